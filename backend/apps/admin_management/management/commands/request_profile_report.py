@@ -0,0 +1,70 @@
+"""
+Print the slowest / most query-heavy views recorded by
+RequestProfilingMiddleware across all workers (from their profile dumps).
+"""
+import json
+
+from django.core.management.base import BaseCommand
+
+from utils.request_profiling import SORT_KEYS, dump_dir, top_views
+
+
+class Command(BaseCommand):
+    help = 'Show the top-N views by latency or query load from the request profiler'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sort',
+            choices=list(SORT_KEYS),
+            default='p95',
+            help='Ranking: p95 latency (default), avg latency, max, queries, duplicates, count, total',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Number of views to show (default: 20)',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the raw summaries as JSON',
+        )
+        parser.add_argument(
+            '--duplicates',
+            action='store_true',
+            help='Also list the most repeated query fingerprints of each view',
+        )
+
+    def handle(self, *args, **options):
+        views = top_views(sort=options['sort'], limit=max(options['limit'], 1))
+
+        if options['json']:
+            self.stdout.write(json.dumps(views, indent=2))
+            return
+
+        if not views:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'No profile data in {dump_dir()} - is REQUEST_PROFILING enabled?'
+                )
+            )
+            return
+
+        header = (
+            f"{'view':<55} {'count':>7} {'avg ms':>8} {'p95 ms':>8} {'max ms':>9} "
+            f"{'queries':>8} {'max q':>6} {'dup q':>6}"
+        )
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in views:
+            self.stdout.write(
+                f"{row['view'][:55]:<55} {row['count']:>7} {row['avg_ms']:>8.1f} "
+                f"{row['p95_ms']:>8.1f} {row['max_ms']:>9.1f} {row['avg_queries']:>8.1f} "
+                f"{row['max_queries']:>6} {row['avg_duplicates']:>6.1f}"
+            )
+            if options['duplicates']:
+                for duplicate in row['top_duplicates']:
+                    self.stdout.write(
+                        f"    x{duplicate['extra_executions']:<6} {duplicate['sql'][:140]}"
+                    )
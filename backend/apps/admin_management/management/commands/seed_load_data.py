@@ -0,0 +1,614 @@
+"""
+Django management command to generate production-scale data for load and
+query benchmarking.
+
+Everything is written with bulk_create in large batches and driven by a
+seeded RNG, so the same ``--seed``/``--scale`` always yields the same rows.
+At ``--scale 1`` it creates roughly 1k customers, 100 cooks, 20k orders,
+50k order items and 100k location updates; ``--scale 50`` gives ~1M orders.
+"""
+
+import math
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from apps.authentication.models import Cook, Customer, DeliveryAgent
+from apps.communications.models import Notification
+from apps.food.models import Food, FoodPrice
+from apps.food.price_summary import refresh_price_summaries
+from apps.orders.models import LocationUpdate, Order, OrderItem
+from apps.payments.models import Payment
+from apps.users.models import ChefLocation
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+User = get_user_model()
+
+# Rows created per unit of --scale
+BASE_CUSTOMERS = 1000
+BASE_COOKS = 100
+BASE_DELIVERY_AGENTS = 50
+BASE_ORDERS = 20000
+
+FOODS_PER_COOK = 12
+LOCATION_POINTS_PER_DELIVERY = 8
+
+# (city, latitude, longitude, share of customers and cooks)
+CITIES = [
+    ("Colombo", 6.9271, 79.8612, 0.45),
+    ("Kandy", 7.2906, 80.6337, 0.15),
+    ("Galle", 6.0535, 80.2210, 0.12),
+    ("Negombo", 7.2008, 79.8737, 0.10),
+    ("Jaffna", 9.6615, 80.0255, 0.10),
+    ("Kurunegala", 7.4863, 80.3647, 0.08),
+]
+
+DISHES = [
+    ("Chicken Kottu", "Kottu", 950),
+    ("Vegetable Kottu", "Kottu", 750),
+    ("Chicken Biryani", "Biryani", 1200),
+    ("Mutton Biryani", "Biryani", 1500),
+    ("Fish Curry with Rice", "Rice & Curry", 850),
+    ("Chicken Curry with Rice", "Rice & Curry", 800),
+    ("Egg Hoppers", "Hoppers", 450),
+    ("String Hoppers with Dhal", "Hoppers", 500),
+    ("Devilled Chicken", "Mains", 1100),
+    ("Butter Chicken", "Curries", 1250),
+    ("Chicken Fried Rice", "Fried Rice", 900),
+    ("Seafood Fried Rice", "Fried Rice", 1300),
+    ("Lamprais", "Rice & Curry", 1400),
+    ("Pol Roti with Lunu Miris", "Short Eats", 350),
+    ("Fish Cutlets", "Short Eats", 300),
+    ("Watalappan", "Desserts", 400),
+]
+
+SIZES = [("Small", Decimal("0.75"), -5), ("Medium", Decimal("1.00"), 0), ("Large", Decimal("1.35"), 5)]
+
+# Weight of each hour of the day (lunch and dinner peaks)
+HOUR_WEIGHTS = [
+    0, 0, 0, 0, 0, 0, 1, 2, 4, 3, 3, 6,
+    12, 14, 8, 4, 3, 5, 9, 14, 13, 8, 4, 1,
+]
+
+ITEMS_PER_ORDER_WEIGHTS = [45, 30, 15, 7, 3]  # 1..5 items
+
+
+def zipf_cum_weights(count, exponent=1.1):
+    """Cumulative weights so a few customers/cooks account for most orders"""
+    total = 0.0
+    cumulative = []
+    for rank in range(1, count + 1):
+        total += 1.0 / rank**exponent
+        cumulative.append(total)
+    return cumulative
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def delivery_fee(distance_km):
+    """Same fee structure as Order.calculate_delivery_fee"""
+    if distance_km <= 5.0:
+        return Decimal("300.00")
+    return Decimal("300.00") + Decimal(math.ceil(distance_km - 5.0)) * Decimal("100.00")
+
+
+def quantize(value, places="0.000001"):
+    return Decimal(str(value)).quantize(Decimal(places))
+
+
+class Command(BaseCommand):
+    help = "Generate production-scale orders, payments, tracking and notifications with bulk inserts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Size multiplier; 1.0 is ~20k orders, 50 is ~1M (default: 1.0)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            help="Random seed; the same seed and scale produce the same data (default: 42)",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=180,
+            help="Spread orders over this many days up to now (default: 180)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows per INSERT and orders per transaction (default: 5000)",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete data from a previous run with the same seed first",
+        )
+
+    def handle(self, *args, **options):
+        scale = options["scale"]
+        if scale <= 0:
+            raise CommandError("--scale must be positive")
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = max(options["batch_size"], 1)
+        self.days = max(options["days"], 1)
+        self.tag = f"load{options['seed']}"
+        self.email_domain = f"{self.tag}.chefsync.test"
+        # Anchor timestamps to the hour so reruns within it produce identical rows
+        self.now = timezone.now().replace(minute=0, second=0, microsecond=0)
+
+        existing = User.objects.filter(email__endswith=f"@{self.email_domain}")
+        if existing.exists():
+            if not options["clear"]:
+                raise CommandError(
+                    f"Data for seed {options['seed']} already exists; rerun with --clear"
+                )
+            self.stdout.write("Removing previous run...")
+            self.clear_previous_run(existing)
+
+        started = timezone.now()
+        customers = self.create_users(
+            "customer", max(int(BASE_CUSTOMERS * scale), 1), Customer
+        )
+        cooks = self.create_users("cook", max(int(BASE_COOKS * scale), 1), Cook)
+        agents = self.create_users(
+            "delivery_agent", max(int(BASE_DELIVERY_AGENTS * scale), 1), DeliveryAgent
+        )
+        menus = self.create_menus(cooks)
+        totals = self.create_orders(
+            max(int(BASE_ORDERS * scale), 1), customers, cooks, agents, menus
+        )
+
+        elapsed = (timezone.now() - started).total_seconds()
+        for label, count in totals.items():
+            self.stdout.write(f"  {label}: {count}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {totals['orders']} orders in {elapsed:.1f}s "
+                f"({totals['orders'] / max(elapsed, 1e-6):.0f} orders/s)"
+            )
+        )
+
+    def clear_previous_run(self, users):
+        """Delete the bulk tables first so the cascade collector has little to fetch"""
+        orders = Order.objects.filter(order_number__startswith=f"{self.tag.upper()}-")
+        Notification.objects.filter(user__in=users).delete()
+        LocationUpdate.objects.filter(order__in=orders).delete()
+        Payment.objects.filter(order__in=orders).delete()
+        OrderItem.objects.filter(order__in=orders).delete()
+        orders.delete()
+        users.delete()
+
+    # ------------------------------------------------------------------
+    # Reference data
+    # ------------------------------------------------------------------
+
+    def random_point(self, city):
+        _, lat, lng, _ = city
+        return lat + self.rng.gauss(0, 0.04), lng + self.rng.gauss(0, 0.04)
+
+    def pick_city(self):
+        return self.rng.choices(CITIES, weights=[c[3] for c in CITIES])[0]
+
+    def create_users(self, role, count, profile_model):
+        """Create users of one role plus their role profile rows"""
+        password = make_password(f"{self.tag}-password")
+        users = []
+        cities = []
+        for i in range(count):
+            city = self.pick_city()
+            cities.append(city)
+            joined = self.now - timedelta(days=self.days + self.rng.randint(0, 365))
+            users.append(
+                User(
+                    email=f"{role}{i}@{self.email_domain}",
+                    username=f"{self.tag}_{role}{i}",
+                    name=f"{role.replace('_', ' ').title()} {i}",
+                    password=password,
+                    role=role,
+                    phone_no=f"07{self.rng.randint(10000000, 99999999)}",
+                    address=city[0],
+                    is_active=True,
+                    email_verified=True,
+                    approval_status="approved",
+                    date_joined=joined,
+                    created_at=joined,
+                    updated_at=joined,
+                )
+            )
+        users = self.bulk_insert(User, users, "email")
+
+        profiles = []
+        points = []
+        for user, city in zip(users, cities):
+            lat, lng = self.random_point(city)
+            points.append((lat, lng))
+            if profile_model is Cook:
+                profiles.append(
+                    Cook(
+                        user=user,
+                        specialty=self.rng.choice(DISHES)[1],
+                        kitchen_location=user.address,
+                        experience_years=self.rng.randint(1, 25),
+                        rating_avg=quantize(self.rng.uniform(3.2, 5.0), "0.01"),
+                        kitchen_latitude=quantize(lat),
+                        kitchen_longitude=quantize(lng),
+                    )
+                )
+            elif profile_model is DeliveryAgent:
+                profiles.append(
+                    DeliveryAgent(
+                        user=user,
+                        vehicle_type=self.rng.choice(["bike", "scooter", "car"]),
+                        vehicle_number=f"WP-{self.rng.randint(1000, 9999)}",
+                        is_available=self.rng.random() < 0.7,
+                    )
+                )
+            else:
+                profiles.append(Customer(user=user))
+        profile_model.objects.bulk_create(profiles, batch_size=self.batch_size)
+        if profile_model is Cook:
+            # bulk_create skips the Cook signals that keep ChefLocation current
+            ChefLocation.objects.bulk_create(
+                [
+                    ChefLocation(
+                        chef=cook.user,
+                        latitude=cook.kitchen_latitude,
+                        longitude=cook.kitchen_longitude,
+                        address=cook.kitchen_location,
+                        source="cook",
+                    )
+                    for cook in profiles
+                ],
+                batch_size=self.batch_size,
+            )
+
+        self.stdout.write(f"Created {len(users)} {role} users")
+        return [
+            (user, lat, lng, city[0]) for user, (lat, lng), city in zip(users, points, cities)
+        ]
+
+    def create_menus(self, cooks):
+        """Create approved foods with 1-3 sizes for every cook"""
+        foods = []
+        for cook, _, _, _ in cooks:
+            for dish, category, base in self.rng.sample(DISHES, min(FOODS_PER_COOK, len(DISHES))):
+                created = cook.created_at + timedelta(days=self.rng.randint(0, 30))
+                foods.append(
+                    Food(
+                        name=dish,
+                        category=category,
+                        # The seed tag keeps descriptions unique for with_pks
+                        description=f"{dish} by {cook.name} ({self.tag})",
+                        status="Approved",
+                        chef=cook,
+                        is_available=self.rng.random() < 0.9,
+                        preparation_time=self.rng.randint(10, 45),
+                        spice_level=self.rng.choice(["mild", "medium", "hot", "very_hot"]),
+                        is_vegetarian="Vegetable" in dish or "Dhal" in dish,
+                        rating_average=quantize(self.rng.uniform(3.0, 5.0), "0.01"),
+                        created_at=created,
+                        updated_at=created,
+                    )
+                )
+        foods = self.bulk_insert(Food, foods, "description")
+
+        base_prices = {dish: base for dish, _, base in DISHES}
+        prices = []
+        for food in foods:
+            for size, factor, prep_delta in self.rng.sample(SIZES, self.rng.randint(1, 3)):
+                prices.append(
+                    FoodPrice(
+                        food=food,
+                        cook_id=food.chef_id,
+                        size=size,
+                        price=(Decimal(base_prices[food.name]) * factor).quantize(Decimal("0.01")),
+                        preparation_time=max(food.preparation_time + prep_delta, 5),
+                        created_at=food.created_at,
+                        updated_at=food.created_at,
+                    )
+                )
+        prices = self.bulk_insert(FoodPrice, prices)
+        # bulk_create skips the FoodPrice signals that keep the summary current
+        refresh_price_summaries([food.pk for food in foods])
+
+        menus = {}
+        for price in prices:
+            menus.setdefault(price.cook_id, []).append(price)
+        self.stdout.write(f"Created {len(foods)} foods with {len(prices)} prices")
+        return menus
+
+    def bulk_insert(self, model, objs, unique_field=None):
+        """
+        bulk_create ``objs`` and return them with primary keys and the
+        generated timestamps
+
+        bulk_create stamps auto_now/auto_now_add fields with the current time,
+        so the generated values are written back with a bulk_update.
+        """
+        fields = [
+            field
+            for field in model._meta.concrete_fields
+            if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+        ]
+        planned = [[getattr(obj, field.attname) for field in fields] for obj in objs]
+        last_pk = None
+        returns_pks = connection.features.can_return_rows_from_bulk_insert
+        if unique_field is None and not returns_pks:
+            last_pk = model.objects.aggregate(last=Max("pk"))["last"] or 0
+
+        model.objects.bulk_create(objs, batch_size=self.batch_size)
+        if unique_field:
+            objs = self.with_pks(objs, model, unique_field)
+        elif objs and objs[0].pk is None:
+            # No unique column: this command is the only writer, so the new
+            # rows are the ones after last_pk, in insertion order
+            pks = model.objects.filter(pk__gt=last_pk).order_by("pk").values_list(
+                "pk", flat=True
+            )
+            for obj, pk in zip(objs, pks):
+                obj.pk = pk
+
+        if fields and objs:
+            for obj, values in zip(objs, planned):
+                for field, value in zip(fields, values):
+                    setattr(obj, field.attname, value)
+            model.objects.bulk_update(
+                objs, [field.name for field in fields], batch_size=self.batch_size
+            )
+        return objs
+
+    def with_pks(self, objs, model, unique_field):
+        """bulk_create does not return primary keys on MySQL; look them up"""
+        if not objs or objs[0].pk is not None:
+            return objs
+        by_key = {}
+        keys = [getattr(obj, unique_field) for obj in objs]
+        for start in range(0, len(keys), self.batch_size):
+            chunk = keys[start:start + self.batch_size]
+            for obj in model.objects.filter(**{f"{unique_field}__in": chunk}):
+                by_key[getattr(obj, unique_field)] = obj
+        return [by_key[key] for key in keys]
+
+    # ------------------------------------------------------------------
+    # Orders
+    # ------------------------------------------------------------------
+
+    def order_time(self):
+        """Random timestamp with weekend uplift and lunch/dinner peaks"""
+        while True:
+            day = self.rng.randrange(self.days)
+            date = self.now - timedelta(days=day)
+            # Weekends are ~40% busier
+            if date.weekday() < 5 and self.rng.random() > 1 / 1.4:
+                continue
+            hour = self.rng.choices(range(24), weights=HOUR_WEIGHTS)[0]
+            placed = date.replace(hour=hour, minute=self.rng.randrange(60), second=self.rng.randrange(60))
+            if placed <= self.now:
+                return placed
+
+    def order_status(self, age):
+        """Older orders are finished; the last few hours hold the live pipeline"""
+        if age > timedelta(hours=3):
+            roll = self.rng.random()
+            if roll < 0.05:
+                return "cancelled"
+            if roll < 0.06:
+                return "refunded"
+            return "delivered"
+        return self.rng.choices(
+            ["pending", "confirmed", "preparing", "ready", "out_for_delivery", "delivered", "cancelled"],
+            weights=[15, 15, 20, 10, 15, 20, 5],
+        )[0]
+
+    def create_orders(self, count, customers, cooks, agents, menus):
+        customer_weights = zipf_cum_weights(len(customers))
+        # Customers order from cooks in their own city; popularity is skewed there too
+        cooks = [cook for cook in cooks if menus.get(cook[0].pk)] or cooks
+        cooks_by_city = {}
+        for cook in cooks:
+            cooks_by_city.setdefault(cook[3], []).append(cook)
+        cooks_by_city = {
+            city: (members, zipf_cum_weights(len(members), exponent=0.9))
+            for city, members in cooks_by_city.items()
+        }
+        fallback = (cooks, zipf_cum_weights(len(cooks), exponent=0.9))
+        totals = dict.fromkeys(
+            ["orders", "order_items", "payments", "location_updates", "notifications"], 0
+        )
+
+        for start in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - start)
+            with transaction.atomic():
+                batch = self.create_order_batch(
+                    start, size, customers, customer_weights, cooks_by_city, fallback, agents, menus
+                )
+            for label, created in batch.items():
+                totals[label] += created
+            self.stdout.write(f"  orders: {start + size}/{count}")
+        return totals
+
+    def create_order_batch(self, start, size, customers, customer_weights, cooks_by_city, fallback, agents, menus):
+        orders = []
+        plans = []
+        for n in range(start, start + size):
+            customer, cust_lat, cust_lng, city = self.rng.choices(
+                customers, cum_weights=customer_weights
+            )[0]
+            local_cooks, cook_weights = cooks_by_city.get(city, fallback)
+            cook, kitchen_lat, kitchen_lng, _ = self.rng.choices(
+                local_cooks, cum_weights=cook_weights
+            )[0]
+            placed = self.order_time()
+            status = self.order_status(self.now - placed)
+
+            menu = menus.get(cook.pk, [])
+            picks = self.rng.sample(
+                menu,
+                min(self.rng.choices(range(1, 6), weights=ITEMS_PER_ORDER_WEIGHTS)[0], len(menu)),
+            )
+            lines = [(price, self.rng.choices([1, 2, 3, 4], weights=[70, 20, 7, 3])[0]) for price in picks]
+            subtotal = sum((price.price * qty for price, qty in lines), Decimal("0.00"))
+            distance = haversine_km(kitchen_lat, kitchen_lng, cust_lat, cust_lng)
+            fee = delivery_fee(distance)
+            tax = (subtotal * Decimal("0.10")).quantize(Decimal("0.01"))
+
+            assigned = status in ("out_for_delivery", "delivered", "refunded")
+            agent = self.rng.choice(agents)[0] if assigned else None
+            prep_minutes = max((price.preparation_time for price, _ in lines), default=20)
+            timeline = self.status_timeline(placed, status, prep_minutes)
+            finished = timeline[-1][1]
+
+            orders.append(
+                Order(
+                    order_number=f"{self.tag.upper()}-{n:09d}",
+                    customer=customer,
+                    chef=cook,
+                    delivery_partner=agent,
+                    status=status,
+                    # Cash on delivery: paid once delivered
+                    payment_status={"delivered": "paid", "refunded": "refunded"}.get(
+                        status, "pending"
+                    ),
+                    payment_method="cash",
+                    subtotal=subtotal,
+                    tax_amount=tax,
+                    delivery_fee=fee,
+                    total_amount=subtotal + tax + fee,
+                    delivery_address=f"{self.rng.randint(1, 400)} Main Street",
+                    delivery_latitude=quantize(cust_lat, "0.00000001"),
+                    delivery_longitude=quantize(cust_lng, "0.00000001"),
+                    distance_km=quantize(distance, "0.01"),
+                    preparation_time=prep_minutes,
+                    estimated_delivery_time=placed + timedelta(minutes=prep_minutes + 25),
+                    actual_delivery_time=finished if status == "delivered" else None,
+                    confirmed_at=timeline[1][1] if len(timeline) > 1 and status != "cancelled" else None,
+                    cancelled_at=finished if status == "cancelled" else None,
+                    status_timestamps={label: at.isoformat() for label, at in timeline},
+                    created_at=placed,
+                    updated_at=finished,
+                )
+            )
+            plans.append((lines, timeline, (kitchen_lat, kitchen_lng, cust_lat, cust_lng)))
+
+        orders = self.bulk_insert(Order, orders, "order_number")
+
+        items, payments, locations, notifications = [], [], [], []
+        for order, (lines, timeline, route) in zip(orders, plans):
+            for price, qty in lines:
+                items.append(
+                    OrderItem(
+                        order=order,
+                        price=price,
+                        quantity=qty,
+                        unit_price=price.price,
+                        total_price=price.price * qty,
+                        food_name=price.food.name,
+                        created_at=order.created_at,
+                    )
+                )
+
+            if order.payment_status in ("paid", "refunded"):
+                payments.append(
+                    Payment(
+                        payment_id=f"PAY-{order.order_number}",
+                        order=order,
+                        amount=order.total_amount,
+                        currency="LKR",
+                        payment_method="cash",
+                        payment_provider="cash",
+                        status="completed" if order.payment_status == "paid" else "refunded",
+                        created_at=order.created_at,
+                        updated_at=order.updated_at,
+                        processed_at=order.updated_at,
+                    )
+                )
+
+            if order.delivery_partner_id:
+                locations.extend(self.route_points(order, route, timeline))
+
+            for label, at in timeline:
+                notifications.append(
+                    Notification(
+                        user=order.customer,
+                        subject=f"Order {order.order_number} {label.replace('_', ' ')}",
+                        message=f"Your order {order.order_number} is now {label.replace('_', ' ')}.",
+                        status="Read" if at < self.now - timedelta(days=1) else "Unread",
+                        time=at,
+                    )
+                )
+
+        self.bulk_insert(OrderItem, items)
+        self.bulk_insert(Payment, payments, "payment_id")
+        self.bulk_insert(LocationUpdate, locations)
+        self.bulk_insert(Notification, notifications)
+        return {
+            "orders": len(orders),
+            "order_items": len(items),
+            "payments": len(payments),
+            "location_updates": len(locations),
+            "notifications": len(notifications),
+        }
+
+    def status_timeline(self, placed, status, prep_minutes):
+        """(status, timestamp) pairs the order went through, ending at ``status``"""
+        flow = ["pending", "confirmed", "preparing", "ready", "out_for_delivery", "delivered"]
+        if status in ("cancelled", "refunded"):
+            reached = flow[: self.rng.randint(1, 2)] if status == "cancelled" else flow
+            steps = reached + [status]
+        else:
+            steps = flow[: flow.index(status) + 1]
+
+        gaps = {
+            "confirmed": (2, 10),
+            "preparing": (1, 5),
+            "ready": (prep_minutes, prep_minutes + 15),
+            "out_for_delivery": (3, 15),
+            "delivered": (10, 40),
+            "cancelled": (1, 10),
+            "refunded": (60, 1440),
+        }
+        at = placed
+        timeline = [(steps[0], at)]
+        for step in steps[1:]:
+            at = min(at + timedelta(minutes=self.rng.randint(*gaps[step])), self.now)
+            timeline.append((step, at))
+        return timeline
+
+    def route_points(self, order, route, timeline):
+        """GPS pings interpolated along the kitchen -> customer route"""
+        kitchen_lat, kitchen_lng, cust_lat, cust_lng = route
+        times = dict(timeline)
+        departed = times.get("out_for_delivery", order.created_at)
+        arrived = times.get("delivered", self.now)
+        points = []
+        for i in range(LOCATION_POINTS_PER_DELIVERY):
+            fraction = i / (LOCATION_POINTS_PER_DELIVERY - 1)
+            points.append(
+                LocationUpdate(
+                    delivery_agent_id=order.delivery_partner_id,
+                    order=order,
+                    latitude=quantize(kitchen_lat + (cust_lat - kitchen_lat) * fraction + self.rng.gauss(0, 0.0005)),
+                    longitude=quantize(kitchen_lng + (cust_lng - kitchen_lng) * fraction + self.rng.gauss(0, 0.0005)),
+                    timestamp=departed + (arrived - departed) * fraction,
+                )
+            )
+        return points
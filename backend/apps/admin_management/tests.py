@@ -752,3 +752,182 @@ class AdminDocumentManagementViewSetTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["id"], self.pending_document.id)
         self.assertEqual(response.data["status"], "pending")
+
+
+class SeedLoadDataCommandTestCase(TestCase):
+    """Test cases for the seed_load_data command"""
+
+    def seed(self, *args):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        call_command(
+            "seed_load_data", "--scale=0.01", "--days=30", "--seed=7", *args, stdout=StringIO()
+        )
+        return list(
+            Order.objects.order_by("order_number").values_list(
+                "order_number", "customer__email", "chef__email", "status", "total_amount", "created_at"
+            )
+        )
+
+    def test_seed_is_deterministic(self):
+        """Test that rerunning with the same seed recreates identical orders"""
+        first = self.seed()
+        second = self.seed("--clear")
+
+        self.assertEqual(len(first), 200)
+        self.assertEqual(first, second)
+
+    def test_related_rows_and_history(self):
+        """Test that items, payments and tracking are generated with past timestamps"""
+        from apps.orders.models import LocationUpdate, OrderItem
+        from apps.payments.models import Payment
+
+        self.seed()
+
+        self.assertGreaterEqual(OrderItem.objects.count(), Order.objects.count())
+        delivered = Order.objects.filter(status="delivered")
+        self.assertEqual(
+            Payment.objects.filter(order__in=delivered).count(), delivered.count()
+        )
+        self.assertTrue(LocationUpdate.objects.filter(order__in=delivered).exists())
+        oldest = Order.objects.order_by("created_at").first()
+        self.assertLess(oldest.created_at, timezone.now() - timedelta(days=7))
+
+    def test_timestamps_are_backdated_without_touching_auto_now(self):
+        """Test that generated timestamps are kept and auto_now still applies afterwards"""
+        from apps.communications.models import Notification
+        from apps.orders.models import LocationUpdate
+
+        self.seed()
+
+        week_ago = timezone.now() - timedelta(days=7)
+        for model, field in [
+            (Food, "created_at"),
+            (Order, "updated_at"),
+            (LocationUpdate, "timestamp"),
+            (Notification, "time"),
+        ]:
+            oldest = model.objects.order_by(field).values_list(field, flat=True).first()
+            self.assertLess(oldest, week_ago, model.__name__)
+
+        food = Food.objects.order_by("created_at").first()
+        food.save()
+        self.assertGreater(food.updated_at, week_ago)
+
+    def test_chef_locations_are_filled(self):
+        """Test that bulk-created cooks get the ChefLocation signals would build"""
+        from apps.authentication.models import Cook
+        from apps.users.kitchen_location_utils import build_chef_location
+        from apps.users.models import ChefLocation
+
+        self.seed()
+
+        cook = Cook.objects.first()
+        location = ChefLocation.objects.get(chef_id=cook.user_id)
+        built = build_chef_location(cook.user_id)
+        self.assertEqual(
+            (location.latitude, location.longitude, location.address, location.source),
+            (built["latitude"], built["longitude"], built["address"], built["source"]),
+        )
+        self.assertEqual(ChefLocation.objects.count(), Cook.objects.count())
+
+    def test_food_price_summaries_are_filled(self):
+        """Test that bulk-created foods get their stored price range"""
+        from django.db.models import Count, Max, Min
+
+        self.seed()
+
+        food = Food.objects.annotate(
+            low=Min("prices__price"), high=Max("prices__price"), cooks=Count("prices__cook", distinct=True)
+        ).first()
+        self.assertEqual(
+            (food.min_price, food.max_price, food.cook_count), (food.low, food.high, food.cooks)
+        )
+        self.assertFalse(Food.objects.filter(min_price__isnull=True).exists())
+
+
+class RequestProfilingTestCase(APITestCase):
+    """Test cases for the request profiling middleware and report"""
+
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        from django.test import override_settings
+        from utils.request_profiling import profile_store
+
+        dump_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, dump_dir, ignore_errors=True)
+        overrides = override_settings(
+            REQUEST_PROFILING=True,
+            REQUEST_PROFILING_DUMP_DIR=dump_dir,
+            REQUEST_PROFILING_DUMP_SECONDS=0,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        profile_store.reset()
+        self.addCleanup(profile_store.reset)
+
+        self.admin_user = User.objects.create_superuser(
+            email="admin@example.com", password="testpass123", name="Admin User", role="admin"
+        )
+        self.customer = User.objects.create_user(
+            email="customer@example.com", password="testpass123", name="Customer", role="customer"
+        )
+        chef = User.objects.create_user(
+            email="chef@example.com", password="testpass123", name="Chef", role="cook"
+        )
+        for _ in range(3):
+            Order.objects.create(customer=self.customer, chef=chef, status="pending")
+
+    def test_requests_are_profiled_per_view(self):
+        """Test that view, query count and repeated queries are recorded"""
+        self.client.force_authenticate(user=self.customer)
+        response = self.client.get("/api/orders/orders/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("queries", response["Server-Timing"])
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(
+            reverse("request-performance"), {"sort": "queries", "workers": "self"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = {row["view"]: row for row in response.data["views"]}
+        orders = rows["GET orders-list"]
+        self.assertEqual(orders["count"], 1)
+        self.assertGreater(orders["avg_queries"], 0)
+        # Per-order lookups in the serializer show up as repeated fingerprints
+        self.assertGreater(orders["avg_duplicates"], 0)
+        self.assertTrue(orders["top_duplicates"])
+        self.assertGreaterEqual(orders["p95_ms"], orders["p50_ms"])
+
+    def test_invalid_sort_is_rejected(self):
+        """Test that unknown sort keys return 400"""
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(reverse("request-performance"), {"sort": "bogus"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_report_command_lists_views(self):
+        """Test that the management command prints the recorded views"""
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        self.client.force_authenticate(user=self.customer)
+        self.client.get("/api/orders/orders/")
+
+        out = StringIO()
+        call_command("request_profile_report", "--sort=count", stdout=out)
+        self.assertIn("GET orders-list", out.getvalue())
+
+    def test_fingerprint_ignores_values(self):
+        """Test that the same statement with different values shares a fingerprint"""
+        from utils.request_profiling import fingerprint
+
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s) AND x = 5"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND x = 7"),
+        )
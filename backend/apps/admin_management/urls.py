@@ -19,6 +19,9 @@ urlpatterns = [
     # Reports endpoints
     path('reports/templates/', views.get_report_templates, name='report-templates'),
     path('reports/generate/', views.generate_report, name='generate-report'),
+
+    # Request profiling (config.middleware.RequestProfilingMiddleware)
+    path('performance/requests/', views.request_performance, name='request-performance'),
     
     # AI/ML Endpoints (Phase 3)
     path('ai/sales-forecast/', ai_views.sales_forecast, name='ai-sales-forecast'),
@@ -4391,3 +4391,50 @@ def generate_report(request):
             {"error": f"Failed to generate report: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
+
+
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAdminUser])
+def request_performance(request):
+    """
+    Slowest / most query-heavy views recorded by RequestProfilingMiddleware
+
+    Query params:
+        sort: p95 (default), latency, max, queries, duplicates, count or total
+        limit: number of views (default 20)
+        workers: "all" (default) merges other workers' dumps, "self" only this one
+    DELETE clears this worker's in-memory profile.
+    """
+    from django.conf import settings
+
+    from utils.request_profiling import SORT_KEYS, profile_store, top_views
+
+    if request.method == "DELETE":
+        profile_store.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    sort = request.query_params.get("sort", "p95")
+    if sort not in SORT_KEYS:
+        return Response(
+            {"error": f"sort must be one of: {', '.join(SORT_KEYS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        limit = max(int(request.query_params.get("limit", 20)), 1)
+    except ValueError:
+        return Response(
+            {"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response(
+        {
+            "enabled": getattr(settings, "REQUEST_PROFILING", False),
+            "window_seconds": profile_store.window_seconds,
+            "sort": sort,
+            "views": top_views(
+                sort=sort,
+                limit=limit,
+                include_dumps=request.query_params.get("workers", "all") != "self",
+            ),
+        }
+    )
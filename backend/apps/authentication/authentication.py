@@ -1,64 +1,139 @@
 """
 Custom JWT Authentication for ChefSync
 """
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-from rest_framework_simplejwt.tokens import AccessToken
-from .services.jwt_service import JWTTokenService
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """
+    Short-TTL, per-process LRU of users resolved from access tokens.
+
+    Entries are dropped on ``User`` save/delete in this process (see
+    ``signals.py``); other processes pick up changes once the TTL expires, so
+    a deactivated user is rejected everywhere within ``ttl`` seconds.
+
+    Keys are normalised to ``str`` since the token claim is a string while
+    ``User.pk`` is an int.
+
+    The cache is for authenticating only: the copies it hands out remember
+    the field values they were cached with, and ``User.save`` then writes
+    just the fields a request changed instead of the whole, possibly stale,
+    row.
+    """
+
+    def __init__(self, ttl=30, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, user_id):
+        """Return a private copy of the cached user, or None"""
+        user_id = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= now:
+                del self._entries[user_id]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+        # Views mutate and save request.user, so never hand out the shared instance
+        user = copy.copy(user)
+        user._cached_state = user.field_state()
+        return user
+
+    def set(self, user_id, user):
+        if self.ttl <= 0:
+            return
+        user_id = str(user_id)
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, copy.copy(user))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._entries.pop(str(user_id), None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+user_cache = UserCache(
+    ttl=getattr(settings, "JWT_USER_CACHE_TTL", 30),
+    max_size=getattr(settings, "JWT_USER_CACHE_SIZE", 10000),
+)
 
 
 class CustomJWTAuthentication(JWTAuthentication):
     """
-    Custom JWT Authentication that validates tokens against database
+    JWT authentication that decodes the access token once and resolves the
+    user through ``user_cache`` instead of a SELECT on every request.
+
+    Access tokens stay stateless as in ``JWTTokenService.validate_token``:
+    a token is accepted while its signature and expiry are valid and the
+    user exists and is active.
     """
-    
-    def get_validated_token(self, raw_token):
-        """
-        Validates an encoded JSON web token and returns a validated token
-        wrapper object.
-        """
-        messages = []
-        for AuthToken in self.get_auth_token_classes():
-            try:
-                # Validate token with SimpleJWT first
-                validated_token = AuthToken(raw_token)
-                
-                # Additional validation against database
-                is_valid, user, error = JWTTokenService.validate_token(
-                    str(validated_token), 
-                    'access'
-                )
-                
-                if not is_valid:
-                    raise InvalidToken(error)
-                
-                return validated_token
-                
-            except TokenError as e:
-                messages.append({'token_class': AuthToken.__name__,
-                               'token_type': AuthToken.token_type,
-                               'message': e.args[0]})
-
-        raise InvalidToken({
-            'detail': 'Given token not valid for any token type',
-            'messages': messages,
-        })
-    
+
     def get_user(self, validated_token):
         """
         Attempts to find and return a user using the given validated token.
         """
-        try:
-            user_id = validated_token[self.get_user_id_claim()]
-        except KeyError:
-            raise InvalidToken('Token contained no recognizable user identification')
-
-        try:
-            user = self.get_user_model().objects.get(**{self.get_user_id_field(): user_id})
-        except self.get_user_model().DoesNotExist:
-            raise InvalidToken('User not found')
-
-        if not user.is_active:
-            raise InvalidToken('User is inactive')
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id) if user_id is not None else None
+        if user is None:
+            # Fetches the user and runs the active/revocation checks
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                "The user's password has been changed.", code="password_changed"
+            )
 
         return user
@@ -0,0 +1,74 @@
+"""
+Management command comparing the stock simplejwt authenticator with
+CustomJWTAuthentication: queries and time per authenticated request.
+
+Runs against the configured database inside a rolled back transaction.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.authentication.authentication import CustomJWTAuthentication, user_cache
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark JWT authentication with and without the user cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Authenticated requests per authenticator (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = max(options['requests'], 1)
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    email='benchmark_auth@chefsync.local',
+                    password='benchmark-pass-123',
+                    name='Auth Benchmark',
+                    role='customer',
+                )
+                access = str(RefreshToken.for_user(user).access_token)
+                request = APIRequestFactory().get(
+                    '/', HTTP_AUTHORIZATION=f'Bearer {access}'
+                )
+                user_cache.clear()
+                for label, authenticator in (
+                    ('simplejwt JWTAuthentication', JWTAuthentication()),
+                    ('CustomJWTAuthentication', CustomJWTAuthentication()),
+                ):
+                    self._run(label, authenticator, request, iterations)
+                raise _Rollback
+        except _Rollback:
+            pass
+        finally:
+            user_cache.clear()
+
+    def _run(self, label, authenticator, request, iterations):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                authenticator.authenticate(request)
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(label)
+            + f': {len(queries) / iterations:.3f} queries/request, '
+            f'{elapsed / iterations * 1e6:.1f} us/request'
+        )
@@ -0,0 +1,86 @@
+"""
+Management command measuring the login endpoint: queries, time and logins
+per second with and without the Django session.
+
+Runs against the configured database inside a rolled back transaction.
+Rate limiting is disabled for the run; --cheap-hasher swaps the password
+hasher for MD5 so the numbers show the endpoint's own overhead instead of
+PBKDF2.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+PASSWORD = 'benchmark-pass-123'
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the login endpoint with and without a session'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--logins',
+            type=int,
+            default=50,
+            help='Logins per mode (default: 50)',
+        )
+        parser.add_argument(
+            '--cheap-hasher',
+            action='store_true',
+            help='Hash the benchmark password with MD5 to take hashing out of the timing',
+        )
+
+    def handle(self, *args, **options):
+        iterations = max(options['logins'], 1)
+        overrides = {'RATELIMIT_ENABLE': False}
+        if options['cheap_hasher']:
+            overrides['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+        with override_settings(**overrides):
+            try:
+                with transaction.atomic():
+                    user = User.objects.create_user(
+                        email='benchmark_login@chefsync.local',
+                        password=PASSWORD,
+                        name='Login Benchmark',
+                        role='customer',
+                    )
+                    for label, session in (
+                        ('login with session', True),
+                        ('login, JWT only', False),
+                    ):
+                        self._run(label, user.email, session, iterations)
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _run(self, label, email, session, iterations):
+        client = APIClient()
+        payload = {'email': email, 'password': PASSWORD, 'session': session}
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                response = client.post('/api/auth/login/', payload, format='json')
+                if response.status_code != 200:
+                    self.stderr.write(f'{label}: login failed with {response.status_code}')
+                    return
+                client.cookies.clear()
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(label)
+            + f': {len(queries) / iterations:.2f} queries/login, '
+            f'{elapsed / iterations * 1000:.2f} ms/login, '
+            f'{iterations / elapsed:.1f} logins/s'
+        )
@@ -0,0 +1,83 @@
+"""
+Management command to inspect and resume PDF conversion jobs that did not
+complete (Cloudinary outage, worker restart mid-conversion, ...), and to purge
+the PDFs of failed jobs nobody retried.
+"""
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.authentication.models import DocumentConversionJob
+from apps.authentication.services.pdf_service import (
+    PDFConversionError,
+    purge_failed_conversions,
+    resume_pdf_conversion,
+)
+
+
+class Command(BaseCommand):
+    help = 'List unfinished PDF conversion jobs, resume them and purge stale ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--resume',
+            nargs='+',
+            default=[],
+            metavar='JOB_ID',
+            help='Resume these jobs',
+        )
+        parser.add_argument(
+            '--resume-failed',
+            action='store_true',
+            help='Resume every failed job whose PDF is still kept',
+        )
+        parser.add_argument(
+            '--purge-failed',
+            type=int,
+            default=getattr(settings, 'PDF_JOB_RETENTION_DAYS', 7),
+            metavar='DAYS',
+            help='Delete the PDFs of failed jobs not retried for this long '
+                 '(default: PDF_JOB_RETENTION_DAYS, 0 to keep)',
+        )
+
+    def handle(self, *args, **options):
+        unfinished = DocumentConversionJob.objects.exclude(status='completed')
+        self.stdout.write(f'{unfinished.count()} unfinished job(s)')
+        for job in unfinished:
+            self.stdout.write(
+                f'  {job.job_id} {job.status} {job.completed_pages}/{job.total_pages} '
+                f'{job.user_email} {job.document_type_name} {job.error}'.rstrip()
+            )
+
+        job_ids = list(options['resume'])
+        if options['resume_failed']:
+            job_ids += [
+                str(job_id) for job_id in
+                unfinished.filter(status='failed').exclude(source_path='')
+                .values_list('job_id', flat=True)
+            ]
+
+        resumed = failed = 0
+        for job_id in dict.fromkeys(job_ids):
+            try:
+                images = resume_pdf_conversion(job_id)
+            except (DocumentConversionJob.DoesNotExist, ValidationError):
+                raise CommandError(f'No conversion job {job_id}')
+            except PDFConversionError as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'  failed {job_id}: {e}'))
+            else:
+                resumed += 1
+                self.stdout.write(
+                    self.style.SUCCESS(f'  resumed {job_id} ({len(images)} pages)')
+                )
+
+        purged = 0
+        if options['purge_failed']:
+            purged = purge_failed_conversions(options['purge_failed'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Done: {resumed} resumed, {failed} failed, {purged} stale job(s) purged'
+            )
+        )
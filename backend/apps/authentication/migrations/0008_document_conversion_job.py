@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:28
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_merge_20251025_1420'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentConversionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('user_email', models.EmailField(db_index=True, max_length=254)),
+                ('document_type_name', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('total_pages', models.PositiveIntegerField(default=0)),
+                ('completed_pages', models.PositiveIntegerField(default=0)),
+                ('pages', models.JSONField(blank=True, default=dict, help_text='Upload result per page number, filled in as pages complete')),
+                ('source_path', models.CharField(blank=True, help_text='Spooled PDF kept until the job completes so it can be resumed', max_length=500)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'document_conversion_jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0008_document_conversion_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jwttoken',
+            index=models.Index(fields=['revoked_at'], name='jwt_tokens_revoked_6ea6d1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jwttoken',
+            index=models.Index(fields=['blacklisted_at'], name='jwt_tokens_blackli_57710c_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
-import datetime
+import copy
 import random
 import string
+import uuid
 from datetime import timedelta
 
 from django.contrib.auth.models import AbstractUser, BaseUserManager
@@ -179,6 +180,13 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.name} ({self.get_role_display()})"
 
+    def field_state(self):
+        """Values of the concrete fields, to tell later which ones changed"""
+        return {
+            field.attname: copy.deepcopy(getattr(self, field.attname))
+            for field in self._meta.concrete_fields
+        }
+
     def create_profile(self):
         """Create the appropriate profile model based on user role"""
         if self.role in ["customer", "Customer"]:
@@ -246,25 +254,54 @@ class User(AbstractUser):
         return False
 
     def increment_failed_login(self):
-        """Increment failed login attempts"""
-        from django.utils import timezone
+        """
+        Increment failed login attempts in one atomic UPDATE, locking the
+        account for 30 minutes from the 5th consecutive failure
+        """
+        now = timezone.now()
+        locks = models.Q(failed_login_attempts__gte=4)
+        # The lock columns are assigned first: MySQL evaluates SET clauses
+        # left to right, so they must see the attempt count before the increment
+        type(self).objects.filter(pk=self.pk).update(
+            account_locked_until=models.Case(
+                models.When(locks, then=models.Value(now + timedelta(minutes=30))),
+                default=models.F("account_locked_until"),
+            ),
+            account_locked=models.Case(
+                models.When(locks, then=models.Value(True)),
+                default=models.F("account_locked"),
+            ),
+            last_failed_login=now,
+            failed_login_attempts=models.F("failed_login_attempts") + 1,
+        )
 
         self.failed_login_attempts += 1
-        self.last_failed_login = timezone.now()
-
-        # Lock account after 5 failed attempts
+        self.last_failed_login = now
         if self.failed_login_attempts >= 5:
             self.account_locked = True
-            self.account_locked_until = timezone.now() + datetime.timedelta(minutes=30)
-
-        self.save()
+            self.account_locked_until = now + timedelta(minutes=30)
+
+    def reset_failed_login_attempts(self, update_last_login=False):
+        """
+        Reset failed login attempts (and optionally stamp last_login) in one
+        UPDATE; nothing is written when there is nothing to change
+        """
+        changes = {}
+        if self.failed_login_attempts or self.account_locked or self.account_locked_until:
+            changes.update(
+                failed_login_attempts=0,
+                account_locked=False,
+                account_locked_until=None,
+            )
+        if update_last_login:
+            changes["last_login"] = timezone.now()
+        if not changes:
+            return False
 
-    def reset_failed_login_attempts(self):
-        """Reset failed login attempts"""
-        self.failed_login_attempts = 0
-        self.account_locked = False
-        self.account_locked_until = None
-        self.save()
+        type(self).objects.filter(pk=self.pk).update(**changes)
+        for field, value in changes.items():
+            setattr(self, field, value)
+        return True
 
     def can_login(self):
         """Check if user can login based on approval status"""
@@ -384,7 +421,27 @@ class User(AbstractUser):
                 self.approval_status = "pending"
             # Admin role can login without approval
 
+        # request.user may be a copy from the JWT user cache (see
+        # authentication.UserCache) that is older than the row: write only
+        # the fields changed on it so other workers' changes are not undone
+        cached_state = getattr(self, "_cached_state", None)
+        if (
+            cached_state is not None
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and (
+                    field.name == "updated_at"
+                    or getattr(self, field.attname) != cached_state[field.attname]
+                )
+            ]
         super().save(*args, **kwargs)
+        if cached_state is not None:
+            self._cached_state = self.field_state()
 
     @property
     def id(self):
@@ -643,6 +700,50 @@ class UserDocument(models.Model):
         ordering = ["-uploaded_at"]
 
 
+class DocumentConversionJob(models.Model):
+    """Progress of a PDF-to-image conversion (see ``PDFService``)"""
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user_email = models.EmailField(db_index=True)
+    document_type_name = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    total_pages = models.PositiveIntegerField(default=0)
+    completed_pages = models.PositiveIntegerField(default=0)
+    pages = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Upload result per page number, filled in as pages complete",
+    )
+    source_path = models.CharField(
+        max_length=500,
+        blank=True,
+        help_text="Spooled PDF kept until the job completes so it can be resumed",
+    )
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Conversion {self.job_id} ({self.completed_pages}/{self.total_pages})"
+
+    @property
+    def progress(self):
+        if not self.total_pages:
+            return 0
+        return round(self.completed_pages * 100 / self.total_pages)
+
+    class Meta:
+        db_table = "document_conversion_jobs"
+        ordering = ["-created_at"]
+
+
 class EmailOTP(models.Model):
     email = models.EmailField()
     otp = models.CharField(max_length=6)
@@ -771,6 +872,8 @@ class JWTToken(models.Model):
             models.Index(fields=["jti"]),
             models.Index(fields=["expires_at"]),
             models.Index(fields=["is_revoked", "is_blacklisted"]),
+            models.Index(fields=["revoked_at"]),
+            models.Index(fields=["blacklisted_at"]),
         ]
 
     def __str__(self):
@@ -96,6 +96,9 @@ class UserLoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField()
 
+    # The account matching the email, set even when validation fails
+    user = None
+
     def validate(self, attrs):
         email = attrs.get("email")
         password = attrs.get("password")
@@ -109,6 +112,9 @@ class UserLoginSerializer(serializers.Serializer):
         except User.DoesNotExist:
             raise serializers.ValidationError("Invalid email or password")
 
+        # Kept for the view so a failed attempt can be counted without a re-query
+        self.user = user
+
         # Check if password is correct
         if not user.check_password(password):
             raise serializers.ValidationError("Invalid email or password")
@@ -119,18 +125,13 @@ class UserLoginSerializer(serializers.Serializer):
                 "Your account has been deactivated. Please contact support."
             )
 
-        # Check if account is locked
+        # Check if account is locked; an expired lock is cleared by the
+        # view's reset_failed_login_attempts() once the login succeeds
         if user.account_locked:
             if user.account_locked_until and user.account_locked_until > timezone.now():
                 raise serializers.ValidationError(
                     "Account is temporarily locked due to multiple failed login attempts. Please try again later."
                 )
-            else:
-                # Unlock account if lock period has expired
-                user.account_locked = False
-                user.account_locked_until = None
-                user.failed_login_attempts = 0
-                user.save()
 
         # Check approval status for cooks and delivery agents
         if user.role in ["cook", "delivery_agent"]:
@@ -0,0 +1,356 @@
+"""
+Streaming proxy for user documents stored on Cloudinary
+
+Used by ``proxy_document_download``. Remote files are relayed in chunks
+through a pooled HTTP session instead of being read into memory, ``Range``
+and ``If-None-Match`` are passed through, and complete downloads are kept in
+a bounded on-disk LRU so admins paging back and forth through documents
+during a review are served from local disk.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from typing import Dict, Iterator, Optional
+
+import requests
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Upstream headers relayed to the client
+PASSTHROUGH_HEADERS = (
+    "Content-Type",
+    "Content-Length",
+    "Content-Range",
+    "Accept-Ranges",
+    "ETag",
+    "Last-Modified",
+)
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RemoteDocumentError(Exception):
+    """Raised when the remote file cannot be fetched"""
+
+
+# ----------------------------------------------------------------------
+# Pooled session
+# ----------------------------------------------------------------------
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Process-wide session so connections to Cloudinary are reused"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=getattr(settings, "DOCUMENT_PROXY_POOL_SIZE", 10),
+                max_retries=Retry(
+                    total=2,
+                    backoff_factor=0.3,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=("GET",),
+                ),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+# ----------------------------------------------------------------------
+# On-disk cache
+# ----------------------------------------------------------------------
+
+
+class DocumentCache:
+    """
+    Bounded LRU of downloaded documents on disk.
+
+    Each entry is ``<key>.body`` plus ``<key>.json`` (content type, ETag,
+    size). Recency is the body's mtime, refreshed on every hit; the oldest
+    entries are evicted once the directory exceeds ``max_bytes``.
+    """
+
+    def __init__(self, directory, max_bytes, max_file_bytes):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return f"{base}.body", f"{base}.json"
+
+    def get(self, url: str) -> Optional[Dict]:
+        body_path, meta_path = self._paths(self.key(url))
+        try:
+            with open(meta_path) as handle:
+                meta = json.load(handle)
+            os.utime(body_path)
+        except (OSError, ValueError):
+            return None
+        meta["path"] = body_path
+        return meta
+
+    def writer(self, url: str, meta: Dict):
+        """Return a ``CacheWriter`` for a full download of ``url``"""
+        os.makedirs(self.directory, exist_ok=True)
+        return CacheWriter(self, self.key(url), meta)
+
+    def commit(self, key: str, tmp_path: str, meta: Dict):
+        body_path, meta_path = self._paths(key)
+        os.replace(tmp_path, body_path)
+        with open(meta_path, "w") as handle:
+            json.dump(meta, handle)
+        self.evict()
+
+    def evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.directory):
+                if not name.endswith(".body"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                for victim in (path, path[: -len(".body")] + ".json"):
+                    try:
+                        os.remove(victim)
+                    except OSError:
+                        pass
+                total -= size
+
+
+class CacheWriter:
+    """Tees a streamed download into the cache; discarded unless completed"""
+
+    def __init__(self, cache: DocumentCache, key: str, meta: Dict):
+        self.cache = cache
+        self.key = key
+        self.meta = meta
+        self.size = 0
+        self.tmp_path = os.path.join(cache.directory, f"{key}.{uuid.uuid4().hex}.tmp")
+        self._file = open(self.tmp_path, "wb")
+        self.active = True
+
+    def write(self, chunk: bytes):
+        if not self.active:
+            return
+        self.size += len(chunk)
+        if self.size > self.cache.max_file_bytes:
+            self.discard()
+            return
+        self._file.write(chunk)
+
+    def commit(self):
+        if not self.active:
+            return
+        self._file.close()
+        self.active = False
+        self.meta["size"] = self.size
+        self.cache.commit(self.key, self.tmp_path, self.meta)
+
+    def discard(self):
+        if not self.active:
+            return
+        self._file.close()
+        self.active = False
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+document_cache = DocumentCache(
+    directory=getattr(
+        settings,
+        "DOCUMENT_CACHE_DIR",
+        os.path.join(str(settings.BASE_DIR), "var", "document_cache"),
+    ),
+    max_bytes=getattr(settings, "DOCUMENT_CACHE_MAX_BYTES", 500 * 1024 * 1024),
+    max_file_bytes=getattr(settings, "DOCUMENT_CACHE_MAX_FILE_BYTES", 50 * 1024 * 1024),
+)
+
+
+# ----------------------------------------------------------------------
+# Responses
+# ----------------------------------------------------------------------
+
+
+def parse_range(header: Optional[str], size: int):
+    """Return ``(start, end)`` for a single ``bytes=`` range, or None"""
+    match = _RANGE_RE.match(header or "")
+    if not match or size == 0:
+        return None
+    start, end = match.groups()
+    if start == "" and end == "":
+        return None
+    if start == "":
+        # Suffix range: the last N bytes
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end) if end else size - 1, size - 1)
+    if start > end:
+        return None
+    return start, end
+
+
+def _read_file(path: str, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(path: str, content_type: str, request_headers, etag: str = None):
+    """Stream a local file, honouring ``Range`` and ``If-None-Match``"""
+    size = os.path.getsize(path)
+    if etag and request_headers.get("If-None-Match") == etag:
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
+
+    byte_range = parse_range(request_headers.get("Range"), size)
+    if request_headers.get("Range") and byte_range is None:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    response = StreamingHttpResponse(
+        _read_file(path, start, length),
+        content_type=content_type,
+        status=206 if byte_range else 200,
+    )
+    response["Content-Length"] = str(length)
+    response["Accept-Ranges"] = "bytes"
+    if byte_range:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    if etag:
+        response["ETag"] = etag
+    return response
+
+
+def _relay(upstream: requests.Response, writer: Optional[CacheWriter]) -> Iterator[bytes]:
+    completed = False
+    try:
+        for chunk in upstream.iter_content(chunk_size=CHUNK_SIZE):
+            if writer:
+                writer.write(chunk)
+            yield chunk
+        completed = True
+    finally:
+        upstream.close()
+        if writer and completed:
+            writer.commit()
+        elif writer:
+            writer.discard()
+
+
+def stream_remote_file(url: str, request_headers, content_type: str = None):
+    """
+    Relay ``url`` to the client without buffering it.
+
+    Served from the disk cache when possible. Otherwise the client's
+    ``Range``/``If-None-Match`` headers are forwarded upstream and full
+    200 responses are written to the cache while they stream.
+
+    Raises:
+        RemoteDocumentError: If the upstream request fails
+    """
+    cached = document_cache.get(url)
+    if cached:
+        try:
+            return file_response(
+                cached["path"],
+                content_type or cached.get("content_type") or "application/octet-stream",
+                request_headers,
+                etag=cached.get("etag"),
+            )
+        except OSError:
+            # Evicted between lookup and open; fetch it again
+            pass
+
+    forward = {
+        name: request_headers[name]
+        for name in ("Range", "If-None-Match", "If-Range")
+        if request_headers.get(name)
+    }
+    # Relay bytes as stored so Content-Length/Content-Range stay valid
+    forward["Accept-Encoding"] = "identity"
+    timeout = getattr(settings, "DOCUMENT_PROXY_TIMEOUT", 30)
+    try:
+        upstream = get_session().get(url, headers=forward, stream=True, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        raise RemoteDocumentError(str(e))
+
+    if upstream.status_code == 304:
+        upstream.close()
+        response = HttpResponse(status=304)
+        if upstream.headers.get("ETag"):
+            response["ETag"] = upstream.headers["ETag"]
+        return response
+
+    if upstream.status_code not in (200, 206):
+        upstream.close()
+        raise RemoteDocumentError(f"Upstream returned HTTP {upstream.status_code}")
+
+    resolved_type = content_type or upstream.headers.get(
+        "Content-Type", "application/octet-stream"
+    )
+    writer = None
+    if upstream.status_code == 200:
+        declared = int(upstream.headers.get("Content-Length") or 0)
+        if declared <= document_cache.max_file_bytes:
+            try:
+                writer = document_cache.writer(
+                    url,
+                    {"content_type": resolved_type, "etag": upstream.headers.get("ETag")},
+                )
+            except OSError as e:
+                logger.warning(f"Document cache unavailable: {e}")
+
+    response = StreamingHttpResponse(
+        _relay(upstream, writer),
+        content_type=resolved_type,
+        status=upstream.status_code,
+    )
+    for header in PASSTHROUGH_HEADERS:
+        if header != "Content-Type" and upstream.headers.get(header):
+            response[header] = upstream.headers[header]
+    return response
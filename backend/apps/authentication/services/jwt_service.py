@@ -10,6 +10,10 @@ from django.conf import settings
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 from apps.authentication.models import User, JWTToken
+from apps.authentication.services.token_revocation import (
+    revocation_list,
+    usage_tracker,
+)
 
 
 class JWTTokenService:
@@ -61,58 +65,75 @@ class JWTTokenService:
         refresh_expires_at = timezone.now() + timedelta(days=settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'].days)
         
         # Store ONLY refresh token in database
-        refresh_token_record = cls._store_token(
+        refresh_token_record = cls._build_token(
             user=user,
             token=str(refresh),
             token_type='refresh',
+            jti=refresh['jti'],
             expires_at=refresh_expires_at,
             client_info=client_info
         )
+        cls._store_tokens([refresh_token_record])
         
         return {
             'access_token': str(access),
             'refresh_token': str(refresh),
             'refresh_token_info': {
+                # None on backends whose bulk inserts do not return keys (MySQL)
                 'id': refresh_token_record.id,
+                'jti': refresh_token_record.jti,
                 'issued_at': refresh_token_record.issued_at,
                 'expires_at': refresh_token_record.expires_at,
             }
         }
     
     @classmethod
-    def _store_token(cls, user: User, token: str, token_type: str, 
-                    expires_at: datetime, client_info: Dict[str, Any]) -> JWTToken:
-        """Store token in database"""
-        token_hash = cls.generate_token_hash(token)
-        
-        # Extract JTI from token
-        try:
-            if token_type == 'access':
-                access_token = AccessToken(token)
-                jti = access_token.get('jti')
-            else:
-                refresh_token = RefreshToken(token)
-                jti = refresh_token.get('jti')
-        except Exception:
-            jti = secrets.token_urlsafe(32)  # Generate random JTI if extraction fails
-        
-        return JWTToken.objects.create(
+    def _build_token(cls, user: User, token: str, token_type: str, jti: Optional[str],
+                     expires_at: datetime, client_info: Dict[str, Any]) -> JWTToken:
+        """Build an unsaved token row; the jti comes from the token object, no re-decode"""
+        return JWTToken(
             user=user,
-            token_hash=token_hash,
+            token_hash=cls.generate_token_hash(token),
             token_type=token_type,
-            jti=jti,
+            jti=jti or secrets.token_urlsafe(32),
             expires_at=expires_at,
             ip_address=client_info.get('ip_address'),
             user_agent=client_info.get('user_agent'),
             device_info=client_info.get('device_info')
         )
     
+    @staticmethod
+    def _store_tokens(records) -> list:
+        """Insert the token rows of one issue in a single statement"""
+        created = JWTToken.objects.bulk_create(records)
+        for record in created:
+            if record.token_type == 'refresh':
+                revocation_list.mark_issued(record.token_hash)
+        return created
+    
+    @staticmethod
+    def _get_active_user(user_id) -> Tuple[Optional[User], Optional[str]]:
+        """Resolve the token's user through the JWT user cache"""
+        from apps.authentication.authentication import user_cache
+
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = User.objects.get(user_id=user_id)
+            except User.DoesNotExist:
+                return None, "User not found"
+            user_cache.set(user_id, user)
+
+        if not user.is_active:
+            return None, "User account is disabled"
+        return user, None
+
     @classmethod
     def validate_token(cls, token: str, token_type: str = 'access') -> Tuple[bool, Optional[User], Optional[str]]:
         """
         Validate a JWT token
         Access tokens: Stateless validation only
-        Refresh tokens: Database validation + usage tracking
+        Refresh tokens: Revocation list check + batched usage tracking
         
         Args:
             token: JWT token string
@@ -125,58 +146,54 @@ class JWTTokenService:
             # First validate with SimpleJWT
             if token_type == 'access':
                 access_token = AccessToken(token)
-                user_id = access_token['user_id']
                 
                 # For access tokens: Only stateless validation
-                try:
-                    user = User.objects.get(user_id=user_id)
-                except User.DoesNotExist:
-                    return False, None, "User not found"
-                
-                # Check if user is active
-                if not user.is_active:
-                    return False, None, "User account is disabled"
+                user, error = cls._get_active_user(access_token['user_id'])
+                if user is None:
+                    return False, None, error
                 
                 # Access tokens are stateless - no database lookup needed
                 return True, user, None
                 
             else:  # refresh token
+                # Signature and expiry are checked here
                 refresh_token = RefreshToken(token)
                 user_id = refresh_token['user_id']
-                
-                # Get user
-                try:
-                    user = User.objects.get(user_id=user_id)
-                except User.DoesNotExist:
-                    return False, None, "User not found"
-                
-                # Check if user is active
-                if not user.is_active:
-                    return False, None, "User account is disabled"
-                
-                # For refresh tokens: Check database record
                 token_hash = cls.generate_token_hash(token)
                 
-                try:
-                    token_record = JWTToken.objects.get(
-                        token_hash=token_hash,
-                        token_type='refresh',
-                        user=user
-                    )
-                except JWTToken.DoesNotExist:
-                    return False, None, "Refresh token not found in database"
-                
-                # Check if refresh token is valid
-                if not token_record.is_valid():
-                    if token_record.is_expired():
-                        return False, None, "Refresh token has expired"
-                    elif token_record.is_revoked:
+                if revocation_list.enabled:
+                    if revocation_list.is_revoked(token_hash):
                         return False, None, "Refresh token has been revoked"
-                    elif token_record.is_blacklisted:
-                        return False, None, "Refresh token has been blacklisted"
+                    if not revocation_list.is_issued(token_hash, user_id):
+                        return False, None, "Refresh token not found in database"
+                    user, error = cls._get_active_user(user_id)
+                    if user is None:
+                        return False, None, error
+                else:
+                    # Strict mode: check the database record on every refresh
+                    try:
+                        token_record = JWTToken.objects.select_related('user').get(
+                            token_hash=token_hash,
+                            token_type='refresh',
+                            user_id=user_id
+                        )
+                    except JWTToken.DoesNotExist:
+                        return False, None, "Refresh token not found in database"
+                    
+                    user = token_record.user
+                    if not user.is_active:
+                        return False, None, "User account is disabled"
+                    
+                    if not token_record.is_valid():
+                        if token_record.is_expired():
+                            return False, None, "Refresh token has expired"
+                        elif token_record.is_revoked:
+                            return False, None, "Refresh token has been revoked"
+                        elif token_record.is_blacklisted:
+                            return False, None, "Refresh token has been blacklisted"
                 
-                # Mark refresh token as used
-                token_record.mark_as_used()
+                # Usage is written in batches, not one UPDATE per refresh
+                usage_tracker.record(token_hash)
                 
                 return True, user, None
             
@@ -219,15 +236,15 @@ class JWTTokenService:
         }
     
     @classmethod
-    def revoke_token(cls, token: str, token_type: str):
+    def revoke_token(cls, token: str, token_type: str) -> bool:
         """Revoke a specific token by setting is_revoked to True"""
         token_hash = cls.generate_token_hash(token)
-        try:
-            jwt_token = JWTToken.objects.get(token_hash=token_hash, token_type=token_type)
-            jwt_token.is_revoked = True
-            jwt_token.save()
-        except JWTToken.DoesNotExist:
-            pass
+        revoked = JWTToken.objects.filter(
+            token_hash=token_hash, token_type=token_type, is_revoked=False
+        ).update(is_revoked=True, revoked_at=timezone.now())
+        if token_type == 'refresh':
+            revocation_list.add(token_hash)
+        return revoked > 0
 
     @classmethod
     def rotate_refresh_token(cls, old_refresh_token: str, user: User, request=None) -> Dict[str, Any]:
@@ -250,8 +267,20 @@ class JWTTokenService:
         """
         if token_type and token_type != 'refresh':
             return 0  # Only refresh tokens can be revoked
-            
-        return JWTToken.revoke_all_user_tokens(user, 'refresh')
+        
+        tokens = list(
+            JWTToken.objects.filter(
+                user=user, token_type='refresh', is_revoked=False
+            ).values_list('pk', 'token_hash')
+        )
+        if not tokens:
+            return 0
+        
+        JWTToken.objects.filter(pk__in=[pk for pk, _ in tokens]).update(
+            is_revoked=True, revoked_at=timezone.now()
+        )
+        revocation_list.add_many(token_hash for _, token_hash in tokens)
+        return len(tokens)
     
     @classmethod
     def blacklist_token(cls, token: str, token_type: str = 'refresh') -> bool:
@@ -269,16 +298,13 @@ class JWTTokenService:
         if token_type != 'refresh':
             return False  # Access tokens are stateless, cannot be blacklisted
             
-        try:
-            token_hash = cls.generate_token_hash(token)
-            token_record = JWTToken.objects.get(
-                token_hash=token_hash,
-                token_type='refresh'
-            )
-            token_record.blacklist()
-            return True
-        except JWTToken.DoesNotExist:
-            return False
+        token_hash = cls.generate_token_hash(token)
+        blacklisted = JWTToken.objects.filter(
+            token_hash=token_hash,
+            token_type='refresh'
+        ).update(is_blacklisted=True, blacklisted_at=timezone.now())
+        revocation_list.add(token_hash)
+        return blacklisted > 0
     
     @classmethod
     def cleanup_expired_tokens(cls) -> int:
@@ -303,6 +329,7 @@ class JWTTokenService:
         Returns:
             List of active refresh token records
         """
+        usage_tracker.flush()
         queryset = JWTToken.objects.filter(
             user=user,
             token_type='refresh',  # Only refresh tokens are stored
@@ -329,6 +356,7 @@ class JWTTokenService:
         if token_type != 'refresh':
             return None  # Access tokens are stateless, no database info
             
+        usage_tracker.flush()
         try:
             token_hash = cls.generate_token_hash(token)
             token_record = JWTToken.objects.get(
@@ -2,20 +2,32 @@
 PDF processing service for document validation and conversion
 """
 import os
+import shutil
 import tempfile
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Tuple, Optional
 from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
 import PyPDF2
-from pdf2image import convert_from_path, convert_from_bytes
-from PIL import Image
+from pdf2image import convert_from_path, convert_from_bytes, pdfinfo_from_path
 import cloudinary
 import cloudinary.uploader
 from io import BytesIO
+from utils.cloudinary_utils import configure_cloudinary
 
 logger = logging.getLogger(__name__)
 
+POPPLER_HELP = (
+    "{action} failed: Poppler is not installed or not in PATH.\n\n"
+    "To fix this on Windows:\n"
+    "1. Download Poppler from: https://github.com/oschwartz10612/poppler-windows/releases/\n"
+    "2. Extract to C:\\poppler\\\n"
+    "3. Add C:\\poppler\\bin to your system PATH\n"
+    "4. Restart your terminal/IDE\n\n"
+    "Alternatively, you can install via conda: conda install -c conda-forge poppler"
+)
+
 
 class PDFValidationError(Exception):
     """Custom exception for PDF validation errors"""
@@ -36,6 +48,7 @@ class PDFService:
     SUPPORTED_FORMATS = ['pdf']
     IMAGE_QUALITY = 85
     IMAGE_FORMAT = 'JPEG'
+    RASTER_DPI = 200  # Good quality for document viewing
     
     def __init__(self):
         """Initialize the PDF service"""
@@ -136,16 +149,7 @@ class PDFService:
                 except Exception as e2:
                     logger.error(f"Error with pdf2image fallback: {str(e2)}")
                     if "poppler" in str(e2).lower() or "path" in str(e2).lower():
-                        error_msg = (
-                            "PDF validation failed: Poppler is not installed or not in PATH.\n\n"
-                            "To fix this on Windows:\n"
-                            "1. Download Poppler from: https://github.com/oschwartz10612/poppler-windows/releases/\n"
-                            "2. Extract to C:\\poppler\\\n"
-                            "3. Add C:\\poppler\\bin to your system PATH\n"
-                            "4. Restart your terminal/IDE\n\n"
-                            "Alternatively, you can install via conda: conda install -c conda-forge poppler"
-                        )
-                        raise PDFValidationError(error_msg)
+                        raise PDFValidationError(POPPLER_HELP.format(action="PDF validation"))
                     else:
                         raise PDFValidationError("Invalid PDF file format")
             
@@ -170,6 +174,10 @@ class PDFService:
         """
         Convert PDF to images and upload to Cloudinary
         
+        Pages are rasterized one at a time to JPEG files and uploaded from a
+        bounded worker pool, so memory use does not grow with the page count.
+        Progress is recorded on a ``DocumentConversionJob``.
+        
         Args:
             file: UploadedFile object containing the PDF
             user_email: User's email for organizing files
@@ -181,105 +189,200 @@ class PDFService:
         Raises:
             PDFConversionError: If conversion fails
         """
+        job = self.start_conversion(file, user_email, document_type_name)
+        return self.run_conversion(job)
+    
+    def start_conversion(self, file: UploadedFile, user_email: str, document_type_name: str):
+        """
+        Spool the PDF to the job directory and create its job record
+        
+        Raises:
+            PDFConversionError: If the PDF cannot be read or has too many pages
+        """
+        from apps.authentication.models import DocumentConversionJob
+        
+        job = DocumentConversionJob.objects.create(
+            user_email=user_email,
+            document_type_name=document_type_name,
+        )
+        job_dir = self._job_dir(job)
+        os.makedirs(job_dir, exist_ok=True)
+        source_path = os.path.join(job_dir, 'source.pdf')
+        
+        # Stream the upload to disk instead of reading it into memory
+        file.seek(0)
+        with open(source_path, 'wb') as source:
+            for chunk in file.chunks():
+                source.write(chunk)
+        file.seek(0)
+        
         try:
-            # Reset file pointer
-            file.seek(0)
-            pdf_content = file.read()
-            file.seek(0)
-            
-            # Configure Cloudinary
-            cloudinary.config(
-                cloud_name=settings.CLOUDINARY_STORAGE['CLOUD_NAME'],
-                api_key=settings.CLOUDINARY_STORAGE['API_KEY'],
-                api_secret=settings.CLOUDINARY_STORAGE['API_SECRET'],
-                secure=True
-            )
-            
-            # Convert PDF to images
-            logger.info(f"Converting PDF to images for user: {user_email}")
-            
-            # Use pdf2image to convert PDF to images
+            page_count = len(PyPDF2.PdfReader(source_path).pages)
+        except Exception as e:
+            logger.error(f"Error reading PDF with PyPDF2: {str(e)}")
+            # Fallback: ask Poppler, which reads PDFs PyPDF2 rejects
             try:
-                images = convert_from_bytes(
-                    pdf_content,
-                    dpi=200,  # Good quality for document viewing
-                    fmt='jpeg',
-                    jpegopt={'quality': self.IMAGE_QUALITY},
-                    poppler_path=self.poppler_path
+                page_count = int(
+                    pdfinfo_from_path(source_path, poppler_path=self.poppler_path)["Pages"]
                 )
-            except Exception as e:
-                if "poppler" in str(e).lower() or "path" in str(e).lower():
-                    # Provide helpful error message with installation instructions
-                    error_msg = (
-                        "PDF conversion failed: Poppler is not installed or not in PATH.\n\n"
-                        "To fix this on Windows:\n"
-                        "1. Download Poppler from: https://github.com/oschwartz10612/poppler-windows/releases/\n"
-                        "2. Extract to C:\\poppler\\\n"
-                        "3. Add C:\\poppler\\bin to your system PATH\n"
-                        "4. Restart your terminal/IDE\n\n"
-                        "Alternatively, you can install via conda: conda install -c conda-forge poppler"
-                    )
-                    raise PDFConversionError(error_msg)
-                else:
-                    raise PDFConversionError(f"PDF conversion failed: {str(e)}")
-            
-            # Validate page count after conversion
-            if len(images) > self.MAX_PAGES:
-                raise PDFConversionError(f"PDF has {len(images)} pages. Maximum allowed is {self.MAX_PAGES} pages.")
-            
-            if len(images) == 0:
-                raise PDFConversionError("No pages found in PDF")
-            
-            # Upload images to Cloudinary
-            uploaded_images = []
-            
-            for i, image in enumerate(images):
+            except Exception as e2:
+                logger.error(f"Error with pdfinfo fallback: {str(e2)}")
+                page_count = None
+        if page_count is None:
+            error = "PDF conversion failed: unable to read PDF file"
+        else:
+            error = None
+            if page_count == 0:
+                error = "No pages found in PDF"
+            elif page_count > self.MAX_PAGES:
+                error = f"PDF has {page_count} pages. Maximum allowed is {self.MAX_PAGES} pages."
+        
+        if error:
+            # Rejected PDFs cannot be resumed, so don't keep them around
+            shutil.rmtree(job_dir, ignore_errors=True)
+            self._fail(job, error)
+        
+        job.source_path = source_path
+        job.total_pages = page_count
+        job.save(update_fields=['source_path', 'total_pages', 'updated_at'])
+        return job
+    
+    def run_conversion(self, job) -> List[Dict[str, str]]:
+        """
+        Convert and upload the pages of ``job`` that are not done yet
+        
+        Safe to call again on a failed job: pages already uploaded are kept
+        and only the remaining ones are processed.
+        """
+        from apps.authentication.models import DocumentConversionJob
+        
+        if not job.source_path or not os.path.exists(job.source_path):
+            self._fail(job, "PDF source for this conversion is no longer available")
+        
+        configure_cloudinary()
+        logger.info(f"Converting PDF to images for user: {job.user_email}")
+        
+        DocumentConversionJob.objects.filter(pk=job.pk).update(status='running', error='')
+        
+        safe_email = job.user_email.replace('@', '_at_').replace('.', '_')
+        safe_doc_type = job.document_type_name.replace(' ', '_').lower()
+        remaining = [
+            page_number for page_number in range(1, job.total_pages + 1)
+            if str(page_number) not in job.pages
+        ]
+        workers = max(1, min(getattr(settings, 'PDF_PIPELINE_WORKERS', 3), len(remaining) or 1))
+        page_dir = tempfile.mkdtemp(prefix='pdf_pages_', dir=self._ensure_temp_dir())
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pdf-page') as pool:
+            futures = {
+                pool.submit(
+                    self._process_page, job.source_path, page_dir, page_number,
+                    safe_email, safe_doc_type
+                ): page_number
+                for page_number in remaining
+            }
+            failure = None
+            for future in as_completed(futures):
+                page_number = futures[future]
                 try:
-                    # Prepare image data
-                    img_buffer = BytesIO()
-                    image.save(img_buffer, format=self.IMAGE_FORMAT, quality=self.IMAGE_QUALITY, optimize=True)
-                    img_buffer.seek(0)
-                    
-                    # Generate unique filename
-                    safe_email = user_email.replace('@', '_at_').replace('.', '_')
-                    safe_doc_type = document_type_name.replace(' ', '_').lower()
-                    filename = f"{safe_email}_{safe_doc_type}_page_{i+1}"
-                    
-                    # Upload to Cloudinary
-                    upload_result = cloudinary.uploader.upload(
-                        img_buffer,
-                        folder=f"chefsync/documents/{safe_email}",
-                        public_id=filename,
-                        resource_type="image",
-                        format="jpg",
-                        quality="auto",
-                        fetch_format="auto"
-                    )
-                    
-                    uploaded_images.append({
-                        'page_number': i + 1,
-                        'image_url': upload_result['secure_url'],
-                        'public_id': upload_result['public_id'],
-                        'width': upload_result['width'],
-                        'height': upload_result['height'],
-                        'file_size': upload_result['bytes']
-                    })
-                    
-                    logger.info(f"Successfully uploaded page {i+1} to Cloudinary: {upload_result['public_id']}")
-                    
+                    result = future.result()
                 except Exception as e:
-                    logger.error(f"Error uploading page {i+1}: {str(e)}")
-                    raise PDFConversionError(f"Failed to upload page {i+1}: {str(e)}")
-            
-            logger.info(f"Successfully converted and uploaded {len(uploaded_images)} pages for user: {user_email}")
-            
-            return uploaded_images
-            
-        except PDFConversionError:
-            raise
+                    logger.error(f"Error converting page {page_number}: {str(e)}")
+                    failure = failure or f"Failed to convert page {page_number}: {str(e)}"
+                    continue
+                
+                # Only this thread writes job.pages, so no lock is needed
+                job.pages[str(page_number)] = result
+                job.completed_pages = len(job.pages)
+                DocumentConversionJob.objects.filter(pk=job.pk).update(
+                    pages=job.pages, completed_pages=job.completed_pages
+                )
+        
+        if failure:
+            self._fail(job, failure)
+        
+        job.status = 'completed'
+        job.save(update_fields=['status', 'updated_at'])
+        shutil.rmtree(self._job_dir(job), ignore_errors=True)
+        
+        logger.info(f"Successfully converted and uploaded {job.completed_pages} pages for user: {job.user_email}")
+        return [job.pages[str(n)] for n in range(1, job.total_pages + 1)]
+    
+    def _process_page(self, pdf_path: str, page_dir: str, page_number: int,
+                      safe_email: str, safe_doc_type: str) -> Dict[str, str]:
+        """Rasterize one page to a JPEG file, upload it and delete the file"""
+        image_path = self._rasterize_page(pdf_path, page_dir, page_number)
+        try:
+            return self._upload_page(
+                image_path,
+                page_number,
+                folder=f"chefsync/documents/{safe_email}",
+                public_id=f"{safe_email}_{safe_doc_type}_page_{page_number}",
+            )
+        finally:
+            if os.path.exists(image_path):
+                os.remove(image_path)
+    
+    def _rasterize_page(self, pdf_path: str, page_dir: str, page_number: int) -> str:
+        """Write a single page as JPEG into ``page_dir`` and return its path"""
+        try:
+            paths = convert_from_path(
+                pdf_path,
+                dpi=self.RASTER_DPI,
+                first_page=page_number,
+                last_page=page_number,
+                fmt='jpeg',
+                jpegopt={'quality': self.IMAGE_QUALITY, 'optimize': True},
+                output_folder=page_dir,
+                output_file=f"page_{page_number}",
+                paths_only=True,
+                poppler_path=self.poppler_path
+            )
         except Exception as e:
-            logger.error(f"Unexpected error during PDF conversion: {str(e)}")
+            if "poppler" in str(e).lower() or "path" in str(e).lower():
+                raise PDFConversionError(POPPLER_HELP.format(action="PDF conversion"))
             raise PDFConversionError(f"PDF conversion failed: {str(e)}")
+        
+        if not paths:
+            raise PDFConversionError(f"Page {page_number} could not be rendered")
+        return paths[0]
+    
+    def _upload_page(self, image_path: str, page_number: int, folder: str, public_id: str) -> Dict[str, str]:
+        """Upload a rendered page from disk to Cloudinary"""
+        upload_result = cloudinary.uploader.upload(
+            image_path,
+            folder=folder,
+            public_id=public_id,
+            resource_type="image",
+            format="jpg",
+            quality="auto",
+            fetch_format="auto"
+        )
+        logger.info(f"Successfully uploaded page {page_number} to Cloudinary: {upload_result['public_id']}")
+        return {
+            'page_number': page_number,
+            'image_url': upload_result['secure_url'],
+            'public_id': upload_result['public_id'],
+            'width': upload_result['width'],
+            'height': upload_result['height'],
+            'file_size': upload_result['bytes']
+        }
+    
+    def _job_dir(self, job) -> str:
+        base = getattr(settings, 'PDF_JOB_DIR', os.path.join(settings.BASE_DIR, 'var', 'pdf_jobs'))
+        return os.path.join(str(base), str(job.job_id))
+    
+    def _ensure_temp_dir(self) -> str:
+        if not self.temp_dir:
+            self.temp_dir = tempfile.mkdtemp(prefix='chefsync_pdf_')
+        return self.temp_dir
+    
+    def _fail(self, job, message: str):
+        """Record the failure on the job and raise it"""
+        job.status = 'failed'
+        job.error = message
+        job.save(update_fields=['status', 'error', 'updated_at'])
+        raise PDFConversionError(message)
     
     def validate_and_convert_pdf(self, file: UploadedFile, user_email: str, document_type_name: str) -> Dict[str, any]:
         """
@@ -392,3 +495,50 @@ def validate_and_convert_pdf(file: UploadedFile, user_email: str, document_type_
         return service.validate_and_convert_pdf(file, user_email, document_type_name)
     finally:
         service.cleanup_temp_files()
+
+
+def resume_pdf_conversion(job_id) -> List[Dict[str, str]]:
+    """
+    Utility function to finish a failed or interrupted conversion job
+    
+    Args:
+        job_id: ``DocumentConversionJob.job_id``
+        
+    Returns:
+        List of dictionaries containing image URLs and metadata
+    """
+    from apps.authentication.models import DocumentConversionJob
+    
+    service = PDFService()
+    try:
+        job = DocumentConversionJob.objects.get(job_id=job_id)
+        return service.run_conversion(job)
+    finally:
+        service.cleanup_temp_files()
+
+
+def purge_failed_conversions(older_than_days: int) -> int:
+    """
+    Delete the spooled PDFs of failed jobs not retried for ``older_than_days``
+    
+    The job records are kept for their status and error; they just can no
+    longer be resumed.
+    
+    Returns:
+        Number of jobs purged
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from apps.authentication.models import DocumentConversionJob
+    
+    service = PDFService()
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    stale = DocumentConversionJob.objects.filter(
+        status='failed', updated_at__lt=cutoff
+    ).exclude(source_path='')
+    purged = 0
+    for job in stale:
+        shutil.rmtree(service._job_dir(job), ignore_errors=True)
+        DocumentConversionJob.objects.filter(pk=job.pk).update(source_path='')
+        purged += 1
+    return purged
@@ -0,0 +1,240 @@
+"""
+In-memory refresh token revocation list and batched usage tracking.
+
+``JWTTokenService.validate_token`` checks refresh tokens against
+``revocation_list`` instead of reading their ``jwt_tokens`` row. The list is
+built from ``jwt_tokens`` on first use, updated immediately by revocations in
+this process and pulls revocations made by other processes every
+``JWT_REVOCATION_SYNC_SECONDS``. Setting that to 0 restores the per-request
+database check. Tokens must still have been issued: the first refresh of a
+token this process has not seen checks that its row exists, later ones use
+a bounded set of known hashes.
+
+``usage_tracker`` buffers ``last_used_at``/``usage_count`` bumps and writes
+them in one UPDATE per flush instead of one per refresh.
+"""
+import atexit
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.authentication.models import JWTToken
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over SHA-256 hex digests.
+
+    Token hashes are already uniformly distributed, so the bit positions are
+    sliced out of the digest instead of hashing it again.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.01):
+        self.num_bits = max(
+            int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 64
+        )
+        self.num_hashes = min(
+            max(int(round(self.num_bits / capacity * math.log(2))), 1), 8
+        )
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, token_hash):
+        for i in range(self.num_hashes):
+            yield int(token_hash[i * 8 : i * 8 + 8], 16) % self.num_bits
+
+    def add(self, token_hash):
+        for position in self._positions(token_hash):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, token_hash):
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(token_hash)
+        )
+
+
+def _digest_key(token_hash):
+    """Compact exact-set key: the first 16 bytes of the SHA-256 digest"""
+    return bytes.fromhex(token_hash[:32])
+
+
+class RevocationList:
+    """Revoked/blacklisted refresh token hashes: bloom filter plus exact set"""
+
+    def __init__(self, sync_seconds=5, capacity=100000):
+        self.sync_seconds = sync_seconds
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._bloom = BloomFilter(capacity)
+        self._exact = set()
+        self._synced_at = None
+        self._next_sync = 0.0
+        # Digest keys of tokens known to have a row, least recently used first
+        self._issued = OrderedDict()
+
+    @property
+    def enabled(self):
+        return self.sync_seconds > 0
+
+    def _add_locked(self, token_hash):
+        if len(self._exact) >= self.capacity:
+            # Grow by rebuilding at the next sync rather than degrade the filter
+            self._loaded = False
+        self._bloom.add(token_hash)
+        self._exact.add(_digest_key(token_hash))
+
+    def load(self):
+        """Rebuild from revoked/blacklisted refresh tokens that are not yet expired"""
+        now = timezone.now()
+        hashes = list(
+            JWTToken.objects.filter(token_type="refresh", expires_at__gt=now)
+            .filter(Q(is_revoked=True) | Q(is_blacklisted=True))
+            .values_list("token_hash", flat=True)
+        )
+        with self._lock:
+            self.capacity = max(self.capacity, len(hashes) * 2)
+            self._bloom = BloomFilter(self.capacity)
+            self._exact = set()
+            for token_hash in hashes:
+                self._add_locked(token_hash)
+            self._loaded = True
+            self._synced_at = now
+            self._next_sync = time.monotonic() + self.sync_seconds
+
+    def sync(self):
+        """Load on first use, then pull revocations made since the last sync"""
+        if not self._loaded:
+            self.load()
+            return
+        if time.monotonic() < self._next_sync:
+            return
+
+        now = timezone.now()
+        # Overlap the window slightly so rows committed late are not missed
+        since = self._synced_at - timedelta(seconds=self.sync_seconds)
+        hashes = JWTToken.objects.filter(token_type="refresh").filter(
+            Q(revoked_at__gte=since) | Q(blacklisted_at__gte=since)
+        ).values_list("token_hash", flat=True)
+        with self._lock:
+            for token_hash in hashes:
+                self._add_locked(token_hash)
+            self._synced_at = now
+            self._next_sync = time.monotonic() + self.sync_seconds
+
+    def add(self, token_hash):
+        with self._lock:
+            self._add_locked(token_hash)
+
+    def add_many(self, token_hashes):
+        with self._lock:
+            for token_hash in token_hashes:
+                self._add_locked(token_hash)
+
+    def is_revoked(self, token_hash):
+        self.sync()
+        if token_hash not in self._bloom:
+            return False
+        return _digest_key(token_hash) in self._exact
+
+    def mark_issued(self, token_hash):
+        """Remember a refresh token whose row is known to exist"""
+        key = _digest_key(token_hash)
+        with self._lock:
+            self._issued[key] = True
+            self._issued.move_to_end(key)
+            while len(self._issued) > self.capacity:
+                self._issued.popitem(last=False)
+
+    def is_issued(self, token_hash, user_id):
+        """True when the token has a ``jwt_tokens`` row for ``user_id``"""
+        key = _digest_key(token_hash)
+        with self._lock:
+            if key in self._issued:
+                self._issued.move_to_end(key)
+                return True
+        exists = JWTToken.objects.filter(
+            token_hash=token_hash, token_type="refresh", user_id=user_id
+        ).exists()
+        if exists:
+            self.mark_issued(token_hash)
+        return exists
+
+    def clear(self):
+        with self._lock:
+            self._loaded = False
+            self._bloom = BloomFilter(self.capacity)
+            self._exact = set()
+            self._issued = OrderedDict()
+
+
+class UsageTracker:
+    """Buffers refresh token usage and flushes it in batched UPDATEs"""
+
+    def __init__(self, flush_seconds=30, flush_size=500):
+        self.flush_seconds = flush_seconds
+        self.flush_size = flush_size
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._last_used = {}
+        self._next_flush = time.monotonic() + flush_seconds
+
+    def record(self, token_hash):
+        with self._lock:
+            self._pending[token_hash] += 1
+            self._last_used[token_hash] = timezone.now()
+            due = (
+                len(self._pending) >= self.flush_size
+                or time.monotonic() >= self._next_flush
+            )
+        if due or self.flush_seconds <= 0:
+            self.flush()
+
+    def flush(self):
+        """Write buffered usage, one UPDATE per distinct increment"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            last_used, self._last_used = self._last_used, {}
+            self._next_flush = time.monotonic() + self.flush_seconds
+        if not pending:
+            return 0
+
+        by_increment = {}
+        for token_hash, count in pending.items():
+            by_increment.setdefault(count, []).append(token_hash)
+
+        updated = 0
+        for count, token_hashes in by_increment.items():
+            updated += JWTToken.objects.filter(token_hash__in=token_hashes).update(
+                usage_count=F("usage_count") + count,
+                last_used_at=max(last_used[token_hash] for token_hash in token_hashes),
+            )
+        return updated
+
+
+revocation_list = RevocationList(
+    sync_seconds=getattr(settings, "JWT_REVOCATION_SYNC_SECONDS", 5),
+    capacity=getattr(settings, "JWT_REVOCATION_CAPACITY", 100000),
+)
+usage_tracker = UsageTracker(
+    flush_seconds=getattr(settings, "JWT_USAGE_FLUSH_SECONDS", 30),
+    flush_size=getattr(settings, "JWT_USAGE_FLUSH_SIZE", 500),
+)
+
+
+def _flush_at_exit():
+    try:
+        usage_tracker.flush()
+    except Exception:
+        # Usage counters are advisory; never block interpreter shutdown
+        pass
+
+
+atexit.register(_flush_at_exit)
+
@@ -1,12 +1,23 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from apps.communications.utils import NotificationManager
+from .authentication import user_cache
 from .models import Cook
 
 User = get_user_model()
 
 
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_auth_user(sender, instance, **kwargs):
+    """
+    Drop the user from the JWT authentication cache so role, approval and
+    deactivation changes apply to the next request
+    """
+    user_cache.invalidate(instance.pk)
+
+
 @receiver(post_save, sender=User)
 def notify_cook_profile_update(sender, instance, created, **kwargs):
     """
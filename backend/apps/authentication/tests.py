@@ -267,3 +267,451 @@ class UserDocumentTest(TestCase):
         self.assertEqual(document.reviewed_by, admin)
         self.assertIsNotNone(document.reviewed_at)
         self.assertTrue(document.is_visible_to_admin)
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    """Test the cached user lookup in CustomJWTAuthentication"""
+
+    def setUp(self):
+        from apps.authentication.authentication import user_cache
+        from rest_framework.test import APIRequestFactory
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = User.objects.create_user(
+            email="jwt_cache@test.com",
+            password="cachepass123",
+            name="Cache User",
+            role="customer",
+        )
+        access = str(RefreshToken.for_user(self.user).access_token)
+        self.request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {access}"
+        )
+
+    def test_repeat_requests_skip_user_query(self):
+        """Test that only the first request loads the user"""
+        from apps.authentication.authentication import CustomJWTAuthentication
+
+        auth = CustomJWTAuthentication()
+        with self.assertNumQueries(1):
+            first, _ = auth.authenticate(self.request)
+        with self.assertNumQueries(0):
+            second, _ = auth.authenticate(self.request)
+
+        self.assertEqual(second.pk, self.user.pk)
+        self.assertIsNot(first, second)
+
+    def test_deactivated_user_is_rejected(self):
+        """Test that saving the user invalidates the cached entry"""
+        from apps.authentication.authentication import CustomJWTAuthentication
+        from rest_framework.exceptions import AuthenticationFailed
+
+        auth = CustomJWTAuthentication()
+        auth.authenticate(self.request)
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            auth.authenticate(self.request)
+
+    def test_saving_a_cached_user_keeps_changes_from_elsewhere(self):
+        """Test that a stale cached copy only writes the fields it changed"""
+        from apps.authentication.authentication import CustomJWTAuthentication
+
+        auth = CustomJWTAuthentication()
+        auth.authenticate(self.request)
+        # Another worker: a queryset update reaches neither signals nor the cache
+        User.objects.filter(pk=self.user.pk).update(approval_status="rejected")
+
+        user, _ = auth.authenticate(self.request)
+        user.name = "Renamed"
+        user.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(
+            (self.user.name, self.user.approval_status), ("Renamed", "rejected")
+        )
+
+
+class RefreshTokenRevocationTest(TestCase):
+    """Test refresh token validation against the in-memory revocation list"""
+
+    def setUp(self):
+        from apps.authentication.authentication import user_cache
+        from apps.authentication.services.jwt_service import JWTTokenService
+        from apps.authentication.services.token_revocation import (
+            revocation_list,
+            usage_tracker,
+        )
+
+        self.service = JWTTokenService
+        self.revocation_list = revocation_list
+        self.usage_tracker = usage_tracker
+        for cache in (user_cache, revocation_list):
+            cache.clear()
+            self.addCleanup(cache.clear)
+        self.addCleanup(usage_tracker.flush)
+
+        self.user = User.objects.create_user(
+            email="refresh@test.com",
+            password="refreshpass123",
+            name="Refresh User",
+            role="customer",
+        )
+        self.refresh = self.service.create_tokens(self.user)["refresh_token"]
+
+    def test_valid_refresh_skips_token_lookup(self):
+        """Test that repeat refreshes only touch the database to load the list"""
+        is_valid, user, _ = self.service.validate_token(self.refresh, "refresh")
+        self.assertTrue(is_valid)
+        self.assertEqual(user.pk, self.user.pk)
+
+        with self.assertNumQueries(0):
+            is_valid, _, _ = self.service.validate_token(self.refresh, "refresh")
+        self.assertTrue(is_valid)
+
+    def test_revoked_refresh_token_is_rejected(self):
+        """Test that revoke_token takes effect without a database check"""
+        self.assertTrue(self.service.revoke_token(self.refresh, "refresh"))
+
+        is_valid, _, error = self.service.validate_token(self.refresh, "refresh")
+        self.assertFalse(is_valid)
+        self.assertEqual(error, "Refresh token has been revoked")
+
+    def test_unknown_refresh_token_is_rejected(self):
+        """Test that a signed token without a database row is not accepted"""
+        from apps.authentication.models import JWTToken
+
+        JWTToken.objects.filter(user=self.user).delete()
+        self.revocation_list.clear()
+
+        is_valid, _, error = self.service.validate_token(self.refresh, "refresh")
+        self.assertFalse(is_valid)
+        self.assertEqual(error, "Refresh token not found in database")
+
+    def test_revocation_from_another_process_is_synced(self):
+        """Test that revocations written directly to the table are picked up"""
+        from apps.authentication.models import JWTToken
+
+        self.service.validate_token(self.refresh, "refresh")
+        JWTToken.objects.filter(user=self.user).update(
+            is_revoked=True, revoked_at=timezone.now()
+        )
+        self.revocation_list._next_sync = 0
+
+        is_valid, _, _ = self.service.validate_token(self.refresh, "refresh")
+        self.assertFalse(is_valid)
+
+    def test_usage_is_flushed_in_batches(self):
+        """Test that usage counters are buffered and written on flush"""
+        from apps.authentication.models import JWTToken
+
+        for _ in range(3):
+            self.service.validate_token(self.refresh, "refresh")
+        record = JWTToken.objects.get(user=self.user, token_type="refresh")
+        self.assertEqual(record.usage_count, 0)
+
+        with self.assertNumQueries(1):
+            self.usage_tracker.flush()
+        record.refresh_from_db()
+        self.assertEqual(record.usage_count, 3)
+        self.assertIsNotNone(record.last_used_at)
+
+
+class PDFConversionPipelineTest(TestCase):
+    """Test the page-by-page PDF conversion job"""
+
+    def setUp(self):
+        import shutil
+        import tempfile
+        from io import BytesIO
+
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test import override_settings
+        from PyPDF2 import PdfWriter
+
+        job_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, job_dir, ignore_errors=True)
+        overrides = override_settings(PDF_JOB_DIR=job_dir, PDF_PIPELINE_WORKERS=2)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        writer = PdfWriter()
+        for _ in range(3):
+            writer.add_blank_page(width=200, height=200)
+        buffer = BytesIO()
+        writer.write(buffer)
+        self.pdf = SimpleUploadedFile(
+            "licence.pdf", buffer.getvalue(), content_type="application/pdf"
+        )
+
+    def _rasterize(self, pdf_path, page_dir, page_number):
+        import os
+
+        path = os.path.join(page_dir, f"page_{page_number}.jpg")
+        with open(path, "wb") as image:
+            image.write(b"\xff\xd8fake")
+        return path
+
+    def _upload(self, image_path, page_number, folder, public_id):
+        if page_number in self.failing_pages:
+            raise ConnectionError("upload timed out")
+        self.uploaded.append(page_number)
+        return {"page_number": page_number, "image_url": f"https://cdn/{public_id}"}
+
+    def test_failed_pages_are_resumed(self):
+        """Test that a resumed job only converts the pages that failed"""
+        from unittest import mock
+
+        from apps.authentication.models import DocumentConversionJob
+        from apps.authentication.services.pdf_service import (
+            PDFConversionError,
+            PDFService,
+            resume_pdf_conversion,
+        )
+
+        self.uploaded = []
+        self.failing_pages = {2}
+        with mock.patch.object(
+            PDFService, "_rasterize_page", side_effect=self._rasterize
+        ), mock.patch.object(PDFService, "_upload_page", side_effect=self._upload):
+            with self.assertRaises(PDFConversionError):
+                PDFService().convert_pdf_to_images(
+                    self.pdf, "cook@test.com", "Food Licence"
+                )
+
+            job = DocumentConversionJob.objects.get()
+            self.assertEqual(job.status, "failed")
+            self.assertEqual((job.completed_pages, job.total_pages), (2, 3))
+
+            self.failing_pages = set()
+            images = resume_pdf_conversion(job.job_id)
+
+        self.assertEqual([image["page_number"] for image in images], [1, 2, 3])
+        self.assertEqual(sorted(self.uploaded), [1, 2, 3])
+        job.refresh_from_db()
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.progress, 100)
+
+    def test_page_count_falls_back_to_pdfinfo(self):
+        """Test that PDFs PyPDF2 cannot read are counted by Poppler"""
+        from unittest import mock
+
+        from apps.authentication.services import pdf_service
+
+        with mock.patch.object(
+            pdf_service.PyPDF2, "PdfReader", side_effect=ValueError("bad xref")
+        ), mock.patch.object(
+            pdf_service, "pdfinfo_from_path", return_value={"Pages": 3}
+        ):
+            job = pdf_service.PDFService().start_conversion(
+                self.pdf, "cook@test.com", "Food Licence"
+            )
+
+        self.assertEqual(job.total_pages, 3)
+
+    def test_command_resumes_and_purges_failed_jobs(self):
+        """Test that pdf_conversion_jobs resumes failed jobs and purges stale ones"""
+        import os
+        from datetime import timedelta
+        from io import StringIO
+        from unittest import mock
+
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        from apps.authentication.models import DocumentConversionJob
+        from apps.authentication.services.pdf_service import (
+            PDFConversionError,
+            PDFService,
+        )
+
+        self.uploaded = []
+        self.failing_pages = {1, 2, 3}
+        with mock.patch.object(
+            PDFService, "_rasterize_page", side_effect=self._rasterize
+        ), mock.patch.object(PDFService, "_upload_page", side_effect=self._upload):
+            for _ in range(2):
+                with self.assertRaises(PDFConversionError):
+                    PDFService().convert_pdf_to_images(
+                        self.pdf, "cook@test.com", "Food Licence"
+                    )
+            stale, fresh = DocumentConversionJob.objects.order_by("pk")
+            DocumentConversionJob.objects.filter(pk=stale.pk).update(
+                updated_at=timezone.now() - timedelta(days=30)
+            )
+
+            call_command(
+                "pdf_conversion_jobs", "--purge-failed", "7", stdout=StringIO()
+            )
+            stale.refresh_from_db()
+            self.assertEqual(stale.source_path, "")
+            self.assertFalse(os.path.exists(PDFService()._job_dir(stale)))
+
+            self.failing_pages = set()
+            out = StringIO()
+            call_command("pdf_conversion_jobs", "--resume-failed", stdout=out)
+
+        self.assertIn("1 resumed", out.getvalue())
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, "completed")
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, "failed")
+
+
+class DocumentProxyStreamingTest(TestCase):
+    """Test the streaming document proxy and its disk cache"""
+
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        from apps.authentication.services.document_proxy import DocumentCache
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        self.cache = DocumentCache(cache_dir, max_bytes=10_000, max_file_bytes=5_000)
+        self.body = bytes(range(256)) * 8
+        self.url = "https://res.cloudinary.com/demo/raw/upload/v1/docs/id.pdf"
+
+    def _upstream(self):
+        from unittest import mock
+
+        upstream = mock.Mock(status_code=200)
+        upstream.headers = {
+            "Content-Type": "application/pdf",
+            "Content-Length": str(len(self.body)),
+            "ETag": '"abc"',
+        }
+        upstream.iter_content.return_value = [self.body[:1000], self.body[1000:]]
+        return upstream
+
+    def test_download_is_streamed_then_served_from_cache(self):
+        """Test streaming, cache fill and a Range request served from disk"""
+        from unittest import mock
+
+        from apps.authentication.services import document_proxy
+
+        session = mock.Mock()
+        session.get.return_value = self._upstream()
+        with mock.patch.object(
+            document_proxy, "document_cache", self.cache
+        ), mock.patch.object(document_proxy, "get_session", return_value=session):
+            response = document_proxy.stream_remote_file(self.url, {})
+            self.assertTrue(response.streaming)
+            self.assertEqual(b"".join(response.streaming_content), self.body)
+
+            cached = document_proxy.stream_remote_file(self.url, {"Range": "bytes=10-19"})
+
+        self.assertEqual(session.get.call_count, 1)
+        self.assertEqual(cached.status_code, 206)
+        self.assertEqual(cached["Content-Range"], f"bytes 10-19/{len(self.body)}")
+        self.assertEqual(b"".join(cached.streaming_content), self.body[10:20])
+
+    def test_not_modified_from_cache(self):
+        """Test that a matching If-None-Match is answered with 304"""
+        from unittest import mock
+
+        from apps.authentication.services import document_proxy
+
+        session = mock.Mock()
+        session.get.return_value = self._upstream()
+        with mock.patch.object(
+            document_proxy, "document_cache", self.cache
+        ), mock.patch.object(document_proxy, "get_session", return_value=session):
+            b"".join(document_proxy.stream_remote_file(self.url, {}).streaming_content)
+            response = document_proxy.stream_remote_file(
+                self.url, {"If-None-Match": '"abc"'}
+            )
+
+        self.assertEqual(response.status_code, 304)
+
+
+class LoginFastPathTest(TestCase):
+    """Test the write path of user_login"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from django.test import override_settings
+
+        cache.clear()
+        overrides = override_settings(RATELIMIT_ENABLE=False)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = User.objects.create_user(
+            email="fastlogin@test.com",
+            password="fastpass123",
+            name="Fast Login",
+            role="customer",
+        )
+
+    def login(self, password="fastpass123", **extra):
+        return self.client.post(
+            "/api/auth/login/",
+            {"email": self.user.email, "password": password, **extra},
+            content_type="application/json",
+        )
+
+    def test_jwt_only_login_skips_session(self):
+        """Test that session=false issues tokens in one UPDATE and one INSERT"""
+        from django.conf import settings
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.login(session=False)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("refresh", response.json())
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        writes = [
+            q["sql"].split()[0] for q in ctx.captured_queries
+            if q["sql"].split()[0] in ("INSERT", "UPDATE")
+        ]
+        self.assertEqual(writes, ["UPDATE", "INSERT"])
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    def test_session_login_is_default(self):
+        """Test that the session is still opened unless the client opts out"""
+        from django.conf import settings
+
+        response = self.login()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_failed_attempts_lock_and_reset(self):
+        """Test that the 5th failure locks the account and a later success clears it"""
+        for _ in range(5):
+            self.assertEqual(self.login(password="wrong").status_code, 400)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.failed_login_attempts, 5)
+        self.assertTrue(self.user.account_locked)
+        self.assertEqual(self.login().status_code, 400)
+
+        from datetime import timedelta
+
+        User.objects.filter(pk=self.user.pk).update(
+            account_locked_until=timezone.now() - timedelta(minutes=1)
+        )
+        self.assertEqual(self.login(session=False).status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.failed_login_attempts, 0)
+        self.assertFalse(self.user.account_locked)
+        self.assertIsNone(self.user.account_locked_until)
+
+    def test_cook_login_does_not_notify_profile_update(self):
+        """Test that a cook's login no longer saves the whole user row"""
+        from apps.communications.models import Notification
+
+        self.user.role = "cook"
+        self.user.approval_status = "approved"
+        self.user.save()
+        Notification.objects.all().delete()
+
+        self.assertEqual(self.login().status_code, 200)
+        self.assertFalse(Notification.objects.filter(user=self.user).exists())
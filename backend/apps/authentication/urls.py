@@ -25,6 +25,7 @@ urlpatterns = [
     path("logout/", views.user_logout, name="logout"),
     # JWT Token Management
     path("token/refresh/", views.token_refresh, name="token_refresh"),
+    path("token/cache-stats/", views.auth_cache_stats, name="auth_cache_stats"),
     # Email Verification
     path("verify-email/", views.verify_email, name="verify_email"),
     # Password Management
@@ -324,6 +324,20 @@ def validate_referral_token(request):
         )
 
 
+def _wants_login_session(request):
+    """
+    Whether the login should also open a Django session. Pure JWT clients
+    skip it with ``"session": false`` in the body; the default comes from
+    AUTH_LOGIN_SESSION.
+    """
+    value = request.data.get("session")
+    if value is None:
+        return getattr(settings, "AUTH_LOGIN_SESSION", True)
+    if isinstance(value, str):
+        return value.strip().lower() not in ("0", "false", "no", "off")
+    return bool(value)
+
+
 @api_view(["POST"])
 @permission_classes([AllowAny])
 @ratelimit(key="ip", rate="5/m", method="POST", block=True)
@@ -336,16 +350,19 @@ def user_login(request):
     if serializer.is_valid():
         user = serializer.validated_data["user"]
         logger.info(f"Login successful for user: {user.email}")
+        with_session = _wants_login_session(request)
 
-        # Reset failed login attempts on successful login
-        user.reset_failed_login_attempts()
+        # Reset failed login attempts on successful login. login() stamps
+        # last_login itself, otherwise it rides along in the same UPDATE
+        user.reset_failed_login_attempts(update_last_login=not with_session)
 
         # Generate JWT tokens using the service
         from .services.jwt_service import JWTTokenService
 
         token_data = JWTTokenService.create_tokens(user, request)
 
-        login(request, user, backend="django.contrib.auth.backends.ModelBackend")
+        if with_session:
+            login(request, user, backend="django.contrib.auth.backends.ModelBackend")
 
         return Response(
             {
@@ -376,11 +393,8 @@ def user_login(request):
             )
 
     # Increment failed login attempts for invalid credentials
-    try:
-        user = User.objects.get(email=request.data.get("email"))
-        user.increment_failed_login()
-    except User.DoesNotExist:
-        pass
+    if serializer.user is not None:
+        serializer.user.increment_failed_login()
 
     return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -454,6 +468,17 @@ def token_refresh(request):
         )
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def auth_cache_stats(request):
+    """
+    Hit/miss counters of this worker's JWT user cache (admin only)
+    """
+    from .authentication import user_cache
+
+    return Response(user_cache.stats(), status=status.HTTP_200_OK)
+
+
 @api_view(["POST"])
 @permission_classes([AllowAny])
 def verify_email(request):
@@ -1690,6 +1715,7 @@ def proxy_document_download(request):
             )
 
         # If document_id is provided, get the document and verify access
+        document = None
         if document_id:
             try:
                 document = UserDocument.objects.get(id=document_id)
@@ -1719,17 +1745,12 @@ def proxy_document_download(request):
 
         # Check if it's a local file
         if file_url.startswith("/local_media/"):
-            return handle_local_file_download(file_url, document_id, preview_mode)
+            return handle_local_file_download(
+                file_url, document_id, preview_mode, document
+            )
         else:
-            # Pass the document object if available
-            document_obj = None
-            if document_id:
-                try:
-                    document_obj = UserDocument.objects.get(id=document_id)
-                except UserDocument.DoesNotExist:
-                    pass
             return handle_cloudinary_download(
-                file_url, document_id, preview_mode, document_obj
+                file_url, document_id, preview_mode, document, request.headers
             )
 
     except Exception as e:
@@ -2192,7 +2213,7 @@ def check_email_availability(request):
         )
 
 
-def handle_local_file_download(file_url, document_id, preview_mode):
+def handle_local_file_download(file_url, document_id, preview_mode, document=None):
     """Handle local file downloads"""
     try:
         import os
@@ -2217,13 +2238,7 @@ def handle_local_file_download(file_url, document_id, preview_mode):
             )
 
         # Get filename from document if available
-        filename = "document"
-        if document_id:
-            try:
-                document = UserDocument.objects.get(id=document_id)
-                filename = document.file_name
-            except UserDocument.DoesNotExist:
-                filename = file_path.name
+        filename = document.file_name if document else file_path.name
 
         # Determine content type
         content_type = "application/octet-stream"
@@ -2263,33 +2278,24 @@ def handle_local_file_download(file_url, document_id, preview_mode):
         )
 
 
-def handle_cloudinary_download(file_url, document_id, preview_mode, document=None):
-    """Handle Cloudinary downloads"""
-    try:
-        # Import Cloudinary modules conditionally
-        try:
-            import cloudinary
-            import cloudinary.api
-        except ImportError:
-            print(
-                "Cloudinary package not installed. Please install it with: pip install cloudinary"
-            )
-            return Response(
-                {"error": "Cloudinary service not available"},
-                status=status.HTTP_503_SERVICE_UNAVAILABLE,
-            )
+def handle_cloudinary_download(
+    file_url, document_id, preview_mode, document=None, request_headers=None
+):
+    """
+    Handle Cloudinary downloads
 
-        import requests
-        from django.conf import settings
-        from django.http import HttpResponse
+    The file is streamed to the client (with Range/ETag support) instead of
+    being read into memory; see ``services.document_proxy``.
+    """
+    from .services.document_proxy import (
+        RemoteDocumentError,
+        file_response,
+        stream_remote_file,
+    )
 
-        # Configure Cloudinary
-        cloudinary.config(
-            cloud_name=settings.CLOUDINARY_STORAGE["CLOUD_NAME"],
-            api_key=settings.CLOUDINARY_STORAGE["API_KEY"],
-            api_secret=settings.CLOUDINARY_STORAGE["API_SECRET"],
-            secure=True,
-        )
+    request_headers = request_headers or {}
+    try:
+        import cloudinary.utils
 
         # Extract public_id from the URL
         url_parts = file_url.split("/")
@@ -2317,172 +2323,81 @@ def handle_cloudinary_download(file_url, document_id, preview_mode, document=Non
         else:
             raise ValueError("Invalid Cloudinary URL format")
 
-        print(f"Extracted public_id: {public_id}")
-
         # Determine resource type from URL
-        if "/image/upload/" in file_url:
-            resource_type = "image"
-        elif "/raw/upload/" in file_url:
-            resource_type = "raw"
-        else:
-            resource_type = "raw"
+        resource_type = "image" if "/image/upload/" in file_url else "raw"
 
-        print(f"Resource type: {resource_type}")
+        # Determine proper content type
+        content_type = None
+        if file_url.endswith(".pdf"):
+            content_type = "application/pdf"
+        elif file_url.endswith((".jpg", ".jpeg")):
+            content_type = "image/jpeg"
+        elif file_url.endswith(".png"):
+            content_type = "image/png"
 
-        # Generate a signed URL for the file
-        # For raw files (PDFs) on free Cloudinary accounts, we need to handle them differently
         if resource_type == "raw":
-            print("Handling raw file (PDF) - checking for local file first")
-
-            # First, try to serve from local file if available
+            # PDFs on free Cloudinary accounts: prefer the local copy if available
             if (
                 document
                 and document.local_file_path
                 and os.path.exists(document.local_file_path)
             ):
-                print(f"Serving PDF from local file: {document.local_file_path}")
-                try:
-                    with open(document.local_file_path, "rb") as local_file:
-                        file_content = local_file.read()
-
-                    from django.http import HttpResponse
-
-                    django_response = HttpResponse(
-                        file_content, content_type="application/pdf"
-                    )
-                    django_response["Content-Disposition"] = (
-                        f'inline; filename="{document.file_name}"'
-                    )
-                    django_response["Content-Length"] = str(len(file_content))
-
-                    print(
-                        f"Successfully served PDF from local file, size: {len(file_content)} bytes"
-                    )
-                    return django_response
-
-                except Exception as local_error:
-                    print(f"Failed to serve local file: {str(local_error)}")
-                    # Continue to try Cloudinary as fallback
-
-            # If no local file or local file failed, try Cloudinary
-            print("No local file available, trying Cloudinary...")
-            try:
-                # Try to download the file directly from the original URL
-                response = requests.get(file_url, stream=True, timeout=30)
-                print(f"Direct download response status: {response.status_code}")
-                response.raise_for_status()
-
-                # If successful, serve the file content directly
-                content_type = response.headers.get("content-type", "application/pdf")
-                if file_url.endswith(".pdf") or "application/pdf" in content_type:
-                    content_type = "application/pdf"
-
-                # Create Django response with the file content
-                from django.http import HttpResponse
-
-                file_content = response.content
-
-                django_response = HttpResponse(file_content, content_type=content_type)
-                filename = document.file_name if document else "document.pdf"
-                django_response["Content-Disposition"] = (
-                    f'inline; filename="{filename}"'
+                response = file_response(
+                    document.local_file_path, "application/pdf", request_headers
                 )
-                django_response["Content-Length"] = str(len(file_content))
-
-                print(
-                    f"Successfully served PDF file directly, size: {len(file_content)} bytes"
+                response["Content-Disposition"] = (
+                    f'inline; filename="{document.file_name}"'
                 )
-                return django_response
-
-            except requests.exceptions.RequestException as e:
-                print(f"Failed to download PDF directly: {str(e)}")
-                raise ValueError(f"Failed to access PDF file: {str(e)}")
+                return response
+            candidate_urls = [file_url]
         else:
-            # For images, use the normal signed URL approach
+            # For images, use the signed URL and fall back to the original one
+            from utils.cloudinary_utils import configure_cloudinary
+
+            configure_cloudinary()
             try:
                 signed_url = cloudinary.utils.cloudinary_url(
                     public_id, resource_type=resource_type, secure=True, sign_url=True
                 )[0]
-                print(f"Generated signed URL: {signed_url}")
             except Exception as url_error:
-                print(f"Error generating signed URL: {str(url_error)}")
-                # Try without signing as fallback
-                try:
-                    signed_url = cloudinary.utils.cloudinary_url(
-                        public_id,
-                        resource_type=resource_type,
-                        secure=True,
-                        sign_url=False,
-                    )[0]
-                    print(f"Generated unsigned URL as fallback: {signed_url}")
-                except Exception as fallback_error:
-                    print(f"Fallback URL generation failed: {str(fallback_error)}")
-                    # Use original URL as final fallback
-                    print("Using original URL as final fallback")
-                    signed_url = file_url
-
-        # Download the file using the signed URL (for images only, PDFs are handled above)
-        try:
-            response = requests.get(signed_url, stream=True, timeout=30)
-            print(f"Cloudinary response status: {response.status_code}")
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            print(f"Cloudinary access error: {str(e)}")
-            # If signed URL fails, try the original URL as final fallback
-            if signed_url != file_url:
-                print(f"Trying original URL as fallback: {file_url}")
-                response = requests.get(file_url, stream=True, timeout=30)
-                print(f"Original URL response status: {response.status_code}")
-                response.raise_for_status()
-            else:
-                raise
+                logger.warning(f"Error generating signed URL: {str(url_error)}")
+                signed_url = file_url
+            candidate_urls = [signed_url] if signed_url == file_url else [signed_url, file_url]
 
-        # Determine proper content type
-        content_type = response.headers.get("content-type", "application/octet-stream")
-        if file_url.endswith(".pdf") or "application/pdf" in content_type:
-            content_type = "application/pdf"
-        elif file_url.endswith((".jpg", ".jpeg")) or "image/jpeg" in content_type:
-            content_type = "image/jpeg"
-        elif file_url.endswith(".png") or "image/png" in content_type:
-            content_type = "image/png"
-
-        # Create Django response
-        django_response = HttpResponse(response.content, content_type=content_type)
+        response = None
+        for index, url in enumerate(candidate_urls):
+            try:
+                response = stream_remote_file(url, request_headers, content_type)
+                break
+            except RemoteDocumentError as e:
+                logger.warning(f"Cloudinary access error for {url}: {str(e)}")
+                if index == len(candidate_urls) - 1:
+                    raise
 
         # Set headers
-        if preview_mode:
-            django_response["Content-Disposition"] = "inline"
+        if resource_type == "raw":
+            filename = document.file_name if document else "document.pdf"
+            response["Content-Disposition"] = f'inline; filename="{filename}"'
+        elif preview_mode:
+            response["Content-Disposition"] = "inline"
         else:
-            if document_id:
-                try:
-                    document = UserDocument.objects.get(id=document_id)
-                    filename = document.file_name
-                except UserDocument.DoesNotExist:
-                    filename = (
-                        file_url.split("/")[-1] if "/" in file_url else "document"
-                    )
-            else:
-                filename = file_url.split("/")[-1] if "/" in file_url else "document"
-
             import urllib.parse
 
+            if document:
+                filename = document.file_name
+            else:
+                filename = file_url.split("/")[-1] if "/" in file_url else "document"
             filename = urllib.parse.quote(filename)
-            django_response["Content-Disposition"] = (
-                f'attachment; filename="{filename}"'
-            )
-
-        django_response["Content-Length"] = str(len(response.content))
-        django_response["Access-Control-Allow-Origin"] = "*"
-        django_response["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
-        django_response["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
 
-        print(
-            f"Successfully proxied Cloudinary file, size: {len(response.content)} bytes"
-        )
-        return django_response
+        response["Access-Control-Allow-Origin"] = "*"
+        response["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
+        response["Access-Control-Allow-Headers"] = "Content-Type, Authorization, Range"
+        response["Access-Control-Expose-Headers"] = "Content-Range, Accept-Ranges, ETag"
+        return response
 
     except Exception as e:
-        print(f"Cloudinary access error: {str(e)}")
+        logger.error(f"Cloudinary access error: {str(e)}")
         return Response(
             {"error": f"Failed to access Cloudinary file: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,145 @@
+"""
+Cached catalogue of bulk menus offered to customers
+
+The customer AI search and recommendations used to load every approved
+bulk menu and then its items with one query per menu, and hand the whole
+catalogue to Gemini in a single prompt. The catalogue is now built once
+(menus with their chef, items prefetched) into a snapshot kept in the cache
+until a BulkMenu or BulkMenuItem changes.
+
+Each process keeps a BM25 index over the snapshot so a query is narrowed
+to its best lexical candidates before anything is sent to the model;
+prompt size and latency no longer grow with the catalogue.
+"""
+import threading
+import uuid
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import BulkMenu
+from .text_search import BM25Index
+
+CATALOGUE_KEY = 'bulk_menu_catalogue:v1'
+
+_index_lock = threading.Lock()
+_index = {'version': None, 'index': None}
+
+
+def _catalogue_seconds():
+    return getattr(settings, 'BULK_MENU_CATALOGUE_SECONDS', 3600)
+
+
+def candidate_limit():
+    """Most menus put in front of the model for one request"""
+    return getattr(settings, 'BULK_MENU_AI_CANDIDATES', 20)
+
+
+def _menu_entry(menu) -> Dict:
+    items = sorted(menu.items.all(), key=lambda item: (item.sort_order, item.item_name))
+    mandatory_items = [item.item_name for item in items if not item.is_optional]
+    optional_items = [item.item_name for item in items if item.is_optional]
+    return {
+        'id': menu.id,
+        'menu_name': menu.menu_name,
+        'description': menu.description or '',
+        'meal_type': menu.meal_type,
+        'meal_type_display': menu.get_meal_type_display(),
+        'chef_name': menu.chef.name if hasattr(menu.chef, 'name') else menu.chef.username,
+        'base_price_per_person': float(menu.base_price_per_person),
+        'min_persons': menu.min_persons,
+        'max_persons': menu.max_persons,
+        'image_url': str(menu.image) if menu.image else None,
+        'menu_items_summary': {
+            'mandatory_items': mandatory_items,
+            'optional_items': optional_items,
+            'total_items': len(mandatory_items) + len(optional_items)
+        },
+        # Searched, not returned
+        'search_text': ' '.join([
+            menu.menu_name, menu.menu_name, menu.description or '',
+            menu.get_meal_type_display(),
+            *(item.item_name for item in items),
+            *(item.description or '' for item in items),
+        ]),
+    }
+
+
+def build_catalogue() -> Dict:
+    """Snapshot of the available, approved bulk menus"""
+    menus = (
+        BulkMenu.objects.filter(availability_status=True, approval_status='approved')
+        .select_related('chef')
+        .prefetch_related('items')
+    )
+    return {
+        'version': uuid.uuid4().hex,
+        'menus': [_menu_entry(menu) for menu in menus],
+    }
+
+
+def menu_catalogue() -> Dict:
+    """The cached catalogue snapshot, rebuilt on a miss"""
+    catalogue = cache.get(CATALOGUE_KEY)
+    if catalogue is None:
+        catalogue = build_catalogue()
+        cache.set(CATALOGUE_KEY, catalogue, _catalogue_seconds())
+    return catalogue
+
+
+def forget_catalogue():
+    """Drop the snapshot after a bulk menu or one of its items changed"""
+    cache.delete(CATALOGUE_KEY)
+
+
+def _search_index(catalogue) -> BM25Index:
+    with _index_lock:
+        if _index['version'] != catalogue['version']:
+            _index['index'] = BM25Index({
+                position: menu['search_text']
+                for position, menu in enumerate(catalogue['menus'])
+            })
+            _index['version'] = catalogue['version']
+        return _index['index']
+
+
+def public_menu(menu) -> Dict:
+    """A catalogue entry as returned to clients"""
+    return {key: value for key, value in menu.items() if key != 'search_text'}
+
+
+def search_menus(query: str, meal_type: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+    """
+    Rank the catalogue against a free text query
+
+    Args:
+        query: Search text
+        meal_type: Only menus of this meal type
+        limit: Number of candidates (defaults to candidate_limit())
+
+    Returns:
+        dict: {'candidates': the best lexical matches (the first menus when
+               nothing matches), 'others': the remaining menus in order}
+    """
+    catalogue = menu_catalogue()
+    menus = catalogue['menus']
+    limit = limit or candidate_limit()
+    allowed = [
+        position for position, menu in enumerate(menus)
+        if not meal_type or menu['meal_type'] == meal_type
+    ]
+    allowed_set = set(allowed)
+
+    ranked = [
+        position for position, _ in _search_index(catalogue).search(query)
+        if position in allowed_set
+    ] if query else []
+    ranked_set = set(ranked)
+    # Lexical matches first, then the rest in catalogue order
+    order = ranked + [position for position in allowed if position not in ranked_set]
+
+    return {
+        'candidates': [public_menu(menus[position]) for position in order[:limit]],
+        'others': [public_menu(menus[position]) for position in order[limit:]],
+    }
@@ -1,14 +1,64 @@
 """
 Custom fields for handling both Cloudinary URLs and blob data
+
+Blob values are not uploaded during ``save()``: they are spooled to disk,
+saved as a ``pending-upload:`` placeholder and uploaded in the background
+(see ``utils.media_upload``). Until then the field reads as None, so the
+placeholder never reaches serializers or templates; the stored value is
+kept in the instance and written back unchanged on save.
 """
+import functools
+import threading
+import uuid
+
 from django.db import models
-from django.core.files.base import ContentFile
-from cloudinary.models import CloudinaryField
-from utils.cloudinary_utils import upload_image_to_cloudinary, migrate_blob_to_cloudinary
-import base64
+from django.db.models.query_utils import DeferredAttribute
+from utils.media_upload import PENDING_PREFIX, enqueue_blob_upload, is_pending_upload
+
+_raw_reads = threading.local()
+
+
+class PendingUploadAttribute(DeferredAttribute):
+    """Reads a queued upload's placeholder as None"""
+
+    def __get__(self, instance, cls=None):
+        value = super().__get__(instance, cls)
+        if instance is None or getattr(_raw_reads, 'active', False):
+            return value
+        return None if is_pending_upload(value) else value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+def _keep_placeholders_on_refresh(refresh_from_db):
+    """refresh_from_db copies fields with getattr, which must not mask"""
+
+    @functools.wraps(refresh_from_db)
+    def wrapper(self, *args, **kwargs):
+        previous = getattr(_raw_reads, 'active', False)
+        _raw_reads.active = True
+        try:
+            return refresh_from_db(self, *args, **kwargs)
+        finally:
+            _raw_reads.active = previous
+
+    wrapper.keeps_pending_uploads = True
+    return wrapper
+
+
+class PendingUploadFieldMixin:
+    """Masks pending-upload placeholders on read (see module docstring)"""
+
+    descriptor_class = PendingUploadAttribute
+
+    def contribute_to_class(self, cls, name, *args, **kwargs):
+        super().contribute_to_class(cls, name, *args, **kwargs)
+        if not getattr(cls.refresh_from_db, 'keeps_pending_uploads', False):
+            cls.refresh_from_db = _keep_placeholders_on_refresh(cls.refresh_from_db)
 
 
-class CloudinaryImageField(models.CharField):
+class CloudinaryImageField(PendingUploadFieldMixin, models.CharField):
     """
     Custom field that stores Cloudinary URLs but can accept blob data for migration
     """
@@ -22,25 +72,28 @@ class CloudinaryImageField(models.CharField):
     
     def pre_save(self, model_instance, add):
         """Process the value before saving to database"""
-        value = getattr(model_instance, self.attname)
+        # The stored value, placeholder included
+        value = model_instance.__dict__.get(self.attname)
         
         if value and self._is_blob_data(value):
-            # This is blob data, upload to Cloudinary
+            # This is blob data, queue it for upload to Cloudinary
             model_name = model_instance.__class__.__name__.lower()
             field_name = self.name
             
-            cloudinary_url = migrate_blob_to_cloudinary(
-                value,
-                folder=f'{model_name}s',
-                model_name=model_name,
-                field_name=field_name
+            placeholder = enqueue_blob_upload(
+                model_instance,
+                field_name,
+                str(value),
+                folder=f'{model_name}s/{model_name}',
+                public_id=f"{model_name}_{field_name}_{uuid.uuid4().hex[:8]}",
+                tags=['migrated', model_name, field_name],
             )
             
-            if cloudinary_url:
-                setattr(model_instance, self.attname, cloudinary_url)
-                return cloudinary_url
+            if placeholder:
+                setattr(model_instance, self.attname, placeholder)
+                return placeholder
         
-        return super().pre_save(model_instance, add)
+        return value
     
     def _is_blob_data(self, value):
         """Check if the value is blob/base64 data"""
@@ -49,8 +102,8 @@ class CloudinaryImageField(models.CharField):
         
         value_str = str(value)
         
-        # Skip if it's already a URL
-        if value_str.startswith(('http://', 'https://')):
+        # Skip if it's already a URL or a queued upload
+        if value_str.startswith(('http://', 'https://', PENDING_PREFIX)):
             return False
         
         # Skip if it's a data URL
@@ -61,7 +114,7 @@ class CloudinaryImageField(models.CharField):
         return len(value_str) > 100
 
 
-class HybridImageField(models.TextField):
+class HybridImageField(PendingUploadFieldMixin, models.TextField):
     """
     A field that can store both blob data and URLs
     This field automatically migrates blob data to Cloudinary on save
@@ -75,25 +128,29 @@ class HybridImageField(models.TextField):
     
     def pre_save(self, model_instance, add):
         """Process the value before saving to database"""
-        value = getattr(model_instance, self.attname)
+        # The stored value, placeholder included
+        value = model_instance.__dict__.get(self.attname)
         
         if value and self._is_blob_data(value):
-            # This is blob data, upload to Cloudinary
+            # This is blob data, queue it for upload to Cloudinary
             model_name = model_instance.__class__.__name__.lower()
             field_name = self.name
+            folder = f'{self.cloudinary_folder}/{model_name}'
             
-            cloudinary_url = upload_image_to_cloudinary(
-                image_data=value,
-                folder=f'{self.cloudinary_folder}/{model_name}',
-                tags=[model_name, field_name, 'auto_upload']
+            placeholder = enqueue_blob_upload(
+                model_instance,
+                field_name,
+                str(value),
+                folder=folder,
+                public_id=f"{folder.replace('/', '_')}_{uuid.uuid4().hex[:12]}",
+                tags=[model_name, field_name, 'auto_upload'],
             )
             
-            if cloudinary_url and 'secure_url' in cloudinary_url:
-                url = cloudinary_url['secure_url']
-                setattr(model_instance, self.attname, url)
-                return url
+            if placeholder:
+                setattr(model_instance, self.attname, placeholder)
+                return placeholder
         
-        return super().pre_save(model_instance, add)
+        return value
     
     def _is_blob_data(self, value):
         """Check if the value is blob/base64 data"""
@@ -102,8 +159,8 @@ class HybridImageField(models.TextField):
         
         value_str = str(value)
         
-        # Skip if it's already a URL
-        if value_str.startswith(('http://', 'https://')):
+        # Skip if it's already a URL or a queued upload
+        if value_str.startswith(('http://', 'https://', PENDING_PREFIX)):
             return False
         
         # Skip if it's a data URL
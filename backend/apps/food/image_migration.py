@@ -0,0 +1,251 @@
+"""
+Parallel blob-to-Cloudinary migration shared by the
+``migrate_blob_to_cloudinary`` and ``migrate_images_to_cloudinary`` commands.
+
+Rows are walked in primary-key order, blobs are uploaded on a thread pool
+under a global rate limit, and each batch is written back with one
+``bulk_update``. The last primary key of every finished batch is stored in a
+JSON checkpoint so an interrupted run continues where it stopped. Once an
+upload fails the checkpoint stays just before that row, so the next run
+retries it (rows migrated since are URLs by then and are skipped).
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.cloudinary_utils import migrate_blob_to_cloudinary
+
+
+def has_blob_data(value):
+    """Check if an image value contains blob data (not a URL)"""
+    if not value:
+        return False
+
+    image_str = str(value)
+
+    # Skip URLs, data URLs and uploads already queued by the model field
+    if image_str.startswith(('http', 'data:', 'pending-upload:')):
+        return False
+    if 'cloudinary.com' in image_str:
+        return False
+
+    # If it's a long string, it's likely base64/blob data
+    return len(image_str) > 100
+
+
+def is_not_uploaded(value):
+    """Anything that is not already a URL (data URLs included)"""
+    if not value:
+        return False
+    image_str = str(value)
+    return not (
+        image_str.startswith(('http', 'pending-upload:')) or 'cloudinary.com' in image_str
+    )
+
+
+class RateLimiter:
+    """Token bucket shared by the upload workers (``rate`` uploads/second)"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def acquire(self):
+        if not self.rate or self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(self._next_slot, now) + 1.0 / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+
+class Checkpoint:
+    """Last migrated primary key per ``<model label>.<field>``, kept in a JSON file"""
+
+    def __init__(self, path, reset=False):
+        self.path = path
+        self.data = {}
+        if path and not reset and os.path.exists(path):
+            with open(path) as handle:
+                self.data = json.load(handle)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, pk):
+        self.data[key] = pk
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as handle:
+            json.dump(self.data, handle)
+        os.replace(tmp_path, self.path)
+
+
+class BlobMigrationRunner:
+    """Migrates blob image fields to Cloudinary URLs for one command run"""
+
+    def __init__(self, stdout, style, batch_size=100, workers=8, rate=10.0,
+                 checkpoint=None, dry_run=False):
+        self.stdout = stdout
+        self.style = style
+        self.batch_size = max(batch_size, 1)
+        self.workers = max(workers, 1)
+        self.limiter = RateLimiter(rate)
+        self.checkpoint = checkpoint or Checkpoint(None)
+        self.dry_run = dry_run
+        self.uploaded = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    def _upload(self, value, folder, model_name, field_name):
+        self.limiter.acquire()
+        try:
+            return migrate_blob_to_cloudinary(
+                blob_data=value,
+                folder=folder,
+                model_name=model_name,
+                field_name=field_name
+            )
+        except Exception:
+            return None
+
+    def migrate(self, model_class, field_name, folder, model_name=None, predicate=has_blob_data):
+        """Migrate one field of one model; returns the number of rows migrated"""
+        model_name = model_name or model_class.__name__.lower()
+        pk_name = model_class._meta.pk.name
+        key = f'{model_class._meta.label}.{field_name}'
+        last_pk = self.checkpoint.get(key)
+
+        queryset = (
+            model_class.objects.exclude(**{f'{field_name}__isnull': True})
+            .exclude(**{field_name: ''})
+            .only(pk_name, field_name)
+            .order_by(pk_name)
+        )
+        if last_pk is not None:
+            self.stdout.write(f'Resuming {key} after {pk_name}={last_pk}')
+
+        migrated = 0
+        # Primary key everything up to which is done; frozen at the first failure
+        resume_pk = last_pk
+        holding = False
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                batch_qs = queryset
+                if last_pk is not None:
+                    batch_qs = batch_qs.filter(**{f'{pk_name}__gt': last_pk})
+                batch = list(batch_qs[:self.batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+
+                candidates = [obj for obj in batch if predicate(getattr(obj, field_name))]
+                if self.dry_run:
+                    for obj in candidates:
+                        self.stdout.write(f'Would migrate {model_name} ID {obj.pk}')
+                    migrated += len(candidates)
+                    continue
+
+                futures = [
+                    (obj, pool.submit(
+                        self._upload, getattr(obj, field_name), folder, model_name, field_name
+                    ))
+                    for obj in candidates
+                ]
+                updated = []
+                failed = set()
+                for obj, future in futures:
+                    url = future.result()
+                    if url:
+                        setattr(obj, field_name, url)
+                        updated.append(obj)
+                    else:
+                        failed.add(obj.pk)
+                        self.failed += 1
+                        self.stdout.write(
+                            self.style.ERROR(f'✗ Failed to migrate {model_name} ID {obj.pk}')
+                        )
+
+                if updated:
+                    model_class.objects.bulk_update(updated, [field_name])
+                migrated += len(updated)
+                self.uploaded += len(updated)
+                if not holding:
+                    for obj in batch:
+                        if obj.pk in failed:
+                            holding = True
+                            break
+                        resume_pk = obj.pk
+                    if resume_pk is not None:
+                        self.checkpoint.set(key, resume_pk)
+                self.stdout.write(
+                    f'  {model_name}.{field_name}: {migrated} migrated (up to ID {last_pk})'
+                )
+
+        return migrated
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        return (
+            f'{self.uploaded} image(s) uploaded, {self.failed} failed in {elapsed:.1f}s '
+            f'({self.uploaded / elapsed:.2f} images/s)'
+        )
+
+
+def add_runner_arguments(parser, default_batch_size):
+    """Options shared by the migration commands"""
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Show what would be migrated without actually doing it',
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=default_batch_size,
+        help=f'Rows read and bulk-updated per batch (default: {default_batch_size})',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Concurrent uploads (default: 8)',
+    )
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=10.0,
+        help='Maximum uploads per second across all workers, 0 for no limit (default: 10)',
+    )
+    parser.add_argument(
+        '--checkpoint',
+        type=str,
+        default='.image_migration_checkpoint.json',
+        help='Checkpoint file used to resume an interrupted run',
+    )
+    parser.add_argument(
+        '--reset',
+        action='store_true',
+        help='Ignore the checkpoint and scan all rows again',
+    )
+
+
+def runner_from_options(command, options):
+    return BlobMigrationRunner(
+        command.stdout,
+        command.style,
+        batch_size=options['batch_size'],
+        workers=options['workers'],
+        rate=options['rate'],
+        checkpoint=Checkpoint(
+            None if options['dry_run'] else options['checkpoint'],
+            reset=options['reset'],
+        ),
+        dry_run=options['dry_run'],
+    )
@@ -0,0 +1,89 @@
+"""
+Benchmark food search: the chained ``icontains`` ORM filter the search
+endpoints used before against the in-process BM25 index, on the foods in
+the current database (seed some first, e.g. with seed_load_data).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.food.models import Food
+from apps.food.search_index import build_index, food_index, reset_index, search_food_ids
+
+
+def orm_search(query, limit):
+    return list(
+        Food.objects.filter(
+            Q(name__icontains=query)
+            | Q(description__icontains=query)
+            | Q(food_category__name__icontains=query)
+            | Q(chef__first_name__icontains=query)
+            | Q(chef__last_name__icontains=query),
+            status='Approved',
+        ).values_list('pk', flat=True)[:limit]
+    )
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the food search index against the icontains ORM search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'queries',
+            nargs='*',
+            help='Queries to run (default: words taken from approved food names)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Times each query is run (default: 20)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Results per query (default: 20)',
+        )
+
+    def handle(self, *args, **options):
+        repeat = max(options['repeat'], 1)
+        limit = max(options['limit'], 1)
+        queries = options['queries'] or [
+            name.split()[0]
+            for name in Food.objects.filter(status='Approved')
+            .order_by('?')
+            .values_list('name', flat=True)[:10]
+            if name.split()
+        ]
+        if not queries:
+            self.stdout.write(self.style.WARNING('No approved foods to search'))
+            return
+
+        reset_index()
+        started = time.perf_counter()
+        documents = len(build_index())
+        build = time.perf_counter() - started
+        reset_index()
+        food_index()
+
+        def run(search):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for query in queries:
+                    search(query, limit)
+            return time.perf_counter() - started
+
+        orm = run(orm_search)
+        indexed = run(search_food_ids)
+
+        calls = repeat * len(queries)
+        self.stdout.write(
+            f'{documents} foods indexed in {build * 1e3:.1f} ms; '
+            f'{len(queries)} queries x {repeat}: {", ".join(queries)}'
+        )
+        self.stdout.write(f'  icontains ORM: {orm * 1e3 / calls:.3f} ms/query')
+        self.stdout.write(f'  BM25 index:    {indexed * 1e3 / calls:.3f} ms/query')
+        if indexed:
+            self.stdout.write(self.style.SUCCESS(f'  speedup: {orm / indexed:.1f}x'))
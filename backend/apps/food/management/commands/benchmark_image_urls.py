@@ -0,0 +1,73 @@
+"""
+Micro-benchmark for the memoized image URL builders used by menu/food list
+serialization (optimized image + thumbnail per row).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from utils.cloudinary_utils import (
+    _build_reliable_image_url,
+    clear_image_url_cache,
+    get_reliable_image_url,
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark get_reliable_image_url with and without the URL cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=200,
+            help='Distinct images per simulated list response (default: 200)',
+        )
+        parser.add_argument(
+            '--responses',
+            type=int,
+            default=20,
+            help='Number of simulated list responses (default: 20)',
+        )
+
+    def handle(self, *args, **options):
+        rows = max(options['rows'], 1)
+        responses = max(options['responses'], 1)
+        urls = [
+            f'https://res.cloudinary.com/demo/image/upload/foods/food/food_image_{i:05d}.jpg'
+            for i in range(rows)
+        ]
+        sizes = [(400, 300), (200, 200)]
+
+        def serialize(build):
+            for url in urls:
+                for width, height in sizes:
+                    build(url, width, height)
+
+        # Baseline: every response starts cold, i.e. builds each URL with the SDK
+        started = time.perf_counter()
+        for _ in range(responses):
+            clear_image_url_cache()
+            serialize(get_reliable_image_url)
+        baseline = time.perf_counter() - started
+
+        clear_image_url_cache()
+        started = time.perf_counter()
+        for _ in range(responses):
+            serialize(get_reliable_image_url)
+        cached = time.perf_counter() - started
+
+        calls = rows * len(sizes) * responses
+        info = _build_reliable_image_url.cache_info()
+        self.stdout.write(f'{calls} URL builds over {responses} responses of {rows} rows')
+        self.stdout.write(
+            f'  uncached: {baseline * 1e6 / calls:.2f} us/url, '
+            f'{baseline * 1e3 / responses:.2f} ms/response'
+        )
+        self.stdout.write(
+            f'  cached:   {cached * 1e6 / calls:.2f} us/url, '
+            f'{cached * 1e3 / responses:.2f} ms/response '
+            f'(hits={info.hits}, misses={info.misses})'
+        )
+        if cached:
+            self.stdout.write(self.style.SUCCESS(f'  speedup: {baseline / cached:.1f}x'))
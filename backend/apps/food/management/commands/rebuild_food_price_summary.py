@@ -0,0 +1,24 @@
+"""
+Management command to recompute Food.min_price, max_price and cook_count
+from the FoodPrice rows, e.g. after prices were bulk imported or edited
+with queryset updates that do not send signals.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.food.price_summary import refresh_price_summaries
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the stored price range and cook count of foods'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'food_ids',
+            nargs='*',
+            type=int,
+            help='Foods to rebuild (default: all)',
+        )
+
+    def handle(self, *args, **options):
+        updated = refresh_price_summaries(options['food_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt price summary of {updated} food(s)'))
@@ -0,0 +1,59 @@
+"""
+Management command to re-run spooled image uploads that did not complete
+(Cloudinary outage, worker restart before the upload finished, ...).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from utils.media_upload import pending_uploads, process_upload, spool_dir
+
+
+class Command(BaseCommand):
+    help = 'Retry pending background image uploads from the upload spool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List pending uploads without uploading them',
+        )
+        parser.add_argument(
+            '--purge-orphans',
+            type=int,
+            default=24,
+            metavar='HOURS',
+            help='Delete spool files of rolled back saves older than this (default: 24, 0 to keep)',
+        )
+
+    def handle(self, *args, **options):
+        pending = pending_uploads()
+        self.stdout.write(f'{len(pending)} pending upload(s)')
+
+        uploaded = failed = 0
+        for meta in pending:
+            label = f"{meta['model']}#{meta['pk']}.{meta['field']}"
+            if options['dry_run']:
+                self.stdout.write(f'  would upload {label}')
+                continue
+            if process_upload(meta):
+                uploaded += 1
+                self.stdout.write(self.style.SUCCESS(f'  uploaded {label}'))
+            else:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'  failed {label}'))
+
+        purged = 0
+        if options['purge_orphans'] and not options['dry_run']:
+            # A spool file without metadata belongs to a save that never committed
+            cutoff = time.time() - options['purge_orphans'] * 3600
+            for blob in spool_dir().glob('*.bin'):
+                if not blob.with_suffix('.json').exists() and blob.stat().st_mtime < cutoff:
+                    blob.unlink(missing_ok=True)
+                    purged += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Done: {uploaded} uploaded, {failed} failed, {purged} orphan(s) purged'
+            )
+        )
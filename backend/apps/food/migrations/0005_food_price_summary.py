@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_price_summaries(apps, schema_editor):
+    from apps.food.price_summary import refresh_price_summaries
+
+    refresh_price_summaries(registry=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0004_remove_bulk_menu_item_dietary_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='food',
+            name='cook_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='food',
+            name='max_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='food',
+            name='min_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='food',
+            index=models.Index(fields=['status', 'is_available', 'min_price'], name='Food_status_548c7f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='food',
+            index=models.Index(fields=['status', 'is_available', 'max_price'], name='Food_status_89d3d7_idx'),
+        ),
+        migrations.RunPython(backfill_price_summaries, migrations.RunPython.noop),
+    ]
@@ -90,6 +90,11 @@ class Food(models.Model):
     total_reviews = models.PositiveIntegerField(default=0)
     total_orders = models.PositiveIntegerField(default=0)
     
+    # Summary of the food's FoodPrice rows, kept by apps.food.price_summary
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False)
+    cook_count = models.PositiveIntegerField(default=0, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -131,6 +136,10 @@ class Food(models.Model):
     class Meta:
         db_table = 'Food'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'is_available', 'min_price']),
+            models.Index(fields=['status', 'is_available', 'max_price']),
+        ]
 
 
 class FoodPrice(models.Model):
@@ -0,0 +1,79 @@
+"""
+Stored price range and cook count of each food
+
+``Food.min_price``, ``max_price`` and ``cook_count`` summarize the food's
+FoodPrice rows so menus can filter and sort by price on the Food table
+alone and serializers need no per-row price queries. FoodPrice saves and
+deletes refresh the food they belong to; bulk writes that skip signals
+are caught up with ``manage.py rebuild_food_price_summary``.
+"""
+from django.apps import apps as django_apps
+from django.db.models import (
+    Count, DecimalField, Exists, IntegerField, Max, Min, OuterRef, Subquery,
+)
+from django.db.models.functions import Coalesce
+
+
+def _price_stat(FoodPrice, aggregate, output_field):
+    return Subquery(
+        FoodPrice.objects.filter(food=OuterRef('pk'))
+        .order_by()
+        .values('food')
+        .annotate(value=aggregate)
+        .values('value'),
+        output_field=output_field,
+    )
+
+
+def refresh_price_summaries(food_ids=None, registry=django_apps):
+    """
+    Recompute the summary columns with one UPDATE
+
+    Args:
+        food_ids: Foods to refresh (all foods when None)
+        registry: App registry to load models from (migrations pass theirs)
+
+    Returns:
+        int: Number of foods updated
+    """
+    Food = registry.get_model('food', 'Food')
+    FoodPrice = registry.get_model('food', 'FoodPrice')
+
+    foods = Food.objects.all() if food_ids is None else Food.objects.filter(pk__in=food_ids)
+    price = DecimalField(max_digits=10, decimal_places=2)
+    return foods.update(
+        min_price=_price_stat(FoodPrice, Min('price'), price),
+        max_price=_price_stat(FoodPrice, Max('price'), price),
+        cook_count=Coalesce(
+            _price_stat(FoodPrice, Count('cook', distinct=True), IntegerField()), 0
+        ),
+    )
+
+
+def refresh_price_summary(food_id):
+    """Recompute the summary of one food after one of its prices changed"""
+    if food_id is not None:
+        refresh_price_summaries([food_id])
+
+
+def filter_by_price(foods, min_price=None, max_price=None):
+    """
+    Foods with a price between ``min_price`` and ``max_price`` (either may
+    be None), using the stored price range
+    """
+    if min_price:
+        foods = foods.filter(max_price__gte=min_price)
+    if max_price:
+        foods = foods.filter(min_price__lte=max_price)
+    if min_price and max_price:
+        # Overlapping ranges can still have no single price inside the window
+        from .models import FoodPrice
+
+        foods = foods.filter(
+            Exists(
+                FoodPrice.objects.filter(
+                    food=OuterRef('pk'), price__gte=min_price, price__lte=max_price
+                )
+            )
+        )
+    return foods
@@ -0,0 +1,148 @@
+"""
+In-process search index over approved foods
+
+Food search used to chain ``icontains`` ORs over name, description,
+category and chef name, which scans the whole table and cannot rank. Each
+process now keeps a BM25 index (see ``text_search``) over the text of the
+approved foods, built on the first search and then kept current by the
+Food signals one food at a time. Views ask the index for ranked food ids
+and load just those rows.
+
+Signals only reach the process that saved the food, so every change also
+bumps a generation counter in the cache; a process whose index is older
+than the cached generation rebuilds it before answering. That only spans
+workers when CACHES points at a shared backend, so an index is also
+rebuilt once it is ``FOOD_SEARCH_INDEX_MAX_AGE_SECONDS`` old. Searches and
+updates hold the same lock, so a search never sees an index mid-update.
+"""
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, When
+
+from .models import Food
+from .text_search import BM25Index
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = 'food_search_index:generation'
+
+_lock = threading.RLock()
+_state = {'index': None, 'generation': None, 'built_at': None}
+
+
+def food_text(food) -> str:
+    """Searchable text of a food (name counted twice)"""
+    chef = food.chef
+    category = food.food_category
+    return ' '.join(part or '' for part in [
+        food.name,
+        food.name,
+        food.category,
+        category.name if category else '',
+        food.description,
+        chef.first_name if chef else '',
+        chef.last_name if chef else '',
+        chef.username if chef else '',
+    ])
+
+
+def _generation():
+    return cache.get_or_set(GENERATION_KEY, 0, None)
+
+
+def _bump_generation():
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 1, None)
+        return cache.get(GENERATION_KEY)
+
+
+def build_index() -> BM25Index:
+    foods = Food.objects.filter(status='Approved').select_related('chef', 'food_category')
+    return BM25Index({food.pk: food_text(food) for food in foods.iterator()})
+
+
+def _max_age():
+    return getattr(settings, 'FOOD_SEARCH_INDEX_MAX_AGE_SECONDS', 300)
+
+
+def max_search_results() -> int:
+    """Cap on the ids a list endpoint passes to ``rank_queryset``"""
+    return getattr(settings, 'FOOD_SEARCH_MAX_RESULTS', 300)
+
+
+def food_index() -> BM25Index:
+    """This process's index, (re)built when missing, stale or too old"""
+    generation = _generation()
+    with _lock:
+        if (
+            _state['index'] is None
+            or _state['generation'] != generation
+            or time.monotonic() - _state['built_at'] > _max_age()
+        ):
+            _state['index'] = build_index()
+            _state['generation'] = generation
+            _state['built_at'] = time.monotonic()
+        return _state['index']
+
+
+def _apply(change):
+    with _lock:
+        generation = _bump_generation()
+        index = _state['index']
+        if index is None or _state['generation'] != generation - 1:
+            # Other changes happened in between; the next search rebuilds
+            return
+        change(index)
+        _state['generation'] = generation
+
+
+def update_food(food):
+    """Index, re-index or drop one food after it was saved"""
+    if food.status == 'Approved':
+        text = food_text(food)
+        _apply(lambda index: index.add(food.pk, text))
+    else:
+        remove_food(food.pk)
+
+
+def remove_food(food_id):
+    """Drop a food from the index after it was deleted"""
+    _apply(lambda index: index.remove(food_id))
+
+
+def invalidate_index():
+    """Have every process rebuild, e.g. after a category was renamed"""
+    _bump_generation()
+
+
+def reset_index():
+    """Forget this process's index (tests and the benchmark command)"""
+    with _lock:
+        _state['index'] = None
+        _state['generation'] = None
+        _state['built_at'] = None
+
+
+def search_food_ids(query: str, limit: Optional[int] = None) -> List[int]:
+    """Ids of approved foods matching ``query``, most relevant first"""
+    with _lock:
+        return [pk for pk, _ in food_index().search(query, limit)]
+
+
+def rank_queryset(queryset, food_ids: List[int]):
+    """``queryset`` narrowed to ``food_ids`` and ordered like them"""
+    if not food_ids:
+        return queryset.none()
+    return queryset.filter(pk__in=food_ids).order_by(
+        Case(
+            *[When(pk=pk, then=position) for position, pk in enumerate(food_ids)],
+            output_field=IntegerField(),
+        )
+    )
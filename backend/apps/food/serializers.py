@@ -7,6 +7,14 @@ from utils.cloudinary_utils import get_optimized_url, upload_image_to_cloudinary
 from .models import BulkMenu, BulkMenuItem, Cuisine, Food, FoodCategory, FoodPrice, FoodReview, Offer
 
 
+def _listed(serializer, attr):
+    """``attr`` of every object in the list ``serializer`` is rendering as part of"""
+    parent = serializer.parent
+    if isinstance(parent, serializers.ListSerializer) and parent.instance is not None:
+        return [getattr(item, attr) for item in parent.instance]
+    return []
+
+
 class CuisineSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     thumbnail_url = serializers.SerializerMethodField()
@@ -115,48 +123,19 @@ class FoodPriceSerializer(serializers.ModelSerializer):
         
         # Get cook's kitchen location (with fallback to food's chef)
         kitchen_location = None
-        try:
-            from apps.users.models import Address
-            import logging
-            logger = logging.getLogger(__name__)
-            
-            kitchen_address = Address.objects.filter(
-                user=obj.cook,
-                address_type='kitchen',
-                is_active=True
-            ).first()
-            
-            # If cook doesn't have kitchen location, try food's chef
-            if (not kitchen_address or not kitchen_address.latitude or not kitchen_address.longitude) and obj.food and obj.food.chef and obj.food.chef != obj.cook:
-                logger.info(f"Cook {obj.cook.user_id} has no kitchen location, falling back to food chef {obj.food.chef.user_id}")
-                kitchen_address = Address.objects.filter(
-                    user=obj.food.chef,
-                    address_type='kitchen',
-                    is_active=True
-                ).first()
-            
-            if not kitchen_address:
-                logger.warning(f"No kitchen address found for cook {obj.cook.user_id} or food chef")
-            elif not kitchen_address.latitude or not kitchen_address.longitude:
-                logger.warning(f"Kitchen address found but missing coordinates")
-            else:
-                # Get kitchen name from KitchenLocation object
-                kitchen_name = 'Kitchen'
-                if hasattr(kitchen_address, 'kitchen_details') and kitchen_address.kitchen_details:
-                    kitchen_name = kitchen_address.kitchen_details.kitchen_name
-                
-                kitchen_location = {
-                    'latitude': float(kitchen_address.latitude),
-                    'longitude': float(kitchen_address.longitude),
-                    'address': kitchen_address.full_address,
-                    'kitchen_name': kitchen_name
-                }
-                logger.info(f"Kitchen location found: {kitchen_location}")
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error getting kitchen location for cook {obj.cook.user_id}: {str(e)}")
-            kitchen_location = None
+        location = self._kitchen_location(obj.cook_id)
+        if location is None or location.latitude is None:
+            food_chef_id = obj.food.chef_id if obj.food_id else None
+            if food_chef_id and food_chef_id != obj.cook_id:
+                location = self._kitchen_location(food_chef_id)
+        if location is not None and location.latitude is not None:
+            latitude, longitude = location.coordinates
+            kitchen_location = {
+                'latitude': latitude,
+                'longitude': longitude,
+                'address': location.address,
+                'kitchen_name': location.kitchen_name or 'Kitchen'
+            }
         
         return {
             "id": obj.cook.pk,  # Use pk instead of id
@@ -173,6 +152,12 @@ class FoodPriceSerializer(serializers.ModelSerializer):
             return get_optimized_url(str(obj.image_url))
         return None
 
+    def _kitchen_location(self, chef_id):
+        """Chef's stored kitchen location, fetched once for every cook in the list"""
+        from apps.users.kitchen_location_utils import context_chef_location
+
+        return context_chef_location(self.context, chef_id, _listed(self, 'cook_id'))
+
 
 class FoodSerializer(serializers.ModelSerializer):
     primary_image = serializers.SerializerMethodField()
@@ -244,7 +229,7 @@ class FoodSerializer(serializers.ModelSerializer):
 
     def get_available_cooks_count(self, obj):
         """Get count of cooks who have prices for this food"""
-        return obj.prices.values('cook').distinct().count()
+        return obj.cook_count
     
     def get_chef_name(self, obj):
         """Get chef username safely"""
@@ -273,17 +258,11 @@ class FoodSerializer(serializers.ModelSerializer):
     
     def get_min_price(self, obj):
         """Get minimum price across all sizes"""
-        prices = obj.prices.all()
-        if prices:
-            return float(min(price.price for price in prices))
-        return None
+        return float(obj.min_price) if obj.min_price is not None else None
     
     def get_max_price(self, obj):
         """Get maximum price across all sizes"""
-        prices = obj.prices.all()
-        if prices:
-            return float(max(price.price for price in prices))
-        return None
+        return float(obj.max_price) if obj.max_price is not None else None
     
     def get_delivery_fee(self, obj):
         """Calculate delivery fee if user location is provided"""
@@ -292,24 +271,18 @@ class FoodSerializer(serializers.ModelSerializer):
             return None
             
         try:
-            from apps.users.models import Address
             from .utils import calculate_delivery_fee
             
             # Get chef's kitchen location
-            kitchen_address = Address.objects.filter(
-                user=obj.chef,
-                address_type='kitchen',
-                is_active=True
-            ).first()
-            
-            if not kitchen_address or not kitchen_address.latitude or not kitchen_address.longitude:
+            kitchen_lat, kitchen_lng = self._kitchen_location(obj.chef_id).coordinates
+            if kitchen_lat is None:
                 return None
             
             fee_data = calculate_delivery_fee(
                 user_location['latitude'],
                 user_location['longitude'],
-                float(kitchen_address.latitude),
-                float(kitchen_address.longitude)
+                kitchen_lat,
+                kitchen_lng
             )
             
             return fee_data['total_delivery_fee']
@@ -324,23 +297,17 @@ class FoodSerializer(serializers.ModelSerializer):
             return None
             
         try:
-            from apps.users.models import Address
             from .utils import calculate_distance
             
-            kitchen_address = Address.objects.filter(
-                user=obj.chef,
-                address_type='kitchen',
-                is_active=True
-            ).first()
-            
-            if not kitchen_address or not kitchen_address.latitude or not kitchen_address.longitude:
+            kitchen_lat, kitchen_lng = self._kitchen_location(obj.chef_id).coordinates
+            if kitchen_lat is None:
                 return None
             
             distance = calculate_distance(
                 user_location['latitude'],
                 user_location['longitude'],
-                float(kitchen_address.latitude),
-                float(kitchen_address.longitude)
+                kitchen_lat,
+                kitchen_lng
             )
             
             return round(distance, 2)
@@ -371,99 +338,60 @@ class FoodSerializer(serializers.ModelSerializer):
         if is_chef_view and request and request.user and request.user.is_authenticated:
             # For chef food viewset, only show prices created by the current user
             prices = obj.prices.filter(cook=request.user)
-            return FoodPriceSerializer(prices, many=True).data
+            return FoodPriceSerializer(prices, many=True, context=self._price_context()).data
         
         # For customer menu and other cases, return all prices from all cooks
-        return FoodPriceSerializer(obj.prices.all(), many=True).data
+        return FoodPriceSerializer(obj.prices.all(), many=True, context=self._price_context()).data
+    
+    def _price_context(self):
+        """Nested price serializers share this response's kitchen location memo"""
+        return {'kitchen_locations': self.context.setdefault('kitchen_locations', {})}
     
     def get_kitchen_location(self, obj):
         """Get chef's kitchen location details"""
-        try:
-            from apps.users.models import Address
-            
-            kitchen_address = Address.objects.filter(
-                user=obj.chef,
-                address_type='kitchen',
-                is_active=True
-            ).first()
-            
-            if not kitchen_address:
-                return None
-            
-            return {
-                'latitude': float(kitchen_address.latitude) if kitchen_address.latitude else None,
-                'longitude': float(kitchen_address.longitude) if kitchen_address.longitude else None,
-                'address': kitchen_address.full_address,
-                'kitchen_name': getattr(kitchen_address, 'kitchen_details', {}).get('kitchen_name', 'Kitchen') if hasattr(kitchen_address, 'kitchen_details') else 'Kitchen'
-            }
-            
-        except Exception:
+        location = self._kitchen_location(obj.chef_id)
+        if location is None or (location.latitude is None and not location.address):
             return None
+        
+        latitude, longitude = location.coordinates
+        return {
+            'latitude': latitude,
+            'longitude': longitude,
+            'address': location.address,
+            'kitchen_name': location.kitchen_name or 'Kitchen'
+        }
+    
+    def _kitchen_location(self, chef_id):
+        """Chef's stored kitchen location, fetched once for every chef in the list"""
+        from apps.users.kitchen_location_utils import context_chef_location
+
+        return context_chef_location(self.context, chef_id, _listed(self, 'chef_id'))
+    
+    def _chef_availability(self, obj):
+        """Chef's availability, evaluated once per chef for the whole response"""
+        from apps.users.availability_utils import chef_availability
+
+        return chef_availability(obj.chef_id, self.context.setdefault('chef_availability', {}))
     
     def get_chef_is_currently_open(self, obj):
         """Check if chef is currently accepting orders"""
         try:
-            from apps.users.models import Address
-            from apps.users.availability_utils import is_within_operating_hours
-            
-            kitchen_address = Address.objects.filter(
-                user=obj.chef,
-                address_type='kitchen',
-                is_default=True,
-                is_active=True
-            ).first()
-            
-            if kitchen_address and hasattr(kitchen_address, 'kitchen_details'):
-                operating_hours = kitchen_address.kitchen_details.operating_hours
-                is_open, _, _ = is_within_operating_hours(operating_hours)
-                return is_open
-            
-            # If no operating hours set, assume available
-            return True
-            
+            return self._chef_availability(obj).is_open
         except Exception:
             return True
     
     def get_chef_availability_message(self, obj):
         """Get chef's current availability status message"""
         try:
-            from apps.users.models import Address
-            from apps.users.availability_utils import is_within_operating_hours
-            
-            kitchen_address = Address.objects.filter(
-                user=obj.chef,
-                address_type='kitchen',
-                is_default=True,
-                is_active=True
-            ).first()
-            
-            if kitchen_address and hasattr(kitchen_address, 'kitchen_details'):
-                operating_hours = kitchen_address.kitchen_details.operating_hours
-                _, message, _ = is_within_operating_hours(operating_hours)
-                return message
-            
-            return "Always available"
-            
+            return self._chef_availability(obj).message
         except Exception:
             return "Always available"
     
     def get_chef_operating_hours_readable(self, obj):
         """Get human-readable chef operating hours"""
         try:
-            from apps.users.models import Address
-            from apps.users.availability_utils import format_operating_hours_readable
-            
-            kitchen_address = Address.objects.filter(
-                user=obj.chef,
-                address_type='kitchen',
-                is_default=True,
-                is_active=True
-            ).first()
-            
-            if kitchen_address and hasattr(kitchen_address, 'kitchen_details'):
-                operating_hours = kitchen_address.kitchen_details.operating_hours
-                return format_operating_hours_readable(operating_hours)
-            
+            return self._chef_availability(obj).readable
+        except Exception:
             return "Hours not specified"
             
         except Exception:
@@ -726,6 +654,8 @@ class ChefFoodCreateSerializer(serializers.ModelSerializer):
             preparation_time=prep_time,
             cook=self.context["request"].user,
         )
+        # The FoodPrice signal updated the stored price range in the database
+        food.refresh_from_db(fields=["min_price", "max_price", "cook_count"])
 
         return food
 
@@ -984,27 +914,18 @@ class BulkMenuWithItemsSerializer(serializers.ModelSerializer):
     
     def get_kitchen_location(self, obj):
         """Get chef's kitchen location"""
-        try:
-            from apps.users.models import Address
-            kitchen_address = Address.objects.filter(
-                user=obj.chef,
-                address_type='kitchen',
-                is_active=True
-            ).first()
-            
-            if kitchen_address and kitchen_address.latitude and kitchen_address.longitude:
-                return {
-                    'lat': float(kitchen_address.latitude),
-                    'lng': float(kitchen_address.longitude),
-                    'address': kitchen_address.full_address,
-                    'city': kitchen_address.city,
-                    'state': kitchen_address.state
-                }
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error getting kitchen location: {e}")
-        return None
+        location = self._kitchen_location(obj.chef_id)
+        if location is None or location.latitude is None:
+            return None
+        
+        lat, lng = location.coordinates
+        return {
+            'lat': lat,
+            'lng': lng,
+            'address': location.address,
+            'city': location.city,
+            'state': location.state
+        }
     
     def get_delivery_fee(self, obj):
         """Calculate delivery fee if user location is provided"""
@@ -1013,24 +934,18 @@ class BulkMenuWithItemsSerializer(serializers.ModelSerializer):
             return 300  # Return base fee if no location
             
         try:
-            from apps.users.models import Address
             from .utils import calculate_delivery_fee
             
             # Get chef's kitchen location
-            kitchen_address = Address.objects.filter(
-                user=obj.chef,
-                address_type='kitchen',
-                is_active=True
-            ).first()
-            
-            if not kitchen_address or not kitchen_address.latitude or not kitchen_address.longitude:
+            kitchen_lat, kitchen_lng = self._kitchen_location(obj.chef_id).coordinates
+            if kitchen_lat is None:
                 return 300  # Return base fee if no kitchen location
             
             fee_data = calculate_delivery_fee(
                 user_location['latitude'],
                 user_location['longitude'],
-                float(kitchen_address.latitude),
-                float(kitchen_address.longitude)
+                kitchen_lat,
+                kitchen_lng
             )
             
             return fee_data['total_delivery_fee']
@@ -1048,24 +963,18 @@ class BulkMenuWithItemsSerializer(serializers.ModelSerializer):
             return None
             
         try:
-            from apps.users.models import Address
             from .utils import calculate_distance
             
             # Get chef's kitchen location
-            kitchen_address = Address.objects.filter(
-                user=obj.chef,
-                address_type='kitchen',
-                is_active=True
-            ).first()
-            
-            if not kitchen_address or not kitchen_address.latitude or not kitchen_address.longitude:
+            kitchen_lat, kitchen_lng = self._kitchen_location(obj.chef_id).coordinates
+            if kitchen_lat is None:
                 return None
             
             distance = calculate_distance(
                 user_location['latitude'],
                 user_location['longitude'],
-                float(kitchen_address.latitude),
-                float(kitchen_address.longitude)
+                kitchen_lat,
+                kitchen_lng
             )
             
             return round(distance, 2)
@@ -1076,70 +985,37 @@ class BulkMenuWithItemsSerializer(serializers.ModelSerializer):
             logger.error(f"Error calculating distance: {e}")
             return None
     
+    def _kitchen_location(self, chef_id):
+        """Chef's stored kitchen location, fetched once for every chef in the list"""
+        from apps.users.kitchen_location_utils import context_chef_location
+
+        return context_chef_location(self.context, chef_id, _listed(self, 'chef_id'))
+    
+    def _chef_availability(self, obj):
+        """Chef's availability, evaluated once per chef for the whole response"""
+        from apps.users.availability_utils import chef_availability
+
+        return chef_availability(obj.chef_id, self.context.setdefault('chef_availability', {}))
+    
     def get_chef_is_currently_open(self, obj):
         """Check if chef is currently accepting orders"""
         try:
-            from apps.users.models import Address
-            from apps.users.availability_utils import is_within_operating_hours
-            
-            kitchen_address = Address.objects.filter(
-                user=obj.chef,
-                address_type='kitchen',
-                is_default=True,
-                is_active=True
-            ).first()
-            
-            if kitchen_address and hasattr(kitchen_address, 'kitchen_details'):
-                operating_hours = kitchen_address.kitchen_details.operating_hours
-                is_open, _, _ = is_within_operating_hours(operating_hours)
-                return is_open
-            
-            # If no operating hours set, assume available
-            return True
-            
+            return self._chef_availability(obj).is_open
         except Exception:
             return True
     
     def get_chef_availability_message(self, obj):
         """Get chef's current availability status message"""
         try:
-            from apps.users.models import Address
-            from apps.users.availability_utils import is_within_operating_hours
-            
-            kitchen_address = Address.objects.filter(
-                user=obj.chef,
-                address_type='kitchen',
-                is_default=True,
-                is_active=True
-            ).first()
-            
-            if kitchen_address and hasattr(kitchen_address, 'kitchen_details'):
-                operating_hours = kitchen_address.kitchen_details.operating_hours
-                _, message, _ = is_within_operating_hours(operating_hours)
-                return message
-            
-            return "Always available"
-            
+            return self._chef_availability(obj).message
         except Exception:
             return "Always available"
     
     def get_chef_operating_hours_readable(self, obj):
         """Get human-readable chef operating hours"""
         try:
-            from apps.users.models import Address
-            from apps.users.availability_utils import format_operating_hours_readable
-            
-            kitchen_address = Address.objects.filter(
-                user=obj.chef,
-                address_type='kitchen',
-                is_default=True,
-                is_active=True
-            ).first()
-            
-            if kitchen_address and hasattr(kitchen_address, 'kitchen_details'):
-                operating_hours = kitchen_address.kitchen_details.operating_hours
-                return format_operating_hours_readable(operating_hours)
-            
+            return self._chef_availability(obj).readable
+        except Exception:
             return "Hours not specified"
             
         except Exception:
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save, pre_delete
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Food, BulkMenu, BulkMenuItem
+from .models import Food, FoodCategory, FoodPrice, BulkMenu, BulkMenuItem
+from .bulk_menu_catalogue import forget_catalogue
+from . import search_index
+from .price_summary import refresh_price_summary
 from apps.communications.utils import NotificationManager
 
 User = get_user_model()
@@ -146,4 +150,46 @@ def notify_chef_on_bulk_menu_item_deletion(sender, instance, **kwargs):
             instance.bulk_menu.chef,
             instance.item_name,
             instance.bulk_menu.menu_name
-        )
\ No newline at end of file
+        )
+
+
+# BULK MENU CATALOGUE
+
+@receiver(post_save, sender=BulkMenu)
+@receiver(post_delete, sender=BulkMenu)
+@receiver(post_save, sender=BulkMenuItem)
+@receiver(post_delete, sender=BulkMenuItem)
+def forget_bulk_menu_catalogue(sender, instance, **kwargs):
+    """Rebuild the customer bulk menu catalogue after a menu or item changed"""
+    forget_catalogue()
+
+
+# FOOD SEARCH INDEX
+
+@receiver(post_save, sender=Food)
+def index_saved_food(sender, instance, **kwargs):
+    """Re-index a food once its save is committed"""
+    transaction.on_commit(lambda: search_index.update_food(instance))
+
+
+@receiver(post_delete, sender=Food)
+def unindex_deleted_food(sender, instance, **kwargs):
+    """Drop a deleted food from the search index"""
+    food_id = instance.pk
+    transaction.on_commit(lambda: search_index.remove_food(food_id))
+
+
+@receiver(post_save, sender=FoodCategory)
+@receiver(post_delete, sender=FoodCategory)
+def reindex_foods_on_category_change(sender, instance, **kwargs):
+    """Category names are indexed with each food, so rebuild"""
+    transaction.on_commit(search_index.invalidate_index)
+
+
+# FOOD PRICE SUMMARY
+
+@receiver(post_save, sender=FoodPrice)
+@receiver(post_delete, sender=FoodPrice)
+def refresh_food_price_summary(sender, instance, **kwargs):
+    """Keep the food's min/max price and cook count in step with its prices"""
+    refresh_price_summary(instance.food_id)
@@ -1,3 +1,406 @@
-from django.test import TestCase
+import base64
+import io
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+import cloudinary
+from django.test import TestCase, override_settings
+
+from apps.food.models import Cuisine
+from utils import media_upload
+
+
+class FailingUploader:
+    def upload(self, path, folder, public_id, tags):
+        raise ConnectionError("Cloudinary unavailable")
+
+
+class BackgroundImageUploadTest(TestCase):
+    """Test that blob images are uploaded after save instead of during it"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        overrides = override_settings(
+            MEDIA_ROOT=self.media_root,
+            MEDIA_UPLOAD_SPOOL_DIR=f"{self.media_root}/spool",
+            MEDIA_UPLOADER="utils.media_upload.LocalFakeUploader",
+            MEDIA_UPLOAD_WORKERS=0,
+            MEDIA_UPLOAD_RETRY_BACKOFF=0,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        media_upload.reset_uploader()
+        self.addCleanup(media_upload.reset_uploader)
+
+        self.image_bytes = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+        self.blob = base64.b64encode(self.image_bytes).decode()
+
+    def stored_image(self, cuisine):
+        """The raw column, which the model attribute masks while pending"""
+        return Cuisine.objects.values_list("image", flat=True).get(pk=cuisine.pk)
+
+    def test_save_stores_placeholder_then_final_url(self):
+        """Test that save is not blocked on the upload and the URL is swapped in"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            cuisine = Cuisine.objects.create(name="Sri Lankan", image=self.blob)
+
+        self.assertTrue(media_upload.is_pending_upload(self.stored_image(cuisine)))
+        self.assertEqual(media_upload.get_uploader().uploads, [])
+
+        for callback in callbacks:
+            callback()
+
+        cuisine.refresh_from_db()
+        self.assertTrue(cuisine.image.startswith("https://res.cloudinary.com/fake/"))
+        upload = media_upload.get_uploader().uploads[0]
+        with open(upload["path"], "rb") as uploaded:
+            self.assertEqual(uploaded.read(), self.image_bytes)
+        self.assertEqual(media_upload.pending_uploads(), [])
+
+    def test_wrapped_base64_is_accepted(self):
+        """Test that line-wrapped base64 decodes to the original bytes"""
+        blob = base64.encodebytes(self.image_bytes).decode()
+        with self.captureOnCommitCallbacks(execute=True):
+            cuisine = Cuisine.objects.create(name="Malay", image=blob)
+
+        self.assertTrue(self.stored_image(cuisine).startswith("https://"))
+        upload = media_upload.get_uploader().uploads[0]
+        with open(upload["path"], "rb") as uploaded:
+            self.assertEqual(uploaded.read(), self.image_bytes)
+
+    def test_newer_value_is_not_overwritten(self):
+        """Test that a value saved before the upload finishes wins"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            cuisine = Cuisine.objects.create(name="Indian", image=self.blob)
+        Cuisine.objects.filter(pk=cuisine.pk).update(image="https://example.com/new.jpg")
+
+        for callback in callbacks:
+            callback()
+
+        cuisine.refresh_from_db()
+        self.assertEqual(cuisine.image, "https://example.com/new.jpg")
+
+    @override_settings(
+        MEDIA_UPLOADER="apps.food.tests.FailingUploader", MEDIA_UPLOAD_RETRIES=1
+    )
+    def test_failed_upload_is_kept_for_retry(self):
+        """Test that failed uploads stay spooled and keep the placeholder"""
+        media_upload.reset_uploader()
+        with self.captureOnCommitCallbacks(execute=True):
+            cuisine = Cuisine.objects.create(name="Thai", image=self.blob)
+
+        self.assertTrue(media_upload.is_pending_upload(self.stored_image(cuisine)))
+        self.assertEqual(len(media_upload.pending_uploads()), 1)
+
+    def test_pending_placeholder_reads_as_none(self):
+        """Test that readers never see the placeholder and saves keep it"""
+        from apps.food.serializers import CuisineSerializer
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            cuisine = Cuisine.objects.create(name="Korean", image=self.blob)
+        cuisine.refresh_from_db()
+        self.assertIsNone(cuisine.image)
+        self.assertIsNone(CuisineSerializer(cuisine).data["image"])
+
+        cuisine.name = "Korean BBQ"
+        cuisine.save()
+        for callback in callbacks:
+            callback()
+
+        cuisine.refresh_from_db()
+        self.assertTrue(cuisine.image.startswith("https://res.cloudinary.com/fake/"))
+
+
+class ImageUrlCacheTest(TestCase):
+    """Test that image URL building is memoized"""
+
+    def setUp(self):
+        from utils.cloudinary_utils import clear_image_url_cache
+
+        clear_image_url_cache()
+        self.addCleanup(clear_image_url_cache)
+
+    def test_repeat_urls_skip_cloudinary_sdk(self):
+        """Test that only the first build of a (url, size) calls the SDK"""
+        from utils.cloudinary_utils import get_reliable_image_url
+
+        url = "https://res.cloudinary.com/demo/image/upload/foods/food/dal.jpg"
+        build_url = cloudinary.CloudinaryImage.build_url
+        with mock.patch.object(
+            cloudinary.CloudinaryImage, "build_url", autospec=True, side_effect=build_url
+        ) as sdk:
+            first = get_reliable_image_url(url, width=400, height=300)
+            second = get_reliable_image_url(url, width=400, height=300)
+            get_reliable_image_url(url, width=200, height=200)
+
+        self.assertEqual(first, second)
+        self.assertIn("w_400", first)
+        self.assertEqual(sdk.call_count, 2)
+
+    def test_blobs_are_not_memoized(self):
+        """Test that base64 image data never ends up in the URL cache"""
+        from utils.cloudinary_utils import _build_reliable_image_url, get_reliable_image_url
+
+        get_reliable_image_url("data:image/png;base64," + "A" * 100)
+        get_reliable_image_url("A" * 10000)
+        self.assertEqual(_build_reliable_image_url.cache_info().currsize, 0)
+
+        get_reliable_image_url("https://example.com/dal.jpg")
+        self.assertEqual(_build_reliable_image_url.cache_info().currsize, 1)
+
+
+class ImageMigrationCommandTest(TestCase):
+    """Test the parallel, checkpointed blob migration"""
+
+    def setUp(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, ignore_errors=True)
+        self.checkpoint = f"{work_dir}/checkpoint.json"
+
+        # Legacy rows: write the blobs directly, bypassing the upload queue
+        for i in range(5):
+            Cuisine.objects.create(name=f"Cuisine {i}")
+        Cuisine.objects.update(image="A" * 200)
+        Cuisine.objects.create(name="Hosted", image="https://example.com/hosted.jpg")
+
+    def migrate(self, side_effect):
+        from django.core.management import call_command
+
+        with mock.patch(
+            "apps.food.image_migration.migrate_blob_to_cloudinary", side_effect=side_effect
+        ) as upload:
+            call_command(
+                "migrate_images_to_cloudinary",
+                "--model=cuisine",
+                "--batch-size=2",
+                "--workers=3",
+                "--rate=0",
+                f"--checkpoint={self.checkpoint}",
+                stdout=io.StringIO(),
+            )
+        return upload
+
+    def test_blobs_are_replaced_with_urls(self):
+        """Test that every blob is uploaded once and written back"""
+        upload = self.migrate(lambda blob_data, **kwargs: "https://res.cloudinary.com/x.jpg")
+
+        self.assertEqual(upload.call_count, 5)
+        self.assertEqual(
+            Cuisine.objects.filter(image="https://res.cloudinary.com/x.jpg").count(), 5
+        )
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        """Test that a rerun skips batches finished before the interruption"""
+        calls = []
+
+        def flaky(blob_data, **kwargs):
+            calls.append(blob_data)
+            if len(calls) > 2:
+                raise KeyboardInterrupt
+            return "https://res.cloudinary.com/x.jpg"
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.migrate(flaky)
+        self.assertEqual(
+            Cuisine.objects.filter(image="https://res.cloudinary.com/x.jpg").count(), 2
+        )
+
+        # Reset one migrated row to a blob: it is behind the checkpoint and must be skipped
+        first = Cuisine.objects.order_by("pk").first()
+        Cuisine.objects.filter(pk=first.pk).update(image="B" * 200)
+
+        upload = self.migrate(lambda blob_data, **kwargs: "https://res.cloudinary.com/y.jpg")
+        self.assertEqual(upload.call_count, 3)
+        self.assertEqual(
+            Cuisine.objects.filter(image="https://res.cloudinary.com/y.jpg").count(), 3
+        )
+
+    def test_failed_upload_is_retried_on_the_next_run(self):
+        """Test that the checkpoint does not move past a row that failed"""
+        second = Cuisine.objects.order_by("pk")[1]
+        Cuisine.objects.filter(pk=second.pk).update(image="C" * 200)
+        self.migrate(
+            lambda blob_data, **kwargs: None if blob_data.startswith("C")
+            else "https://res.cloudinary.com/x.jpg"
+        )
+        self.assertEqual(
+            Cuisine.objects.filter(image="https://res.cloudinary.com/x.jpg").count(), 4
+        )
+
+        upload = self.migrate(lambda blob_data, **kwargs: "https://res.cloudinary.com/y.jpg")
+        self.assertEqual(upload.call_count, 1)
+        second.refresh_from_db()
+        self.assertEqual(second.image, "https://res.cloudinary.com/y.jpg")
+
+
+class FoodSearchIndexTest(TestCase):
+    """Test the ranked in-process food search"""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        from apps.authentication.models import User
+        from apps.food.models import Food
+        from apps.food.search_index import reset_index
+
+        cache.clear()
+        reset_index()
+        self.addCleanup(reset_index)
+        self.chef = User.objects.create_user(
+            email="chef@test.com", password="pass1234", name="Chef", role="cook"
+        )
+        self.foods = {
+            name: Food.objects.create(
+                name=name, description=description, status=status, chef=self.chef
+            )
+            for name, description, status in [
+                ("Chicken Biryani", "Basmati rice with chicken", "Approved"),
+                ("Chicken Kottu", "Chopped roti", "Approved"),
+                ("Fried Rice", "Egg and vegetables", "Approved"),
+                ("Chicken Curry", "Pending dish", "Pending"),
+            ]
+        }
+
+    def search(self, query):
+        response = self.client.get("/api/food/search/", {"q": query})
+        return [row["name"] for row in response.json()]
+
+    def test_results_are_ranked_and_tolerant(self):
+        """Test relevance order, prefixes and one-letter typos"""
+        self.assertEqual(self.search("chicken rice")[0], "Chicken Biryani")
+        self.assertEqual(self.search("chicken")[-1], "Chicken Kottu")
+        self.assertEqual(self.search("biry"), ["Chicken Biryani"])
+        self.assertEqual(self.search("kotu"), ["Chicken Kottu"])
+        self.assertNotIn("Chicken Curry", self.search("curry"))
+
+    def test_index_follows_food_changes(self):
+        """Test that saves and deletes update a built index"""
+        from apps.food.models import Food
+
+        self.search("rice")
+        with self.captureOnCommitCallbacks(execute=True):
+            Food.objects.create(name="Lamprais", status="Approved", chef=self.chef)
+        self.assertEqual(self.search("lamprais"), ["Lamprais"])
+
+        curry = self.foods["Chicken Curry"]
+        curry.status = "Approved"
+        with self.captureOnCommitCallbacks(execute=True):
+            curry.save()
+        self.assertEqual(self.search("curry"), ["Chicken Curry"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.foods["Fried Rice"].delete()
+        self.assertEqual(self.search("fried"), [])
+
+    def test_old_index_is_rebuilt(self):
+        """Test that an index past its max age picks up unsignalled changes"""
+        from apps.food.models import Food
+
+        self.search("rice")
+        Food.objects.filter(pk=self.foods["Chicken Curry"].pk).update(status="Approved")
+        self.assertEqual(self.search("curry"), [])
+        with override_settings(FOOD_SEARCH_INDEX_MAX_AGE_SECONDS=0):
+            self.assertEqual(self.search("curry"), ["Chicken Curry"])
+
+    def test_menu_search_defaults_to_relevance(self):
+        """Test that the menu endpoint orders searches by relevance"""
+        response = self.client.get("/api/food/menu/", {"search": "rice chicken"})
+        names = [row["name"] for row in response.json()["results"]]
+        self.assertEqual(names, ["Chicken Biryani", "Fried Rice", "Chicken Kottu"])
+
+        response = self.client.get("/api/food/menu/", {"search": "rice chicken", "sort_by": "name"})
+        names = [row["name"] for row in response.json()["results"]]
+        self.assertEqual(names, ["Chicken Biryani", "Chicken Kottu", "Fried Rice"])
+
+    def test_menu_search_keeps_only_the_best_matches(self):
+        """Test that broad searches are capped at FOOD_SEARCH_MAX_RESULTS"""
+        with override_settings(FOOD_SEARCH_MAX_RESULTS=2):
+            response = self.client.get("/api/food/menu/", {"search": "rice chicken"})
+        names = [row["name"] for row in response.json()["results"]]
+        self.assertEqual(names, ["Chicken Biryani", "Fried Rice"])
+
+
+class FoodPriceSummaryTest(TestCase):
+    """Test the stored price range and cook count of foods"""
+
+    def setUp(self):
+        from apps.authentication.models import User
+        from apps.food.models import Food, FoodPrice
+
+        self.cooks = [
+            User.objects.create_user(
+                email=f"cook{i}@test.com", password="pass1234", name=f"Cook {i}", role="cook"
+            )
+            for i in range(2)
+        ]
+        self.food = Food.objects.create(name="Kottu", status="Approved", chef=self.cooks[0])
+        self.small = FoodPrice.objects.create(
+            food=self.food, cook=self.cooks[0], size="Small", price="300.00"
+        )
+        self.large = FoodPrice.objects.create(
+            food=self.food, cook=self.cooks[1], size="Large", price="700.00"
+        )
+
+    def summary(self):
+        self.food.refresh_from_db()
+        return self.food.min_price, self.food.max_price, self.food.cook_count
+
+    def test_price_changes_update_the_food(self):
+        """Test that FoodPrice saves and deletes keep the summary current"""
+        from decimal import Decimal
+
+        self.assertEqual(self.summary(), (Decimal("300.00"), Decimal("700.00"), 2))
+
+        self.large.price = "650.00"
+        self.large.save()
+        self.assertEqual(self.summary()[1], Decimal("650.00"))
+
+        self.large.delete()
+        self.assertEqual(self.summary(), (Decimal("300.00"), Decimal("300.00"), 1))
+
+        self.small.delete()
+        self.assertEqual(self.summary(), (None, None, 0))
+
+    def test_rebuild_command(self):
+        """Test that the command repairs rows written without signals"""
+        from decimal import Decimal
+
+        from django.core.management import call_command
+
+        from apps.food.models import Food
+
+        Food.objects.filter(pk=self.food.pk).update(min_price=None, max_price=None, cook_count=0)
+        call_command("rebuild_food_price_summary", stdout=io.StringIO())
+        self.assertEqual(self.summary(), (Decimal("300.00"), Decimal("700.00"), 2))
+
+    def test_created_food_returns_its_summary(self):
+        """Test that a chef's new food carries the price its signal stored"""
+        from decimal import Decimal
+        from types import SimpleNamespace
+
+        from apps.food.serializers import ChefFoodCreateSerializer
+
+        serializer = ChefFoodCreateSerializer(
+            data={"name": "Hoppers", "category": "Main Course", "price": "250.00"},
+            context={"request": SimpleNamespace(user=self.cooks[0])},
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        food = serializer.save()
+        self.assertEqual(
+            (food.min_price, food.max_price, food.cook_count), (Decimal("250.00"), Decimal("250.00"), 1)
+        )
+
+    def test_price_window_needs_a_price_inside(self):
+        """Test the menu price filter against the stored range"""
+        response = self.client.get("/api/food/menu/", {"min_price": "400", "max_price": "600"})
+        self.assertEqual(response.json()["count"], 0)
+
+        response = self.client.get("/api/food/menu/", {"min_price": "650"})
+        rows = response.json()["results"]
+        self.assertEqual([row["name"] for row in rows], ["Kottu"])
+        self.assertEqual(
+            (rows[0]["min_price"], rows[0]["max_price"], rows[0]["available_cooks_count"]),
+            (300.0, 700.0, 2),
+        )
@@ -0,0 +1,153 @@
+"""
+Lexical search over small in-memory catalogues
+
+Documents are tokenized into an inverted index (term -> {document: term
+frequency}) and queries are scored with Okapi BM25, so only documents that
+share a term with the query are touched. Documents can be added, replaced
+and removed one at a time.
+
+Query terms also match indexed terms they are a prefix of (autocomplete)
+and terms one edit away (typos), found through a sorted vocabulary and a
+single-deletion map instead of a scan; those matches score a little lower
+than the exact term.
+"""
+
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, List, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Words too common in menu queries to say anything about a menu
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'at', 'be', 'for', 'from', 'i', 'in', 'is', 'it',
+    'me', 'my', 'of', 'on', 'or', 'our', 'some', 'the', 'to', 'we', 'with',
+    'want', 'need', 'looking', 'food', 'menu', 'menus',
+}
+
+# Shortest query term expanded to prefixes / to typo corrections
+MIN_PREFIX_LENGTH = 2
+MIN_TYPO_LENGTH = 4
+PREFIX_WEIGHT = 0.8
+TYPO_WEIGHT = 0.6
+# Most vocabulary terms a prefix expands to
+MAX_PREFIX_TERMS = 50
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens of ``text`` without stopwords"""
+    return [
+        token for token in TOKEN_RE.findall((text or '').lower())
+        if token not in STOPWORDS
+    ]
+
+
+def _deletions(term: str):
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+class BM25Index:
+    """Okapi BM25 ranking over {key: text} documents"""
+
+    def __init__(self, documents: Dict[Hashable, str] = None, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)
+        self.terms = {}
+        self.lengths = {}
+        self.total_length = 0
+        self.vocabulary = []
+        self.deletions = defaultdict(set)
+        for key, text in (documents or {}).items():
+            self.add(key, text)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __contains__(self, key):
+        return key in self.lengths
+
+    @property
+    def average_length(self):
+        return self.total_length / len(self.lengths) if self.lengths else 0
+
+    def add(self, key: Hashable, text: str):
+        """Index a document, replacing any previous text under ``key``"""
+        self.remove(key)
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+        self.terms[key] = counts
+        self.lengths[key] = len(tokens)
+        self.total_length += len(tokens)
+        for term, count in counts.items():
+            if term not in self.postings:
+                insort(self.vocabulary, term)
+                for deleted in _deletions(term):
+                    self.deletions[deleted].add(term)
+            self.postings[term][key] = count
+
+    def remove(self, key: Hashable):
+        """Drop a document; unknown keys are ignored"""
+        counts = self.terms.pop(key, None)
+        if counts is None:
+            return
+        self.total_length -= self.lengths.pop(key)
+        for term in counts:
+            postings = self.postings[term]
+            del postings[key]
+            if not postings:
+                del self.postings[term]
+                del self.vocabulary[bisect_left(self.vocabulary, term)]
+                for deleted in _deletions(term):
+                    self.deletions[deleted].discard(term)
+                    if not self.deletions[deleted]:
+                        del self.deletions[deleted]
+
+    def idf(self, term: str) -> float:
+        matches = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.lengths) - matches + 0.5) / (matches + 0.5))
+
+    def expand(self, term: str) -> Dict[str, float]:
+        """Indexed terms a query term matches, with their weight"""
+        matches = {}
+        if len(term) >= MIN_TYPO_LENGTH:
+            # Same single deletion: one substitution, insertion or deletion apart
+            candidates = set(self.deletions.get(term, ()))
+            for deleted in _deletions(term):
+                if deleted in self.postings:
+                    candidates.add(deleted)
+                candidates |= self.deletions.get(deleted, set())
+            matches.update(dict.fromkeys(candidates, TYPO_WEIGHT))
+        if len(term) >= MIN_PREFIX_LENGTH:
+            start = bisect_left(self.vocabulary, term)
+            for candidate in self.vocabulary[start:start + MAX_PREFIX_TERMS]:
+                if not candidate.startswith(term):
+                    break
+                matches[candidate] = PREFIX_WEIGHT
+        if term in self.postings:
+            matches[term] = 1.0
+        return matches
+
+    def search(self, query: str, limit: int = None) -> List[Tuple[Hashable, float]]:
+        """(key, score) of documents matching any query term, best first"""
+        scores = defaultdict(float)
+        average_length = self.average_length or 1
+        for query_term in dict.fromkeys(tokenize(query)):
+            # Each query term counts once per document, through its best match
+            best = {}
+            for term, weight in self.expand(query_term).items():
+                boost = weight * self.idf(term) * (self.k1 + 1)
+                for key, frequency in self.postings[term].items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[key] / average_length)
+                    score = boost * frequency / (frequency + norm)
+                    if score > best.get(key, 0):
+                        best[key] = score
+            for key, score in best.items():
+                scores[key] += score
+
+        if limit:
+            return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return sorted(scores.items(), key=lambda item: -item[1])
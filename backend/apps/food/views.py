@@ -36,6 +36,8 @@ from .serializers import (
     FoodSerializer,
     OfferSerializer,
 )
+from .price_summary import filter_by_price
+from .search_index import max_search_results, rank_queryset, search_food_ids
 from .utils import calculate_delivery_fee, validate_delivery_radius
 
 
@@ -54,10 +56,10 @@ def food_search(request):
     if not query or len(query) < 2:
         return Response([])
 
-    # Search approved foods only for general search
-    foods = Food.objects.filter(
-        Q(name__icontains=query) | Q(description__icontains=query), status="Approved"
-    ).distinct()[:10]
+    # Search approved foods only for general search, best matches first
+    foods = rank_queryset(
+        Food.objects.filter(status="Approved"), search_food_ids(query, limit=10)
+    )
 
     results = []
     for food in foods:
@@ -193,10 +195,9 @@ class ChefFoodViewSet(viewsets.ModelViewSet):
             return Response([])
 
         # Search all foods for autocomplete (approved ones)
-        foods = Food.objects.filter(
-            Q(name__icontains=query) | Q(description__icontains=query),
-            status="Approved",
-        ).distinct()[:10]
+        foods = rank_queryset(
+            Food.objects.filter(status="Approved"), search_food_ids(query, limit=10)
+        )
 
         results = []
         for food in foods:
@@ -255,15 +256,11 @@ class CustomerFoodViewSet(viewsets.ReadOnlyModelViewSet):
             .select_related("chef", "food_category")
         )
 
-        # Search functionality
+        # Search functionality (ranked by relevance)
         search = self.request.query_params.get("search", None)
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search)
-                | Q(description__icontains=search)
-                | Q(food_category__name__icontains=search)
-                | Q(chef__first_name__icontains=search)
-                | Q(chef__last_name__icontains=search)
+            queryset = rank_queryset(
+                queryset, search_food_ids(search, limit=max_search_results())
             )
 
         # Filter by category
@@ -284,14 +281,10 @@ class CustomerFoodViewSet(viewsets.ReadOnlyModelViewSet):
         # Price range filtering
         min_price = self.request.query_params.get("min_price", None)
         max_price = self.request.query_params.get("max_price", None)
-        if min_price or max_price:
-            price_filter = Q()
-            if min_price:
-                price_filter &= Q(prices__price__gte=min_price)
-            if max_price:
-                price_filter &= Q(prices__price__lte=max_price)
-            queryset = queryset.filter(price_filter).distinct()
+        queryset = filter_by_price(queryset, min_price, max_price)
 
+        if search:
+            return queryset
         return queryset.order_by("-created_at")
 
     @action(detail=True, methods=["get"], url_path="prices")
@@ -699,7 +692,8 @@ def menu_with_filters(request):
     chef_ids = request.GET.getlist("chef_ids")
     user_lat = request.GET.get("user_lat")
     user_lng = request.GET.get("user_lng")
-    sort_by = request.GET.get("sort_by", "name")  # name, price, rating, distance
+    # name, price, rating, distance; searches default to relevance
+    sort_by = request.GET.get("sort_by") or ("relevance" if search else "name")
     page = int(request.GET.get("page", 1))
     page_size = int(request.GET.get("page_size", 20))
 
@@ -710,23 +704,18 @@ def menu_with_filters(request):
         .prefetch_related("prices")
     )
 
-    # Apply search filter
+    # Apply search filter (ordered by relevance)
     if search:
-        foods = foods.filter(
-            Q(name__icontains=search)
-            | Q(description__icontains=search)
-            | Q(chef__username__icontains=search)
-            | Q(food_category__name__icontains=search)
+        foods = rank_queryset(
+            foods, search_food_ids(search, limit=max_search_results())
         )
 
-    # Apply price filter (look at food prices)
-    if min_price or max_price:
-        price_filter = Q()
-        if min_price:
-            price_filter &= Q(prices__price__gte=Decimal(min_price))
-        if max_price:
-            price_filter &= Q(prices__price__lte=Decimal(max_price))
-        foods = foods.filter(price_filter).distinct()
+    # Apply price filter (stored price range of each food)
+    foods = filter_by_price(
+        foods,
+        Decimal(min_price) if min_price else None,
+        Decimal(max_price) if max_price else None,
+    )
 
     # Apply category filter
     if categories:
@@ -754,12 +743,14 @@ def menu_with_filters(request):
 
     # Sorting
     if sort_by == "price":
-        foods = foods.annotate(min_price=Min("prices__price")).order_by("min_price")
+        foods = foods.order_by("min_price")
     elif sort_by == "rating":
         foods = foods.order_by("-rating_average")
     elif sort_by == "distance" and user_lat and user_lng:
         # For distance sorting, we'll handle this in serializer
         pass
+    elif sort_by == "relevance" and search:
+        pass
     else:
         foods = foods.order_by("name")
 
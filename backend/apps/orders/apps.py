@@ -19,8 +19,9 @@ class OrdersConfig(AppConfig):
         # Start background scheduler
         import sys
         
-        # Don't start scheduler during migrations or collectstatic
-        if 'makemigrations' in sys.argv or 'migrate' in sys.argv or 'collectstatic' in sys.argv:
+        # Don't start scheduler during migrations, collectstatic or tests
+        # (its jobs would write to the test database from another thread)
+        if any(command in sys.argv for command in ('makemigrations', 'migrate', 'collectstatic', 'test')):
             return
         
         # Don't start multiple instances in auto-reload scenarios (runserver)
@@ -257,42 +257,50 @@ class BulkOrderManagementViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def available_chefs(self, request):
-        """Get list of active chefs available for collaboration"""
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        # Get active chefs (excluding the requesting user)
-        active_chefs = User.objects.filter(
-            is_active=True,
-            role__in=['cook', 'Cook']
-        ).exclude(
-            user_id=request.user.user_id
-        ).values(
-            'user_id', 'name', 'username', 'email'
+        """
+        Get active chefs available for collaboration, ranked by workload
+
+        Query params:
+            bulk_order_id: Rank against this bulk order's event location and time
+            latitude, longitude: Event location (overrides the bulk order's)
+            limit, offset: Page of the ranking (total in X-Total-Count)
+        """
+        from .services.chef_workload import DEFAULT_LIMIT, event_context, ranked_chefs
+
+        lat = lng = event_at = None
+        bulk_order_id = request.query_params.get('bulk_order_id')
+        if bulk_order_id:
+            bulk_order = self.get_queryset().filter(pk=bulk_order_id).first()
+            if bulk_order is None:
+                return Response(
+                    {'error': 'Bulk order not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            lat, lng, event_at = event_context(bulk_order)
+
+        try:
+            if request.query_params.get('latitude') and request.query_params.get('longitude'):
+                lat = float(request.query_params['latitude'])
+                lng = float(request.query_params['longitude'])
+            limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            return Response(
+                {'error': 'latitude, longitude, limit and offset must be numbers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        chef_list, total = ranked_chefs(
+            exclude_user=request.user,
+            lat=lat,
+            lng=lng,
+            event_at=event_at,
+            limit=limit,
+            offset=offset,
         )
-        
-        # Format chef data
-        chef_list = []
-        for chef in active_chefs:
-            # Get current workload (number of active bulk orders)
-            active_assignments = BulkOrderAssignment.objects.filter(
-                chef_id=chef['user_id'],
-                bulk_order__status__in=['pending', 'confirmed', 'collaborating', 'preparing']
-            ).count()
-            
-            chef_list.append({
-                'id': chef['user_id'],
-                'name': chef['name'] or chef['username'],
-                'username': chef['username'],
-                'email': chef['email'],
-                'active_assignments': active_assignments,
-                'availability_status': 'available' if active_assignments < 3 else 'busy'
-            })
-        
-        # Sort by availability and workload
-        chef_list.sort(key=lambda x: (x['availability_status'] == 'busy', x['active_assignments']))
-        
-        return Response(chef_list)
+        response = Response(chef_list)
+        response['X-Total-Count'] = total
+        return response
     
     @action(detail=True, methods=['post'], url_path='assign_delivery')
     def assign_delivery(self, request, pk=None):
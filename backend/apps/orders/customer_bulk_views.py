@@ -15,6 +15,7 @@ from .models import Order, OrderItem, BulkOrder
 from .serializers import CustomerBulkOrderSerializer, BulkOrderDetailSerializer
 from apps.food.models import BulkMenu, BulkMenuItem
 from apps.food.ai_service import ai_service
+from apps.food.bulk_menu_catalogue import search_menus
 
 logger = logging.getLogger(__name__)
 
@@ -245,42 +246,15 @@ class CustomerBulkOrderViewSet(viewsets.ViewSet):
         logger.info(f"🔍 AI Search query: '{query}' from user: {request.user.email}")
         
         try:
-            # Get available bulk menus
-            menus_queryset = BulkMenu.objects.filter(
-                availability_status=True,
-                approval_status='approved'
-            ).select_related('chef')
-            
-            if meal_type_filter:
-                menus_queryset = menus_queryset.filter(meal_type=meal_type_filter)
-            
-            # Convert to list of dicts for AI processing
-            menus_data = []
-            for menu in menus_queryset:
-                menu_items = BulkMenuItem.objects.filter(bulk_menu=menu)
-                mandatory_items = [item.item_name for item in menu_items if not item.is_optional]
-                optional_items = [item.item_name for item in menu_items if item.is_optional]
-                
-                menus_data.append({
-                    'id': menu.id,
-                    'menu_name': menu.menu_name,
-                    'description': menu.description or '',
-                    'meal_type': menu.meal_type,
-                    'meal_type_display': menu.get_meal_type_display(),
-                    'chef_name': menu.chef.name if hasattr(menu.chef, 'name') else menu.chef.username,
-                    'base_price_per_person': float(menu.base_price_per_person),
-                    'min_persons': menu.min_persons,
-                    'max_persons': menu.max_persons,
-                    'image_url': str(menu.image) if menu.image else None,
-                    'menu_items_summary': {
-                        'mandatory_items': mandatory_items,
-                        'optional_items': optional_items,
-                        'total_items': len(mandatory_items) + len(optional_items)
-                    }
-                })
+            # Narrow the cached catalogue to its best lexical matches so
+            # only those are sent to the model
+            matches = search_menus(query, meal_type=meal_type_filter)
             
             # Use AI to filter and rank menus
-            filtered_menus = ai_service.filter_menus_by_query(query, menus_data)
+            filtered_menus = (
+                ai_service.filter_menus_by_query(query, matches['candidates'])
+                + matches['others']
+            )
             
             return Response({
                 'query': query,
@@ -364,26 +338,21 @@ class CustomerBulkOrderViewSet(viewsets.ViewSet):
             # Remove None values
             user_preferences = {k: v for k, v in user_preferences.items() if v is not None}
             
-            # Get available menus
-            menus_queryset = BulkMenu.objects.filter(
-                availability_status=True,
-                approval_status='approved'
-            ).select_related('chef')
-            
-            # Convert to list of dicts
+            # Shortlist menus matching the preferences from the cached catalogue
+            preference_text = ' '.join(
+                str(user_preferences.get(key, '')).replace('_', ' ')
+                for key in ('dietary_preference', 'occasion', 'meal_type')
+            )
             menus_data = []
-            for menu in menus_queryset:
-                menu_items = BulkMenuItem.objects.filter(bulk_menu=menu)
-                mandatory_items = [item.item_name for item in menu_items if not item.is_optional]
-                
+            for menu in search_menus(preference_text)['candidates']:
                 menus_data.append({
-                    'id': menu.id,
-                    'menu_name': menu.menu_name,
-                    'description': menu.description or '',
-                    'meal_type': menu.meal_type,
-                    'chef_name': menu.chef.name if hasattr(menu.chef, 'name') else menu.chef.username,
-                    'base_price_per_person': float(menu.base_price_per_person),
-                    'items': mandatory_items[:10]  # First 10 items
+                    'id': menu['id'],
+                    'menu_name': menu['menu_name'],
+                    'description': menu['description'],
+                    'meal_type': menu['meal_type'],
+                    'chef_name': menu['chef_name'],
+                    'base_price_per_person': menu['base_price_per_person'],
+                    'items': menu['menu_items_summary']['mandatory_items'][:10]  # First 10 items
                 })
             
             # Get AI recommendations
@@ -0,0 +1,103 @@
+"""
+Management command measuring place_order: queries and time per checkout
+for a cart of --items items.
+
+Runs in autocommit (like a real request, so on_commit notifications are
+included in the numbers) and deletes the benchmark users, which cascades
+to everything it created.
+"""
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.food.models import Food, FoodPrice
+from apps.orders.models import CartItem
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark order placement for a cart of N items'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--items',
+            type=int,
+            default=20,
+            help='Cart items per checkout (default: 20)',
+        )
+        parser.add_argument(
+            '--orders',
+            type=int,
+            default=20,
+            help='Checkouts to time (default: 20)',
+        )
+
+    def handle(self, *args, **options):
+        item_count = max(options['items'], 1)
+        iterations = max(options['orders'], 1)
+        users = []
+        try:
+            self._run(users, item_count, iterations)
+        finally:
+            for user in users:
+                user.delete()
+
+    def _run(self, users, item_count, iterations):
+        customer = User.objects.create_user(
+            email='benchmark_order_customer@chefsync.local',
+            password='benchmark-pass-123',
+            name='Order Benchmark Customer',
+            role='customer',
+        )
+        users.append(customer)
+        chef = User.objects.create_user(
+            email='benchmark_order_chef@chefsync.local',
+            password='benchmark-pass-123',
+            name='Order Benchmark Chef',
+            role='cook',
+        )
+        users.append(chef)
+        prices = []
+        for i in range(item_count):
+            food = Food.objects.create(
+                name=f'Benchmark Dish {i}',
+                description='Benchmark dish',
+                category='Mains',
+                status='Approved',
+                chef=chef,
+                preparation_time=20,
+            )
+            prices.append(
+                FoodPrice.objects.create(food=food, cook=chef, size='Medium', price=Decimal('500.00'))
+            )
+
+        client = APIClient()
+        client.force_authenticate(customer)
+        payload = {'order_type': 'pickup', 'payment_method': 'cash', 'total_amount': 1000}
+
+        queries = 0
+        elapsed = 0.0
+        for _ in range(iterations):
+            CartItem.objects.bulk_create(
+                [CartItem(customer=customer, price=price, quantity=1) for price in prices]
+            )
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.post('/api/orders/place/', payload, format='json')
+                elapsed += time.perf_counter() - started
+            if response.status_code != 200:
+                self.stderr.write(f'place_order failed with {response.status_code}: {response.data}')
+                return
+            queries += len(captured)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'place_order, {item_count} items')
+            + f': {queries / iterations:.1f} queries/order, '
+            f'{elapsed / iterations * 1000:.2f} ms/order'
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0020_merge_20251025_1420'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deliveryissue',
+            index=models.Index(fields=['order', 'status'], name='delivery_is_order_i_e38716_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='locationupdate',
+            index=models.Index(fields=['order', '-timestamp'], name='location_up_order_i_7d08a8_idx'),
+        ),
+    ]
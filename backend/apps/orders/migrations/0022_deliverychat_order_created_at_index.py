@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0021_delivery_tracking_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deliverychat',
+            index=models.Index(fields=['order', 'created_at'], name='delivery_ch_order_i_65d238_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0023_deliveryoffer'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='locationupdate',
+            index=models.Index(fields=['delivery_agent', '-timestamp'], name='location_up_deliver_2b6a9a_idx'),
+        ),
+    ]
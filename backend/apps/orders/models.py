@@ -205,6 +205,7 @@ class Order(models.Model):
             self.order_number = self.generate_order_number()
 
         # Track status changes with timestamps
+        self._status_changed = False
         if self.pk:  # Only for existing orders
             old_order = Order.objects.filter(pk=self.pk).first()
             if old_order and old_order.status != self.status:
@@ -212,11 +213,13 @@ class Order(models.Model):
                 if not self.status_timestamps:
                     self.status_timestamps = {}
                 self.status_timestamps[self.status] = timezone.now().isoformat()
+                self._status_changed = True
         else:
             # New order, initialize with current status
             if not self.status_timestamps:
                 self.status_timestamps = {}
             self.status_timestamps[self.status] = timezone.now().isoformat()
+            self._status_changed = True
 
         super().save(*args, **kwargs)
 
@@ -710,6 +713,10 @@ class LocationUpdate(models.Model):
     class Meta:
         db_table = "location_updates"
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["order", "-timestamp"]),
+            models.Index(fields=["delivery_agent", "-timestamp"]),
+        ]
 
 
 class DeliveryIssue(models.Model):
@@ -755,6 +762,9 @@ class DeliveryIssue(models.Model):
     class Meta:
         db_table = "delivery_issues"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["order", "status"]),
+        ]
 
 
 class DeliveryChat(models.Model):
@@ -793,6 +803,9 @@ class DeliveryChat(models.Model):
     class Meta:
         db_table = "delivery_chats"
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["order", "created_at"]),
+        ]
 
 
 class DeliveryLog(models.Model):
@@ -841,3 +854,45 @@ class DeliveryLog(models.Model):
         ordering = ["-start_time"]
         db_table = "delivery_logs"
         ordering = ["-start_time"]
+
+
+class DeliveryOffer(models.Model):
+    """
+    Time-limited offer of an unassigned order to one delivery agent.
+
+    Orders are offered to a few agents at a time (see services/dispatch.py);
+    the first to accept wins the conditional claim on the order and the
+    remaining offers are withdrawn.
+    """
+
+    STATUS_CHOICES = [
+        ("offered", "Offered"),
+        ("accepted", "Accepted"),
+        ("declined", "Declined"),
+        ("expired", "Expired"),
+        ("withdrawn", "Withdrawn"),
+    ]
+
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="delivery_offers"
+    )
+    agent = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="delivery_offers",
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="offered")
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    responded_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Offer {self.pk} - Order {self.order_id} to {self.agent_id} ({self.status})"
+
+    class Meta:
+        db_table = "delivery_offers"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["agent", "status", "expires_at"]),
+            models.Index(fields=["order", "status"]),
+        ]
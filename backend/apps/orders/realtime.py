@@ -0,0 +1,290 @@
+"""
+In-process pub/sub for order tracking, delivery chat and notifications.
+
+Order status changes, ``LocationUpdate`` inserts, ``DeliveryChat`` creates and
+new notifications publish small delta events (see ``signals.py``). Clients read
+them with a cursor through the long-poll action (``OrderViewSet.events``) or the
+Server-Sent Events streams in ``stream_views.py`` instead of re-fetching the
+whole tracking document and chat history on every poll.
+
+The broker lives in the worker process: with several workers a client only
+receives events published by the process it is connected to. A cursor issued
+by another process (or one whose events were already evicted from the ring
+buffer) is answered with ``reset=True`` so the client refetches the full
+document once and continues from the returned cursor. Topics that see no
+events for ``TOPIC_IDLE_SECONDS`` (delivered orders, logged out users) are
+dropped so the broker does not grow with every order ever tracked.
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+from django.db import transaction
+
+from .models import Order
+
+# Events kept per topic; older ones are evicted and trigger a client reset
+TOPIC_BUFFER_SIZE = 200
+# Topics without a new event for this long are dropped with their buffer
+TOPIC_IDLE_SECONDS = 60 * 60
+
+
+def order_topic(order_id):
+    return f"order:{order_id}"
+
+
+def user_topic(user_id):
+    return f"user:{user_id}"
+
+
+class OrderEventBroker:
+    """Thread-safe ring buffers of events per topic with sync and async waiters"""
+
+    def __init__(self, buffer_size=TOPIC_BUFFER_SIZE, idle_seconds=TOPIC_IDLE_SECONDS):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.buffer_size = buffer_size
+        self.idle_seconds = idle_seconds
+        self._seq = 0
+        self._topics = {}
+        self._evicted_seq = {}
+        # topic -> time of its last event, least recently published first
+        self._last_published = OrderedDict()
+        # Highest seq of any dropped topic: older cursors on unknown topics reset
+        self._expired_seq = 0
+        self._condition = threading.Condition()
+        # topic -> {(loop, asyncio.Event)} of coroutines waiting on it
+        self._async_waiters = {}
+
+    # ------------------------------------------------------------------
+    # Cursors
+    # ------------------------------------------------------------------
+
+    def cursor(self, seq=None):
+        """Return an opaque cursor for ``seq`` (defaults to the latest event)"""
+        if seq is None:
+            with self._condition:
+                seq = self._seq
+        return f"{self.epoch}-{seq}"
+
+    def parse_cursor(self, cursor):
+        """
+        Return ``(seq, reset)`` for a client supplied cursor.
+
+        An empty cursor means "from now". A cursor from another process or a
+        previous run of this one cannot be resumed and asks for a reset.
+        """
+        with self._condition:
+            current = self._seq
+        if not cursor:
+            return current, False
+        epoch, _, raw_seq = str(cursor).rpartition("-")
+        try:
+            seq = int(raw_seq)
+        except ValueError:
+            return current, True
+        if epoch != self.epoch or seq < 0 or seq > current:
+            return current, True
+        return seq, False
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def publish(self, topic, event_type, data):
+        with self._condition:
+            self._seq += 1
+            event = {
+                "id": f"{self.epoch}-{self._seq}",
+                "seq": self._seq,
+                "topic": topic,
+                "type": event_type,
+                "data": data,
+            }
+            buffer = self._topics.get(topic)
+            if buffer is None:
+                buffer = self._topics[topic] = deque(maxlen=self.buffer_size)
+            elif len(buffer) == buffer.maxlen:
+                self._evicted_seq[topic] = buffer[0]["seq"]
+            buffer.append(event)
+            now = time.monotonic()
+            self._last_published[topic] = now
+            self._last_published.move_to_end(topic)
+            self._expire_idle_topics(now)
+            self._condition.notify_all()
+            waiters = list(self._async_waiters.get(topic, ()))
+
+        for loop, wakeup in waiters:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # The waiter's event loop is already closed
+                pass
+        return event
+
+    def _expire_idle_topics(self, now):
+        """Drop topics idle for ``idle_seconds`` (caller holds the lock)"""
+        while self._last_published:
+            topic, published = next(iter(self._last_published.items()))
+            if now - published < self.idle_seconds:
+                break
+            del self._last_published[topic]
+            buffer = self._topics.pop(topic)
+            self._evicted_seq.pop(topic, None)
+            self._expired_seq = max(self._expired_seq, buffer[-1]["seq"])
+
+    def publish_on_commit(self, topic, event_type, data):
+        """Publish once the surrounding transaction commits (immediately in autocommit)"""
+        transaction.on_commit(lambda: self.publish(topic, event_type, data))
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def events_since(self, topics, seq):
+        """Return ``(events, reset)`` for events on ``topics`` newer than ``seq``"""
+        events = []
+        reset = False
+        with self._condition:
+            for topic in topics:
+                buffer = self._topics.get(topic)
+                if buffer is None:
+                    # Possibly dropped as idle after events the cursor missed
+                    if self._expired_seq > seq:
+                        reset = True
+                    continue
+                if self._evicted_seq.get(topic, 0) > seq:
+                    reset = True
+                events.extend(event for event in buffer if event["seq"] > seq)
+        events.sort(key=lambda event: event["seq"])
+        return events, reset
+
+    def wait(self, topics, seq, timeout):
+        """Block the calling thread until events newer than ``seq`` arrive"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                events, reset = self.events_since(topics, seq)
+                remaining = deadline - time.monotonic()
+                if events or reset or remaining <= 0:
+                    return events, reset
+                self._condition.wait(remaining)
+
+    async def wait_async(self, topics, seq, timeout):
+        """Await events newer than ``seq`` without holding a thread"""
+        wakeup = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), wakeup)
+        with self._condition:
+            for topic in topics:
+                self._async_waiters.setdefault(topic, set()).add(waiter)
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                wakeup.clear()
+                events, reset = self.events_since(topics, seq)
+                remaining = deadline - time.monotonic()
+                if events or reset or remaining <= 0:
+                    return events, reset
+                try:
+                    await asyncio.wait_for(wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._condition:
+                for topic in topics:
+                    waiters = self._async_waiters.get(topic)
+                    if waiters is not None:
+                        waiters.discard(waiter)
+                        if not waiters:
+                            del self._async_waiters[topic]
+
+
+broker = OrderEventBroker()
+
+
+# ----------------------------------------------------------------------
+# Event payloads - deltas only, never whole documents
+# ----------------------------------------------------------------------
+
+
+def order_status_payload(order):
+    timestamps = order.status_timestamps or {}
+    return {
+        "order_id": order.pk,
+        "order_number": order.order_number,
+        "status": order.status,
+        "status_display": order.get_status_display(),
+        "timestamp": timestamps.get(order.status),
+        "delivery_partner_id": order.delivery_partner_id,
+    }
+
+
+def location_payload(location):
+    return {
+        "order_id": location.order_id,
+        "latitude": float(location.latitude),
+        "longitude": float(location.longitude),
+        "address": location.address,
+        "timestamp": location.timestamp.isoformat(),
+    }
+
+
+def chat_payload(message):
+    return {
+        "id": message.pk,
+        "message_id": str(message.message_id),
+        "order_id": message.order_id,
+        "sender_id": message.sender_id,
+        "receiver_id": message.receiver_id,
+        "message": message.message,
+        "message_type": message.message_type,
+        "created_at": message.created_at.isoformat(),
+    }
+
+
+def notification_payload(notification):
+    return {
+        "notification_id": notification.notification_id,
+        "subject": notification.subject,
+        "message": notification.message,
+        "status": notification.status,
+        "time": notification.time.isoformat(),
+    }
+
+
+def visible_events(events, user):
+    """Drop chat events the user is not a party to (staff see everything)"""
+    if user.is_staff:
+        return events
+    return [
+        event
+        for event in events
+        if event["type"] != "chat.message"
+        or user.pk in (event["data"]["sender_id"], event["data"]["receiver_id"])
+    ]
+
+
+def can_follow_order(order, user):
+    """
+    ``order`` is a dict with customer_id/chef_id/delivery_partner_id, so the
+    access check can run on a ``.values()`` row instead of a full instance.
+    """
+    return user.is_staff or user.pk in (
+        order["customer_id"],
+        order["chef_id"],
+        order["delivery_partner_id"],
+    )
+
+
+def get_followable_order(pk, user):
+    """Return the order's participant ids, or None if missing or not visible"""
+    order = (
+        Order.objects.filter(pk=pk)
+        .values("pk", "customer_id", "chef_id", "delivery_partner_id")
+        .first()
+    )
+    if order is None or not can_follow_order(order, user):
+        return None
+    return order
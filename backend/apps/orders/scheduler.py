@@ -82,6 +82,34 @@ def auto_cancel_unconfirmed_orders():
         return 0
 
 
+def dispatch_delivery_offers():
+    """
+    Expire stale delivery offers and offer unassigned orders to the next
+    agents (see apps.orders.services.dispatch). Runs every 15 seconds.
+    """
+    from apps.orders.services.dispatch import dispatch_pending_orders
+
+    try:
+        return dispatch_pending_orders()
+    except Exception as e:
+        logger.error(f'❌ Error dispatching delivery offers: {str(e)}')
+        return 0
+
+
+def purge_delivery_offers():
+    """
+    Delete closed delivery offers that dispatch no longer needs
+    (see apps.orders.services.dispatch). Runs once a day.
+    """
+    from apps.orders.services.dispatch import purge_closed_offers
+
+    try:
+        return purge_closed_offers()
+    except Exception as e:
+        logger.error(f'❌ Error purging delivery offers: {str(e)}')
+        return 0
+
+
 def delete_old_job_executions(max_age=604_800):
     """
     Delete APScheduler job execution entries older than `max_age` from the database.
@@ -123,6 +151,26 @@ def start_scheduler():
             max_instances=1,  # Only one instance should run at a time
         )
         
+        # Register the delivery dispatch job - offers unassigned orders to agents
+        scheduler.add_job(
+            dispatch_delivery_offers,
+            trigger=IntervalTrigger(seconds=15),
+            id='dispatch_delivery_offers',
+            name='Dispatch delivery offers',
+            replace_existing=True,
+            max_instances=1,
+        )
+        
+        # Register the delivery offer cleanup job - runs once a day
+        scheduler.add_job(
+            purge_delivery_offers,
+            trigger=IntervalTrigger(days=1),
+            id='purge_delivery_offers',
+            name='Purge closed delivery offers',
+            replace_existing=True,
+            max_instances=1,
+        )
+        
         # Register cleanup job - runs once a week
         scheduler.add_job(
             delete_old_job_executions,
@@ -529,59 +529,26 @@ class CartItemSerializer(serializers.ModelSerializer):
 
     def get_kitchen_location(self, obj):
         """Get chef's kitchen location coordinates"""
-        try:
-            from apps.users.models import Address
-
-            # Try to get kitchen from price.cook first
-            cook = obj.price.cook
-            if not cook:
-                return None
-
-            # Get kitchen address from Address model (users app)
-            kitchen_address = Address.objects.filter(
-                user=cook, address_type="kitchen", is_default=True, is_active=True
-            ).first()
-
-            # If no default kitchen, get any active kitchen address
-            if not kitchen_address:
-                kitchen_address = Address.objects.filter(
-                    user=cook, address_type="kitchen", is_active=True
-                ).first()
-
-            # If still no kitchen address, get default address
-            if not kitchen_address:
-                kitchen_address = Address.objects.filter(
-                    user=cook, is_default=True, is_active=True
-                ).first()
+        from apps.users.kitchen_location_utils import context_chef_location
 
-            # If cook doesn't have kitchen location, fall back to food's chef
-            if not kitchen_address or not kitchen_address.latitude or not kitchen_address.longitude:
-                food_chef = obj.price.food.chef if obj.price and obj.price.food else None
-                if food_chef and food_chef != cook:
-                    # Try to get kitchen address from food's chef
-                    kitchen_address = Address.objects.filter(
-                        user=food_chef, address_type="kitchen", is_active=True
-                    ).first()
+        price = obj.price
+        if not price or not price.cook_id:
+            return None
 
-            if (
-                kitchen_address
-                and kitchen_address.latitude
-                and kitchen_address.longitude
-            ):
-                return {
-                    "lat": float(kitchen_address.latitude),
-                    "lng": float(kitchen_address.longitude),
-                }
+        # Fetch every cook in the cart at once
+        listed = []
+        if isinstance(self.parent, serializers.ListSerializer) and self.parent.instance is not None:
+            listed = [item.price.cook_id for item in self.parent.instance]
 
-            return None
-        except Exception as e:
-            import logging
+        location = context_chef_location(self.context, price.cook_id, listed)
+        # If cook doesn't have kitchen location, fall back to food's chef
+        if location.latitude is None and price.food.chef_id not in (None, price.cook_id):
+            location = context_chef_location(self.context, price.food.chef_id)
 
-            logger = logging.getLogger(__name__)
-            logger.error(
-                f"Error getting kitchen location for cart item {obj.id}: {str(e)}"
-            )
+        lat, lng = location.coordinates
+        if lat is None:
             return None
+        return {"lat": lat, "lng": lng}
 
     def get_total_price(self, obj):
         """Calculate total price for this cart item"""
@@ -0,0 +1,172 @@
+"""
+Cart pricing and checkout quotes
+
+``calculate_checkout`` used to load every cart line's FoodPrice with its own
+query and load the first one again to find the chef. Prices are now read
+as snapshots (price, cook, food, size) from the cache with one bulk query
+for the misses; FoodPrice saves and deletes drop their snapshot, and the
+short TTL bounds how stale a missed invalidation can get.
+
+Each checkout result is stored as a quote for the customer. ``place_order``
+accepts its ``quote_id`` and takes the amounts from it as long as the cart,
+prices and delivery address still match, instead of pricing the cart a
+second time; without a usable quote it keeps using the amounts the client
+sends.
+"""
+
+import logging
+import uuid
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.food.models import FoodPrice
+
+logger = logging.getLogger(__name__)
+
+TAX_RATE = Decimal("0.10")
+
+PRICE_KEY = "cart_pricing:price:{}"
+QUOTE_KEY = "cart_pricing:quote:{}"
+
+
+class PriceNotFound(Exception):
+    """Raised when a cart line refers to a price that does not exist"""
+
+    def __init__(self, price_id):
+        super().__init__(f"Price with ID {price_id} not found")
+        self.price_id = price_id
+
+
+def _price_seconds():
+    return getattr(settings, "CHECKOUT_PRICE_CACHE_SECONDS", 60)
+
+
+def _quote_seconds():
+    return getattr(settings, "CHECKOUT_QUOTE_SECONDS", 900)
+
+
+def _snapshot(food_price) -> Dict:
+    return {
+        "price_id": food_price.pk,
+        "price": str(food_price.price),
+        "cook_id": food_price.cook_id,
+        "food_id": food_price.food_id,
+        "size": food_price.size,
+    }
+
+
+def price_snapshots(price_ids: Iterable[int]) -> Dict[int, Dict]:
+    """
+    Snapshots of the given FoodPrice ids, from the cache where possible and
+    one query for the rest. Unknown ids are left out.
+    """
+    price_ids = set(price_ids)
+    cached = cache.get_many([PRICE_KEY.format(pk) for pk in price_ids])
+    snapshots = {snapshot["price_id"]: snapshot for snapshot in cached.values()}
+
+    missing = price_ids - snapshots.keys()
+    if missing:
+        fetched = {
+            pk: _snapshot(food_price)
+            for pk, food_price in FoodPrice.objects.in_bulk(missing).items()
+        }
+        cache.set_many(
+            {PRICE_KEY.format(pk): snapshot for pk, snapshot in fetched.items()},
+            _price_seconds(),
+        )
+        snapshots.update(fetched)
+    return snapshots
+
+
+def forget_price(price_id):
+    """Drop a FoodPrice snapshot after the price changed"""
+    cache.delete(PRICE_KEY.format(price_id))
+
+
+def _normalize_items(cart_items) -> List[List[int]]:
+    """[[price_id, quantity], ...] sorted, from the checkout request payload"""
+    try:
+        items = [[int(item["price_id"]), int(item["quantity"])] for item in cart_items]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Each cart item needs an integer price_id and quantity")
+    return sorted(items)
+
+
+def price_cart(cart_items) -> Dict:
+    """
+    Price checkout cart lines ({"price_id", "quantity"} dicts)
+
+    Returns the normalized items, unit prices, subtotal, tax and the chef
+    (cook of the first line). Raises PriceNotFound for unknown prices.
+    """
+    items = _normalize_items(cart_items)
+    snapshots = price_snapshots(pk for pk, _ in items)
+
+    subtotal = Decimal("0.00")
+    for price_id, quantity in items:
+        snapshot = snapshots.get(price_id)
+        if snapshot is None:
+            raise PriceNotFound(price_id)
+        subtotal += Decimal(snapshot["price"]) * quantity
+
+    first = snapshots[int(cart_items[0]["price_id"])]
+    return {
+        "items": items,
+        "unit_prices": {str(pk): snapshots[pk]["price"] for pk, _ in items},
+        "chef_id": first["cook_id"],
+        "subtotal": subtotal,
+        "tax_rate": TAX_RATE,
+        "tax_amount": subtotal * TAX_RATE,
+    }
+
+
+def save_quote(customer, pricing, delivery_fee, delivery_fee_result, delivery_address_id=None) -> Dict:
+    """Store a checkout result for ``customer``; returns it with its quote_id"""
+    quote = {
+        "quote_id": uuid.uuid4().hex,
+        "customer_id": customer.pk,
+        "items": pricing["items"],
+        "unit_prices": pricing["unit_prices"],
+        "delivery_address_id": str(delivery_address_id) if delivery_address_id else None,
+        "subtotal": str(pricing["subtotal"]),
+        "tax_amount": str(pricing["tax_amount"]),
+        "delivery_fee": str(delivery_fee),
+        "total_amount": str(pricing["subtotal"] + pricing["tax_amount"] + delivery_fee),
+        "delivery_fee_breakdown": delivery_fee_result,
+    }
+    cache.set(QUOTE_KEY.format(quote["quote_id"]), quote, _quote_seconds())
+    return quote
+
+
+def quote_for_cart(quote_id, customer, cart_items, delivery_address_id=None) -> Optional[Dict]:
+    """
+    The customer's quote if it still describes ``cart_items`` (CartItems
+    from fetch_cart, with their prices loaded) and the delivery address;
+    None when it expired, belongs to someone else or no longer matches.
+    """
+    if not quote_id:
+        return None
+    quote = cache.get(QUOTE_KEY.format(quote_id))
+    if quote is None or quote["customer_id"] != customer.pk:
+        return None
+
+    items = sorted([item.price_id, item.quantity] for item in cart_items)
+    unit_prices = {str(item.price_id): str(item.price.price) for item in cart_items}
+    if items != quote["items"] or unit_prices != quote["unit_prices"]:
+        logger.info(f"Checkout quote {quote_id} no longer matches the cart")
+        return None
+
+    # The delivery fee was priced for the quote's address only: a quote from
+    # bare coordinates is not reused for a delivery to a saved address
+    address_id = str(delivery_address_id) if delivery_address_id else None
+    if quote["delivery_address_id"] != address_id:
+        return None
+    return quote
+
+
+def forget_quote(quote_id):
+    """Drop a quote once an order was placed from it"""
+    cache.delete(QUOTE_KEY.format(quote_id))
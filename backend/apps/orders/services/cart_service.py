@@ -0,0 +1,70 @@
+"""
+Cart writes and totals used by ``CartItemViewSet``
+
+Adding an item is an ``UPDATE ... SET quantity = quantity + n`` on the
+(customer, price) row, falling back to an INSERT when there is none; a
+concurrent insert of the same row (double click) loses the unique
+constraint race and is retried as the increment, so no quantity is lost.
+Cart totals are a single aggregate query instead of loading each line's
+price in Python.
+"""
+
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+from django.utils import timezone
+
+from ..models import CartItem
+
+LINE_TOTAL = ExpressionWrapper(
+    F("quantity") * F("price__price"),
+    output_field=DecimalField(max_digits=12, decimal_places=2),
+)
+
+
+def cart_with_prices(customer):
+    """The customer's cart with what CartItemSerializer reads loaded"""
+    return CartItem.objects.filter(customer=customer).select_related(
+        "price__food", "price__cook"
+    )
+
+
+def cart_totals(customer):
+    """(total_value, total_items) of the customer's cart in one query"""
+    totals = CartItem.objects.filter(customer=customer).aggregate(
+        total_value=Sum(LINE_TOTAL), total_items=Sum("quantity")
+    )
+    return totals["total_value"] or Decimal("0.00"), totals["total_items"] or 0
+
+
+def _increment(customer, price_id, quantity):
+    return CartItem.objects.filter(customer=customer, price_id=price_id).update(
+        quantity=F("quantity") + quantity, updated_at=timezone.now()
+    )
+
+
+def add_cart_item(customer, price_id, quantity, special_instructions=""):
+    """
+    Add ``quantity`` of a price to the cart, atomically incrementing the
+    existing line if there is one. Returns (cart_item, created); cart_item
+    is None when the price does not exist.
+    """
+    if _increment(customer, price_id, quantity):
+        return cart_with_prices(customer).get(price_id=price_id), False
+
+    try:
+        with transaction.atomic():
+            CartItem.objects.create(
+                customer=customer,
+                price_id=price_id,
+                quantity=quantity,
+                special_instructions=special_instructions,
+            )
+        created = True
+    except IntegrityError:
+        # Another request created the line first, or the price is unknown
+        if not _increment(customer, price_id, quantity):
+            return None, False
+        created = False
+    return cart_with_prices(customer).get(price_id=price_id), created
@@ -0,0 +1,112 @@
+"""
+Delivery chat fetch service
+
+Shared by ``OrderViewSet.get_chat_messages`` and ``DeliveryTrackingViewSet.chat``.
+Clients pass the ``cursor`` from the previous response as ``?after=`` and only
+receive messages newer than it, so polling a long conversation no longer
+re-transfers the whole history. Older history is paged backwards by passing
+``previous_cursor`` as ``?before=``.
+"""
+
+import uuid
+from typing import Dict, Optional
+
+from django.db.models import Q, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import DeliveryChat
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 500
+
+
+class InvalidChatCursor(ValueError):
+    """Raised when a cursor is neither a message id nor an ISO timestamp"""
+
+
+def _cursor_filter(order, cursor: str, newer: bool) -> Q:
+    """Keyset filter on (created_at, id) for messages newer/older than ``cursor``"""
+    created_lookup = "created_at__gt" if newer else "created_at__lt"
+    pk_lookup = "pk__gt" if newer else "pk__lt"
+    try:
+        message_id = uuid.UUID(str(cursor))
+    except ValueError:
+        timestamp = parse_datetime(str(cursor).replace(" ", "+"))
+        if timestamp is None:
+            raise InvalidChatCursor(
+                "after/before must be a chat message_id or an ISO 8601 timestamp"
+            )
+        if timezone.is_naive(timestamp):
+            timestamp = timezone.make_aware(timestamp)
+        return Q(**{created_lookup: timestamp})
+
+    # Resolve the anchor inside the same query rather than fetching it first
+    anchor = DeliveryChat.objects.filter(order=order, message_id=message_id)
+    anchor_created = Subquery(anchor.values("created_at")[:1])
+    anchor_pk = Subquery(anchor.values("pk")[:1])
+    return Q(**{created_lookup: anchor_created}) | Q(
+        created_at=anchor_created, **{pk_lookup: anchor_pk}
+    )
+
+
+def fetch_chat_messages(
+    order,
+    user,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    limit: Optional[int] = None,
+    mark_read: bool = True,
+) -> Dict:
+    """
+    Return one page of chat messages for ``order``.
+
+    With ``after`` the page holds the oldest ``limit`` messages newer than
+    that cursor; with ``before`` (or no cursor) it holds the newest ``limit``
+    messages older than it, so long chats still end with the latest message.
+    Only the messages in the returned page are marked read, in a single
+    UPDATE that is skipped when none of them are unread for ``user``.
+
+    Returns a dict with ``messages`` (DeliveryChat instances, oldest first),
+    ``unread_count`` (how many of the returned messages were unread for
+    ``user``), ``has_more`` (more newer messages after ``after``, older ones
+    otherwise), ``cursor`` (pass back as ``after``) and ``previous_cursor``
+    (pass back as ``before``).
+    """
+    if after and before:
+        raise InvalidChatCursor("Pass either after or before, not both")
+    limit = min(max(int(limit or DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE)
+
+    queryset = DeliveryChat.objects.filter(order=order).select_related(
+        "sender", "sender__deliveryagent", "receiver"
+    )
+    if after:
+        queryset = queryset.filter(_cursor_filter(order, after, newer=True))
+        rows = list(queryset.order_by("created_at", "pk")[: limit + 1])
+        messages = rows[:limit]
+    else:
+        if before:
+            queryset = queryset.filter(_cursor_filter(order, before, newer=False))
+        rows = list(queryset.order_by("-created_at", "-pk")[: limit + 1])
+        messages = rows[:limit][::-1]
+    has_more = len(rows) > limit
+
+    unread_ids = {
+        msg.pk for msg in messages if msg.receiver_id == user.pk and not msg.is_read
+    }
+    if mark_read and unread_ids:
+        DeliveryChat.objects.filter(pk__in=unread_ids).update(is_read=True)
+        for msg in messages:
+            if msg.pk in unread_ids:
+                msg.is_read = True
+
+    # An empty page keeps the caller's cursor so polling can resume from it
+    cursor = str(messages[-1].message_id) if messages else after
+    previous_cursor = str(messages[0].message_id) if messages else before
+    return {
+        "messages": messages,
+        "unread_count": len(unread_ids),
+        "has_more": has_more,
+        "cursor": cursor,
+        "previous_cursor": previous_cursor,
+    }
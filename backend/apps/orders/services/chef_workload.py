@@ -0,0 +1,170 @@
+"""
+Workload ranking of chefs for bulk order collaboration
+
+``available_chefs`` used to list every active cook and then count each
+one's bulk order assignments with its own query. The workload is now a
+COUNT subquery annotated onto the chef list, read together with the chef's
+ChefLocation (coordinates and compiled operating hours) in a single query.
+
+Each chef is scored against the event: spare capacity (below
+``BULK_CHEF_CAPACITY`` active assignments), whether the kitchen is open at
+the event time and the distance from the kitchen to the event location.
+Without an event location there is no distance to rank by; chefs are then
+ranked and paged by workload in SQL and the hours fit is only reported.
+"""
+
+from datetime import datetime, time
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Case, Count, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from apps.food.utils import calculate_distance
+from apps.users.availability_utils import LOCAL_TIMEZONE, OperatingSchedule
+
+from ..models import BulkOrderAssignment
+
+# Bulk order statuses that keep an assigned chef busy
+ACTIVE_BULK_STATUSES = ["pending", "confirmed", "collaborating", "preparing"]
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 100
+
+# Kitchens without a known event time are checked at midday
+DEFAULT_EVENT_TIME = time(12, 0)
+
+
+def chef_capacity() -> int:
+    return getattr(settings, "BULK_CHEF_CAPACITY", 3)
+
+
+def event_context(bulk_order) -> Tuple[Optional[float], Optional[float], Optional[datetime]]:
+    """(lat, lng, event datetime) of a bulk order; parts not set are None"""
+    lat = lng = None
+    if bulk_order.delivery_latitude is not None and bulk_order.delivery_longitude is not None:
+        lat, lng = float(bulk_order.delivery_latitude), float(bulk_order.delivery_longitude)
+    event_at = None
+    if bulk_order.event_date:
+        event_at = LOCAL_TIMEZONE.localize(
+            datetime.combine(bulk_order.event_date, bulk_order.event_time or DEFAULT_EVENT_TIME)
+        )
+    return lat, lng, event_at
+
+
+def chef_workloads(exclude_user=None):
+    """Active cooks annotated with their number of active bulk order assignments"""
+    User = get_user_model()
+    capacity = chef_capacity()
+    # Counted per chef in a correlated subquery so the kitchen's JSON columns
+    # read alongside do not end up in a GROUP BY
+    counts = (
+        BulkOrderAssignment.objects.filter(
+            chef=OuterRef("pk"), bulk_order__status__in=ACTIVE_BULK_STATUSES
+        )
+        .order_by()
+        .values("chef")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    queryset = User.objects.filter(is_active=True, role__in=["cook", "Cook"]).annotate(
+        active_assignments=Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+    ).annotate(
+        busy=Case(
+            When(active_assignments__gte=capacity, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+    if exclude_user is not None:
+        queryset = queryset.exclude(pk=exclude_user.pk)
+    return queryset
+
+
+def _fits_hours(operating_hours, compiled, event_at) -> bool:
+    # Kitchens without operating hours are treated as always available
+    if not compiled:
+        return True
+    return OperatingSchedule(operating_hours, compiled).is_open(event_at)
+
+
+def _row(values, capacity, lat, lng, event_at) -> Dict:
+    kitchen_lat, kitchen_lng = values["kitchen_cache__latitude"], values["kitchen_cache__longitude"]
+    distance = None
+    if lat is not None and kitchen_lat is not None and kitchen_lng is not None:
+        distance = round(calculate_distance(lat, lng, float(kitchen_lat), float(kitchen_lng)), 2)
+    radius = values["kitchen_cache__delivery_radius_km"]
+    active = values["active_assignments"]
+    return {
+        "id": values["user_id"],
+        "name": values["name"] or values["username"],
+        "username": values["username"],
+        "email": values["email"],
+        "active_assignments": active,
+        "capacity": capacity,
+        "remaining_capacity": max(capacity - active, 0),
+        "availability_status": "available" if active < capacity else "busy",
+        "distance_km": distance,
+        "within_delivery_radius": (
+            None if distance is None or radius is None else distance <= radius
+        ),
+        "open_at_event": _fits_hours(
+            values["kitchen_cache__operating_hours"],
+            values["kitchen_cache__operating_schedule"],
+            event_at,
+        ),
+    }
+
+
+def _rank(row):
+    distance = row["distance_km"]
+    return (
+        row["availability_status"] == "busy",
+        not row["open_at_event"],
+        distance is None,
+        distance or 0,
+        row["active_assignments"],
+        row["id"],
+    )
+
+
+def ranked_chefs(
+    exclude_user=None,
+    lat=None,
+    lng=None,
+    event_at=None,
+    limit=DEFAULT_LIMIT,
+    offset=0,
+) -> Tuple[List[Dict], int]:
+    """
+    One page of chefs for the collaboration picker and the total count.
+
+    With an event location, chefs with spare capacity come first, then those
+    whose kitchen is open at ``event_at`` (now when not given), then the
+    nearest, then the least loaded. Without one they are ordered by workload
+    only and just the requested page is read.
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    offset = max(offset, 0)
+    capacity = chef_capacity()
+    queryset = chef_workloads(exclude_user).values(
+        "user_id",
+        "name",
+        "username",
+        "email",
+        "active_assignments",
+        "kitchen_cache__latitude",
+        "kitchen_cache__longitude",
+        "kitchen_cache__delivery_radius_km",
+        "kitchen_cache__operating_hours",
+        "kitchen_cache__operating_schedule",
+    )
+
+    if lat is None or lng is None:
+        total = queryset.count()
+        page = queryset.order_by("busy", "active_assignments", "user_id")[offset:offset + limit]
+        return [_row(values, capacity, None, None, event_at) for values in page], total
+
+    rows = sorted((_row(values, capacity, lat, lng, event_at) for values in queryset), key=_rank)
+    return rows[offset:offset + limit], len(rows)
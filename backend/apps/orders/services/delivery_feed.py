@@ -0,0 +1,148 @@
+"""
+Proximity-ranked feed of orders waiting for a delivery agent
+
+``available_for_delivery`` used to send every unassigned order on the
+platform, fully serialized, to every polling agent. The feed instead starts
+from the agent's last known position (a fresh GPS fix sent by the app, the
+latest ``LocationUpdate`` or the agent's ``DeliveryAgentLocation`` address)
+and only considers orders whose kitchen lies inside the agent's
+``service_radius_km``.
+
+Kitchen coordinates come from the chef's ChefLocation row; a
+latitude/longitude bounding box over its indexed coordinates picks the
+nearby candidates in SQL. Those are ranked by exact haversine distance in
+Python and the top ``limit`` are returned; the caller serializes just those.
+"""
+
+import math
+from typing import List, Optional, Tuple
+
+from django.db.models import Case, Value, When
+
+from apps.food.utils import calculate_distance
+from apps.users.models import DeliveryAgentLocation
+
+from ..models import LocationUpdate, Order
+from .dispatch import CLAIMABLE_STATUSES
+
+DEFAULT_RADIUS_KM = 15
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+# Kilometres per degree of latitude (and of longitude at the equator)
+KM_PER_DEGREE = 111.32
+
+
+def _to_float(value):
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def agent_position(agent, lat=None, lng=None) -> Tuple[Optional[float], Optional[float], float]:
+    """
+    Return (lat, lng, radius_km) for ``agent``.
+
+    Explicit coordinates win, then the agent's latest location update, then
+    the address behind their DeliveryAgentLocation (current location before
+    base and service area). lat/lng are None when nothing is known.
+    """
+    profile = (
+        DeliveryAgentLocation.objects.filter(
+            address__user=agent, address__is_active=True, is_available_for_service=True
+        )
+        .select_related("address")
+        .order_by(
+            Case(When(location_type="current", then=Value(0)), default=Value(1)),
+            "-last_updated_location",
+        )
+        .first()
+    )
+    radius = float(profile.service_radius_km) if profile else DEFAULT_RADIUS_KM
+
+    lat, lng = _to_float(lat), _to_float(lng)
+    if lat is not None and lng is not None:
+        return lat, lng, radius
+
+    update = (
+        LocationUpdate.objects.filter(delivery_agent=agent)
+        .order_by("-timestamp")
+        .values_list("latitude", "longitude")
+        .first()
+    )
+    if update:
+        return float(update[0]), float(update[1]), radius
+
+    if profile and profile.address.latitude is not None and profile.address.longitude is not None:
+        return float(profile.address.latitude), float(profile.address.longitude), radius
+
+    return None, None, radius
+
+
+def bounding_box(lat, lng, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing a circle of ``radius_km``"""
+    dlat = radius_km / KM_PER_DEGREE
+    dlng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+
+def open_orders():
+    """Unassigned orders an agent may pick up"""
+    return Order.objects.filter(
+        status__in=CLAIMABLE_STATUSES, delivery_partner__isnull=True
+    )
+
+
+def nearby_orders(lat, lng, radius_km, limit=DEFAULT_LIMIT) -> List[Tuple[int, float]]:
+    """
+    (order_id, pickup_distance_km) of open orders whose kitchen is within
+    ``radius_km`` of (lat, lng), nearest first, at most ``limit`` of them.
+    Orders whose kitchen has no coordinates are left out.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    candidates = (
+        open_orders()
+        .filter(
+            chef__kitchen_cache__latitude__range=(min_lat, max_lat),
+            chef__kitchen_cache__longitude__range=(min_lng, max_lng),
+        )
+        .values_list(
+            "pk",
+            "chef__kitchen_cache__latitude",
+            "chef__kitchen_cache__longitude",
+            "created_at",
+        )
+    )
+
+    ranked = []
+    for pk, kitchen_lat, kitchen_lng, created_at in candidates:
+        distance = calculate_distance(lat, lng, float(kitchen_lat), float(kitchen_lng))
+        if distance <= radius_km:
+            ranked.append((distance, -created_at.timestamp(), pk))
+    ranked.sort()
+    return [(pk, round(distance, 2)) for distance, _, pk in ranked[:limit]]
+
+
+def delivery_feed(agent, lat=None, lng=None, limit=DEFAULT_LIMIT):
+    """
+    Orders for the agent's available list and their pickup distances.
+
+    Returns (orders, distances) where ``distances`` maps order id to km.
+    Without any known position the newest ``limit`` open orders are
+    returned unranked and ``distances`` is empty.
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    lat, lng, radius = agent_position(agent, lat, lng)
+    queryset = (
+        open_orders()
+        .select_related("customer", "chef")
+        .prefetch_related("items__price__food")
+    )
+
+    if lat is None or lng is None:
+        return list(queryset.order_by("-created_at")[:limit]), {}
+
+    distances = dict(nearby_orders(lat, lng, radius, limit))
+    orders = queryset.in_bulk(list(distances))
+    return [orders[pk] for pk in distances if pk in orders], distances
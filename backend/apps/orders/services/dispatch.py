@@ -0,0 +1,238 @@
+"""
+Delivery claim and dispatch queue
+
+``claim_order`` is the only way an agent takes an order: a single
+``UPDATE ... WHERE delivery_partner IS NULL`` that reports whether this
+agent won, so two agents accepting at the same moment can no longer both
+succeed and no row lock is held while the request runs.
+
+On top of it unassigned orders are offered to a few agents at a time
+(``DeliveryOffer`` rows with an expiry) instead of every agent racing for
+every order. ``dispatch_pending_orders`` runs from the scheduler: it expires
+stale offers and offers each unassigned order without a live offer to the
+next batch of agents. Accepting an offer goes through ``claim_order`` and
+withdraws the order's other offers. ``purge_closed_offers`` deletes the
+answered and expired offers once their order no longer waits for an agent
+or they are older than ``DELIVERY_OFFER_RETENTION_SECONDS``.
+"""
+
+import logging
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Case, Exists, OuterRef, Q, Value, When
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from ..models import DeliveryOffer, Order, OrderStatusHistory
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Order statuses an agent may pick up
+CLAIMABLE_STATUSES = ["confirmed", "preparing", "ready"]
+
+
+def _offer_seconds():
+    return getattr(settings, "DELIVERY_OFFER_SECONDS", 60)
+
+
+def _batch_size():
+    return getattr(settings, "DELIVERY_OFFER_BATCH_SIZE", 3)
+
+
+def _retention_seconds():
+    return getattr(settings, "DELIVERY_OFFER_RETENTION_SECONDS", 24 * 60 * 60)
+
+
+def claim_order(order, agent, notes="Order accepted by delivery agent") -> bool:
+    """
+    Atomically assign ``order`` to ``agent`` if nobody holds it yet.
+
+    Returns False when another agent won or the order is no longer in a
+    claimable status. On success ``order`` is updated in place and the
+    usual post-save side effects (status notification, realtime event) run.
+    """
+    now = timezone.now()
+    # Built from the copy the caller loaded; claims only happen from
+    # claimable statuses, so at most a concurrent confirm->ready step is lost
+    timestamps = dict(order.status_timestamps or {})
+    timestamps["out_for_delivery"] = now.isoformat()
+
+    won = Order.objects.filter(
+        pk=order.pk,
+        delivery_partner__isnull=True,
+        status__in=CLAIMABLE_STATUSES,
+    ).update(
+        delivery_partner=agent,
+        status="out_for_delivery",
+        status_timestamps=timestamps,
+        updated_at=now,
+    )
+    if not won:
+        return False
+
+    order.delivery_partner = agent
+    order.status = "out_for_delivery"
+    order.status_timestamps = timestamps
+    order.updated_at = now
+    order._status_changed = True
+    post_save.send(
+        sender=Order, instance=order, created=False, update_fields=None, raw=False,
+        using=Order.objects.db,
+    )
+
+    OrderStatusHistory.objects.create(
+        order=order,
+        status="out_for_delivery",
+        changed_by=agent,
+        notes=notes,
+    )
+    DeliveryOffer.objects.filter(order=order, status="offered").update(
+        status=Case(
+            When(agent=agent, then=Value("accepted")),
+            default=Value("withdrawn"),
+        ),
+        responded_at=now,
+    )
+    return True
+
+
+def live_offers(agent):
+    """The agent's unexpired offers for orders that are still unassigned"""
+    return (
+        DeliveryOffer.objects.filter(
+            agent=agent,
+            status="offered",
+            expires_at__gt=timezone.now(),
+            order__delivery_partner__isnull=True,
+            order__status__in=CLAIMABLE_STATUSES,
+        )
+        .select_related("order__customer", "order__chef")
+        .order_by("expires_at")
+    )
+
+
+def accept_offer(offer_id, agent) -> Tuple[bool, Optional[str], Optional[Order]]:
+    """
+    Accept one of the agent's offers. Returns (won, error, order); error is
+    "expired" when the offer is gone or timed out and "taken" when another
+    agent claimed the order first.
+    """
+    offer = (
+        DeliveryOffer.objects.filter(
+            pk=offer_id, agent=agent, status="offered", expires_at__gt=timezone.now()
+        )
+        .select_related("order")
+        .first()
+    )
+    if offer is None:
+        return False, "expired", None
+
+    if claim_order(offer.order, agent, notes="Delivery offer accepted"):
+        return True, None, offer.order
+
+    DeliveryOffer.objects.filter(pk=offer.pk, status="offered").update(
+        status="withdrawn", responded_at=timezone.now()
+    )
+    return False, "taken", offer.order
+
+
+def decline_offer(offer_id, agent) -> bool:
+    """Decline an open offer; the order moves on to the next agents"""
+    declined = DeliveryOffer.objects.filter(
+        pk=offer_id, agent=agent, status="offered"
+    ).update(status="declined", responded_at=timezone.now())
+    if declined:
+        order = Order.objects.filter(delivery_offers__pk=offer_id).first()
+        if order is not None and not order.delivery_offers.filter(
+            status="offered", expires_at__gt=timezone.now()
+        ).exists():
+            dispatch_order(order)
+    return bool(declined)
+
+
+def _candidate_agents(order, limit):
+    """Next agents to offer ``order`` to: ones not offered it yet come first"""
+    agents = User.objects.filter(
+        Q(role__iexact="delivery_agent") | Q(role__iexact="DeliveryAgent"),
+        is_active=True,
+        approval_status="approved",
+    )
+    offered = DeliveryOffer.objects.filter(order=order, agent=OuterRef("pk"))
+    fresh = list(
+        agents.exclude(Exists(offered)).order_by("-last_login", "pk")[:limit]
+    )
+    if fresh:
+        return fresh
+    # Everyone has seen it: go around again, skipping agents who declined
+    # or hold a live offer for it
+    skip = offered.filter(
+        Q(status="declined") | Q(status="offered", expires_at__gt=timezone.now())
+    )
+    return list(agents.exclude(Exists(skip)).order_by("-last_login", "pk")[:limit])
+
+
+def dispatch_order(order, batch_size=None, ttl_seconds=None) -> List[DeliveryOffer]:
+    """Offer ``order`` to the next batch of agents"""
+    batch_size = batch_size or _batch_size()
+    expires_at = timezone.now() + timedelta(seconds=ttl_seconds or _offer_seconds())
+    offers = [
+        DeliveryOffer(order=order, agent=agent, expires_at=expires_at)
+        for agent in _candidate_agents(order, batch_size)
+    ]
+    return DeliveryOffer.objects.bulk_create(offers)
+
+
+def expire_offers() -> int:
+    """Mark offers past their expiry as expired"""
+    return DeliveryOffer.objects.filter(
+        status="offered", expires_at__lte=timezone.now()
+    ).update(status="expired")
+
+
+def dispatch_pending_orders(batch_size=None, ttl_seconds=None) -> int:
+    """
+    Expire stale offers and offer every unassigned delivery order that has
+    no live offer to its next batch of agents. Returns the offers created.
+    """
+    expire_offers()
+    live = DeliveryOffer.objects.filter(order=OuterRef("pk"), status="offered")
+    orders = Order.objects.filter(
+        status__in=CLAIMABLE_STATUSES,
+        delivery_partner__isnull=True,
+        order_type="delivery",
+    ).exclude(Exists(live))
+
+    created = 0
+    for order in orders.only("pk"):
+        created += len(dispatch_order(order, batch_size, ttl_seconds))
+    if created:
+        logger.info(f"Dispatched {created} delivery offers")
+    return created
+
+
+def purge_closed_offers(max_age_seconds=None) -> int:
+    """
+    Delete declined, expired and withdrawn offers of orders that are no
+    longer waiting for an agent, and any older than the retention period.
+    Offers of waiting orders are kept meanwhile: they decide which agents
+    are asked next. Returns the offers deleted.
+    """
+    if max_age_seconds is None:
+        max_age_seconds = _retention_seconds()
+    cutoff = timezone.now() - timedelta(seconds=max_age_seconds)
+    waiting = Order.objects.filter(
+        status__in=CLAIMABLE_STATUSES, delivery_partner__isnull=True
+    )
+    deleted, _ = (
+        DeliveryOffer.objects.filter(status__in=["declined", "expired", "withdrawn"])
+        .filter(~Q(order__in=waiting) | Q(created_at__lt=cutoff))
+        .delete()
+    )
+    if deleted:
+        logger.info(f"Purged {deleted} closed delivery offers")
+    return deleted
@@ -0,0 +1,93 @@
+"""
+Order placement service used by ``place_order``
+
+The cart is read once (with its prices, foods and cooks) and the order is
+written in one transaction: the cart rows are claimed with a single DELETE,
+then the order, all of its items (one bulk INSERT with the price and name
+snapshots computed in memory) and the initial status history are inserted.
+Notifications are sent from ``on_commit`` so a rolled back placement never
+notifies anyone and the request does not wait on them inside the
+transaction. The number of queries does not depend on the cart size.
+"""
+
+import logging
+from typing import List
+
+from django.db import transaction
+
+from ..models import CartItem, Order, OrderItem, OrderStatusHistory
+
+logger = logging.getLogger(__name__)
+
+
+class CartChanged(Exception):
+    """Raised when the cart was modified or ordered by another request meanwhile"""
+
+
+def fetch_cart(customer) -> List[CartItem]:
+    """The customer's cart items with everything placement needs, in one query"""
+    return list(
+        CartItem.objects.filter(customer=customer).select_related(
+            "price__food", "price__cook"
+        )
+    )
+
+
+def build_order_items(order, cart_items) -> List[OrderItem]:
+    """Unsaved OrderItems carrying the same snapshots OrderItem.save() computes"""
+    items = []
+    for cart_item in cart_items:
+        price = cart_item.price
+        food = price.food
+        item = OrderItem(
+            order=order,
+            price=price,
+            quantity=cart_item.quantity,
+            unit_price=price.price,
+            total_price=price.price * cart_item.quantity,
+            food_name=food.name,
+        )
+        if food.description:
+            item.food_description = food.description
+        items.append(item)
+    return items
+
+
+def _notify_order_placed(order):
+    from apps.communications.services.order_notification_service import (
+        OrderNotificationService,
+    )
+
+    try:
+        OrderNotificationService.notify_customer_order_placed(order)
+        OrderNotificationService.notify_chef_new_order(order)
+    except Exception as e:
+        logger.error(f"Failed to send order notifications: {str(e)}")
+
+
+def place_order_from_cart(customer, cart_items, order_data, status_note) -> Order:
+    """
+    Turn ``cart_items`` (from fetch_cart) into an order built from
+    ``order_data`` and empty the cart, atomically.
+
+    Raises CartChanged if any of the cart rows is gone by the time the
+    transaction claims them, e.g. a concurrent checkout of the same cart.
+    """
+    with transaction.atomic():
+        claimed, _ = CartItem.objects.filter(
+            pk__in=[cart_item.pk for cart_item in cart_items]
+        ).delete()
+        if claimed != len(cart_items):
+            raise CartChanged("Cart changed while the order was being placed")
+
+        order = Order.objects.create(**order_data)
+        OrderItem.objects.bulk_create(build_order_items(order, cart_items))
+        OrderStatusHistory.objects.create(
+            order=order,
+            status=order.status,
+            changed_by=customer,
+            notes=status_note,
+        )
+        transaction.on_commit(lambda: _notify_order_placed(order))
+
+    return order
@@ -1,8 +1,21 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from apps.communications.models import Notification
+from apps.food.models import FoodPrice
 from apps.communications.utils import NotificationManager
-from .models import Order, BulkOrder
+from .models import Order, BulkOrder, DeliveryChat, LocationUpdate
+from .services.cart_pricing import forget_price
+from .realtime import (
+    broker,
+    chat_payload,
+    location_payload,
+    notification_payload,
+    order_status_payload,
+    order_topic,
+    user_topic,
+)
 
 User = get_user_model()
 
@@ -10,17 +23,23 @@ User = get_user_model()
 @receiver(post_save, sender=Order)
 def notify_chef_new_order(sender, instance, created, **kwargs):
     """
-    Send notification to chef when a new order is placed
+    Send notification to chef when a new order is placed, once the
+    transaction creating it commits (so a BulkOrder saved in the same
+    transaction is found and rolled back orders notify nobody)
     """
     if created and instance.chef:
-        # Check if this is a bulk order
-        try:
-            bulk_order = BulkOrder.objects.get(order=instance)
-            # It's a bulk order
-            NotificationManager.notify_bulk_order_placed(bulk_order)
-        except BulkOrder.DoesNotExist:
-            # Regular order
-            NotificationManager.notify_order_placed(instance)
+        transaction.on_commit(lambda: _notify_chef_order_placed(instance))
+
+
+def _notify_chef_order_placed(order):
+    # Check if this is a bulk order
+    try:
+        bulk_order = BulkOrder.objects.get(order=order)
+        # It's a bulk order
+        NotificationManager.notify_bulk_order_placed(bulk_order)
+    except BulkOrder.DoesNotExist:
+        # Regular order
+        NotificationManager.notify_order_placed(order)
 
 
 @receiver(post_save, sender=Order)
@@ -46,4 +65,48 @@ def notify_bulk_order_collaboration(sender, instance, created, **kwargs):
             subject=f"Bulk Order Collaboration Update: #{instance.order.order_number}",
             message=f"There has been an update to the collaboration status for bulk order #{instance.order.order_number}.",
             notification_type='bulk_order'
-        )
\ No newline at end of file
+        )
+
+
+@receiver(post_save, sender=Order)
+def publish_order_status_change(sender, instance, created, **kwargs):
+    """
+    Push status changes to clients following the order (see realtime.py)
+    """
+    if getattr(instance, '_status_changed', False):
+        broker.publish_on_commit(
+            order_topic(instance.pk), 'order.status', order_status_payload(instance)
+        )
+
+
+@receiver(post_save, sender=LocationUpdate)
+def publish_location_update(sender, instance, created, **kwargs):
+    if created and instance.order_id:
+        broker.publish_on_commit(
+            order_topic(instance.order_id), 'location', location_payload(instance)
+        )
+
+
+@receiver(post_save, sender=DeliveryChat)
+def publish_chat_message(sender, instance, created, **kwargs):
+    if created:
+        broker.publish_on_commit(
+            order_topic(instance.order_id), 'chat.message', chat_payload(instance)
+        )
+
+
+@receiver(post_save, sender=Notification)
+def publish_notification(sender, instance, created, **kwargs):
+    if created:
+        broker.publish_on_commit(
+            user_topic(instance.user_id),
+            'notification.created',
+            notification_payload(instance),
+        )
+
+
+@receiver(post_save, sender=FoodPrice)
+@receiver(post_delete, sender=FoodPrice)
+def forget_cached_price(sender, instance, **kwargs):
+    """Checkout prices from the new value as soon as a price changes"""
+    forget_price(instance.pk)
@@ -0,0 +1,149 @@
+"""
+Server-Sent Events streams for order tracking, delivery chat and notifications.
+
+Each stream sends the deltas published on ``apps.orders.realtime.broker``
+as ``event: <type>`` / ``data: <json>`` frames with the cursor as the SSE
+``id``, so a reconnecting ``EventSource`` resumes through ``Last-Event-ID``.
+
+Under ASGI (``config.asgi.application``) a stream waits on the broker without
+holding a thread. Under WSGI it falls back to a blocking generator, which
+costs one worker thread per open stream - use the long-poll action
+(``/api/orders/orders/<pk>/events/``) there instead.
+"""
+
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .realtime import (
+    broker,
+    get_followable_order,
+    order_topic,
+    user_topic,
+    visible_events,
+)
+
+# Streams are closed after this long; EventSource reconnects with Last-Event-ID
+STREAM_MAX_SECONDS = 300
+# Comment frame sent while idle so proxies don't drop the connection
+KEEPALIVE_SECONDS = 15
+# Client reconnect delay advertised in the ``retry`` field (milliseconds)
+RECONNECT_MS = 3000
+
+
+def _authenticate(request):
+    """
+    Run the configured DRF authenticators on a plain Django request.
+
+    ``EventSource`` cannot send an Authorization header, so a ``token`` query
+    parameter is accepted as the bearer token.
+    """
+    token = request.GET.get("token")
+    if token and "HTTP_AUTHORIZATION" not in request.META:
+        request.META["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    try:
+        user = drf_request.user
+    except Exception:
+        return None
+    return user if user and user.is_authenticated else None
+
+
+def _format_event(event_type, data, event_id=None):
+    frame = ""
+    if event_id:
+        frame += f"id: {event_id}\n"
+    frame += f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+    return frame
+
+
+def _advance(events, reset, seq, user):
+    """Return the frames for a broker wait result and the cursor to continue from"""
+    if reset:
+        seq, _ = broker.parse_cursor(None)
+        cursor = broker.cursor(seq)
+        return [_format_event("reset", {"cursor": cursor}, cursor)], seq
+    if events:
+        seq = events[-1]["seq"]
+    frames = [
+        _format_event(event["type"], event["data"], event["id"])
+        for event in visible_events(events, user)
+    ]
+    return frames or [": keep-alive\n\n"], seq
+
+
+async def _async_stream(topics, seq, reset, user):
+    yield f"retry: {RECONNECT_MS}\n\n"
+    deadline = time.monotonic() + STREAM_MAX_SECONDS
+    events = []
+    while time.monotonic() < deadline:
+        if not reset:
+            events, reset = await broker.wait_async(topics, seq, KEEPALIVE_SECONDS)
+        frames, seq = _advance(events, reset, seq, user)
+        events, reset = [], False
+        for frame in frames:
+            yield frame
+
+
+def _sync_stream(topics, seq, reset, user):
+    yield f"retry: {RECONNECT_MS}\n\n"
+    deadline = time.monotonic() + STREAM_MAX_SECONDS
+    events = []
+    while time.monotonic() < deadline:
+        if not reset:
+            events, reset = broker.wait(topics, seq, KEEPALIVE_SECONDS)
+        frames, seq = _advance(events, reset, seq, user)
+        events, reset = [], False
+        yield from frames
+
+
+def _stream_response(request, topics, user):
+    cursor = request.META.get("HTTP_LAST_EVENT_ID") or request.GET.get("since")
+    seq, reset = broker.parse_cursor(cursor)
+    if isinstance(request, ASGIRequest):
+        stream = _async_stream(topics, seq, reset, user)
+    else:
+        stream = _sync_stream(topics, seq, reset, user)
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def order_event_stream(request, pk):
+    """
+    SSE stream of status, location and chat deltas for one order plus the
+    caller's notification deltas.
+    GET /api/orders/orders/<pk>/events/stream/?since=<cursor>&token=<jwt>
+    """
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    order = await sync_to_async(get_followable_order)(pk, user)
+    if order is None:
+        return JsonResponse(
+            {"error": "You are not authorized to track this order"}, status=403
+        )
+
+    return _stream_response(request, [order_topic(pk), user_topic(user.pk)], user)
+
+
+async def user_event_stream(request):
+    """
+    SSE stream of the caller's notification deltas.
+    GET /api/orders/events/stream/?since=<cursor>&token=<jwt>
+    """
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    return _stream_response(request, [user_topic(user.pk)], user)
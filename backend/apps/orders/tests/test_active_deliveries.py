@@ -0,0 +1,95 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.orders.models import DeliveryIssue, LocationUpdate, Order
+
+
+class ActiveDeliveriesTest(APITestCase):
+    """active_deliveries should cost a fixed number of queries and support polling"""
+
+    url = "/api/orders/delivery/active_deliveries/"
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email="admin@test.com", password="admin123", name="Admin", role="admin"
+        )
+        self.customer = User.objects.create_user(
+            email="customer@test.com", password="pass1234", name="Customer", role="customer"
+        )
+        self.chef = User.objects.create_user(
+            email="chef@test.com", password="pass1234", name="Chef", role="cook"
+        )
+        self.agent = User.objects.create_user(
+            email="agent@test.com", password="pass1234", name="Agent", role="delivery_agent"
+        )
+        self.orders = [
+            Order.objects.create(
+                customer=self.customer,
+                chef=self.chef,
+                delivery_partner=self.agent,
+                status="out_for_delivery",
+                total_amount=Decimal("100.00"),
+            )
+            for _ in range(5)
+        ]
+        for order in self.orders:
+            LocationUpdate.objects.create(
+                delivery_agent=self.agent, order=order, latitude=1, longitude=2
+            )
+            LocationUpdate.objects.create(
+                delivery_agent=self.agent, order=order, latitude=3, longitude=4
+            )
+        DeliveryIssue.objects.create(
+            order=self.orders[0],
+            delivery_agent=self.agent,
+            issue_type="traffic_delay",
+            description="Stuck",
+        )
+        self.client.force_authenticate(self.admin)
+
+    def test_query_count_does_not_grow_with_orders(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 5)
+        self.assertLessEqual(len(ctx.captured_queries), 3)
+
+        rows = {row["order_pk"]: row for row in response.data["active_deliveries"]}
+        first = rows[self.orders[0].pk]
+        self.assertEqual(first["open_issues"], 1)
+        self.assertEqual(first["current_location"]["latitude"], 3.0)
+        self.assertEqual(rows[self.orders[1].pk]["open_issues"], 0)
+
+    def test_pagination(self):
+        response = self.client.get(self.url, {"limit": 2, "page": 3})
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(len(response.data["active_deliveries"]), 1)
+        self.assertFalse(response.data["has_next"])
+
+    def test_since_returns_only_changed_deliveries(self):
+        since = timezone.now() + timedelta(seconds=1)
+        Order.objects.filter(pk=self.orders[2].pk).update(
+            status="delivered", updated_at=since + timedelta(seconds=1)
+        )
+        LocationUpdate.objects.filter(order=self.orders[1]).update(
+            timestamp=since + timedelta(seconds=1)
+        )
+
+        response = self.client.get(self.url, {"since": since.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["order_pk"] for row in response.data["active_deliveries"]],
+            [self.orders[1].pk],
+        )
+        self.assertEqual(response.data["removed_order_pks"], [self.orders[2].pk])
+
+    def test_non_admin_forbidden(self):
+        self.client.force_authenticate(self.customer)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
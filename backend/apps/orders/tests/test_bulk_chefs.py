@@ -0,0 +1,97 @@
+from datetime import date, time
+from decimal import Decimal
+
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import Cook, User
+from apps.orders.models import BulkOrder, BulkOrderAssignment
+from apps.users.availability_utils import compile_operating_hours, get_default_operating_hours
+from apps.users.models import ChefLocation
+
+# Colombo Fort; 0.01 degree of latitude is about 1.1 km
+EVENT = (Decimal("6.934000"), Decimal("79.850000"))
+
+
+class AvailableChefsTest(APITestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(
+            email="customer@test.com", password="pass1234", name="Customer", role="customer"
+        )
+        self.lead = self.cook("lead", "0.00")
+        self.chefs = {
+            name: self.cook(name, offset)
+            for name, offset in (("near", "0.01"), ("far", "0.08"), ("loaded", "0.005"), ("night", "0.002"))
+        }
+        # Only open in the evenings
+        hours = {
+            day: {"open": "18:00", "close": "23:00", "is_open": True}
+            for day in get_default_operating_hours()
+        }
+        ChefLocation.objects.filter(pk=self.chefs["night"].pk).update(
+            operating_hours=hours, operating_schedule=compile_operating_hours(hours)
+        )
+
+        self.bulk_order = BulkOrder.objects.create(
+            created_by=self.customer,
+            chef=self.lead,
+            status="confirmed",
+            delivery_latitude=EVENT[0],
+            delivery_longitude=EVENT[1],
+            event_date=date(2026, 11, 4),
+            event_time=time(12, 30),
+        )
+        for status in ("confirmed", "preparing", "collaborating", "completed"):
+            order = BulkOrder.objects.create(created_by=self.customer, status=status)
+            BulkOrderAssignment.objects.create(bulk_order=order, chef=self.chefs["loaded"])
+        self.client.force_authenticate(self.lead)
+
+    def cook(self, name, offset):
+        chef = User.objects.create_user(
+            email=f"{name}@test.com", password="pass1234", name=name, role="cook"
+        )
+        Cook.objects.update_or_create(
+            user=chef,
+            defaults={"kitchen_latitude": EVENT[0] + Decimal(offset), "kitchen_longitude": EVENT[1]},
+        )
+        return chef
+
+    def available(self, **params):
+        response = self.client.get("/api/orders/bulk/available_chefs/", params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response
+
+    def names(self, rows):
+        return [row["name"] for row in rows]
+
+    def test_ranked_against_the_event(self):
+        response = self.available(bulk_order_id=self.bulk_order.pk)
+        # Spare capacity first, then open at the event time, then nearest
+        self.assertEqual(self.names(response.data), ["near", "far", "night", "loaded"])
+        self.assertEqual(response["X-Total-Count"], "4")
+
+        near, far, night, loaded = response.data
+        self.assertAlmostEqual(near["distance_km"], 1.11, places=1)
+        self.assertFalse(night["open_at_event"])
+        self.assertEqual(
+            (loaded["active_assignments"], loaded["remaining_capacity"], loaded["availability_status"]),
+            (3, 0, "busy"),
+        )
+
+    def test_one_query_whatever_the_number_of_chefs(self):
+        with self.assertNumQueries(1):
+            ranked = self.available(latitude="6.934", longitude="79.85")
+        self.assertEqual(len(ranked.data), 4)
+
+    def test_paged_by_workload_without_a_location(self):
+        response = self.available(limit=2)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(response["X-Total-Count"], "4")
+        self.assertNotIn("loaded", self.names(response.data))
+        self.assertIsNone(response.data[0]["distance_km"])
+
+        rest = self.available(limit=2, offset=2).data
+        self.assertEqual(self.names(rest)[-1], "loaded")
+
+    def test_unknown_bulk_order(self):
+        response = self.client.get("/api/orders/bulk/available_chefs/", {"bulk_order_id": 999999})
+        self.assertEqual(response.status_code, 404)
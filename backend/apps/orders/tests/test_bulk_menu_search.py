@@ -0,0 +1,76 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.food.ai_service import ai_service
+from apps.food.models import BulkMenu, BulkMenuItem
+
+MENUS = [
+    ("Vegetarian Lunch Buffet", "lunch", ["Paneer curry", "Dhal", "Vegetable rice"]),
+    ("Seafood Dinner", "dinner", ["Prawn curry", "Fried rice"]),
+    ("Morning Tea", "breakfast", ["Egg sandwiches", "Milk tea"]),
+    ("Chicken Biryani Feast", "lunch", ["Chicken biryani", "Raita"]),
+]
+
+
+class BulkMenuSearchTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(
+            email="customer@test.com", password="pass1234", name="Customer", role="customer"
+        )
+        chef = User.objects.create_user(
+            email="chef@test.com", password="pass1234", name="Chef", role="cook"
+        )
+        self.menus = {}
+        for name, meal_type, items in MENUS:
+            menu = BulkMenu.objects.create(
+                chef=chef,
+                menu_name=name,
+                meal_type=meal_type,
+                base_price_per_person=Decimal("500.00"),
+                approval_status="approved",
+            )
+            for item in items:
+                BulkMenuItem.objects.create(bulk_menu=menu, item_name=item)
+            self.menus[name] = menu
+        self.client.force_authenticate(self.customer)
+
+    def search(self, query, **data):
+        response = self.client.post(
+            "/api/orders/customer-bulk-orders/ai-search/", {"query": query, **data}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return [menu["menu_name"] for menu in response.data["menus"]]
+
+    def test_lexical_matches_come_first(self):
+        names = self.search("chicken biryani for an office party")
+        self.assertEqual(names[0], "Chicken Biryani Feast")
+        self.assertEqual(len(names), len(MENUS))
+
+        self.assertEqual(self.search("rice", meal_type="lunch"), [
+            "Vegetarian Lunch Buffet", "Chicken Biryani Feast"
+        ])
+
+    def test_catalogue_is_built_once_and_dropped_on_change(self):
+        self.search("curry")
+        with self.assertNumQueries(0):
+            self.search("curry")
+
+        BulkMenuItem.objects.create(bulk_menu=self.menus["Morning Tea"], item_name="Kiribath")
+        self.assertEqual(self.search("kiribath")[0], "Morning Tea")
+
+    @override_settings(BULK_MENU_AI_CANDIDATES=2)
+    def test_only_candidates_reach_the_model(self):
+        with mock.patch.object(
+            ai_service, "filter_menus_by_query", side_effect=lambda query, menus: menus
+        ) as ranker:
+            names = self.search("curry")
+        sent = [menu["menu_name"] for menu in ranker.call_args.args[1]]
+        self.assertEqual(sorted(sent), ["Seafood Dinner", "Vegetarian Lunch Buffet"])
+        self.assertEqual(names[:2], sent)
+        self.assertEqual(len(names), len(MENUS))
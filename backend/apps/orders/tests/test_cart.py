@@ -0,0 +1,78 @@
+from decimal import Decimal
+from unittest import mock
+
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.food.models import Food, FoodPrice
+from apps.orders.models import CartItem
+from apps.orders.services import cart_service
+
+
+class CartTest(APITestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(
+            email="customer@test.com", password="pass1234", name="Customer", role="customer"
+        )
+        self.chef = User.objects.create_user(
+            email="chef@test.com", password="pass1234", name="Chef", role="cook"
+        )
+        self.prices = []
+        for i in range(3):
+            food = Food.objects.create(
+                name=f"Dish {i}", category="Mains", status="Approved", chef=self.chef
+            )
+            self.prices.append(
+                FoodPrice.objects.create(
+                    food=food, cook=self.chef, size="Medium", price=Decimal("100.50") + i
+                )
+            )
+        self.client.force_authenticate(self.customer)
+
+    def add(self, price, quantity=1):
+        return self.client.post(
+            "/api/orders/cart/add_to_cart/",
+            {"price_id": price.pk, "quantity": quantity},
+            format="json",
+        )
+
+    def test_add_increments_existing_line(self):
+        self.assertEqual(self.add(self.prices[0], 2).status_code, 201)
+        response = self.add(self.prices[0], 3)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["quantity"], 5)
+        self.assertEqual(CartItem.objects.get(customer=self.customer).quantity, 5)
+
+    def test_concurrent_insert_becomes_increment(self):
+        # The line appears between our failed increment and our insert
+        CartItem.objects.create(customer=self.customer, price=self.prices[0], quantity=1)
+        increment = cart_service._increment
+        calls = [lambda *args: 0, increment]
+        with mock.patch.object(
+            cart_service, "_increment", side_effect=lambda *args: calls.pop(0)(*args)
+        ):
+            item, created = cart_service.add_cart_item(self.customer, self.prices[0].pk, 2)
+
+        self.assertFalse(created)
+        self.assertEqual(item.quantity, 3)
+
+    def test_invalid_quantity(self):
+        self.assertEqual(self.add(self.prices[0], 0).status_code, 400)
+        self.assertEqual(self.add(self.prices[0], "two").status_code, 400)
+
+    def test_cart_summary_totals(self):
+        self.add(self.prices[0], 2)
+        self.add(self.prices[2], 1)
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/orders/cart/cart_summary/?include_items=false")
+        self.assertEqual(response.data["total_value"], Decimal("303.50"))
+        self.assertEqual(response.data["total_items"], 3)
+        self.assertNotIn("cart_items", response.data)
+
+        response = self.client.get("/api/orders/cart/cart_summary/")
+        self.assertEqual(len(response.data["cart_items"]), 2)
+
+    def test_empty_cart_summary(self):
+        response = self.client.get("/api/orders/cart/cart_summary/")
+        self.assertEqual((response.data["total_value"], response.data["total_items"]), (0, 0))
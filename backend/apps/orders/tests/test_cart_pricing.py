@@ -0,0 +1,123 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.food.models import Food, FoodPrice
+from apps.orders.models import CartItem, Order
+from apps.orders.services.cart_pricing import quote_for_cart
+from apps.orders.services.order_placement import fetch_cart
+
+
+class CartPricingTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(
+            email="customer@test.com", password="pass1234", name="Customer", role="customer"
+        )
+        self.chef = User.objects.create_user(
+            email="chef@test.com", password="pass1234", name="Chef", role="cook"
+        )
+        self.prices = []
+        for i in range(10):
+            food = Food.objects.create(
+                name=f"Dish {i}", category="Mains", status="Approved", chef=self.chef
+            )
+            self.prices.append(
+                FoodPrice.objects.create(
+                    food=food, cook=self.chef, size="Medium", price=Decimal("100.00") + i
+                )
+            )
+        self.client.force_authenticate(self.customer)
+
+    def checkout(self, prices, quantity=2):
+        response = self.client.post(
+            "/api/orders/checkout/calculate/",
+            {
+                "cart_items": [{"price_id": price.pk, "quantity": quantity} for price in prices],
+                "chef_latitude": 6.9271,
+                "chef_longitude": 79.8612,
+                "delivery_latitude": 6.90,
+                "delivery_longitude": 79.85,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return response
+
+    def place(self, **data):
+        payload = {"order_type": "pickup", "payment_method": "cash", "total_amount": 1}
+        payload.update(data)
+        return self.client.post("/api/orders/place/", payload, format="json")
+
+    def test_checkout_queries_do_not_grow_with_cart(self):
+        counts = []
+        for size in (2, 10):
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.checkout(self.prices[:size])
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(
+            response.data["subtotal"], float(sum(price.price * 2 for price in self.prices))
+        )
+
+        # Warm snapshots price the cart without touching the database
+        with self.assertNumQueries(0):
+            self.checkout(self.prices)
+
+    def test_price_change_is_seen_immediately(self):
+        self.checkout(self.prices[:1])
+        self.prices[0].price = Decimal("150.00")
+        self.prices[0].save()
+        self.assertEqual(self.checkout(self.prices[:1]).data["subtotal"], 300.0)
+
+    def test_unknown_price(self):
+        response = self.client.post(
+            "/api/orders/checkout/calculate/",
+            {"cart_items": [{"price_id": 999999, "quantity": 1}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_place_order_uses_matching_quote(self):
+        CartItem.objects.bulk_create(
+            [CartItem(customer=self.customer, price=price, quantity=2) for price in self.prices[:3]]
+        )
+        quote = self.checkout(self.prices[:3]).data
+
+        response = self.place(quote_id=quote["quote_id"])
+        self.assertEqual(response.status_code, 200, response.data)
+        order = Order.objects.get(pk=response.data["order_id"])
+        self.assertEqual(order.subtotal, Decimal("606.00"))
+        self.assertEqual(order.tax_amount, Decimal("60.60"))
+        # Pickup orders carry no delivery fee
+        self.assertEqual(order.delivery_fee, 0)
+        self.assertEqual(order.total_amount, Decimal("666.60"))
+
+        # A quote is used once
+        CartItem.objects.create(customer=self.customer, price=self.prices[0], quantity=2)
+        response = self.place(quote_id=quote["quote_id"])
+        self.assertEqual(Order.objects.get(pk=response.data["order_id"]).total_amount, 1)
+
+    def test_quote_for_another_cart_is_ignored(self):
+        CartItem.objects.create(customer=self.customer, price=self.prices[0], quantity=1)
+        quote = self.checkout(self.prices[:1], quantity=3).data
+
+        response = self.place(quote_id=quote["quote_id"], subtotal=100, total_amount=110)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Order.objects.get(pk=response.data["order_id"]).total_amount, 110)
+
+    def test_quote_without_address_is_not_used_for_delivery(self):
+        CartItem.objects.create(customer=self.customer, price=self.prices[0], quantity=2)
+        quote_id = self.checkout(self.prices[:1]).data["quote_id"]
+        cart_items = fetch_cart(self.customer)
+
+        # Priced from bare coordinates: fine for pickup, unbound for delivery
+        self.assertIsNone(quote_for_cart(quote_id, self.customer, cart_items, 42))
+        self.assertEqual(
+            quote_for_cart(quote_id, self.customer, cart_items)["quote_id"], quote_id
+        )
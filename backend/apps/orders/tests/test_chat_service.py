@@ -0,0 +1,126 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.orders.models import DeliveryChat, Order
+
+
+class ChatCursorTest(APITestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(
+            email="customer@test.com", password="pass1234", name="Customer", role="customer"
+        )
+        self.chef = User.objects.create_user(
+            email="chef@test.com", password="pass1234", name="Chef", role="cook"
+        )
+        self.agent = User.objects.create_user(
+            email="agent@test.com", password="pass1234", name="Agent", role="delivery_agent"
+        )
+        self.order = Order.objects.create(
+            customer=self.customer,
+            chef=self.chef,
+            delivery_partner=self.agent,
+            status="out_for_delivery",
+            total_amount=Decimal("50.00"),
+        )
+        self.messages = [
+            DeliveryChat.objects.create(
+                order=self.order,
+                sender=self.agent,
+                receiver=self.customer,
+                message=f"Update {i}",
+            )
+            for i in range(3)
+        ]
+        self.url = f"/api/orders/orders/{self.order.pk}/chat/messages/"
+        self.client.force_authenticate(self.customer)
+
+    def test_full_fetch_marks_read_and_counts_unread(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["messages"]), 3)
+        self.assertEqual(response.data["unread_count"], 3)
+        self.assertTrue(all(msg["is_read"] for msg in response.data["messages"]))
+        self.assertEqual(response.data["cursor"], str(self.messages[-1].message_id))
+        self.assertFalse(
+            DeliveryChat.objects.filter(receiver=self.customer, is_read=False).exists()
+        )
+
+    def test_after_cursor_returns_only_new_messages(self):
+        cursor = self.client.get(self.url).data["cursor"]
+        new = DeliveryChat.objects.create(
+            order=self.order, sender=self.agent, receiver=self.customer, message="Here"
+        )
+
+        response = self.client.get(self.url, {"after": cursor})
+        self.assertEqual(
+            [msg["message_id"] for msg in response.data["messages"]],
+            [str(new.message_id)],
+        )
+        self.assertEqual(response.data["unread_count"], 1)
+
+        # Nothing new: no UPDATE is issued and the cursor is kept
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, {"after": response.data["cursor"]})
+        self.assertEqual(response.data["messages"], [])
+        self.assertEqual(response.data["cursor"], str(new.message_id))
+        self.assertFalse(
+            any(q["sql"].startswith("UPDATE") for q in ctx.captured_queries)
+        )
+
+    def test_after_timestamp_and_limit(self):
+        after = (self.messages[0].created_at - timedelta(seconds=1)).isoformat()
+        response = self.client.get(self.url, {"after": after, "limit": 2})
+        self.assertEqual(len(response.data["messages"]), 2)
+        self.assertTrue(response.data["has_more"])
+
+    def test_first_load_returns_newest_page(self):
+        response = self.client.get(self.url, {"limit": 2})
+        self.assertEqual(
+            [msg["message"] for msg in response.data["messages"]],
+            ["Update 1", "Update 2"],
+        )
+        self.assertTrue(response.data["has_more"])
+        self.assertEqual(response.data["cursor"], str(self.messages[-1].message_id))
+
+    def test_before_cursor_pages_back_and_marks_only_the_page(self):
+        first = self.client.get(self.url, {"limit": 2})
+        self.assertEqual(first.data["unread_count"], 2)
+        self.assertEqual(
+            first.data["previous_cursor"], str(self.messages[1].message_id)
+        )
+        self.assertFalse(
+            DeliveryChat.objects.get(pk=self.messages[0].pk).is_read
+        )
+
+        response = self.client.get(
+            self.url, {"before": first.data["previous_cursor"], "limit": 2}
+        )
+        self.assertEqual(
+            [msg["message"] for msg in response.data["messages"]], ["Update 0"]
+        )
+        self.assertEqual(response.data["unread_count"], 1)
+        self.assertFalse(response.data["has_more"])
+        self.assertTrue(DeliveryChat.objects.get(pk=self.messages[0].pk).is_read)
+
+    def test_after_and_before_together_are_rejected(self):
+        cursor = str(self.messages[1].message_id)
+        response = self.client.get(self.url, {"after": cursor, "before": cursor})
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"after": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_delivery_tracking_chat_shares_cursor(self):
+        url = f"/api/orders/delivery/{self.order.pk}/chat/"
+        response = self.client.get(url, {"after": str(self.messages[0].message_id)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [msg["message"] for msg in response.data["messages"]],
+            ["Update 1", "Update 2"],
+        )
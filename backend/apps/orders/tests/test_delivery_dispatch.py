@@ -0,0 +1,123 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.orders.models import DeliveryOffer, Order, OrderStatusHistory
+from apps.orders.services.dispatch import (
+    claim_order,
+    dispatch_pending_orders,
+    purge_closed_offers,
+)
+
+
+class DeliveryDispatchTest(APITestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(
+            email="customer@test.com", password="pass1234", name="Customer", role="customer"
+        )
+        self.chef = User.objects.create_user(
+            email="chef@test.com", password="pass1234", name="Chef", role="cook"
+        )
+        self.agents = [
+            User.objects.create_user(
+                email=f"agent{i}@test.com", password="pass1234", name=f"Agent {i}",
+                role="delivery_agent",
+            )
+            for i in range(4)
+        ]
+        User.objects.filter(role="delivery_agent").update(approval_status="approved")
+        self.order = Order.objects.create(
+            customer=self.customer,
+            chef=self.chef,
+            status="ready",
+            total_amount=Decimal("50.00"),
+        )
+
+    def test_only_one_concurrent_claim_wins(self):
+        first = Order.objects.get(pk=self.order.pk)
+        second = Order.objects.get(pk=self.order.pk)
+
+        self.assertTrue(claim_order(first, self.agents[0]))
+        self.assertFalse(claim_order(second, self.agents[1]))
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.delivery_partner, self.agents[0])
+        self.assertEqual(self.order.status, "out_for_delivery")
+        self.assertIn("out_for_delivery", self.order.status_timestamps)
+        self.assertEqual(
+            OrderStatusHistory.objects.filter(order=self.order, status="out_for_delivery").count(), 1
+        )
+
+    def test_cancelled_order_cannot_be_claimed(self):
+        Order.objects.filter(pk=self.order.pk).update(status="cancelled")
+        self.assertFalse(claim_order(self.order, self.agents[0]))
+
+    def test_offers_go_out_in_batches(self):
+        with self.settings(DELIVERY_OFFER_BATCH_SIZE=2):
+            self.assertEqual(dispatch_pending_orders(), 2)
+            # Live offers hold the order back from the next batch
+            self.assertEqual(dispatch_pending_orders(), 0)
+
+            DeliveryOffer.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+            self.assertEqual(dispatch_pending_orders(), 2)
+
+        offered = DeliveryOffer.objects.values_list("agent_id", flat=True)
+        self.assertEqual(set(offered), {agent.pk for agent in self.agents})
+        self.assertEqual(DeliveryOffer.objects.filter(status="expired").count(), 2)
+
+    def test_first_accepted_offer_wins(self):
+        with self.settings(DELIVERY_OFFER_BATCH_SIZE=2):
+            dispatch_pending_orders()
+        winner, loser = [offer for offer in DeliveryOffer.objects.order_by("pk")]
+
+        self.client.force_authenticate(winner.agent)
+        response = self.client.get("/api/orders/orders/delivery/offers/")
+        self.assertEqual([row["offer_id"] for row in response.data], [winner.pk])
+        response = self.client.post(f"/api/orders/orders/delivery/offers/{winner.pk}/accept/")
+        self.assertEqual(response.status_code, 200, response.data)
+
+        self.client.force_authenticate(loser.agent)
+        response = self.client.post(f"/api/orders/orders/delivery/offers/{loser.pk}/accept/")
+        self.assertEqual(response.status_code, 404)
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.delivery_partner, winner.agent)
+        self.assertEqual(
+            dict(DeliveryOffer.objects.values_list("pk", "status")),
+            {winner.pk: "accepted", loser.pk: "withdrawn"},
+        )
+
+    def test_declined_order_moves_to_next_agent(self):
+        with self.settings(DELIVERY_OFFER_BATCH_SIZE=1):
+            dispatch_pending_orders()
+            offer = DeliveryOffer.objects.get()
+            self.client.force_authenticate(offer.agent)
+            response = self.client.post(f"/api/orders/orders/delivery/offers/{offer.pk}/decline/")
+
+        self.assertEqual(response.status_code, 200)
+        live = DeliveryOffer.objects.get(status="offered")
+        self.assertNotEqual(live.agent, offer.agent)
+
+    def test_closed_offers_are_purged(self):
+        other = Order.objects.create(
+            customer=self.customer, chef=self.chef, status="delivered", total_amount=Decimal("20.00")
+        )
+        expires_at = timezone.now()
+        DeliveryOffer.objects.bulk_create([
+            DeliveryOffer(order=self.order, agent=self.agents[0], status="declined", expires_at=expires_at),
+            DeliveryOffer(order=self.order, agent=self.agents[1], status="offered", expires_at=expires_at),
+            DeliveryOffer(order=other, agent=self.agents[0], status="expired", expires_at=expires_at),
+            DeliveryOffer(order=other, agent=self.agents[1], status="accepted", expires_at=expires_at),
+        ])
+
+        # The waiting order keeps its declined offer until it is old
+        self.assertEqual(purge_closed_offers(), 1)
+        self.assertEqual(
+            sorted(DeliveryOffer.objects.values_list("status", flat=True)),
+            ["accepted", "declined", "offered"],
+        )
+        self.assertEqual(purge_closed_offers(max_age_seconds=0), 1)
+        self.assertFalse(DeliveryOffer.objects.filter(status="declined").exists())
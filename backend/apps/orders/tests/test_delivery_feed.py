@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import Cook, User
+from apps.orders.models import LocationUpdate, Order
+from apps.users.models import Address, DeliveryAgentLocation
+
+# Colombo Fort; 0.01 degree of latitude is about 1.1 km
+ORIGIN = (Decimal("6.934000"), Decimal("79.850000"))
+
+
+class DeliveryFeedTest(APITestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(
+            email="customer@test.com", password="pass1234", name="Customer", role="customer"
+        )
+        self.agent = User.objects.create_user(
+            email="agent@test.com", password="pass1234", name="Agent", role="delivery_agent"
+        )
+        self.orders = {}
+        # Kitchens about 1, 4, 9 and 30 km north of the origin
+        for name, offset in (("near", "0.01"), ("mid", "0.04"), ("far", "0.08"), ("out", "0.27")):
+            chef = User.objects.create_user(
+                email=f"{name}@test.com", password="pass1234", name=name, role="cook"
+            )
+            Cook.objects.update_or_create(
+                user=chef,
+                defaults={
+                    "kitchen_latitude": ORIGIN[0] + Decimal(offset),
+                    "kitchen_longitude": ORIGIN[1],
+                },
+            )
+            self.orders[name] = Order.objects.create(
+                customer=self.customer, chef=chef, status="ready", total_amount=Decimal("50.00")
+            )
+        self.client.force_authenticate(self.agent)
+
+    def feed(self, **params):
+        response = self.client.get("/api/orders/orders/delivery/available/", params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_orders_are_ranked_by_pickup_distance_within_radius(self):
+        LocationUpdate.objects.create(
+            delivery_agent=self.agent, latitude=ORIGIN[0], longitude=ORIGIN[1]
+        )
+        data = self.feed()
+        self.assertEqual(
+            [row["id"] for row in data],
+            [self.orders[name].pk for name in ("near", "mid", "far")],
+        )
+        self.assertAlmostEqual(data[0]["pickup_distance_km"], 1.11, places=1)
+
+        self.assertEqual(len(self.feed(limit=2)), 2)
+
+    def test_service_radius_comes_from_agent_location(self):
+        address = Address.objects.create(
+            user=self.agent,
+            address_type="delivery_agent",
+            label="Current Location",
+            address_line1="1 Main Street",
+            city="Colombo",
+            state="Western",
+            pincode="100001",
+            latitude=ORIGIN[0],
+            longitude=ORIGIN[1],
+        )
+        DeliveryAgentLocation.objects.create(
+            address=address,
+            location_type="current",
+            contact_number="0771234567",
+            service_radius_km=5,
+        )
+        data = self.feed()
+        self.assertEqual(
+            [row["id"] for row in data], [self.orders["near"].pk, self.orders["mid"].pk]
+        )
+
+    def test_kitchen_address_and_explicit_position(self):
+        chef = self.orders["out"].chef
+        Cook.objects.filter(user=chef).update(kitchen_latitude=None, kitchen_longitude=None)
+        Address.objects.create(
+            user=chef,
+            address_type="kitchen",
+            label="Kitchen",
+            address_line1="2 Main Street",
+            city="Colombo",
+            state="Western",
+            pincode="100001",
+            latitude=ORIGIN[0] - Decimal("0.02"),
+            longitude=ORIGIN[1],
+            is_default=True,
+        )
+        data = self.feed(latitude=str(ORIGIN[0]), longitude=str(ORIGIN[1]))
+        self.assertEqual(
+            [row["id"] for row in data],
+            [self.orders[name].pk for name in ("near", "out", "mid", "far")],
+        )
+
+    def test_unknown_position_falls_back_to_newest_orders(self):
+        data = self.feed(limit=3)
+        self.assertEqual(
+            [row["id"] for row in data],
+            [self.orders[name].pk for name in ("out", "far", "mid")],
+        )
+        self.assertIsNone(data[0]["pickup_distance_km"])
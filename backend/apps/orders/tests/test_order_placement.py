@@ -0,0 +1,109 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.communications.models import Notification
+from apps.food.models import Food, FoodPrice
+from apps.orders.models import CartItem, Order, OrderStatusHistory
+from apps.orders.services.order_placement import (
+    CartChanged,
+    fetch_cart,
+    place_order_from_cart,
+)
+
+
+class OrderPlacementTest(APITestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(
+            email="customer@test.com", password="pass1234", name="Customer", role="customer"
+        )
+        self.chef = User.objects.create_user(
+            email="chef@test.com", password="pass1234", name="Chef", role="cook"
+        )
+        Food.objects.bulk_create(
+            [
+                Food(
+                    name=f"Dish {i}",
+                    description=f"Dish number {i}",
+                    category="Mains",
+                    status="Approved",
+                    chef=self.chef,
+                    preparation_time=20,
+                )
+                for i in range(20)
+            ]
+        )
+        FoodPrice.objects.bulk_create(
+            [
+                FoodPrice(food=food, cook=self.chef, size="Medium", price=Decimal("100.00") + food.pk)
+                for food in Food.objects.filter(chef=self.chef)
+            ]
+        )
+        self.prices = list(FoodPrice.objects.filter(cook=self.chef).select_related("food"))
+        self.client.force_authenticate(self.customer)
+
+    def fill_cart(self, count):
+        CartItem.objects.bulk_create(
+            [
+                CartItem(customer=self.customer, price=price, quantity=2)
+                for price in self.prices[:count]
+            ]
+        )
+
+    def place(self):
+        return self.client.post(
+            "/api/orders/place/",
+            {"order_type": "pickup", "payment_method": "cash", "total_amount": 100},
+            format="json",
+        )
+
+    def test_query_count_does_not_grow_with_cart(self):
+        counts = []
+        for size in (2, 20):
+            self.fill_cart(size)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.place()
+            self.assertEqual(response.status_code, 200, response.data)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+        order = Order.objects.get(pk=response.data["order_id"])
+        items = list(order.items.select_related("price__food"))
+        self.assertEqual(len(items), 20)
+        for item in items:
+            self.assertEqual(item.unit_price, item.price.price)
+            self.assertEqual(item.total_price, item.price.price * 2)
+            self.assertEqual(item.food_name, item.price.food.name)
+            self.assertEqual(item.food_description, item.price.food.description)
+        self.assertEqual(OrderStatusHistory.objects.filter(order=order).count(), 1)
+        self.assertFalse(CartItem.objects.filter(customer=self.customer).exists())
+
+    def test_notifications_are_sent_on_commit(self):
+        self.fill_cart(3)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.place()
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Notification.objects.exists())
+
+        for callback in callbacks:
+            callback()
+        self.assertTrue(Notification.objects.filter(user=self.customer).exists())
+        self.assertTrue(Notification.objects.filter(user=self.chef).exists())
+
+    def test_changed_cart_rolls_back(self):
+        self.fill_cart(3)
+        cart_items = fetch_cart(self.customer)
+        cart_items[0].delete()
+
+        with self.assertRaises(CartChanged):
+            place_order_from_cart(
+                self.customer,
+                cart_items,
+                {"customer": self.customer, "chef": self.chef, "total_amount": Decimal("10.00")},
+                "Placed",
+            )
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(CartItem.objects.filter(customer=self.customer).count(), 2)
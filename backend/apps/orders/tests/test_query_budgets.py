@@ -0,0 +1,260 @@
+"""
+Query budgets for the hottest API endpoints.
+
+Each endpoint is driven with the DRF test client against a fixed dataset and
+its query count, wall time and peak Python memory are compared with the
+budgets recorded in ``query_budgets.json``. Query counts must not exceed the
+budget; time and memory get a tolerance factor since they depend on the
+machine. Re-record after an intentional change with:
+
+    QUERY_BUDGET_RECORD=1 python manage.py test apps.orders.tests.test_query_budgets
+"""
+import json
+import os
+import time
+import tracemalloc
+from decimal import Decimal
+from pathlib import Path
+
+from django.core.cache import cache
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import Cook, User
+from apps.food.models import Food, FoodPrice
+from apps.food.price_summary import refresh_price_summaries
+from apps.orders.models import LocationUpdate, Order, OrderItem
+
+BUDGET_FILE = Path(__file__).with_name("query_budgets.json")
+RECORD = os.environ.get("QUERY_BUDGET_RECORD") == "1"
+TIME_TOLERANCE = float(os.environ.get("QUERY_BUDGET_TIME_TOLERANCE", "5"))
+MEMORY_TOLERANCE = float(os.environ.get("QUERY_BUDGET_MEMORY_TOLERANCE", "2"))
+# Absolute slack so millisecond budgets do not flake on a busy machine
+TIME_SLACK_SECONDS = 0.05
+
+COOKS = 3
+CUSTOMERS = 5
+FOODS_PER_COOK = 8
+ORDERS_PER_PAIR = 4
+STATUS_CYCLE = ["pending", "confirmed", "preparing", "ready", "out_for_delivery", "delivered"]
+
+
+class EndpointQueryBudgetTest(APITestCase):
+    """Hot endpoints must stay within their recorded query/time/memory budgets"""
+
+    measurements = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            email="admin@budget.test", password="pass1234", name="Admin", role="admin"
+        )
+        cls.cooks = []
+        for i in range(COOKS):
+            cook = User.objects.create_user(
+                email=f"cook{i}@budget.test", password="pass1234", name=f"Cook {i}", role="cook"
+            )
+            Cook.objects.create(
+                user=cook,
+                kitchen_latitude=Decimal("6.9271") + Decimal(i) / 100,
+                kitchen_longitude=Decimal("79.8612"),
+            )
+            cls.cooks.append(cook)
+        cls.customers = [
+            User.objects.create_user(
+                email=f"customer{i}@budget.test", password="pass1234", name=f"Customer {i}", role="customer"
+            )
+            for i in range(CUSTOMERS)
+        ]
+        cls.agent = User.objects.create_user(
+            email="agent@budget.test", password="pass1234", name="Agent", role="delivery_agent"
+        )
+
+        Food.objects.bulk_create(
+            [
+                Food(
+                    name=f"Dish {i}-{j}",
+                    description=f"Dish {j} by cook {i}",
+                    category="Mains",
+                    status="Approved",
+                    chef=cook,
+                    preparation_time=20,
+                    rating_average=Decimal("4.50"),
+                )
+                for i, cook in enumerate(cls.cooks)
+                for j in range(FOODS_PER_COOK)
+            ]
+        )
+        foods = Food.objects.filter(chef__in=cls.cooks).select_related("chef")
+        FoodPrice.objects.bulk_create(
+            [
+                FoodPrice(food=food, cook=food.chef, size=size, price=price)
+                for food in foods
+                for size, price in (("Small", Decimal("450.00")), ("Large", Decimal("800.00")))
+            ]
+        )
+        # bulk_create skips the FoodPrice signals
+        refresh_price_summaries()
+        cls.prices = {
+            cook.pk: list(FoodPrice.objects.filter(cook=cook).order_by("pk"))
+            for cook in cls.cooks
+        }
+
+        orders = []
+        n = 0
+        for cook in cls.cooks:
+            for customer in cls.customers:
+                for _ in range(ORDERS_PER_PAIR):
+                    status = STATUS_CYCLE[n % len(STATUS_CYCLE)]
+                    orders.append(
+                        Order(
+                            order_number=f"BUDGET-{n:05d}",
+                            customer=customer,
+                            chef=cook,
+                            delivery_partner=cls.agent if status in ("out_for_delivery", "delivered") else None,
+                            status=status,
+                            payment_method="cash",
+                            subtotal=Decimal("1250.00"),
+                            delivery_fee=Decimal("300.00"),
+                            total_amount=Decimal("1675.00"),
+                            delivery_address="1 Main Street",
+                            delivery_latitude=Decimal("6.90"),
+                            delivery_longitude=Decimal("79.85"),
+                        )
+                    )
+                    n += 1
+        Order.objects.bulk_create(orders)
+        orders = list(Order.objects.filter(order_number__startswith="BUDGET-"))
+
+        items = []
+        locations = []
+        for order in orders:
+            small, large = cls.prices[order.chef_id][:2]
+            items += [
+                OrderItem(order=order, price=small, quantity=1, unit_price=small.price,
+                          total_price=small.price, food_name="Dish"),
+                OrderItem(order=order, price=large, quantity=1, unit_price=large.price,
+                          total_price=large.price, food_name="Dish"),
+            ]
+            if order.status == "out_for_delivery":
+                locations += [
+                    LocationUpdate(delivery_agent=cls.agent, order=order, latitude=6.91, longitude=79.86)
+                    for _ in range(3)
+                ]
+        OrderItem.objects.bulk_create(items)
+        LocationUpdate.objects.bulk_create(locations)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if RECORD and cls.measurements:
+            budgets = {}
+            if BUDGET_FILE.exists():
+                budgets = json.loads(BUDGET_FILE.read_text())
+            budgets.update(cls.measurements)
+            BUDGET_FILE.write_text(json.dumps(budgets, indent=2, sort_keys=True) + "\n")
+
+    def setUp(self):
+        cache.clear()
+
+    def measure(self, name, method, url, user=None, data=None):
+        """Run one warm-up request, then measure queries, time and peak memory"""
+        self.client.force_authenticate(user)
+        call = getattr(self.client, method)
+        kwargs = {"format": "json"} if data is not None else {}
+
+        response = call(url, data, **kwargs) if data is not None else call(url)
+        self.assertLess(response.status_code, 400, f"{name}: {response.status_code} {response.content[:500]}")
+
+        # With DEBUG on the query log is a bounded deque; start from empty
+        reset_queries()
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            call(url, data, **kwargs) if data is not None else call(url)
+            elapsed = time.perf_counter() - started
+        # captured_queries is read lazily; the next request would reset the log
+        captured = [query["sql"] for query in ctx.captured_queries]
+
+        tracemalloc.start()
+        try:
+            call(url, data, **kwargs) if data is not None else call(url)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        measured = {
+            "queries": len(captured),
+            "seconds": round(elapsed, 4),
+            "peak_kb": round(peak / 1024),
+        }
+        self.measurements[name] = measured
+        if RECORD:
+            return
+
+        budgets = json.loads(BUDGET_FILE.read_text()) if BUDGET_FILE.exists() else {}
+        budget = budgets.get(name)
+        if budget is None:
+            self.fail(f"No budget recorded for {name}; run with QUERY_BUDGET_RECORD=1")
+
+        queries = "\n".join(captured)
+        self.assertLessEqual(
+            measured["queries"],
+            budget["queries"],
+            f"{name} ran {measured['queries']} queries (budget {budget['queries']}):\n{queries}",
+        )
+        self.assertLessEqual(
+            measured["seconds"],
+            budget["seconds"] * TIME_TOLERANCE + TIME_SLACK_SECONDS,
+            f"{name} took {measured['seconds']}s (budget {budget['seconds']}s x{TIME_TOLERANCE})",
+        )
+        self.assertLessEqual(
+            measured["peak_kb"],
+            budget["peak_kb"] * MEMORY_TOLERANCE,
+            f"{name} peaked at {measured['peak_kb']} KiB (budget {budget['peak_kb']} KiB x{MEMORY_TOLERANCE})",
+        )
+
+    def test_menu_with_filters(self):
+        """Test the filtered customer menu"""
+        self.measure("menu_with_filters", "get", "/api/food/menu/?page=1")
+
+    def test_customer_food_list(self):
+        """Test CustomerFoodViewSet.list"""
+        self.measure("customer_food_list", "get", "/api/food/customer/foods/")
+
+    def test_order_list_admin(self):
+        """Test OrderViewSet.list for an admin (all orders)"""
+        self.measure("order_list_admin", "get", "/api/orders/orders/", self.admin)
+
+    def test_order_list_customer(self):
+        """Test OrderViewSet.list for a customer"""
+        self.measure("order_list_customer", "get", "/api/orders/orders/", self.customers[0])
+
+    def test_chef_dashboard_stats(self):
+        """Test chef_dashboard_stats"""
+        self.measure("chef_dashboard_stats", "get", "/api/orders/chef/dashboard/stats/", self.cooks[0])
+
+    def test_admin_dashboard_stats(self):
+        """Test AdminDashboardViewSet.stats"""
+        self.measure("admin_dashboard_stats", "get", "/api/admin-management/dashboard/stats/", self.admin)
+
+    def test_active_deliveries(self):
+        """Test DeliveryTrackingViewSet.active_deliveries"""
+        self.measure("active_deliveries", "get", "/api/orders/delivery/active_deliveries/", self.admin)
+
+    def test_calculate_checkout(self):
+        """Test calculate_checkout for a three item cart"""
+        prices = self.prices[self.cooks[0].pk]
+        self.measure(
+            "calculate_checkout",
+            "post",
+            "/api/orders/checkout/calculate/",
+            self.customers[0],
+            {
+                "cart_items": [{"price_id": price.pk, "quantity": 2} for price in prices[:3]],
+                "chef_latitude": 6.9271,
+                "chef_longitude": 79.8612,
+                "delivery_latitude": 6.90,
+                "delivery_longitude": 79.85,
+            },
+        )
@@ -0,0 +1,150 @@
+import asyncio
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.orders.models import DeliveryChat, LocationUpdate, Order
+from apps.orders.realtime import OrderEventBroker, broker, order_topic
+
+
+class OrderEventBrokerTest(TestCase):
+    def test_events_since_cursor(self):
+        events = OrderEventBroker()
+        seq, reset = events.parse_cursor(None)
+        self.assertFalse(reset)
+
+        events.publish("order:1", "order.status", {"status": "ready"})
+        events.publish("order:2", "order.status", {"status": "preparing"})
+
+        pending, reset = events.events_since(["order:1"], seq)
+        self.assertFalse(reset)
+        self.assertEqual([e["data"]["status"] for e in pending], ["ready"])
+
+        seq, _ = events.parse_cursor(pending[-1]["id"])
+        self.assertEqual(events.events_since(["order:1"], seq), ([], False))
+
+    def test_foreign_or_evicted_cursor_requests_reset(self):
+        events = OrderEventBroker(buffer_size=2)
+        self.assertTrue(events.parse_cursor("deadbeef-1")[1])
+
+        seq, _ = events.parse_cursor(None)
+        for i in range(3):
+            events.publish("order:1", "location", {"i": i})
+        _, reset = events.events_since(["order:1"], seq)
+        self.assertTrue(reset)
+
+    def test_wait_times_out_without_events(self):
+        events = OrderEventBroker()
+        seq, _ = events.parse_cursor(None)
+        self.assertEqual(events.wait(["order:1"], seq, 0.01), ([], False))
+
+    def test_idle_topics_are_dropped(self):
+        events = OrderEventBroker(idle_seconds=60)
+        stale, _ = events.parse_cursor(None)
+        with mock.patch("apps.orders.realtime.time.monotonic", return_value=0):
+            events.publish("order:1", "order.status", {"status": "delivered"})
+        seq, _ = events.parse_cursor(None)
+        with mock.patch("apps.orders.realtime.time.monotonic", return_value=61):
+            events.publish("order:2", "order.status", {"status": "ready"})
+
+        self.assertEqual(list(events._topics), ["order:2"])
+        self.assertEqual(events.events_since(["order:1"], seq), ([], False))
+        # A cursor from before the dropped events cannot be resumed
+        self.assertEqual(events.events_since(["order:1"], stale), ([], True))
+
+    def test_publish_wakes_only_waiters_of_its_topic(self):
+        events = OrderEventBroker()
+
+        async def scenario():
+            seq, _ = events.parse_cursor(None)
+            waiter = asyncio.ensure_future(events.wait_async(["order:1"], seq, 5))
+            await asyncio.sleep(0)
+            self.assertEqual(set(events._async_waiters), {"order:1"})
+            (_, wakeup), = events._async_waiters["order:1"]
+
+            events.publish("order:2", "location", {})
+            await asyncio.sleep(0)
+            self.assertFalse(wakeup.is_set())
+
+            events.publish("order:1", "location", {})
+            pending, reset = await asyncio.wait_for(waiter, 1)
+            self.assertEqual([event["topic"] for event in pending], ["order:1"])
+            self.assertEqual(events._async_waiters, {})
+
+        asyncio.run(scenario())
+
+
+class OrderEventsLongPollTest(APITestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(
+            email="customer@test.com", password="pass1234", name="Customer", role="customer"
+        )
+        self.chef = User.objects.create_user(
+            email="chef@test.com", password="pass1234", name="Chef", role="cook"
+        )
+        self.agent = User.objects.create_user(
+            email="agent@test.com", password="pass1234", name="Agent", role="delivery_agent"
+        )
+        self.order = Order.objects.create(
+            customer=self.customer,
+            chef=self.chef,
+            delivery_partner=self.agent,
+            status="preparing",
+            total_amount=Decimal("50.00"),
+        )
+        self.url = f"/api/orders/orders/{self.order.pk}/events/"
+        self.client.force_authenticate(self.customer)
+
+    def test_receives_deltas_after_cursor(self):
+        cursor = self.client.get(self.url, {"timeout": 0}).data["cursor"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.status = "out_for_delivery"
+            self.order.save()
+            LocationUpdate.objects.create(
+                delivery_agent=self.agent, order=self.order, latitude=1, longitude=2
+            )
+            DeliveryChat.objects.create(
+                order=self.order,
+                sender=self.agent,
+                receiver=self.customer,
+                message="On my way",
+            )
+
+        response = self.client.get(self.url, {"since": cursor, "timeout": 0})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["reset"])
+        events = {event["type"]: event["data"] for event in response.data["events"]}
+        # The status change also notifies the customer through their user topic
+        self.assertEqual(
+            set(events),
+            {"order.status", "location", "chat.message", "notification.created"},
+        )
+        self.assertEqual(events["order.status"]["status"], "out_for_delivery")
+        self.assertEqual(events["chat.message"]["message"], "On my way")
+
+        response = self.client.get(
+            self.url, {"since": response.data["cursor"], "timeout": 0}
+        )
+        self.assertEqual(response.data["events"], [])
+
+    def test_chef_does_not_see_chat(self):
+        self.client.force_authenticate(self.chef)
+        cursor = self.client.get(self.url, {"timeout": 0}).data["cursor"]
+        broker.publish(
+            order_topic(self.order.pk),
+            "chat.message",
+            {"sender_id": self.agent.pk, "receiver_id": self.customer.pk},
+        )
+        response = self.client.get(self.url, {"since": cursor, "timeout": 0})
+        self.assertEqual(response.data["events"], [])
+
+    def test_stranger_forbidden(self):
+        stranger = User.objects.create_user(
+            email="other@test.com", password="pass1234", name="Other", role="customer"
+        )
+        self.client.force_authenticate(stranger)
+        self.assertEqual(self.client.get(self.url, {"timeout": 0}).status_code, 403)
@@ -11,6 +11,7 @@ from .customer_views import (
     submit_delivery_review,
     submit_food_review,
 )
+from .stream_views import order_event_stream, user_event_stream
 from .invoice_views import (
     generate_order_invoice,
     email_order_invoice,
@@ -27,6 +28,9 @@ router.register(r"addresses", views.UserAddressViewSet, basename="addresses")
 router.register(
     r"delivery-reviews", views.DeliveryReviewViewSet, basename="delivery-reviews"
 )
+router.register(
+    r"delivery", views.DeliveryTrackingViewSet, basename="delivery-tracking"
+)
 
 # Bulk order management (for cooks/admins)
 router.register(r"bulk", BulkOrderManagementViewSet, basename="bulk-orders")
@@ -85,6 +89,13 @@ urlpatterns = [
         views.chef_income_breakdown,
         name="chef-income-breakdown",
     ),
+    # Server-Sent Events push channel (see realtime.py)
+    path(
+        "orders/<int:pk>/events/stream/",
+        order_event_stream,
+        name="order-event-stream",
+    ),
+    path("events/stream/", user_event_stream, name="user-event-stream"),
     # Checkout and order placement endpoints
     path("checkout/calculate/", views.calculate_checkout, name="calculate-checkout"),
     path("place/", views.place_order, name="place-order"),
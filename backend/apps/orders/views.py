@@ -5,14 +5,16 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 
 import pytz
-from apps.food.models import FoodPrice, FoodReview
+from apps.food.models import FoodReview
 
 logger = logging.getLogger(__name__)
 from apps.payments.models import Payment
+from apps.users.kitchen_location_utils import chef_locations
 from django.contrib.auth import get_user_model
-from django.db.models import Avg, Count, F, Q, Sum
+from django.db.models import Avg, Count, Exists, F, OuterRef, Q, Subquery, Sum
 from django.http import JsonResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import serializers, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -26,10 +28,29 @@ from .models import (
     DeliveryReview,
     LocationUpdate,
     Order,
-    OrderItem,
     OrderStatusHistory,
     UserAddress,
 )
+from .realtime import (
+    broker,
+    get_followable_order,
+    order_topic,
+    user_topic,
+    visible_events,
+)
+from .services.cart_pricing import (
+    PriceNotFound,
+    forget_quote,
+    price_cart,
+    quote_for_cart,
+    save_quote,
+)
+from .services.cart_service import add_cart_item, cart_totals, cart_with_prices
+from .services.chat_service import fetch_chat_messages
+from .services.delivery_feed import DEFAULT_LIMIT as DEFAULT_FEED_LIMIT
+from .services.delivery_feed import delivery_feed
+from .services.dispatch import accept_offer, claim_order, decline_offer, live_offers
+from .services.order_placement import CartChanged, fetch_cart, place_order_from_cart
 from .serializers import (
     CartItemSerializer,
     ChefSerializer,
@@ -90,151 +111,33 @@ class UserAddressViewSet(viewsets.ModelViewSet):
         return Response({"message": "Address set as default"})
 
 
-# Helper to resolve and (optionally) persist a chef's location
-def _resolve_chef_location(chef, request_data):
-    """Return (lat, lng) for the given chef and persist if provided in request.
+def _resolve_chef_location(chef, request_data, memo=None):
+    """Return (lat, lng) for the given chef.
     Resolution order:
-    1) Use chef_latitude/chef_longitude from request if provided (and persist if missing in profile)
-    2) Chef profile: authentication.Cook.kitchen_location formatted as "lat,lng"
-    3) Chef's saved UserAddress (default or most recent) with lat/lng
-
-    If coordinates are provided in request and the chef has no persisted kitchen_location,
-    we will persist them to chef.cook.kitchen_location and ensure a 'Kitchen' UserAddress exists.
+    1) chef_latitude/chef_longitude from the request, for this request only
+    2) The chef's stored ChefLocation (kitchen address, Cook profile or
+       saved UserAddress, see apps.users.kitchen_location_utils)
     """
-    chef_lat = request_data.get("chef_latitude")
-    chef_lng = request_data.get("chef_longitude")
 
-    # Normalize to floats if present
     def _to_float(v):
         try:
             return float(v) if v is not None and v != "" else None
         except (TypeError, ValueError):
             return None
 
-    lat = _to_float(chef_lat)
-    lng = _to_float(chef_lng)
-
-    # 1) If request provided coords, use them first
+    lat = _to_float(request_data.get("chef_latitude"))
+    lng = _to_float(request_data.get("chef_longitude"))
     if lat is not None and lng is not None:
-        # Persist if profile missing or empty
-        if hasattr(chef, "cook"):
-            cook_profile = chef.cook
-            if not getattr(cook_profile, "kitchen_location", None):
-                cook_profile.kitchen_location = f"{lat},{lng}"
-                cook_profile.save(update_fields=["kitchen_location"])
-
-        # Ensure a 'Kitchen' address exists/updated for chef (best effort; use placeholders where needed)
-        try:
-            kitchen_address, created = UserAddress.objects.get_or_create(
-                user=chef,
-                label="Kitchen",
-                defaults={
-                    "address_line1": request_data.get("chef_address") or "Chef Kitchen",
-                    "city": request_data.get("chef_city") or "Unknown",
-                    "pincode": request_data.get("chef_pincode") or "000000",
-                    "latitude": lat,
-                    "longitude": lng,
-                    "is_default": False,
-                },
-            )
-            # Update coordinates if already existed but empty or different
-            updated = False
-            if kitchen_address.latitude != (
-                Decimal(str(lat)) if lat is not None else None
-            ):
-                kitchen_address.latitude = Decimal(str(lat))
-                updated = True
-            if kitchen_address.longitude != (
-                Decimal(str(lng)) if lng is not None else None
-            ):
-                kitchen_address.longitude = Decimal(str(lng))
-                updated = True
-            if (
-                request_data.get("chef_address")
-                and kitchen_address.address_line1 != request_data["chef_address"]
-            ):
-                kitchen_address.address_line1 = request_data["chef_address"]
-                updated = True
-            if updated:
-                kitchen_address.save()
-        except Exception:
-            # Do not block checkout/order if saving address fails
-            pass
-
         return lat, lng
 
-    # 2) Try persisted cook profile location
-    if hasattr(chef, "cook"):
-        cook_profile = chef.cook
-        location = getattr(cook_profile, "kitchen_location", None)
-        if isinstance(location, str) and "," in location:
-            try:
-                lat_str, lng_str = location.split(",")
-                lat, lng = _to_float(lat_str), _to_float(lng_str)
-                if lat is not None and lng is not None:
-                    return lat, lng
-            except Exception:
-                pass
+    return chef_locations([chef.pk], memo)[chef.pk].coordinates
 
-    # 3) Try chef's saved address with coordinates
-    kitchen_addr = (
-        UserAddress.objects.filter(
-            user=chef, latitude__isnull=False, longitude__isnull=False
-        )
-        .order_by("-is_default", "-created_at")
-        .first()
-    )
-    if (
-        kitchen_addr
-        and kitchen_addr.latitude is not None
-        and kitchen_addr.longitude is not None
-    ):
-        try:
-            return float(kitchen_addr.latitude), float(kitchen_addr.longitude)
-        except Exception:
-            pass
-
-    # Not available
-    return None, None
 
-
-def _get_chef_address(chef):
+def _get_chef_address(chef, memo=None):
     """Get the chef's kitchen address as a formatted string"""
-    # Try to get Kitchen address first
-    kitchen_addr = UserAddress.objects.filter(user=chef, label="Kitchen").first()
-
-    if kitchen_addr:
-        # Format the full address
-        parts = []
-        if kitchen_addr.address_line1:
-            parts.append(kitchen_addr.address_line1)
-        if kitchen_addr.address_line2:
-            parts.append(kitchen_addr.address_line2)
-        if kitchen_addr.city:
-            parts.append(kitchen_addr.city)
-        if kitchen_addr.pincode and kitchen_addr.pincode != "000000":
-            parts.append(kitchen_addr.pincode)
-
-        if parts:
-            return ", ".join(parts)
-
-    # Try any address with coordinates
-    any_addr = (
-        UserAddress.objects.filter(
-            user=chef, latitude__isnull=False, longitude__isnull=False
-        )
-        .order_by("-is_default", "-created_at")
-        .first()
-    )
-
-    if any_addr:
-        parts = []
-        if any_addr.address_line1:
-            parts.append(any_addr.address_line1)
-        if any_addr.city:
-            parts.append(any_addr.city)
-        if parts:
-            return ", ".join(parts)
+    location = chef_locations([chef.pk], memo)[chef.pk]
+    if location.address:
+        return location.address
 
     # Fallback to chef name
     chef_name = chef.get_full_name() or chef.name or chef.username
@@ -570,17 +473,11 @@ class OrderViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_200_OK,
                 )
 
-        order.delivery_partner = request.user
-        order.status = "out_for_delivery"
-        order.save()
-
-        # Add status history
-        OrderStatusHistory.objects.create(
-            order=order,
-            status="out_for_delivery",
-            changed_by=request.user,
-            notes="Order accepted by delivery agent",
-        )
+        # Conditional UPDATE: only one of several agents accepting at once wins
+        if not claim_order(order, request.user):
+            return Response(
+                {"error": "Order already taken"}, status=status.HTTP_400_BAD_REQUEST
+            )
 
         return Response(
             {
@@ -1227,9 +1124,10 @@ class OrderViewSet(viewsets.ModelViewSet):
         # Get chef location for map
         chef_location = None
         if order.chef:
-            chef_lat, chef_lng = _resolve_chef_location(order.chef, {})
+            memo = {}
+            chef_lat, chef_lng = _resolve_chef_location(order.chef, {}, memo)
             if chef_lat and chef_lng:
-                chef_address = _get_chef_address(order.chef)
+                chef_address = _get_chef_address(order.chef, memo)
                 chef_location = {
                     "latitude": chef_lat,
                     "longitude": chef_lng,
@@ -1358,7 +1256,11 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=["get"], url_path="chat/messages")
     def get_chat_messages(self, request, pk=None):
-        """Get all chat messages for an order between customer and delivery agent"""
+        """
+        Get chat messages for an order between customer and delivery agent.
+        Pass the returned ``cursor`` as ``?after=`` to only fetch new messages,
+        or ``previous_cursor`` as ``?before=`` to page back through history.
+        """
         order = self.get_object()
 
         # Check authorization: customer or delivery partner
@@ -1370,23 +1272,29 @@ class OrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # Get all messages for this order
-        messages = DeliveryChat.objects.filter(order=order).order_by("created_at")
-
-        # Mark messages as read if user is the receiver
-        messages.filter(receiver=request.user, is_read=False).update(is_read=True)
+        try:
+            chat = fetch_chat_messages(
+                order,
+                request.user,
+                after=request.query_params.get("after"),
+                before=request.query_params.get("before"),
+                limit=request.query_params.get("limit"),
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = DeliveryChatSerializer(
-            messages, many=True, context={"request": request}
+            chat["messages"], many=True, context={"request": request}
         )
 
         return Response(
             {
                 "order_number": order.order_number,
                 "messages": serializer.data,
-                "unread_count": messages.filter(
-                    receiver=request.user, is_read=False
-                ).count(),
+                "unread_count": chat["unread_count"],
+                "has_more": chat["has_more"],
+                "cursor": chat["cursor"],
+                "previous_cursor": chat["previous_cursor"],
             }
         )
 
@@ -1482,22 +1390,132 @@ class OrderViewSet(viewsets.ModelViewSet):
 
         return Response({"quick_messages": quick_messages})
 
+    @action(detail=True, methods=["get"])
+    def events(self, request, pk=None):
+        """
+        Long-poll for tracking, chat and notification deltas since a cursor.
+        GET /api/orders/orders/<pk>/events/?since=<cursor>&timeout=<seconds>
+
+        Returns immediately when events are pending, otherwise waits up to
+        ``timeout`` seconds (default 25, max 55). ``reset`` means the cursor
+        could not be resumed and the client should refetch ``tracking`` and
+        the chat once before continuing from the returned cursor.
+        """
+        order = get_followable_order(pk, request.user)
+        if order is None:
+            return Response(
+                {"error": "You are not authorized to track this order"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        try:
+            timeout = min(max(float(request.query_params.get("timeout", 25)), 0), 55)
+        except (TypeError, ValueError):
+            timeout = 25
+
+        seq, reset = broker.parse_cursor(request.query_params.get("since"))
+        events = []
+        if not reset:
+            topics = [order_topic(order["pk"]), user_topic(request.user.pk)]
+            events, reset = broker.wait(topics, seq, timeout)
+        if reset:
+            seq, _ = broker.parse_cursor(None)
+            events = []
+        elif events:
+            seq = events[-1]["seq"]
+
+        return Response(
+            {
+                "cursor": broker.cursor(seq),
+                "reset": reset,
+                "events": [
+                    {"id": event["id"], "type": event["type"], "data": event["data"]}
+                    for event in visible_events(events, request.user)
+                ],
+            }
+        )
+
     @action(detail=False, methods=["get"], url_path="delivery/available")
     def available_for_delivery(self, request):
-        """Get orders available for delivery agents to accept"""
-        # Orders that are confirmed, preparing, or ready and don't have a delivery partner yet
-        available_orders = (
-            Order.objects.filter(
-                Q(status__in=["confirmed", "preparing", "ready"])
-                & Q(delivery_partner__isnull=True)
+        """
+        Orders available for the current delivery agent to accept, nearest
+        kitchen first. Only kitchens within the agent's service radius of
+        their last known position are listed.
+
+        Query params: ``latitude``/``longitude`` (a fresh position from the
+        app, optional) and ``limit`` (default 20, max 50).
+        """
+        try:
+            limit = int(request.query_params.get("limit", DEFAULT_FEED_LIMIT))
+        except (TypeError, ValueError):
+            limit = DEFAULT_FEED_LIMIT
+
+        orders, distances = delivery_feed(
+            request.user,
+            lat=request.query_params.get("latitude"),
+            lng=request.query_params.get("longitude"),
+            limit=limit,
+        )
+
+        data = self.get_serializer(orders, many=True).data
+        for order, row in zip(orders, data):
+            row["pickup_distance_km"] = distances.get(order.pk)
+        return Response(data)
+
+    @action(detail=False, methods=["get"], url_path="delivery/offers")
+    def delivery_offers(self, request):
+        """Open dispatch offers for the current delivery agent"""
+        offers = list(live_offers(request.user))
+        orders = self.get_serializer([offer.order for offer in offers], many=True).data
+        return Response(
+            [
+                {
+                    "offer_id": offer.pk,
+                    "expires_at": offer.expires_at,
+                    "order": order,
+                }
+                for offer, order in zip(offers, orders)
+            ]
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path=r"delivery/offers/(?P<offer_id>\d+)/accept",
+    )
+    def accept_delivery_offer(self, request, offer_id=None):
+        """Accept a dispatch offer; the first agent to accept gets the order"""
+        won, error, order = accept_offer(offer_id, request.user)
+        if error == "expired":
+            return Response(
+                {"error": "Offer expired or not found"},
+                status=status.HTTP_404_NOT_FOUND,
             )
-            .select_related("customer", "chef")
-            .prefetch_related("items__price__food")
-            .order_by("-created_at")
+        if not won:
+            return Response(
+                {"error": "Order already taken"}, status=status.HTTP_409_CONFLICT
+            )
+        return Response(
+            {
+                "success": "Order accepted successfully",
+                "order_id": order.id,
+                "status": order.status,
+            }
         )
 
-        serializer = self.get_serializer(available_orders, many=True)
-        return Response(serializer.data)
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path=r"delivery/offers/(?P<offer_id>\d+)/decline",
+    )
+    def decline_delivery_offer(self, request, offer_id=None):
+        """Decline a dispatch offer so the order moves on to other agents"""
+        if not decline_offer(offer_id, request.user):
+            return Response(
+                {"error": "Offer expired or not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response({"success": "Offer declined"})
 
     @action(detail=False, methods=["get"], url_path="delivery/assigned")
     def my_assigned_deliveries(self, request):
@@ -1539,7 +1557,7 @@ class CartItemViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filter cart items to only show the current user's items"""
-        return CartItem.objects.filter(customer=self.request.user)
+        return cart_with_prices(self.request.user)
 
     @action(detail=False, methods=["post"])
     def add_to_cart(self, request):
@@ -1554,21 +1572,26 @@ class CartItemViewSet(viewsets.ModelViewSet):
                     {"error": "price_id is required"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
+            try:
+                quantity = int(quantity)
+            except (TypeError, ValueError):
+                quantity = 0
+            if quantity < 1:
+                return Response(
+                    {"error": "quantity must be a positive integer"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-            # Check if item already exists in cart
-            cart_item, created = CartItem.objects.get_or_create(
-                customer=request.user,
-                price_id=price_id,  # Django will automatically map this to the FoodPrice primary key
-                defaults={
-                    "quantity": quantity,
-                    "special_instructions": special_instructions,
-                },
+            # Increments the existing line atomically, so concurrent adds
+            # (double clicks) are all counted
+            cart_item, created = add_cart_item(
+                request.user, price_id, quantity, special_instructions
             )
-
-            if not created:
-                # Item exists, update quantity
-                cart_item.quantity += quantity
-                cart_item.save()
+            if cart_item is None:
+                return Response(
+                    {"error": f"Price with ID {price_id} not found"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
 
             serializer = self.get_serializer(cart_item)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -1580,21 +1603,23 @@ class CartItemViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["get"])
     def cart_summary(self, request):
-        """Get cart summary with total price and items"""
+        """
+        Get cart summary with total price and items.
+        ``?include_items=false`` returns just the totals (one query), e.g.
+        for the cart badge.
+        """
         try:
-            cart_items = self.get_queryset()
-            total_price = sum(item.total_price for item in cart_items)
-            total_items = sum(item.quantity for item in cart_items)
+            total_price, total_items = cart_totals(request.user)
+            data = {
+                "total_value": total_price,  # Changed from total_price to total_value
+                "total_items": total_items,
+            }
 
-            serializer = self.get_serializer(cart_items, many=True)
+            if request.query_params.get("include_items", "true").lower() != "false":
+                serializer = self.get_serializer(self.get_queryset(), many=True)
+                data["cart_items"] = serializer.data
 
-            return Response(
-                {
-                    "total_value": total_price,  # Changed from total_price to total_value
-                    "total_items": total_items,
-                    "cart_items": serializer.data,
-                }
-            )
+            return Response(data)
         except Exception as e:
             return Response(
                 {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -2127,21 +2152,18 @@ def chef_income_breakdown(request):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def calculate_checkout(request):
-    """Calculate delivery fee, tax, and total for checkout with dynamic pricing"""
-    print("\n" + "=" * 80)
-    print("🚀 CALCULATE_CHECKOUT API CALLED!")
-    print(f"📥 Request Data: {request.data}")
-    print("=" * 80 + "\n")
+    """
+    Calculate delivery fee, tax, and total for checkout with dynamic pricing.
 
+    The result is kept as a quote; pass its ``quote_id`` to place_order to
+    order at exactly these amounts.
+    """
     try:
         from .services.delivery_fee_service import delivery_fee_calculator
 
         cart_items = request.data.get("cart_items", [])
         order_type = request.data.get("order_type", "regular")  # 'regular' or 'bulk'
 
-        print(f"📦 Cart Items: {len(cart_items)}")
-        print(f"🏷️  Order Type: {order_type}")
-
         # Delivery address information
         delivery_address_id = request.data.get("delivery_address_id")
         delivery_latitude = request.data.get("delivery_latitude")
@@ -2164,41 +2186,24 @@ def calculate_checkout(request):
                 {"error": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Initialize calculation variables
-        subtotal = Decimal("0.00")
-        tax_rate = Decimal("0.10")  # 10% tax
-
-        # Calculate subtotal
-        for item in cart_items:
-            # Get the price record
-            try:
-                food_price = FoodPrice.objects.select_related("food", "cook").get(
-                    id=item["price_id"]
-                )
-            except FoodPrice.DoesNotExist:
-                return Response(
-                    {"error": f'Price with ID {item["price_id"]} not found'},
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-
-            # Calculate item total
-            item_total = food_price.price * item["quantity"]
-            subtotal += item_total
+        # Price every line from the price snapshots (one query at most)
+        try:
+            pricing = price_cart(cart_items)
+        except PriceNotFound as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        subtotal = pricing["subtotal"]
+        tax_rate = pricing["tax_rate"]
 
         # Get chef location if not provided
         if not chef_latitude or not chef_longitude:
-            first_item = cart_items[0]
-            try:
-                food_price = FoodPrice.objects.select_related("cook").get(
-                    id=first_item["price_id"]
-                )
-                chef = food_price.cook
-                chef_lat, chef_lng = _resolve_chef_location(chef, request.data)
-                if chef_lat and chef_lng:
-                    chef_latitude = chef_lat
-                    chef_longitude = chef_lng
-            except Exception:
-                pass
+            chef_lat, chef_lng = chef_locations([pricing["chef_id"]])[
+                pricing["chef_id"]
+            ].coordinates
+            if chef_lat and chef_lng:
+                chef_latitude = chef_lat
+                chef_longitude = chef_lng
 
         # Get delivery location if address ID provided
         if delivery_address_id and (not delivery_latitude or not delivery_longitude):
@@ -2232,10 +2237,6 @@ def calculate_checkout(request):
         delivery_fee_result = None
         delivery_fee = Decimal("0.00")
 
-        print(f"\n📍 Coordinates Check:")
-        print(f"   Chef: ({chef_latitude}, {chef_longitude})")
-        print(f"   Delivery: ({delivery_latitude}, {delivery_longitude})")
-
         if (
             chef_latitude
             and chef_longitude
@@ -2243,11 +2244,6 @@ def calculate_checkout(request):
             and delivery_longitude
         ):
             try:
-                print(
-                    f"\n🚀 Calling delivery_fee_calculator.calculate_delivery_fee()..."
-                )
-                print(f"   Order Type: {order_type}")
-
                 logger.info(
                     f"🚀 Calling delivery_fee_calculator with order_type={order_type}"
                 )
@@ -2261,11 +2257,6 @@ def calculate_checkout(request):
                 )
                 delivery_fee = Decimal(str(delivery_fee_result["total_fee"]))
 
-                print(f"\n✅ API Response from calculator:")
-                print(f"   Total Fee: {delivery_fee} LKR")
-                print(f"   Breakdown: {delivery_fee_result.get('breakdown', {})}")
-                print(f"   Factors: {delivery_fee_result.get('factors', {})}")
-
                 logger.info(
                     f"✅ Delivery fee calculated: {delivery_fee} LKR (with surcharges)"
                 )
@@ -2363,35 +2354,27 @@ def calculate_checkout(request):
                 },
             }
 
-        # Calculate tax
-        tax_amount = subtotal * tax_rate
-
-        # Calculate total
-        total_amount = subtotal + delivery_fee + tax_amount
+        quote = save_quote(
+            request.user,
+            pricing,
+            delivery_fee,
+            delivery_fee_result,
+            delivery_address_id,
+        )
 
         response_data = {
             "subtotal": float(subtotal),
             "delivery_fee": float(delivery_fee),
-            "tax_amount": float(tax_amount),
-            "total_amount": float(total_amount),
+            "tax_amount": float(pricing["tax_amount"]),
+            "total_amount": float(Decimal(quote["total_amount"])),
             "tax_rate": float(tax_rate),
+            "quote_id": quote["quote_id"],
         }
 
         # Add delivery fee breakdown if available
         if delivery_fee_result:
             response_data["delivery_fee_breakdown"] = delivery_fee_result
-            print(f"\n📤 SENDING RESPONSE WITH BREAKDOWN:")
-            print(f"   Delivery Fee: {float(delivery_fee)}")
-            print(
-                f"   Night Surcharge: {delivery_fee_result.get('breakdown', {}).get('time_surcharge', 0)}"
-            )
-            print(
-                f"   Is Night: {delivery_fee_result.get('factors', {}).get('is_night_delivery', False)}"
-            )
-        else:
-            print(f"\n⚠️  WARNING: No delivery_fee_breakdown in response!")
 
-        print("\n" + "=" * 80)
         return Response(response_data)
 
     except Exception as e:
@@ -2433,22 +2416,34 @@ def place_order(request):
             f"🛒 Fetching cart for user: {request.user} (ID: {request.user.id if request.user else 'None'})"
         )
 
-        cart_items = CartItem.objects.filter(customer=request.user).select_related(
-            "price__food", "price__cook"
-        )
+        cart_items = fetch_cart(request.user)
 
-        logger.info(f"🛒 Cart items count: {cart_items.count()}")
+        logger.info(f"🛒 Cart items count: {len(cart_items)}")
 
-        if not cart_items.exists():
-            # Check if cart items exist without customer filter to debug
-            all_cart_count = CartItem.objects.count()
-            logger.error(
-                f"❌ Cart is empty for user {request.user.id}. Total cart items in DB: {all_cart_count}"
-            )
+        if not cart_items:
+            logger.error(f"❌ Cart is empty for user {request.user.id}")
             return Response(
                 {"error": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Amounts come from the checkout quote while it still matches the
+        # cart; otherwise the client-sent amounts are used as before
+        quote = quote_for_cart(
+            request.data.get("quote_id"),
+            request.user,
+            cart_items,
+            delivery_address_id if order_type == "delivery" else None,
+        )
+        if quote:
+            subtotal = quote["subtotal"]
+            tax_amount = quote["tax_amount"]
+            if order_type == "delivery":
+                delivery_fee = quote["delivery_fee"]
+                total_amount = quote["total_amount"]
+            else:
+                delivery_fee = 0
+                total_amount = Decimal(subtotal) + Decimal(tax_amount)
+
         # Get delivery address (supports both old UserAddress and new Address systems)
         delivery_address = None
         new_address = None
@@ -2495,8 +2490,8 @@ def place_order(request):
                     )
 
         # Get chef from first cart item
-        first_item = cart_items.first()
-        chef = first_item.price.cook if first_item and first_item.price else None
+        first_item = cart_items[0]
+        chef = first_item.price.cook if first_item.price else None
 
         if not chef:
             return Response(
@@ -2587,49 +2582,21 @@ def place_order(request):
             # Pickup order
             order_data["delivery_address"] = "Pickup"
 
-        # Create order
-        order = Order.objects.create(**order_data)
-
-        logger.info(
-            f"✅ Order {order.order_number} created successfully with status 'pending' for user {request.user.username}"
-        )
-
-        # Create order items from cart
-        for cart_item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                price=cart_item.price,
-                quantity=cart_item.quantity,
-                unit_price=cart_item.price.price,
-                total_price=cart_item.price.price * cart_item.quantity,
-                food_name=cart_item.price.food.name,
-                food_description=cart_item.price.food.description,
-            )
-
-        # Clear cart after order placement
-        cart_items.delete()
-
-        # Create initial status history
+        # Create the order, its items and history and clear the cart in one
+        # transaction; notifications go out once it commits
         status_note = "Order placed successfully. Waiting for chef confirmation. Chef has 10 minutes to accept."
-        OrderStatusHistory.objects.create(
-            order=order,
-            status=initial_status,
-            changed_by=request.user,
-            notes=status_note,
-        )
-
-        # Create notifications
         try:
-            from apps.communications.services.order_notification_service import (
-                OrderNotificationService,
+            order = place_order_from_cart(
+                request.user, cart_items, order_data, status_note
             )
+        except CartChanged as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+        if quote:
+            forget_quote(quote["quote_id"])
 
-            # Notify customer
-            OrderNotificationService.notify_customer_order_placed(order)
-            # Notify chef
-            OrderNotificationService.notify_chef_new_order(order)
-        except Exception as e:
-            logger.error(f"Failed to send order notifications: {str(e)}")
+        logger.info(
+            f"✅ Order {order.order_number} created successfully with status '{order.status}' for user {request.user.username}"
+        )
 
         return Response(
             {
@@ -2649,6 +2616,67 @@ def place_order(request):
 # DELIVERY TRACKING VIEWSET
 # ==========================================
 
+ACTIVE_DELIVERY_STATUSES = ["out_for_delivery", "ready", "preparing"]
+OPEN_ISSUE_STATUSES = ["reported", "acknowledged", "in_progress"]
+
+
+def _display_name(user):
+    return user.get_full_name() or user.name or user.username
+
+
+def _serialize_active_delivery(order, now):
+    """Build the dashboard row for an order annotated by active_deliveries"""
+    customer = order.customer
+    partner = order.delivery_partner
+
+    current_location = None
+    if order.location_timestamp is not None:
+        current_location = {
+            "latitude": float(order.location_latitude),
+            "longitude": float(order.location_longitude),
+            "address": order.location_address,
+            "timestamp": order.location_timestamp.isoformat(),
+        }
+
+    return {
+        "order_id": order.order_number,
+        "order_pk": order.pk,
+        "status": order.status,
+        "customer": {
+            "id": customer.id if customer else None,
+            "name": _display_name(customer) if customer else "Unknown",
+            "phone": getattr(customer, "phone_no", None) if customer else None,
+        },
+        "delivery_partner": (
+            {
+                "id": partner.id,
+                "name": _display_name(partner),
+                "phone": getattr(partner, "phone_no", None),
+            }
+            if partner
+            else None
+        ),
+        "delivery_address": order.delivery_address,
+        "delivery_latitude": (
+            float(order.delivery_latitude) if order.delivery_latitude else None
+        ),
+        "delivery_longitude": (
+            float(order.delivery_longitude) if order.delivery_longitude else None
+        ),
+        "current_location": current_location,
+        "estimated_delivery_time": (
+            order.estimated_delivery_time.isoformat()
+            if order.estimated_delivery_time
+            else None
+        ),
+        "distance_km": float(order.distance_km) if order.distance_km else None,
+        "delivery_fee": float(order.delivery_fee) if order.delivery_fee else 0,
+        "total_amount": float(order.total_amount),
+        "open_issues": order.open_issues,
+        "created_at": order.created_at.isoformat(),
+        "time_elapsed": str(now - order.created_at),
+    }
+
 
 class DeliveryTrackingViewSet(viewsets.ViewSet):
     """
@@ -2662,6 +2690,12 @@ class DeliveryTrackingViewSet(viewsets.ViewSet):
         """
         Get all active deliveries with real-time tracking information
         Admin only - for delivery tracking dashboard
+
+        Query params:
+            page, limit: pagination (limit defaults to 100, max 500)
+            since: ISO timestamp - only return deliveries whose order, location
+                or issues changed after it, plus the pks of orders that left the
+                active set. Clients poll again with the returned ``server_time``.
         """
         try:
             # Admin check
@@ -2670,134 +2704,98 @@ class DeliveryTrackingViewSet(viewsets.ViewSet):
                     {"error": "Admin access required"}, status=status.HTTP_403_FORBIDDEN
                 )
 
-            # Get orders that are actively being delivered
-            active_orders = (
-                Order.objects.filter(
-                    status__in=["out_for_delivery", "ready", "preparing"]
+            try:
+                page = max(int(request.query_params.get("page", 1)), 1)
+                limit = min(max(int(request.query_params.get("limit", 100)), 1), 500)
+            except (TypeError, ValueError):
+                return Response(
+                    {"error": "Invalid pagination parameters"},
+                    status=status.HTTP_400_BAD_REQUEST,
                 )
-                .select_related("customer", "chef", "delivery_partner")
-                .prefetch_related("items__price__food")
-                .order_by("-created_at")
+
+            since = None
+            since_raw = request.query_params.get("since")
+            if since_raw:
+                since = parse_datetime(since_raw.replace(" ", "+"))
+                if since is None:
+                    return Response(
+                        {"error": "Invalid 'since' timestamp, expected ISO 8601"},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                if timezone.is_naive(since):
+                    since = timezone.make_aware(since)
+
+            # Taken before querying so nothing committed meanwhile is skipped
+            # by the next incremental poll.
+            server_time = timezone.now()
+
+            active_orders = Order.objects.filter(status__in=ACTIVE_DELIVERY_STATUSES)
+            if since is not None:
+                active_orders = active_orders.filter(
+                    Q(updated_at__gt=since)
+                    | Exists(
+                        LocationUpdate.objects.filter(
+                            order=OuterRef("pk"), timestamp__gt=since
+                        )
+                    )
+                    | Exists(
+                        DeliveryIssue.objects.filter(
+                            Q(created_at__gt=since) | Q(resolved_at__gt=since),
+                            order=OuterRef("pk"),
+                        )
+                    )
+                )
+
+            total = active_orders.count()
+
+            # Latest location and open issue count are resolved in the same
+            # query instead of two extra queries per order.
+            latest_location = LocationUpdate.objects.filter(
+                order=OuterRef("pk")
+            ).order_by("-timestamp")
+            offset = (page - 1) * limit
+            orders = (
+                active_orders.select_related("customer", "delivery_partner")
+                .annotate(
+                    location_latitude=Subquery(latest_location.values("latitude")[:1]),
+                    location_longitude=Subquery(
+                        latest_location.values("longitude")[:1]
+                    ),
+                    location_address=Subquery(latest_location.values("address")[:1]),
+                    location_timestamp=Subquery(
+                        latest_location.values("timestamp")[:1]
+                    ),
+                    open_issues=Count(
+                        "delivery_issues",
+                        filter=Q(delivery_issues__status__in=OPEN_ISSUE_STATUSES),
+                    ),
+                )
+                .order_by("-created_at")[offset : offset + limit]
             )
 
-            deliveries = []
-            for order in active_orders:
-                # Get latest location update
-                latest_location = LocationUpdate.objects.filter(order=order).first()
+            now = timezone.now()
+            deliveries = [_serialize_active_delivery(order, now) for order in orders]
 
-                # Get open issues
-                open_issues = DeliveryIssue.objects.filter(
-                    order=order,
-                    status__in=["reported", "acknowledged", "in_progress"],
-                ).count()
+            data = {
+                "success": True,
+                "count": total,
+                "page": page,
+                "limit": limit,
+                "num_pages": (total + limit - 1) // limit,
+                "has_next": offset + limit < total,
+                "server_time": server_time.isoformat(),
+                "active_deliveries": deliveries,
+            }
 
-                deliveries.append(
-                    {
-                        "order_id": order.order_number,
-                        "order_pk": order.pk,
-                        "status": order.status,
-                        "customer": {
-                            "id": order.customer.id if order.customer else None,
-                            "name": (
-                                (
-                                    order.customer.get_full_name()
-                                    or order.customer.name
-                                    or order.customer.username
-                                )
-                                if order.customer
-                                else "Unknown"
-                            ),
-                            "phone": (
-                                getattr(order.customer, "phone_no", None)
-                                if order.customer
-                                else None
-                            ),
-                        },
-                        "delivery_partner": (
-                            {
-                                "id": (
-                                    order.delivery_partner.id
-                                    if order.delivery_partner
-                                    else None
-                                ),
-                                "name": (
-                                    (
-                                        order.delivery_partner.get_full_name()
-                                        or order.delivery_partner.name
-                                        or order.delivery_partner.username
-                                    )
-                                    if order.delivery_partner
-                                    else "Unassigned"
-                                ),
-                                "phone": (
-                                    getattr(order.delivery_partner, "phone_no", None)
-                                    if order.delivery_partner
-                                    else None
-                                ),
-                            }
-                            if order.delivery_partner
-                            else None
-                        ),
-                        "delivery_address": order.delivery_address,
-                        "delivery_latitude": (
-                            float(order.delivery_latitude)
-                            if order.delivery_latitude
-                            else None
-                        ),
-                        "delivery_longitude": (
-                            float(order.delivery_longitude)
-                            if order.delivery_longitude
-                            else None
-                        ),
-                        "current_location": (
-                            {
-                                "latitude": (
-                                    float(latest_location.latitude)
-                                    if latest_location
-                                    else None
-                                ),
-                                "longitude": (
-                                    float(latest_location.longitude)
-                                    if latest_location
-                                    else None
-                                ),
-                                "address": (
-                                    latest_location.address if latest_location else None
-                                ),
-                                "timestamp": (
-                                    latest_location.timestamp.isoformat()
-                                    if latest_location
-                                    else None
-                                ),
-                            }
-                            if latest_location
-                            else None
-                        ),
-                        "estimated_delivery_time": (
-                            order.estimated_delivery_time.isoformat()
-                            if order.estimated_delivery_time
-                            else None
-                        ),
-                        "distance_km": (
-                            float(order.distance_km) if order.distance_km else None
-                        ),
-                        "delivery_fee": (
-                            float(order.delivery_fee) if order.delivery_fee else 0
-                        ),
-                        "total_amount": float(order.total_amount),
-                        "open_issues": open_issues,
-                        "created_at": order.created_at.isoformat(),
-                        "time_elapsed": str(timezone.now() - order.created_at),
-                    }
+            if since is not None:
+                # Orders that were delivered/cancelled since the last poll
+                data["removed_order_pks"] = list(
+                    Order.objects.filter(updated_at__gt=since)
+                    .exclude(status__in=ACTIVE_DELIVERY_STATUSES)
+                    .values_list("pk", flat=True)
                 )
 
-            return Response(
-                {
-                    "success": True,
-                    "count": len(deliveries),
-                    "active_deliveries": deliveries,
-                }
-            )
+            return Response(data)
 
         except Exception as e:
             return Response(
@@ -3199,7 +3197,8 @@ class DeliveryTrackingViewSet(viewsets.ViewSet):
     def chat(self, request, pk=None):
         """
         Get or send chat messages for an order
-        GET: Retrieve chat history
+        GET: Retrieve chat history (``?after=<cursor>`` for new messages only,
+             ``?before=<previous_cursor>`` for older ones)
         POST: Send a new message
         """
         try:
@@ -3225,19 +3224,27 @@ class DeliveryTrackingViewSet(viewsets.ViewSet):
                 )
 
             if request.method == "GET":
-                # Get chat messages
-                messages = DeliveryChat.objects.filter(order=order).select_related(
-                    "sender", "receiver"
-                )
-
-                # Mark messages as read for current user
-                DeliveryChat.objects.filter(
-                    order=order, receiver=request.user, is_read=False
-                ).update(is_read=True)
+                # A page after (or before) the client's cursor; marks it read
+                try:
+                    chat = fetch_chat_messages(
+                        order,
+                        request.user,
+                        after=request.query_params.get("after"),
+                        before=request.query_params.get("before"),
+                        limit=request.query_params.get("limit"),
+                    )
+                except ValueError as e:
+                    return Response(
+                        {"error": str(e)}, status=status.HTTP_400_BAD_REQUEST
+                    )
 
                 return Response(
                     {
                         "success": True,
+                        "unread_count": chat["unread_count"],
+                        "has_more": chat["has_more"],
+                        "cursor": chat["cursor"],
+                        "previous_cursor": chat["previous_cursor"],
                         "messages": [
                             {
                                 "message_id": str(msg.message_id),
@@ -3250,7 +3257,7 @@ class DeliveryTrackingViewSet(viewsets.ViewSet):
                                 "is_read": msg.is_read,
                                 "created_at": msg.created_at.isoformat(),
                             }
-                            for msg in messages
+                            for msg in chat["messages"]
                         ],
                     }
                 )
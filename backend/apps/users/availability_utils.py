@@ -1,12 +1,246 @@
 """
 Utility functions for chef availability and operating hours
+
+Operating hours are compiled into a weekly table of open intervals (seconds
+from Monday 00:00 local time) so "is open at t" and "next opening" are a
+bisect instead of re-parsing the JSON. KitchenLocation stores the compiled
+table in ``operating_schedule`` (copied onto the chef's ChefLocation);
+serializers evaluate each chef once per request through ``chef_availability``.
 """
-from datetime import datetime, time
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import datetime, time, timedelta
 import pytz
 
 # Sri Lanka timezone
 LOCAL_TIMEZONE = pytz.timezone('Asia/Colombo')
 
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+DAY_SECONDS = 24 * 60 * 60
+WEEK_SECONDS = 7 * DAY_SECONDS
+# Bump when the compiled layout changes; stale tables are recompiled on read
+SCHEDULE_VERSION = 1
+
+ChefAvailability = namedtuple('ChefAvailability', ['is_open', 'message', 'readable'])
+
+ALWAYS_AVAILABLE = ChefAvailability(True, "Always available", "Hours not specified")
+
+
+def _seconds(value):
+    parsed = datetime.strptime(value, '%H:%M')
+    return parsed.hour * 3600 + parsed.minute * 60
+
+
+def _clock(seconds):
+    seconds %= DAY_SECONDS
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}"
+
+
+def compile_operating_hours(operating_hours):
+    """
+    Compile operating hours into a weekly interval table
+
+    Returns:
+        dict: {
+            "version": SCHEDULE_VERSION,
+            "source": the operating hours it was compiled from,
+            "always_open": True when no hours are set,
+            "days": per weekday (Monday first) "open", "closed", "missing"
+                    or "invalid: <reason>",
+            "intervals": sorted, merged [start, end] pairs in seconds from
+                         Monday 00:00 local time, end inclusive,
+            "readable": format_operating_hours_readable() output,
+        }
+    """
+    compiled = {
+        'version': SCHEDULE_VERSION,
+        'source': operating_hours,
+        'always_open': not operating_hours or not isinstance(operating_hours, dict),
+        'days': [],
+        'intervals': [],
+        'readable': format_operating_hours_readable(operating_hours),
+    }
+    if compiled['always_open']:
+        return compiled
+
+    spans = []
+    for index, day in enumerate(DAYS):
+        day_hours = operating_hours.get(day)
+        if not day_hours:
+            compiled['days'].append('missing')
+            continue
+        if not isinstance(day_hours, dict):
+            compiled['days'].append(f'invalid: expected an object for {day}')
+            continue
+        if not day_hours.get('is_open', True):
+            compiled['days'].append('closed')
+            continue
+        try:
+            open_at = _seconds(day_hours.get('open', '00:00'))
+            close_at = _seconds(day_hours.get('close', '23:59'))
+        except (ValueError, TypeError, AttributeError) as e:
+            compiled['days'].append(f'invalid: {e}')
+            continue
+
+        compiled['days'].append('open')
+        start = index * DAY_SECONDS + open_at
+        end = index * DAY_SECONDS + close_at
+        if close_at < open_at:
+            # Open past midnight: the span runs into the next day
+            end += DAY_SECONDS
+        if end >= WEEK_SECONDS:
+            # Sunday night into Monday morning wraps to the start of the week
+            spans.append([0, end - WEEK_SECONDS])
+            end = WEEK_SECONDS - 1
+        spans.append([start, end])
+
+    for start, end in sorted(spans):
+        intervals = compiled['intervals']
+        if intervals and start <= intervals[-1][1] + 1:
+            intervals[-1][1] = max(intervals[-1][1], end)
+        else:
+            intervals.append([start, end])
+    return compiled
+
+
+class OperatingSchedule:
+    """Open/closed decisions over a compiled operating hours table"""
+
+    def __init__(self, operating_hours, compiled=None):
+        if (
+            not compiled
+            or compiled.get('version') != SCHEDULE_VERSION
+            or compiled.get('source') != operating_hours
+        ):
+            compiled = compile_operating_hours(operating_hours)
+        self.operating_hours = operating_hours
+        self.compiled = compiled
+        self.intervals = compiled['intervals']
+        self._starts = [start for start, _ in self.intervals]
+
+    @property
+    def readable(self):
+        return self.compiled['readable']
+
+    @staticmethod
+    def _local(check_time):
+        if check_time is None:
+            check_time = datetime.now(pytz.UTC)
+        if check_time.tzinfo is None:
+            check_time = pytz.UTC.localize(check_time)
+        local_time = check_time.astimezone(LOCAL_TIMEZONE)
+        offset = (
+            local_time.weekday() * DAY_SECONDS
+            + local_time.hour * 3600
+            + local_time.minute * 60
+            + local_time.second
+        )
+        return local_time, offset
+
+    def _interval_at(self, offset):
+        """Index of the interval containing the week offset, or None"""
+        index = bisect_right(self._starts, offset) - 1
+        if index >= 0 and offset <= self.intervals[index][1]:
+            return index
+        return None
+
+    def _closes_at(self, index):
+        end = self.intervals[index][1]
+        if end == WEEK_SECONDS - 1 and self.intervals[0][0] == 0 and len(self.intervals) > 1:
+            # Split at the week boundary; the real close is Monday morning
+            end = self.intervals[0][1]
+        return end
+
+    def _next_start(self, offset):
+        """Seconds from the week offset until the next opening, or None"""
+        if not self.intervals:
+            return None
+        index = bisect_right(self._starts, offset)
+        if index < len(self._starts):
+            return self._starts[index] - offset
+        return self._starts[0] + WEEK_SECONDS - offset
+
+    def is_open(self, check_time=None):
+        if self.compiled['always_open']:
+            return True
+        _, offset = self._local(check_time)
+        return self._interval_at(offset) is not None
+
+    def next_open(self, check_time=None):
+        """
+        Local datetime the kitchen is next open: check_time itself when open
+        now, None when it never opens
+        """
+        local_time, offset = self._local(check_time)
+        if self.compiled['always_open'] or self._interval_at(offset) is not None:
+            return local_time
+        wait = self._next_start(offset)
+        if wait is None:
+            return None
+        return LOCAL_TIMEZONE.normalize(local_time + timedelta(seconds=wait))
+
+    def status(self, check_time=None):
+        """Same contract as is_within_operating_hours: (is_open, message, current_day_hours)"""
+        if self.compiled['always_open']:
+            return True, "Always available", None
+
+        local_time, offset = self._local(check_time)
+        day_index = local_time.weekday()
+        current_day = DAYS[day_index]
+        day_hours = self.operating_hours.get(current_day)
+
+        index = self._interval_at(offset)
+        if index is not None:
+            return True, f"Open until {_clock(self._closes_at(index))}", day_hours
+
+        day_state = self.compiled['days'][day_index]
+        if day_state == 'missing':
+            return False, f"No operating hours set for {current_day.capitalize()}", None
+        if day_state == 'closed':
+            return False, f"Closed on {current_day.capitalize()}", day_hours
+        if day_state.startswith('invalid: '):
+            return False, f"Invalid operating hours format: {day_state[9:]}", day_hours
+
+        wait = self._next_start(offset)
+        if wait is None:
+            return False, "Closed", day_hours
+        opens = offset + wait
+        days_ahead = opens // DAY_SECONDS - offset // DAY_SECONDS
+        if days_ahead == 0:
+            return False, f"Opens at {_clock(opens)}", day_hours
+        if days_ahead == 1:
+            return False, f"Closed (opens tomorrow at {_clock(opens)})", day_hours
+        opening_day = DAYS[(opens // DAY_SECONDS) % 7].capitalize()
+        return False, f"Closed (opens {opening_day} at {_clock(opens)})", day_hours
+
+
+def chef_availability(chef_id, memo=None, check_time=None):
+    """
+    Availability of the chef's default kitchen as a ChefAvailability
+
+    Args:
+        chef_id: User id of the chef
+        memo: dict kept for the request (e.g. the serializer context) so
+              each chef is looked up and evaluated once per response
+        check_time: datetime object (optional, defaults to current time)
+    """
+    if memo is not None and chef_id in memo:
+        return memo[chef_id]
+
+    from .kitchen_location_utils import chef_location
+
+    location = chef_location(chef_id)
+    schedule = location.schedule if location else None
+    if schedule is not None:
+        is_open, message, _ = schedule.status(check_time)
+        availability = ChefAvailability(is_open, message, schedule.readable)
+    else:
+        availability = ALWAYS_AVAILABLE
+
+    if memo is not None:
+        memo[chef_id] = availability
+    return availability
+
 
 def is_within_operating_hours(operating_hours, check_time=None):
     """
@@ -24,58 +258,7 @@ def is_within_operating_hours(operating_hours, check_time=None):
     Returns:
         tuple: (is_open, message, current_day_hours)
     """
-    if not operating_hours or not isinstance(operating_hours, dict):
-        # If no hours specified, assume always available
-        return True, "Always available", None
-    
-    # Get current time in Sri Lanka timezone
-    if check_time is None:
-        check_time = datetime.now(pytz.UTC)
-    
-    if check_time.tzinfo is None:
-        check_time = pytz.UTC.localize(check_time)
-    
-    local_time = check_time.astimezone(LOCAL_TIMEZONE)
-    current_day = local_time.strftime('%A').lower()  # monday, tuesday, etc.
-    current_time_only = local_time.time()
-    
-    # Get today's hours
-    day_hours = operating_hours.get(current_day)
-    
-    if not day_hours:
-        return False, f"No operating hours set for {current_day.capitalize()}", None
-    
-    # Check if marked as closed
-    if not day_hours.get('is_open', True):
-        return False, f"Closed on {current_day.capitalize()}", day_hours
-    
-    # Parse opening and closing times
-    try:
-        open_time_str = day_hours.get('open', '00:00')
-        close_time_str = day_hours.get('close', '23:59')
-        
-        open_time = datetime.strptime(open_time_str, '%H:%M').time()
-        close_time = datetime.strptime(close_time_str, '%H:%M').time()
-        
-        # Handle cases where closing time is after midnight
-        if close_time < open_time:
-            # Restaurant open past midnight
-            if current_time_only >= open_time or current_time_only <= close_time:
-                return True, f"Open until {close_time_str}", day_hours
-            else:
-                return False, f"Opens at {open_time_str}", day_hours
-        else:
-            # Normal hours
-            if open_time <= current_time_only <= close_time:
-                return True, f"Open until {close_time_str}", day_hours
-            else:
-                if current_time_only < open_time:
-                    return False, f"Opens at {open_time_str}", day_hours
-                else:
-                    return False, f"Closed (opens tomorrow at {open_time_str})", day_hours
-                    
-    except (ValueError, KeyError) as e:
-        return False, f"Invalid operating hours format: {str(e)}", day_hours
+    return OperatingSchedule(operating_hours).status(check_time)
 
 
 def format_operating_hours_readable(operating_hours):
@@ -109,8 +292,8 @@ def format_operating_hours_readable(operating_hours):
     for day in days_order:
         day_hours = operating_hours.get(day, {})
         
-        if not day_hours.get('is_open', True):
-            # Day is closed
+        if not isinstance(day_hours, dict) or not day_hours.get('is_open', True):
+            # Day is closed (or malformed, e.g. "closed" instead of an object)
             if current_group:
                 groups.append(current_group)
                 current_group = None
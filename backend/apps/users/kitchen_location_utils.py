@@ -0,0 +1,227 @@
+"""
+Utility functions for chef kitchen locations
+
+A chef's kitchen can be described by a kitchen Address (with its
+KitchenLocation details), the coordinates on the Cook profile, a legacy
+"lat,lng" Cook.kitchen_location string or a saved orders.UserAddress. They
+are resolved once, in that order, into a ChefLocation row per chef which
+signals keep up to date. Checkout, tracking, menus and the delivery feed
+read those rows in bulk through ``chef_locations``: one query for the chefs
+not yet in the per-request memo, none for the rest.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.apps import apps as django_apps
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+
+# Cook fields that feed the kitchen location
+COOK_LOCATION_FIELDS = {'kitchen_latitude', 'kitchen_longitude', 'kitchen_location'}
+
+
+def _coordinate(value):
+    try:
+        return Decimal(str(value).strip()).quantize(Decimal('0.000001'))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _parse_lat_lng(text):
+    """(lat, lng) Decimals from a legacy "lat,lng" string, else (None, None)"""
+    if not isinstance(text, str) or text.count(',') != 1:
+        return None, None
+    lat, lng = (_coordinate(part) for part in text.split(','))
+    if lat is None or lng is None or abs(lat) > 90 or abs(lng) > 180:
+        return None, None
+    return lat, lng
+
+
+def _format_address(address):
+    """Address.full_address, spelled out so historical models work too"""
+    parts = [address.address_line1]
+    if address.address_line2:
+        parts.append(address.address_line2)
+    if address.landmark:
+        parts.append(f"Near {address.landmark}")
+    parts.extend([address.city, address.state, address.country, address.pincode])
+    return ', '.join(part for part in parts if part)
+
+
+def _format_user_address(address):
+    parts = [address.address_line1, address.address_line2, address.city]
+    if address.pincode and address.pincode != '000000':
+        parts.append(address.pincode)
+    return ', '.join(part for part in parts if part)
+
+
+def build_chef_location(chef_id, registry=django_apps):
+    """
+    Resolve a chef's kitchen from its sources
+
+    Args:
+        chef_id: Chef user id
+        registry: App registry to load models from (migrations pass theirs)
+
+    Returns:
+        dict: ChefLocation field values
+    """
+    from .availability_utils import compile_operating_hours
+
+    Address = registry.get_model('users', 'Address')
+    Cook = registry.get_model('authentication', 'Cook')
+    UserAddress = registry.get_model('orders', 'UserAddress')
+
+    values = {
+        'latitude': None,
+        'longitude': None,
+        'address': '',
+        'city': '',
+        'state': '',
+        'kitchen_name': '',
+        'operating_hours': {},
+        'operating_schedule': {},
+        'delivery_radius_km': None,
+        'source': 'none',
+    }
+
+    kitchen = (
+        Address.objects.filter(user_id=chef_id, address_type='kitchen', is_active=True)
+        .select_related('kitchen_details')
+        .order_by('-is_default', '-created_at')
+        .first()
+    )
+    if kitchen:
+        values.update(
+            address=_format_address(kitchen), city=kitchen.city, state=kitchen.state
+        )
+        details = getattr(kitchen, 'kitchen_details', None)
+        if details:
+            values.update(
+                kitchen_name=details.kitchen_name,
+                operating_hours=details.operating_hours or {},
+                operating_schedule=(
+                    details.operating_schedule or compile_operating_hours(details.operating_hours)
+                ),
+                delivery_radius_km=details.delivery_radius_km,
+            )
+        if kitchen.latitude is not None and kitchen.longitude is not None:
+            values.update(latitude=kitchen.latitude, longitude=kitchen.longitude, source='address')
+            return values
+
+    cook = (
+        Cook.objects.filter(user_id=chef_id)
+        .values_list('kitchen_latitude', 'kitchen_longitude', 'kitchen_location')
+        .first()
+    )
+    if cook:
+        lat, lng, text = cook
+        legacy_lat, legacy_lng = _parse_lat_lng(text)
+        if lat is None or lng is None:
+            lat, lng = legacy_lat, legacy_lng
+        if text and legacy_lat is None and not values['address']:
+            values['address'] = text
+        if lat is not None and lng is not None:
+            values.update(latitude=lat, longitude=lng, source='cook')
+            return values
+
+    saved = (
+        UserAddress.objects.filter(
+            user_id=chef_id, latitude__isnull=False, longitude__isnull=False
+        )
+        .order_by(
+            Case(When(label='Kitchen', then=Value(0)), default=Value(1), output_field=IntegerField()),
+            '-is_default',
+            '-created_at',
+        )
+        .first()
+    )
+    if saved:
+        values.update(latitude=saved.latitude, longitude=saved.longitude, source='user_address')
+        if not values['address']:
+            values.update(
+                address=_format_user_address(saved),
+                city=saved.city,
+                state=saved.state or '',
+            )
+    return values
+
+
+def refresh_chef_location(chef_id, create=True):
+    """
+    Rebuild the stored ChefLocation of a chef
+
+    Args:
+        chef_id: Chef user id
+        create: Create the row if missing; otherwise only an existing row
+                is updated (used while rows may be cascading away)
+
+    Returns:
+        ChefLocation or None
+    """
+    from .models import ChefLocation
+
+    if not create:
+        if not ChefLocation.objects.filter(pk=chef_id).exists():
+            return None
+        ChefLocation.objects.filter(pk=chef_id).update(
+            updated_at=timezone.now(), **build_chef_location(chef_id)
+        )
+        return None
+
+    location, _ = ChefLocation.objects.update_or_create(
+        chef_id=chef_id, defaults=build_chef_location(chef_id)
+    )
+    return location
+
+
+def chef_locations(chef_ids, memo=None):
+    """
+    Stored kitchen locations of several chefs
+
+    Args:
+        chef_ids: Iterable of chef user ids (None entries are ignored)
+        memo: Optional dict kept for the request; chefs already in it cost
+              no query
+
+    Returns:
+        dict: {chef_id: ChefLocation}
+    """
+    from .models import ChefLocation
+
+    memo = {} if memo is None else memo
+    chef_ids = [chef_id for chef_id in chef_ids if chef_id is not None]
+    missing = {chef_id for chef_id in chef_ids if chef_id not in memo}
+    if missing:
+        found = ChefLocation.objects.in_bulk(missing)
+        # Chefs never resolved before are filled in once
+        for chef_id in missing - found.keys():
+            found[chef_id] = refresh_chef_location(chef_id)
+        memo.update(found)
+    return {chef_id: memo[chef_id] for chef_id in chef_ids}
+
+
+def chef_location(chef_id, memo=None):
+    """Stored kitchen location of one chef (see chef_locations)"""
+    if chef_id is None:
+        return None
+    return chef_locations([chef_id], memo)[chef_id]
+
+
+def context_chef_location(context, chef_id, batch=()):
+    """
+    Stored kitchen location of a chef, memoized in a serializer context
+
+    Args:
+        context: Serializer context; the memo is kept under 'kitchen_locations'
+        chef_id: Chef user id
+        batch: Other chef ids in the same response, fetched along on a miss
+
+    Returns:
+        ChefLocation or None
+    """
+    if chef_id is None:
+        return None
+    memo = context.setdefault('kitchen_locations', {})
+    if chef_id not in memo:
+        chef_locations({chef_id, *batch}, memo)
+    return memo[chef_id]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:01
+
+from django.db import migrations, models
+
+
+def compile_schedules(apps, schema_editor):
+    from apps.users.availability_utils import compile_operating_hours
+
+    KitchenLocation = apps.get_model('users', 'KitchenLocation')
+    kitchens = list(KitchenLocation.objects.only('pk', 'operating_hours'))
+    for kitchen in kitchens:
+        kitchen.operating_schedule = compile_operating_hours(kitchen.operating_hours)
+    KitchenLocation.objects.bulk_update(kitchens, ['operating_schedule'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kitchenlocation',
+            name='operating_schedule',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Weekly open intervals compiled from operating_hours on save'),
+        ),
+        migrations.RunPython(compile_schedules, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_chef_locations(apps, schema_editor):
+    from apps.users.kitchen_location_utils import build_chef_location
+
+    User = apps.get_model('authentication', 'User')
+    Address = apps.get_model('users', 'Address')
+    Cook = apps.get_model('authentication', 'Cook')
+    ChefLocation = apps.get_model('users', 'ChefLocation')
+
+    chef_ids = set(User.objects.filter(role__iexact='cook').values_list('pk', flat=True))
+    chef_ids.update(Cook.objects.values_list('user_id', flat=True))
+    chef_ids.update(Address.objects.filter(address_type='kitchen').values_list('user_id', flat=True))
+    ChefLocation.objects.bulk_create(
+        [ChefLocation(chef_id=chef_id, **build_chef_location(chef_id, apps)) for chef_id in chef_ids],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0008_document_conversion_job'),
+        ('orders', '0024_locationupdate_agent_timestamp_index'),
+        ('users', '0002_kitchenlocation_operating_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChefLocation',
+            fields=[
+                ('chef', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='kitchen_cache', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('latitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('address', models.TextField(blank=True)),
+                ('city', models.CharField(blank=True, max_length=100)),
+                ('state', models.CharField(blank=True, max_length=100)),
+                ('kitchen_name', models.CharField(blank=True, max_length=200)),
+                ('operating_hours', models.JSONField(blank=True, default=dict)),
+                ('operating_schedule', models.JSONField(blank=True, default=dict)),
+                ('delivery_radius_km', models.PositiveIntegerField(blank=True, null=True)),
+                ('source', models.CharField(choices=[('address', 'Kitchen Address'), ('cook', 'Cook Profile'), ('user_address', 'Saved Address'), ('none', 'Not Set')], default='none', max_length=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'chef_locations',
+                'indexes': [models.Index(fields=['latitude', 'longitude'], name='chef_locati_latitud_d3abf7_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_chef_locations, migrations.RunPython.noop),
+    ]
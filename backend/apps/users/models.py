@@ -326,6 +326,10 @@ class KitchenLocation(models.Model):
     
     # Operational Details
     operating_hours = models.JSONField(default=dict, blank=True, help_text='Operating hours for each day')
+    operating_schedule = models.JSONField(
+        default=dict, blank=True, editable=False,
+        help_text='Weekly open intervals compiled from operating_hours on save'
+    )
     max_orders_per_day = models.PositiveIntegerField(default=50, help_text='Maximum orders this kitchen can handle per day')
     delivery_radius_km = models.PositiveIntegerField(default=10, help_text='Maximum delivery radius in kilometers')
     
@@ -338,6 +342,22 @@ class KitchenLocation(models.Model):
     verification_notes = models.TextField(blank=True)
     verified_at = models.DateTimeField(null=True, blank=True)
     
+    def save(self, *args, **kwargs):
+        from .availability_utils import compile_operating_hours
+
+        self.operating_schedule = compile_operating_hours(self.operating_hours)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'operating_hours' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'operating_schedule'}
+        super().save(*args, **kwargs)
+    
+    @property
+    def schedule(self):
+        """OperatingSchedule over the stored table (recompiled if out of date)"""
+        from .availability_utils import OperatingSchedule
+
+        return OperatingSchedule(self.operating_hours, self.operating_schedule)
+    
     def __str__(self):
         return f"{self.kitchen_name} - {self.address.user.username}"
     
@@ -381,4 +401,56 @@ class DeliveryAgentLocation(models.Model):
         return f"{self.address.user.username} - {self.get_location_type_display()}"
     
     class Meta:
-        db_table = 'delivery_agent_locations'
\ No newline at end of file
+        db_table = 'delivery_agent_locations'
+
+class ChefLocation(models.Model):
+    """
+    Denormalized kitchen location per chef, resolved from the kitchen
+    Address/KitchenLocation, the Cook profile and legacy UserAddress rows.
+    Maintained by signals; read through kitchen_location_utils.
+    """
+    
+    chef = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='kitchen_cache'
+    )
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    address = models.TextField(blank=True)
+    city = models.CharField(max_length=100, blank=True)
+    state = models.CharField(max_length=100, blank=True)
+    kitchen_name = models.CharField(max_length=200, blank=True)
+    operating_hours = models.JSONField(default=dict, blank=True)
+    operating_schedule = models.JSONField(default=dict, blank=True)
+    delivery_radius_km = models.PositiveIntegerField(null=True, blank=True)
+    source = models.CharField(max_length=20, choices=[
+        ('address', 'Kitchen Address'),
+        ('cook', 'Cook Profile'),
+        ('user_address', 'Saved Address'),
+        ('none', 'Not Set'),
+    ], default='none')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    @property
+    def coordinates(self):
+        """(lat, lng) as floats, or (None, None) when unknown"""
+        if self.latitude is None or self.longitude is None:
+            return None, None
+        return float(self.latitude), float(self.longitude)
+    
+    @property
+    def schedule(self):
+        """OperatingSchedule of the kitchen, None when it has no KitchenLocation"""
+        from .availability_utils import OperatingSchedule
+
+        if not self.operating_schedule:
+            return None
+        return OperatingSchedule(self.operating_hours, self.operating_schedule)
+    
+    def __str__(self):
+        return f"{self.chef_id} - {self.address or self.get_source_display()}"
+    
+    class Meta:
+        db_table = 'chef_locations'
+        indexes = [
+            models.Index(fields=['latitude', 'longitude']),
+        ]
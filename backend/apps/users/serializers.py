@@ -137,13 +137,16 @@ class ChefProfileSerializer(serializers.ModelSerializer):
             print(f"Error getting operating hours: {str(e)}")
         return None
     
+    def _availability(self, obj):
+        """Chef's availability, evaluated once per chef for the whole response"""
+        from .availability_utils import chef_availability
+        
+        return chef_availability(obj.user_id, self.context.setdefault('chef_availability', {}))
+    
     def get_operating_hours_readable(self, obj):
         """Get human-readable operating hours"""
         try:
-            from .availability_utils import format_operating_hours_readable
-            
-            operating_hours = self.get_operating_hours(obj)
-            return format_operating_hours_readable(operating_hours)
+            return self._availability(obj).readable
         except Exception as e:
             print(f"Error formatting operating hours: {str(e)}")
             return "Hours not available"
@@ -151,11 +154,7 @@ class ChefProfileSerializer(serializers.ModelSerializer):
     def get_is_currently_open(self, obj):
         """Check if chef is currently accepting orders"""
         try:
-            from .availability_utils import is_within_operating_hours
-            
-            operating_hours = self.get_operating_hours(obj)
-            is_open, _, _ = is_within_operating_hours(operating_hours)
-            return is_open
+            return self._availability(obj).is_open
         except Exception as e:
             print(f"Error checking if currently open: {str(e)}")
             return True  # Default to open if error
@@ -163,11 +162,7 @@ class ChefProfileSerializer(serializers.ModelSerializer):
     def get_availability_message(self, obj):
         """Get current availability status message"""
         try:
-            from .availability_utils import is_within_operating_hours
-            
-            operating_hours = self.get_operating_hours(obj)
-            _, message, _ = is_within_operating_hours(operating_hours)
-            return message
+            return self._availability(obj).message
         except Exception as e:
             print(f"Error getting availability message: {str(e)}")
             return "Available"
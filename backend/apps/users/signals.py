@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .kitchen_location_utils import COOK_LOCATION_FIELDS, refresh_chef_location
+from .models import Address, KitchenLocation
+
+
+@receiver(post_save, sender=Address)
+def refresh_location_on_address_save(sender, instance, **kwargs):
+    """Keep ChefLocation in step with the chef's kitchen addresses"""
+    refresh_chef_location(instance.user_id, create=instance.address_type == 'kitchen')
+
+
+@receiver(post_delete, sender=Address)
+def refresh_location_on_address_delete(sender, instance, **kwargs):
+    refresh_chef_location(instance.user_id, create=False)
+
+
+@receiver(post_save, sender=KitchenLocation)
+@receiver(post_delete, sender=KitchenLocation)
+def refresh_location_on_kitchen_change(sender, instance, signal, **kwargs):
+    """Kitchen name, hours and radius live on KitchenLocation"""
+    try:
+        user_id = instance.address.user_id
+    except Address.DoesNotExist:
+        return
+    refresh_chef_location(user_id, create=signal is post_save)
+
+
+@receiver(post_save, sender='authentication.Cook')
+def refresh_location_on_cook_save(sender, instance, update_fields=None, **kwargs):
+    """Cook profile coordinates; saves of unrelated fields are skipped"""
+    if update_fields is not None and not COOK_LOCATION_FIELDS & set(update_fields):
+        return
+    refresh_chef_location(instance.user_id)
+
+
+@receiver(post_save, sender='orders.UserAddress')
+@receiver(post_delete, sender='orders.UserAddress')
+def refresh_location_on_user_address_change(sender, instance, **kwargs):
+    """Legacy saved addresses only update chefs that already have a row"""
+    refresh_chef_location(instance.user_id, create=False)
@@ -1,3 +1,241 @@
+from datetime import datetime
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from apps.authentication.models import Cook
+from apps.orders.models import UserAddress
+
+from .availability_utils import (
+    LOCAL_TIMEZONE,
+    OperatingSchedule,
+    chef_availability,
+    compile_operating_hours,
+    is_within_operating_hours,
+)
+from .kitchen_location_utils import chef_locations
+from .models import Address, ChefLocation, KitchenLocation
+
+User = get_user_model()
+
+HOURS = {
+    "monday": {"open": "09:00", "close": "21:00", "is_open": True},
+    "tuesday": {"open": "09:00", "close": "21:00", "is_open": True},
+    "wednesday": {"open": "09:00", "close": "21:00", "is_open": True},
+    "thursday": {"open": "09:00", "close": "21:00", "is_open": True},
+    "friday": {"open": "09:00", "close": "21:00", "is_open": True},
+    "saturday": {"open": "10:00", "close": "14:00", "is_open": False},
+    "sunday": {"open": "18:00", "close": "02:00", "is_open": True},
+}
+
+
+def local(day, hour, minute=0):
+    """Local time on the week of Monday 2026-10-12"""
+    return LOCAL_TIMEZONE.localize(datetime(2026, 10, 12 + day, hour, minute))
+
+
+class OperatingScheduleTest(TestCase):
+    """Test the compiled weekly operating hours table"""
+
+    def setUp(self):
+        self.schedule = OperatingSchedule(HOURS)
+
+    def test_open_and_closed_messages(self):
+        """Test the status messages around a normal day"""
+        self.assertEqual(self.schedule.status(local(2, 10))[:2], (True, "Open until 21:00"))
+        self.assertEqual(self.schedule.status(local(2, 8))[:2], (False, "Opens at 09:00"))
+        self.assertEqual(
+            self.schedule.status(local(2, 22))[:2],
+            (False, "Closed (opens tomorrow at 09:00)"),
+        )
+        self.assertEqual(
+            self.schedule.status(local(4, 22))[:2],
+            (False, "Closed (opens Sunday at 18:00)"),
+        )
+        self.assertEqual(self.schedule.status(local(5, 12))[:2], (False, "Closed on Saturday"))
+
+    def test_overnight_hours_wrap_into_monday(self):
+        """Test that Sunday's late hours carry over the week boundary"""
+        self.assertEqual(self.schedule.status(local(6, 23))[:2], (True, "Open until 02:00"))
+        self.assertEqual(self.schedule.status(local(7, 1))[:2], (True, "Open until 02:00"))
+        self.assertFalse(self.schedule.is_open(local(7, 3)))
+
+    def test_next_open(self):
+        """Test the next opening time"""
+        self.assertEqual(self.schedule.next_open(local(2, 10)), local(2, 10))
+        self.assertEqual(self.schedule.next_open(local(5, 12)), local(6, 18))
+        self.assertIsNone(OperatingSchedule({"monday": {"is_open": False}}).next_open(local(0, 12)))
+
+    def test_missing_and_empty_hours(self):
+        """Test the fallbacks of is_within_operating_hours"""
+        self.assertEqual(is_within_operating_hours({}), (True, "Always available", None))
+        self.assertEqual(
+            is_within_operating_hours({"monday": HOURS["monday"]}, local(1, 10)),
+            (False, "No operating hours set for Tuesday", None),
+        )
+        is_open, message, _ = is_within_operating_hours(
+            {"monday": {"open": "9am", "close": "21:00"}}, local(0, 10)
+        )
+        self.assertFalse(is_open)
+        self.assertTrue(message.startswith("Invalid operating hours format"))
+
+    def test_malformed_day_is_invalid_not_an_error(self):
+        """Test that a day given as a string compiles instead of raising"""
+        compiled = compile_operating_hours({"monday": "closed", "tuesday": HOURS["monday"]})
+        self.assertTrue(compiled["days"][0].startswith("invalid"))
+        self.assertEqual(compiled["days"][1], "open")
+        self.assertTrue(compiled["readable"].startswith("Tue: 09:00 AM - 09:00 PM"))
+
+    def test_stale_table_is_recompiled(self):
+        """Test that a table compiled from other hours is not trusted"""
+        compiled = compile_operating_hours({})
+        self.assertTrue(OperatingSchedule(HOURS, compiled).compiled["intervals"])
+
+
+class ChefAvailabilityTest(TestCase):
+    """Test the stored schedule and the per-request availability memo"""
+
+    def setUp(self):
+        self.chef = User.objects.create_user(
+            email="hours_chef@test.com",
+            password="hourspass123",
+            name="Hours Chef",
+            role="cook",
+        )
+        address = Address.objects.create(
+            user=self.chef,
+            address_type="kitchen",
+            label="Kitchen",
+            address_line1="1 Main Street",
+            city="Colombo",
+            state="Western",
+            pincode="100001",
+            is_default=True,
+        )
+        self.kitchen = KitchenLocation.objects.create(
+            address=address,
+            kitchen_name="Hours Kitchen",
+            contact_number="0771234567",
+            operating_hours=HOURS,
+        )
+
+    def test_schedule_is_stored_on_save(self):
+        """Test that saving the kitchen compiles its operating hours"""
+        self.kitchen.refresh_from_db()
+        self.assertEqual(self.kitchen.operating_schedule["source"], HOURS)
+        self.assertIs(self.kitchen.schedule.compiled, self.kitchen.operating_schedule)
+
+    def test_memo_evaluates_each_chef_once(self):
+        """Test that repeated lookups for a chef hit the database once"""
+        memo = {}
+        with self.assertNumQueries(1):
+            first = chef_availability(self.chef.pk, memo, local(2, 10))
+            for _ in range(10):
+                self.assertIs(chef_availability(self.chef.pk, memo), first)
+
+        self.assertTrue(first.is_open)
+        self.assertEqual(first.message, "Open until 21:00")
+        self.assertTrue(first.readable.startswith("Mon-Fri: 09:00 AM - 09:00 PM"))
+
+
+class ChefLocationTest(TestCase):
+    """Test the denormalized kitchen location kept per chef"""
+
+    def setUp(self):
+        self.chef = User.objects.create_user(
+            email="location_chef@test.com",
+            password="locationpass123",
+            name="Location Chef",
+            role="cook",
+        )
+
+    def add_kitchen(self, user, **fields):
+        return Address.objects.create(
+            user=user,
+            address_type="kitchen",
+            label=fields.pop("label", "Kitchen"),
+            address_line1="1 Main Street",
+            city="Colombo",
+            state="Western",
+            pincode="100001",
+            is_default=True,
+            **fields,
+        )
+
+    def test_cook_profile_coordinates(self):
+        """Test that Cook coordinates are used, then a legacy "lat,lng" string"""
+        Cook.objects.update_or_create(
+            user=self.chef,
+            defaults={"kitchen_latitude": Decimal("6.9271"), "kitchen_longitude": Decimal("79.8612")},
+        )
+        location = ChefLocation.objects.get(pk=self.chef.pk)
+        self.assertEqual((location.source, location.coordinates), ("cook", (6.9271, 79.8612)))
+
+        Cook.objects.filter(user=self.chef).update(
+            kitchen_latitude=None, kitchen_longitude=None, kitchen_location="6.9,79.85"
+        )
+        Cook.objects.get(user=self.chef).save(update_fields=["kitchen_location"])
+        self.assertEqual(ChefLocation.objects.get(pk=self.chef.pk).coordinates, (6.9, 79.85))
+
+    def test_kitchen_address_takes_precedence(self):
+        """Test that the kitchen Address and its details win over other sources"""
+        Cook.objects.update_or_create(
+            user=self.chef,
+            defaults={"kitchen_latitude": Decimal("6.9271"), "kitchen_longitude": Decimal("79.8612")},
+        )
+        address = self.add_kitchen(self.chef, latitude=Decimal("7.2906"), longitude=Decimal("80.6337"))
+        KitchenLocation.objects.create(
+            address=address,
+            kitchen_name="Hill Kitchen",
+            contact_number="0771234567",
+            operating_hours=HOURS,
+            delivery_radius_km=8,
+        )
+
+        location = ChefLocation.objects.get(pk=self.chef.pk)
+        self.assertEqual(location.source, "address")
+        self.assertEqual(location.coordinates, (7.2906, 80.6337))
+        self.assertEqual(location.address, address.full_address)
+        self.assertEqual((location.kitchen_name, location.delivery_radius_km), ("Hill Kitchen", 8))
+        self.assertFalse(chef_availability(self.chef.pk, check_time=local(5, 12)).is_open)
+
+        address.delete()
+        location.refresh_from_db()
+        self.assertEqual(location.source, "cook")
+        self.assertEqual(location.kitchen_name, "")
+
+    def test_saved_user_address_fallback(self):
+        """Test that legacy saved addresses fill in when nothing else is set"""
+        self.assertEqual(chef_locations([self.chef.pk])[self.chef.pk].source, "none")
+        UserAddress.objects.create(
+            user=self.chef,
+            label="Kitchen",
+            address_line1="9 Lake Road",
+            city="Kandy",
+            pincode="000000",
+            latitude=Decimal("7.2906"),
+            longitude=Decimal("80.6337"),
+        )
+        location = ChefLocation.objects.get(pk=self.chef.pk)
+        self.assertEqual(location.source, "user_address")
+        self.assertEqual(location.address, "9 Lake Road, Kandy")
+
+    def test_bulk_lookup_and_memo(self):
+        """Test that several chefs cost one query and memoized ones none"""
+        chefs = [self.chef] + [
+            User.objects.create_user(
+                email=f"bulk_chef{i}@test.com", password="bulkpass123", name=f"Chef {i}", role="cook"
+            )
+            for i in range(3)
+        ]
+        for i, chef in enumerate(chefs):
+            self.add_kitchen(chef, latitude=Decimal("6.9") + i, longitude=Decimal("79.8"))
+
+        memo = {}
+        with self.assertNumQueries(1):
+            found = chef_locations([chef.pk for chef in chefs], memo)
+        self.assertEqual([found[chef.pk].coordinates[0] for chef in chefs], [6.9, 7.9, 8.9, 9.9])
+        with self.assertNumQueries(0):
+            chef_locations([chef.pk for chef in chefs], memo)
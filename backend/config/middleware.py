@@ -1,10 +1,16 @@
 """
-Custom middleware for handling security headers and CORS policies
+Custom middleware for handling security headers, CORS policies and
+request profiling
 """
 
+import random
 import re
+import time
+from contextlib import ExitStack
 
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.utils.deprecation import MiddlewareMixin
 
 
@@ -55,3 +61,54 @@ class DisableCSRFMiddleware(MiddlewareMixin):
                     setattr(request, "_dont_enforce_csrf_checks", True)
                     break
         return None
+
+
+class RequestProfilingMiddleware:
+    """
+    Opt-in (REQUEST_PROFILING=True) per-request profiler.
+
+    Records the resolved view, total latency, DB query count/time and
+    repeated query fingerprints of sampled requests into
+    ``utils.request_profiling.profile_store`` and adds a ``Server-Timing``
+    header. Reports: /api/admin-management/performance/requests/ and
+    ``manage.py request_profile_report``.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_PROFILING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "REQUEST_PROFILING_SAMPLE_RATE", 1.0)
+
+    def __call__(self, request):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        from utils.request_profiling import QueryRecorder, profile_store
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        profile_store.record(
+            self.view_name(request),
+            latency_ms,
+            recorder,
+            error=response.status_code >= 500,
+        )
+        response["Server-Timing"] = (
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+            f"total;dur={latency_ms:.1f}"
+        )
+        return response
+
+    @staticmethod
+    def view_name(request):
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "<unresolved>"
+        return f"{request.method} {match.view_name or match._func_path}"
@@ -79,6 +79,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "config.middleware.RequestProfilingMiddleware",  # No-op unless REQUEST_PROFILING
     "config.middleware.SecurityHeadersMiddleware",  # Custom security headers for OAuth
     "config.middleware.DisableCSRFMiddleware",  # Custom CSRF exemption for development
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -180,7 +181,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.authentication.authentication.CustomJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
         "rest_framework.authentication.BasicAuthentication",
     ],
@@ -218,6 +219,22 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
 }
 
+# Per-process cache of users resolved from access tokens (seconds / entries).
+# Saves invalidate it locally; other workers see changes after the TTL.
+JWT_USER_CACHE_TTL = config("JWT_USER_CACHE_TTL", default=30, cast=int)
+JWT_USER_CACHE_SIZE = config("JWT_USER_CACHE_SIZE", default=10000, cast=int)
+
+# Refresh token revocations made by other workers are picked up this often;
+# 0 checks the jwt_tokens row on every refresh instead.
+JWT_REVOCATION_SYNC_SECONDS = config("JWT_REVOCATION_SYNC_SECONDS", default=5, cast=int)
+# Refresh token last_used_at/usage_count are written in batches
+JWT_USAGE_FLUSH_SECONDS = config("JWT_USAGE_FLUSH_SECONDS", default=30, cast=int)
+JWT_USAGE_FLUSH_SIZE = config("JWT_USAGE_FLUSH_SIZE", default=500, cast=int)
+
+# Open a Django session on login in addition to issuing JWTs. Clients can
+# still opt out per request with {"session": false}.
+AUTH_LOGIN_SESSION = config("AUTH_LOGIN_SESSION", default=True, cast=bool)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
@@ -486,8 +503,28 @@ CLOUDINARY_STORAGE = {
     "SECURE": True,
 }
 
+# Background upload of base64 images saved through CloudinaryImageField /
+# HybridImageField (see utils/media_upload.py); images waiting for upload are
+# spooled outside MEDIA_ROOT so they are never served as public media
+MEDIA_UPLOADER = config(
+    "MEDIA_UPLOADER", default="utils.media_upload.CloudinaryUploader"
+)
+MEDIA_UPLOAD_WORKERS = config("MEDIA_UPLOAD_WORKERS", default=4, cast=int)
+MEDIA_UPLOAD_RETRIES = config("MEDIA_UPLOAD_RETRIES", default=3, cast=int)
+MEDIA_UPLOAD_SPOOL_DIR = config(
+    "MEDIA_UPLOAD_SPOOL_DIR", default=str(BASE_DIR / "var" / "upload_spool")
+)
+
 # Poppler Configuration for PDF processing
 POPPLER_PATH = r"C:\poppler\poppler-23.08.0\Library\bin"
+# Pages rasterized/uploaded concurrently per PDF, and where PDFs of
+# unfinished conversion jobs are kept for resuming (outside MEDIA_ROOT, since
+# they are identity documents)
+PDF_PIPELINE_WORKERS = config("PDF_PIPELINE_WORKERS", default=3, cast=int)
+PDF_JOB_DIR = config("PDF_JOB_DIR", default=str(BASE_DIR / "var" / "pdf_jobs"))
+# Days a failed job's PDF is kept for resuming before pdf_conversion_jobs
+# purges it
+PDF_JOB_RETENTION_DAYS = config("PDF_JOB_RETENTION_DAYS", default=7, cast=int)
 
 # File Storage Configuration - Using Cloudinary
 DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
@@ -501,6 +538,64 @@ MEDIA_ROOT = BASE_DIR / "media"
 USE_LOCAL_STORAGE = config("USE_LOCAL_STORAGE", default=False, cast=bool)
 LOCAL_MEDIA_ROOT = BASE_DIR / "local_media"
 
+# Recently proxied documents (admin document review) kept on local disk, outside
+# MEDIA_ROOT so they are never served as public media
+DOCUMENT_CACHE_DIR = config(
+    "DOCUMENT_CACHE_DIR", default=str(BASE_DIR / "var" / "document_cache")
+)
+DOCUMENT_CACHE_MAX_BYTES = config(
+    "DOCUMENT_CACHE_MAX_BYTES", default=500 * 1024 * 1024, cast=int
+)
+DOCUMENT_PROXY_POOL_SIZE = config("DOCUMENT_PROXY_POOL_SIZE", default=10, cast=int)
+
+# Per-request SQL/latency profiling (config.middleware.RequestProfilingMiddleware)
+REQUEST_PROFILING = config("REQUEST_PROFILING", default=False, cast=bool)
+REQUEST_PROFILING_SAMPLE_RATE = config(
+    "REQUEST_PROFILING_SAMPLE_RATE", default=1.0, cast=float
+)
+REQUEST_PROFILING_WINDOW_SECONDS = config(
+    "REQUEST_PROFILING_WINDOW_SECONDS", default=900, cast=int
+)
+REQUEST_PROFILING_DUMP_SECONDS = config(
+    "REQUEST_PROFILING_DUMP_SECONDS", default=60, cast=int
+)
+REQUEST_PROFILING_DUMP_DIR = config(
+    "REQUEST_PROFILING_DUMP_DIR", default=str(BASE_DIR / "var" / "request_profiles")
+)
+
+# Delivery dispatch queue (apps.orders.services.dispatch): unassigned orders
+# are offered to this many agents at a time, each offer lasting this long;
+# answered/expired offers are purged daily once older than the retention
+DELIVERY_OFFER_BATCH_SIZE = config("DELIVERY_OFFER_BATCH_SIZE", default=3, cast=int)
+DELIVERY_OFFER_SECONDS = config("DELIVERY_OFFER_SECONDS", default=60, cast=int)
+DELIVERY_OFFER_RETENTION_SECONDS = config(
+    "DELIVERY_OFFER_RETENTION_SECONDS", default=24 * 60 * 60, cast=int
+)
+
+# Checkout pricing (apps.orders.services.cart_pricing): FoodPrice snapshots are
+# cached this long, and a checkout quote can be ordered from for this long
+CHECKOUT_PRICE_CACHE_SECONDS = config("CHECKOUT_PRICE_CACHE_SECONDS", default=60, cast=int)
+CHECKOUT_QUOTE_SECONDS = config("CHECKOUT_QUOTE_SECONDS", default=900, cast=int)
+
+# Bulk order collaboration (apps.orders.services.chef_workload): chefs with this
+# many active bulk order assignments are listed as busy
+BULK_CHEF_CAPACITY = config("BULK_CHEF_CAPACITY", default=3, cast=int)
+
+# Customer bulk menu search (apps.food.bulk_menu_catalogue): the menu catalogue
+# snapshot is cached this long (it is also dropped on any menu change), and at
+# most this many lexical matches are sent to the AI model per request
+BULK_MENU_CATALOGUE_SECONDS = config("BULK_MENU_CATALOGUE_SECONDS", default=3600, cast=int)
+BULK_MENU_AI_CANDIDATES = config("BULK_MENU_AI_CANDIDATES", default=20, cast=int)
+
+# Food search index (apps.food.search_index): each process rebuilds its index
+# at least this often, so workers without a shared cache still catch up
+FOOD_SEARCH_INDEX_MAX_AGE_SECONDS = config(
+    "FOOD_SEARCH_INDEX_MAX_AGE_SECONDS", default=300, cast=int
+)
+# Best matches the food list endpoints rank and filter; the rest of a broad
+# query's hits are dropped instead of going into a huge IN/CASE clause
+FOOD_SEARCH_MAX_RESULTS = config("FOOD_SEARCH_MAX_RESULTS", default=300, cast=int)
+
 # Admin Feature Flags
 ADMIN_FEATURES_V2 = config("ADMIN_FEATURES_V2", default=True, cast=bool)
 ADMIN_NOTIFICATIONS_V2 = config("ADMIN_NOTIFICATIONS_V2", default=True, cast=bool)
@@ -6,20 +6,62 @@ import cloudinary.uploader
 import cloudinary.api
 from django.conf import settings
 import base64
+import logging
 import tempfile
+import threading
 import os
+from functools import lru_cache
 from typing import Optional, Dict, Any
 import uuid
 
+from utils.media_upload import is_pending_upload
+
+logger = logging.getLogger(__name__)
+
+# Distinct (url, size) combinations kept by the image URL builders
+IMAGE_URL_CACHE_SIZE = 8192
+# Longer values are not URLs (e.g. base64 blobs) and are not memoized
+MAX_MEMOIZED_URL_LENGTH = 2048
+
+_configured_with = None
+_configure_lock = threading.Lock()
+
 
 def configure_cloudinary():
-    """Configure Cloudinary with settings from environment"""
-    cloudinary.config(
-        cloud_name=settings.CLOUDINARY_STORAGE['CLOUD_NAME'],
-        api_key=settings.CLOUDINARY_STORAGE['API_KEY'],
-        api_secret=settings.CLOUDINARY_STORAGE['API_SECRET'],
-        secure=True
+    """
+    Configure Cloudinary with settings from environment.
+    The SDK is only reconfigured when the credentials change.
+    """
+    global _configured_with
+    credentials = (
+        settings.CLOUDINARY_STORAGE['CLOUD_NAME'],
+        settings.CLOUDINARY_STORAGE['API_KEY'],
+        settings.CLOUDINARY_STORAGE['API_SECRET'],
     )
+    if _configured_with == credentials:
+        return
+    with _configure_lock:
+        cloudinary.config(
+            cloud_name=credentials[0],
+            api_key=credentials[1],
+            api_secret=credentials[2],
+            secure=True
+        )
+        _configured_with = credentials
+
+
+def _memoizable(image_url: str) -> bool:
+    """Only URLs and paths are memoized, so the cache never pins image data"""
+    return (
+        len(image_url) <= MAX_MEMOIZED_URL_LENGTH
+        and not image_url.startswith('data:')
+    )
+
+
+def clear_image_url_cache():
+    """Forget memoized image URLs (e.g. after changing the cloud name)"""
+    _build_optimized_url.cache_clear()
+    _build_reliable_image_url.cache_clear()
 
 
 def upload_image_to_cloudinary(
@@ -113,10 +155,23 @@ def get_optimized_url(
     Returns:
         Optimized URL (Cloudinary optimized URL or original external URL)
     """
+    if not image_url or is_pending_upload(image_url):
+        return ''
+    image_url = str(image_url)
+    build = _build_optimized_url if _memoizable(image_url) else _build_optimized_url.__wrapped__
+    return build(image_url, width, height, quality, format)
+
+
+@lru_cache(maxsize=IMAGE_URL_CACHE_SIZE)
+def _build_optimized_url(
+    image_url: str,
+    width: Optional[int],
+    height: Optional[int],
+    quality: str,
+    format: str
+) -> str:
+    """Memoized body of ``get_optimized_url``: the output only depends on the arguments"""
     try:
-        if not image_url:
-            return ''
-            
         # If it's a Cloudinary URL, optimize it
         if 'cloudinary.com' in image_url:
             public_id = extract_public_id_from_url(image_url)
@@ -162,7 +217,7 @@ def get_optimized_url(
             return image_url
         
     except Exception as e:
-        print(f"Error generating optimized URL: {e}")
+        logger.warning(f"Error generating optimized URL: {e}")
         return image_url or ''
 
 
@@ -199,7 +254,7 @@ def extract_public_id_from_url(cloudinary_url: str) -> Optional[str]:
         return None
         
     except Exception as e:
-        print(f"Error extracting public ID from URL: {e}")
+        logger.warning(f"Error extracting public ID from URL: {e}")
         return None
 
 
@@ -286,11 +341,26 @@ def get_reliable_image_url(
     Returns:
         Optimized URL with fallback logic
     """
-    if not image_url:
+    if not image_url or is_pending_upload(image_url):
         if fallback_enabled:
             return f"https://picsum.photos/{width or 400}/{height or 300}?random=food"
         return ''
-    
+    image_url = str(image_url)
+    build = (
+        _build_reliable_image_url if _memoizable(image_url)
+        else _build_reliable_image_url.__wrapped__
+    )
+    return build(image_url, width, height, fallback_enabled)
+
+
+@lru_cache(maxsize=IMAGE_URL_CACHE_SIZE)
+def _build_reliable_image_url(
+    image_url: str,
+    width: Optional[int],
+    height: Optional[int],
+    fallback_enabled: bool
+) -> str:
+    """Memoized body of ``get_reliable_image_url``"""
     try:
         # Handle Cloudinary URLs - optimize them
         if 'cloudinary.com' in image_url:
@@ -309,7 +379,7 @@ def get_reliable_image_url(
             return _construct_cloudinary_url(image_url, width, height)
             
     except Exception as e:
-        print(f"Error processing image URL {image_url}: {e}")
+        logger.warning(f"Error processing image URL {image_url}: {e}")
         if fallback_enabled:
             return f"https://picsum.photos/{width or 400}/{height or 300}?random=food"
         return image_url
@@ -341,7 +411,6 @@ def _optimize_unsplash_url(image_url: str, width: Optional[int] = None, height:
 def _construct_cloudinary_url(relative_path: str, width: Optional[int] = None, height: Optional[int] = None) -> str:
     """Construct Cloudinary URL from relative path"""
     try:
-        configure_cloudinary()
         cloud_name = settings.CLOUDINARY_STORAGE.get('CLOUD_NAME', 'dqbl2r4ct')
         
         # Clean the path
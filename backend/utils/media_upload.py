@@ -0,0 +1,288 @@
+"""
+Background media upload queue
+
+``CloudinaryImageField``/``HybridImageField`` used to upload base64 blobs to
+Cloudinary inside ``Model.save()``, keeping the transaction open and the
+request thread blocked on the network. They now call ``enqueue_blob_upload``:
+
+1. the blob is decoded in chunks into a spool file under
+   ``MEDIA_UPLOAD_SPOOL_DIR`` and the field is saved as a
+   ``pending-upload:<token>`` placeholder;
+2. once the transaction commits, a worker pool uploads the spool file with
+   retries;
+3. the final URL replaces the placeholder with a conditional UPDATE, so a
+   value written in the meantime is never overwritten.
+
+Uploads that still fail after the retries keep their spool file and are
+re-queued by ``python manage.py retry_media_uploads``.
+
+``MEDIA_UPLOADER`` selects the backend; ``LocalFakeUploader`` stores files
+locally and is what the tests use. ``MEDIA_UPLOAD_WORKERS = 0`` uploads
+inline after commit instead of on the pool.
+"""
+import base64
+import binascii
+import json
+import logging
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+PENDING_PREFIX = "pending-upload:"
+
+# Base64 is decoded in multiples of 4 characters
+DECODE_CHUNK_SIZE = 64 * 1024
+
+
+def is_pending_upload(value) -> bool:
+    """True for placeholders of uploads that have not completed yet"""
+    return isinstance(value, str) and value.startswith(PENDING_PREFIX)
+
+
+# ----------------------------------------------------------------------
+# Uploaders
+# ----------------------------------------------------------------------
+
+
+class CloudinaryUploader:
+    """Uploads a spool file to Cloudinary and returns its secure URL"""
+
+    def upload(self, path: str, folder: str, public_id: str, tags: List[str]) -> str:
+        import cloudinary.uploader
+
+        from utils.cloudinary_utils import configure_cloudinary
+
+        configure_cloudinary()
+        result = cloudinary.uploader.upload(
+            path,
+            folder=folder,
+            public_id=public_id,
+            tags=tags,
+            transformation={'quality': 'auto', 'fetch_format': 'auto'},
+            resource_type='image',
+        )
+        return result['secure_url']
+
+
+class LocalFakeUploader:
+    """
+    Copies uploads under ``MEDIA_ROOT/fake_uploads`` and returns a
+    Cloudinary-shaped URL. Used by tests and offline development.
+    """
+
+    def __init__(self):
+        self.uploads = []
+
+    def upload(self, path: str, folder: str, public_id: str, tags: List[str]) -> str:
+        target = Path(settings.MEDIA_ROOT) / 'fake_uploads' / folder / public_id
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, target)
+        url = f"https://res.cloudinary.com/fake/image/upload/{folder}/{public_id}"
+        self.uploads.append({'url': url, 'path': str(target), 'tags': tags})
+        return url
+
+
+_uploader = None
+_uploader_lock = threading.Lock()
+
+
+def get_uploader():
+    global _uploader
+    with _uploader_lock:
+        if _uploader is None:
+            backend = getattr(
+                settings, 'MEDIA_UPLOADER', 'utils.media_upload.CloudinaryUploader'
+            )
+            _uploader = import_string(backend)()
+        return _uploader
+
+
+def reset_uploader():
+    """Drop the cached uploader so a changed ``MEDIA_UPLOADER`` takes effect"""
+    global _uploader
+    with _uploader_lock:
+        _uploader = None
+
+
+# ----------------------------------------------------------------------
+# Spooling
+# ----------------------------------------------------------------------
+
+
+def spool_dir() -> Path:
+    path = Path(
+        getattr(settings, 'MEDIA_UPLOAD_SPOOL_DIR', Path(settings.BASE_DIR) / 'var' / 'upload_spool')
+    )
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _write_spool(token: str, blob: str) -> Optional[Path]:
+    """
+    Decode a base64 string (optionally a data URL) into ``<token>.bin``.
+    Returns None when the value is not valid base64.
+    """
+    if blob.startswith('data:'):
+        blob = blob.split(',', 1)[-1]
+    # Wrapped base64 would shift the 4-character groups between chunks
+    blob = ''.join(blob.split())
+    path = spool_dir() / f"{token}.bin"
+    try:
+        with open(path, 'wb') as spool:
+            for start in range(0, len(blob), DECODE_CHUNK_SIZE):
+                spool.write(
+                    base64.b64decode(blob[start:start + DECODE_CHUNK_SIZE], validate=True)
+                )
+    except (binascii.Error, ValueError):
+        path.unlink(missing_ok=True)
+        return None
+    return path
+
+
+def _meta_path(token: str) -> Path:
+    return spool_dir() / f"{token}.json"
+
+
+def _release(token: str):
+    for path in (spool_dir() / f"{token}.bin", _meta_path(token)):
+        path.unlink(missing_ok=True)
+
+
+# ----------------------------------------------------------------------
+# Queue
+# ----------------------------------------------------------------------
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'MEDIA_UPLOAD_WORKERS', 4),
+                thread_name_prefix='media-upload',
+            )
+        return _executor
+
+
+def enqueue_blob_upload(
+    model_instance,
+    field_name: str,
+    blob: str,
+    folder: str,
+    public_id: str,
+    tags: List[str],
+) -> Optional[str]:
+    """
+    Spool ``blob`` and schedule its upload after the current transaction
+    commits. Returns the placeholder to store, or None if ``blob`` is not
+    base64 data.
+    """
+    token = uuid.uuid4().hex
+    if _write_spool(token, blob) is None:
+        return None
+
+    placeholder = f"{PENDING_PREFIX}{token}"
+    meta = {
+        'token': token,
+        'model': model_instance._meta.label,
+        'field': field_name,
+        'folder': folder,
+        'public_id': public_id,
+        'tags': tags,
+        'placeholder': placeholder,
+    }
+    # The primary key only exists after the INSERT, so submit on commit
+    transaction.on_commit(lambda: submit_upload(meta, model_instance.pk))
+    return placeholder
+
+
+def submit_upload(meta: Dict, pk):
+    meta = dict(meta, pk=pk)
+    with open(_meta_path(meta['token']), 'w') as handle:
+        json.dump(meta, handle)
+
+    if getattr(settings, 'MEDIA_UPLOAD_WORKERS', 4) <= 0:
+        process_upload(meta)
+    else:
+        _get_executor().submit(_run_upload_job, meta)
+
+
+def _run_upload_job(meta: Dict):
+    """Pool entry point: worker threads must not keep stale DB connections"""
+    close_old_connections()
+    try:
+        return process_upload(meta)
+    finally:
+        close_old_connections()
+
+
+def process_upload(meta: Dict) -> Optional[str]:
+    """Upload one spooled blob with retries and swap the URL into its row"""
+    path = spool_dir() / f"{meta['token']}.bin"
+    if not path.exists():
+        return None
+
+    retries = getattr(settings, 'MEDIA_UPLOAD_RETRIES', 3)
+    backoff = getattr(settings, 'MEDIA_UPLOAD_RETRY_BACKOFF', 1.0)
+    url = None
+    for attempt in range(retries + 1):
+        try:
+            url = get_uploader().upload(
+                str(path), meta['folder'], meta['public_id'], meta['tags']
+            )
+            break
+        except Exception as e:
+            logger.warning(
+                "Media upload %s failed (attempt %s/%s): %s",
+                meta['token'], attempt + 1, retries + 1, e,
+            )
+            if attempt < retries:
+                time.sleep(backoff * (2 ** attempt))
+
+    if not url:
+        logger.error("Media upload %s gave up; spool kept for retry", meta['token'])
+        return None
+
+    model = apps.get_model(meta['model'])
+    field = model._meta.get_field(meta['field'])
+    model._default_manager.filter(
+        pk=meta['pk'], **{field.attname: meta['placeholder']}
+    ).update(**{field.attname: url})
+    _release(meta['token'])
+    return url
+
+
+def pending_uploads() -> List[Dict]:
+    """Metadata of spooled uploads that have not completed"""
+    pending = []
+    for meta_path in sorted(spool_dir().glob('*.json')):
+        try:
+            with open(meta_path) as handle:
+                pending.append(json.load(handle))
+        except (OSError, ValueError):
+            continue
+    return pending
+
+
+def wait_for_uploads():
+    """Block until queued uploads finish (used on shutdown and in tests)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
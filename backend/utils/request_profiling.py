@@ -0,0 +1,297 @@
+"""
+Per-request SQL and latency profiling (see RequestProfilingMiddleware).
+
+Each profiled request records its view, latency, query count/time and the
+fingerprints of queries it ran more than once (the N+1 signature). Samples
+are aggregated per view into one-minute buckets kept for
+``REQUEST_PROFILING_WINDOW_SECONDS``; latency is kept as a fixed-bound
+histogram so buckets (and other workers' dumps) merge cheaply.
+
+Every worker periodically writes its buckets to
+``REQUEST_PROFILING_DUMP_DIR/<pid>.json`` so the admin endpoint and the
+``request_profile_report`` command can report across processes.
+"""
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+
+from django.conf import settings
+
+# Upper bounds (ms) of the latency histogram bins; the last bin is open ended
+LATENCY_BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+# Duplicate fingerprints kept per view and bucket
+MAX_FINGERPRINTS = 20
+
+SORT_KEYS = {
+    "p95": lambda s: s["p95_ms"],
+    "latency": lambda s: s["avg_ms"],
+    "max": lambda s: s["max_ms"],
+    "queries": lambda s: s["avg_queries"],
+    "duplicates": lambda s: s["avg_duplicates"],
+    "count": lambda s: s["count"],
+    "total": lambda s: s["total_ms"],
+}
+
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*%s\s*,?)+\)", re.IGNORECASE)
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Normalize SQL so the same statement with different values compares equal"""
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    sql = _LITERAL_RE.sub("?", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` that counts and times the request's queries"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self):
+        """Extra executions of each statement run more than once"""
+        return {sql: n - 1 for sql, n in self.fingerprints.items() if n > 1}
+
+
+class ViewStats:
+    """Mergeable aggregate of the requests served by one view"""
+
+    __slots__ = (
+        "count", "total_ms", "max_ms", "queries", "max_queries",
+        "query_ms", "duplicates", "errors", "bins", "fingerprints",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.queries = 0
+        self.max_queries = 0
+        self.query_ms = 0.0
+        self.duplicates = 0
+        self.errors = 0
+        self.bins = [0] * (len(LATENCY_BOUNDS_MS) + 1)
+        self.fingerprints = Counter()
+
+    def add(self, latency_ms, queries, query_ms, duplicates, error=False):
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+        self.queries += queries
+        self.max_queries = max(self.max_queries, queries)
+        self.query_ms += query_ms
+        self.duplicates += sum(duplicates.values())
+        self.errors += int(error)
+        self.bins[self._bin(latency_ms)] += 1
+        if duplicates:
+            self.fingerprints.update(duplicates)
+            self._trim()
+
+    @staticmethod
+    def _bin(latency_ms):
+        for index, bound in enumerate(LATENCY_BOUNDS_MS):
+            if latency_ms <= bound:
+                return index
+        return len(LATENCY_BOUNDS_MS)
+
+    def _trim(self):
+        if len(self.fingerprints) > MAX_FINGERPRINTS:
+            self.fingerprints = Counter(dict(self.fingerprints.most_common(MAX_FINGERPRINTS)))
+
+    def merge(self, other):
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.queries += other.queries
+        self.max_queries = max(self.max_queries, other.max_queries)
+        self.query_ms += other.query_ms
+        self.duplicates += other.duplicates
+        self.errors += other.errors
+        self.bins = [a + b for a, b in zip(self.bins, other.bins)]
+        self.fingerprints.update(other.fingerprints)
+        self._trim()
+
+    def percentile(self, fraction):
+        """Upper bound of the histogram bin holding the given fraction of requests"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, n in enumerate(self.bins):
+            seen += n
+            if seen >= target:
+                if index < len(LATENCY_BOUNDS_MS):
+                    return float(min(LATENCY_BOUNDS_MS[index], self.max_ms))
+                return self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        for name in cls.__slots__:
+            if name in data:
+                setattr(stats, name, data[name])
+        stats.fingerprints = Counter(stats.fingerprints)
+        return stats
+
+    def summary(self, view):
+        count = max(self.count, 1)
+        return {
+            "view": view,
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / count, 2),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 2),
+            "total_ms": round(self.total_ms, 2),
+            "avg_queries": round(self.queries / count, 2),
+            "max_queries": self.max_queries,
+            "avg_query_ms": round(self.query_ms / count, 2),
+            "avg_duplicates": round(self.duplicates / count, 2),
+            "top_duplicates": [
+                {"sql": sql, "extra_executions": n}
+                for sql, n in self.fingerprints.most_common(5)
+            ],
+        }
+
+
+class ProfileStore:
+    """Rolling per-view aggregates for this process"""
+
+    def __init__(self, window_seconds=900, bucket_seconds=60):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self._buckets = deque()  # (bucket start, {view: ViewStats})
+        self._lock = threading.Lock()
+        self._last_dump = time.time()
+
+    def _expire(self, now):
+        cutoff = now - self.window_seconds
+        while self._buckets and self._buckets[0][0] + self.bucket_seconds <= cutoff:
+            self._buckets.popleft()
+
+    def record(self, view, latency_ms, recorder, error=False):
+        now = time.time()
+        start = now - now % self.bucket_seconds
+        with self._lock:
+            if not self._buckets or self._buckets[-1][0] != start:
+                self._buckets.append((start, {}))
+                self._expire(now)
+            views = self._buckets[-1][1]
+            stats = views.get(view)
+            if stats is None:
+                stats = views[view] = ViewStats()
+            stats.add(
+                latency_ms,
+                recorder.count,
+                recorder.duration * 1000,
+                recorder.duplicates(),
+                error=error,
+            )
+        self.maybe_dump()
+
+    def buckets(self):
+        with self._lock:
+            self._expire(time.time())
+            return [
+                (start, {view: stats.to_dict() for view, stats in views.items()})
+                for start, views in self._buckets
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def maybe_dump(self, force=False):
+        interval = getattr(settings, "REQUEST_PROFILING_DUMP_SECONDS", 60)
+        if not force and (interval <= 0 or time.time() - self._last_dump < interval):
+            return
+        self._last_dump = time.time()
+        if not self._buckets:
+            return
+        directory = dump_dir()
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"{os.getpid()}.json"
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"buckets": self.buckets()}))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+def dump_dir():
+    return Path(
+        getattr(
+            settings,
+            "REQUEST_PROFILING_DUMP_DIR",
+            Path(settings.BASE_DIR) / "var" / "request_profiles",
+        )
+    )
+
+
+profile_store = ProfileStore(
+    window_seconds=getattr(settings, "REQUEST_PROFILING_WINDOW_SECONDS", 900)
+)
+atexit.register(profile_store.maybe_dump, force=True)
+
+
+def collect(include_dumps=True):
+    """
+    Merge this process' buckets with the dumps of other workers that fall
+    inside the window. Returns {view: ViewStats}.
+    """
+    cutoff = time.time() - profile_store.window_seconds
+    sources = [profile_store.buckets()]
+    if include_dumps and dump_dir().is_dir():
+        own = f"{os.getpid()}.json"
+        for path in dump_dir().glob("*.json"):
+            if path.name == own:
+                continue
+            try:
+                sources.append(json.loads(path.read_text())["buckets"])
+            except (OSError, ValueError, KeyError):
+                continue
+
+    merged = {}
+    for buckets in sources:
+        for start, views in buckets:
+            if start + profile_store.bucket_seconds <= cutoff:
+                continue
+            for view, data in views.items():
+                stats = merged.get(view)
+                if stats is None:
+                    stats = merged[view] = ViewStats()
+                stats.merge(ViewStats.from_dict(data))
+    return merged
+
+
+def top_views(sort="p95", limit=20, include_dumps=True):
+    """Summaries of the ``limit`` worst views by ``sort`` (see SORT_KEYS)"""
+    key = SORT_KEYS.get(sort, SORT_KEYS["p95"])
+    summaries = [stats.summary(view) for view, stats in collect(include_dumps).items()]
+    summaries.sort(key=key, reverse=True)
+    return summaries[:limit]